@@ -78,13 +78,57 @@ WSGI_APPLICATION = 'dashboard.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# 'testlog' 는 러너가 기록하는 로그 저장소 (qa_monitor.routers.TestLogRouter 가 러너 테이블 모델을 보냄).
+# config.ini [Storage] 설정(기본 artifacts/test_log.db, 또는 PostgreSQL)을 따르며,
+# QA_MONITOR_TEST_LOG_DB 를 지정하면 해당 SQLite 파일을 사용.
+# CONN_MAX_AGE 로 요청마다 연결을 새로 열지 않고 워커 스레드별로 재사용
+
+from scripts.utils.log_storage import SQLiteStorage, load_storage
+
+TEST_LOG_STORAGE = (SQLiteStorage(os.environ['QA_MONITOR_TEST_LOG_DB'])
+                    if os.environ.get('QA_MONITOR_TEST_LOG_DB') else load_storage())
+DB_CONN_MAX_AGE = int(os.environ.get('QA_MONITOR_CONN_MAX_AGE', '600'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'testlog': {
+        **TEST_LOG_STORAGE.django_database(),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    },
 }
 
+DATABASE_ROUTERS = ['qa_monitor.routers.TestLogRouter']
+
+
+# Cache
+# 대시보드 뷰 응답 캐시 (qa_monitor.cache). 기본은 프로세스 로컬 메모리,
+# QA_MONITOR_CACHE_DIR 를 지정하면 여러 워커가 공유하는 파일 캐시 사용
+
+QA_MONITOR_CACHE_DIR = os.environ.get('QA_MONITOR_CACHE_DIR')
+
+if QA_MONITOR_CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': QA_MONITOR_CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': 1000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'qa-monitor',
+            'OPTIONS': {'MAX_ENTRIES': 1000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class QaMonitorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qa_monitor'
+
+    def ready(self):
+        # 설정은 프로세스 시작 시 한 번만 읽고, 로그 저장소 스키마는 첫 요청에서 확인 (qa_monitor.services)
+        from django.core.signals import request_started
+
+        from . import services
+        services.initialize()
+        request_started.connect(services.ensure_schema, dispatch_uid="qa_monitor.ensure_schema")
@@ -0,0 +1,122 @@
+"""
+대시보드 Parquet 아카이브 조회
+scripts/utils/log_archive 압축 작업이 오래된 test_log / test_api 행을 DB 에서 Parquet 파티션으로 옮기므로,
+런 상세/케이스 이력처럼 과거 행이 필요한 화면은 여기서 아카이브 행을 함께 읽습니다.
+
+- 매니페스트(ArchivePartition)로 아카이브 여부를 먼저 확인하고 필요한 파티션 파일만 읽음
+- test_log 는 런 단위로 옮기므로 한 런의 행은 DB 나 아카이브 중 한쪽에만 있음
+- 런 목록/상태 카운트(run_summary)와 응답시간 추이(롤업)는 아카이브 후에도 DB 에 남아 있어 여기서 다루지 않음
+- SQLite 저장소이고 pyarrow 가 있을 때만 사용 (그 외에는 DB 행만 표시)
+- log_archive(pyarrow)는 대시보드 시작 시간을 늘리지 않도록 아카이브를 처음 읽을 때 import
+"""
+
+import importlib.util
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import DatabaseError
+from django.db.models import Count, Sum
+
+from scripts.utils.log_storage import SQLITE
+
+from .cache import TEST_LOG_DB, TEST_LOG_STORAGE
+from .models import ApiCall, ArchivePartition
+from .queries import api_call_stats, raw_test_log_connection
+
+ENABLED = TEST_LOG_STORAGE.name == SQLITE and importlib.util.find_spec('pyarrow') is not None
+
+TEST_LOG_FIELDS = ('id', 'test_case_id', 'step_name', 'status', 'start_time', 'end_time', 'elapsed', 'error_msg',
+                   'serial', 'model', 'os_version', 'tving_version', 'run_id')
+
+
+def _reader():
+    from scripts.utils.log_archive import ArchiveReader, default_archive_dir
+    return ArchiveReader(raw_test_log_connection(), default_archive_dir(TEST_LOG_DB))
+
+
+def _field(name):
+    from scripts.utils.log_archive import ds
+    return ds.field(name)
+
+
+def _has_partitions(table, **filters):
+    if not ENABLED:
+        return False
+    try:
+        return ArchivePartition.objects.filter(table_name=table, **filters).exists()
+    except DatabaseError:
+        # 아직 매니페스트(v13)가 없는 DB
+        return False
+
+
+def run_archived(run_id) -> bool:
+    """런의 test_log 행이 아카이브로 옮겨졌는지 (매니페스트 인덱스 조회)"""
+    return _has_partitions('test_log', run_id=str(run_id))
+
+
+def run_logs(run_id) -> List[Dict[str, Any]]:
+    """아카이브된 런의 test_log 행 (런 파티션 파일만 읽음)"""
+    return _reader().rows('test_log', TEST_LOG_FIELDS, run_id=str(run_id))
+
+
+def case_logs(test_case_id) -> List[Dict[str, Any]]:
+    """케이스의 아카이브된 실행 기록 (test_log 파티션 전체에서 test_case_id 로 거름)"""
+    if not _has_partitions('test_log'):
+        return []
+    return _reader().rows('test_log', TEST_LOG_FIELDS,
+                          filter=_field('test_case_id') == str(test_case_id))
+
+
+def _archived_api_stats(run_id=None, case_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, float]]:
+    """아카이브된 test_api 의 케이스별 {calls, timed, elapsed_sum, failed}"""
+    if not _has_partitions('test_api', **({'run_id': str(run_id)} if run_id is not None else {})):
+        return {}
+    condition = None
+    if case_ids is not None:
+        condition = _field('test_case_id').isin([str(case_id) for case_id in case_ids])
+    table = _reader().read('test_api', ['test_case_id', 'status_code', 'elapsed'],
+                           run_id=None if run_id is None else str(run_id), filter=condition)
+    stats: Dict[str, Dict[str, float]] = {}
+    for row in table.to_pylist():
+        item = stats.setdefault(row['test_case_id'], {'calls': 0, 'timed': 0, 'elapsed_sum': 0.0, 'failed': 0})
+        item['calls'] += 1
+        if row['elapsed'] is not None:
+            item['timed'] += 1
+            item['elapsed_sum'] += row['elapsed']
+        if row['status_code'] is not None and row['status_code'] >= 400:
+            item['failed'] += 1
+    return stats
+
+
+def case_api_stats(run_id, case_ids) -> Dict[str, Dict[str, Any]]:
+    """queries.case_api_stats 와 같은 형식으로 DB 행과 아카이브 행을 합친 케이스별 API 호출 통계"""
+    case_ids = list(case_ids)
+    hot = (ApiCall.objects
+           .filter(run_id=str(run_id), test_case_id__in=case_ids)
+           .values('test_case_id')
+           .annotate(**api_call_stats(), timed=Count('elapsed'), elapsed_sum=Sum('elapsed')))
+    merged = {row['test_case_id']: {'calls': row['calls'], 'timed': row['timed'],
+                                    'elapsed_sum': row['elapsed_sum'] or 0.0, 'failed': row['failed']}
+              for row in hot}
+    for case_id, item in _archived_api_stats(run_id, case_ids).items():
+        target = merged.setdefault(case_id, {'calls': 0, 'timed': 0, 'elapsed_sum': 0.0, 'failed': 0})
+        for key in target:
+            target[key] += item[key]
+    return {case_id: {'calls': item['calls'],
+                      'avg_time': item['elapsed_sum'] / item['timed'] if item['timed'] else None,
+                      'failed': item['failed']}
+            for case_id, item in merged.items()}
+
+
+def case_api_totals(test_case_id) -> Dict[str, Any]:
+    """케이스 전체 이력의 API 호출 통계 {calls, avg_time, failed} (DB + 아카이브)"""
+    hot = ApiCall.objects.filter(test_case_id=str(test_case_id)).aggregate(
+        **api_call_stats(), timed=Count('elapsed'), elapsed_sum=Sum('elapsed'))
+    archived = _archived_api_stats(case_ids=[test_case_id]).get(str(test_case_id), {})
+    calls = hot['calls'] + archived.get('calls', 0)
+    timed = hot['timed'] + archived.get('timed', 0)
+    elapsed_sum = (hot['elapsed_sum'] or 0.0) + archived.get('elapsed_sum', 0.0)
+    return {
+        'calls': calls,
+        'avg_time': elapsed_sum / timed if timed else None,
+        'failed': hot['failed'] + archived.get('failed', 0),
+    }
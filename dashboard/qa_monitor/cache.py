@@ -0,0 +1,151 @@
+"""
+대시보드 뷰 응답 캐시
+뷰 이름 + URL 인자 + 쿼리 파라미터 + test_log.db 데이터 세대(generation)로 키를 만들어
+렌더링된 응답을 Django 캐시(settings.CACHES)에 저장합니다.
+
+- 데이터 세대: sqlite_sequence 의 test_log / test_api / test_phase 마지막 id (세 테이블은 삽입만 하므로
+  새 행이 커밋되면 세대가 바뀌어 이전 캐시 키는 더 이상 조회되지 않음. log_archive 가 오래된 행을 옮겨도
+  대시보드는 아카이브 행을 함께 읽으므로 캐시된 응답 내용은 그대로 유효)
+- SQLite 저장소는 api_rollup_state 의 파생 테이블 워터마크(롤업/이상 감지/회귀/시퀀스)도 세대에 포함
+  (api_capture 는 test_api 를 먼저 커밋하고 파생 테이블을 별도 트랜잭션으로 갱신하므로, 그 사이에 캐시된
+  이전 집계가 새 세대 키로 남지 않도록 함)
+- DB/WAL 파일 상태(mtime, 크기)가 그대로면 세대 조회 쿼리도 생략
+- PostgreSQL 저장소는 세 테이블의 MAX(id) 를 세대로 사용 (여러 호스트가 동시에 쓰면 늦게 커밋된
+  작은 id 는 다음 삽입이나 CACHE_TIMEOUT 이후 반영)
+- DB 가 없거나 세대를 읽지 못하면 캐시 없이 뷰를 그대로 실행
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+
+from scripts.utils.log_storage import SQLITE
+
+from .routers import TEST_LOG_DB_ALIAS
+
+logger = logging.getLogger(__name__)
+
+TEST_LOG_STORAGE = settings.TEST_LOG_STORAGE
+TEST_LOG_DB = str(settings.DATABASES[TEST_LOG_DB_ALIAS]["NAME"])
+
+CACHE_ALIAS = "default"
+CACHE_TIMEOUT = 300             # 세대가 그대로여도 시간 기준 집계(최근 N일 등)가 밀리지 않도록 5분 후 만료
+KEY_PREFIX = "qa_monitor"
+DATA_TABLES = ("test_log", "test_api", "test_phase")   # test_phase 업로드 단계는 케이스 log_step 이후에 기록됨
+WATERMARK_TABLE = "api_rollup_state"
+
+_lock = threading.Lock()
+_generations: Dict[str, Tuple[Tuple, str]] = {}     # db_path -> (파일 상태, 세대)
+
+
+def _file_stat(db_path: str) -> Optional[Tuple]:
+    """DB 본 파일과 WAL 파일의 (mtime_ns, size) - 커밋이 있으면 둘 중 하나는 바뀜"""
+    stats = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if path == db_path:
+                return None
+            stats.append(None)
+            continue
+        stats.append((st.st_mtime_ns, st.st_size))
+    return tuple(stats)
+
+
+def _max_id_generation() -> Optional[str]:
+    """SQLite 파일이 아닌 저장소의 세대 (id 인덱스 끝만 읽으므로 요청마다 조회)"""
+    try:
+        with connections[TEST_LOG_DB_ALIAS].cursor() as cursor:
+            seqs = []
+            for table in DATA_TABLES:
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+                seqs.append(str(cursor.fetchone()[0]))
+    except DatabaseError as e:
+        logger.warning(f"대시보드 캐시 세대 조회 실패 (캐시 생략): {e}")
+        return None
+    return "-".join(seqs)
+
+
+def _watermarks(conn: sqlite3.Connection) -> List[str]:
+    """파생 테이블 워터마크 (이름순, 마이그레이션 전 DB 처럼 상태 테이블이 없으면 빈 목록)"""
+    try:
+        return [str(last_id) for _, last_id in conn.execute(
+            f"SELECT name, last_id FROM {WATERMARK_TABLE} ORDER BY name"
+        )]
+    except sqlite3.OperationalError:
+        return []
+
+
+def data_generation(db_path: str = TEST_LOG_DB) -> Optional[str]:
+    """test_log / test_api / test_phase 커밋이나 파생 테이블 갱신마다 바뀌는 세대 문자열 (DB 가 없으면 None)"""
+    if TEST_LOG_STORAGE.name != SQLITE:
+        return _max_id_generation()
+    stat = _file_stat(db_path)
+    if stat is None:
+        return None
+    with _lock:
+        known = _generations.get(db_path)
+    if known and known[0] == stat:
+        return known[1]
+
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = dict(conn.execute(
+                f"SELECT name, seq FROM sqlite_sequence WHERE name IN ({','.join('?' * len(DATA_TABLES))})",
+                DATA_TABLES,
+            ).fetchall())
+            watermarks = _watermarks(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"대시보드 캐시 세대 조회 실패 (캐시 생략): {e}")
+        return None
+
+    generation = "-".join([str(rows.get(table, 0)) for table in DATA_TABLES] + watermarks)
+    with _lock:
+        _generations[db_path] = (stat, generation)
+    return generation
+
+
+def make_cache_key(view_name: str, generation: str, args: tuple, kwargs: dict, query: dict) -> str:
+    params = repr((args, sorted(kwargs.items()), sorted(query.items())))
+    digest = hashlib.sha1(params.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{view_name}:{generation}:{digest}"
+
+
+def cached_view(timeout: int = CACHE_TIMEOUT, db_path: str = TEST_LOG_DB):
+    """GET 응답을 (뷰, 인자, 쿼리 파라미터, 데이터 세대) 단위로 캐시하는 뷰 데코레이터"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            generation = data_generation(db_path) if request.method == "GET" else None
+            if generation is None:
+                return view(request, *args, **kwargs)
+
+            cache = caches[CACHE_ALIAS]
+            key = make_cache_key(view.__name__, generation, args, kwargs, dict(request.GET.lists()))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type, status = cached
+                response = HttpResponse(content, content_type=content_type, status=status)
+                response["X-QA-Cache"] = "hit"
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not getattr(response, "streaming", False):
+                cache.set(key, (response.content, response.get("Content-Type"), response.status_code), timeout)
+            response["X-QA-Cache"] = "miss"
+            return response
+        return wrapper
+    return decorator
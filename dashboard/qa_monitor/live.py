@@ -0,0 +1,246 @@
+"""
+테스트런 실시간 진행 푸시 (Server-Sent Events)
+러너가 run_event 테이블에 남기는 이벤트를 프로세스당 하나의 폴러가 읽어
+구독 중인 모든 브라우저 연결에 나눠 줍니다.
+
+- 폴러는 PRAGMA data_version 이 바뀐 경우(다른 연결이 커밋)에만 새 이벤트를 조회하므로
+  시청자가 늘어도 DB 조회는 늘지 않음 (PostgreSQL 저장소는 주기마다 마지막 id 이후를 인덱스로 조회)
+- 최근 이벤트는 메모리 버퍼에 보관하고, 버퍼보다 오래된 지점에서 재연결한 경우만 DB 에서 직접 읽음
+- 첫 연결은 런 전체 이벤트를 접은 snapshot 을 보내고, 이후에는 이벤트 단위 증분만 보냄
+  (EventSource 재연결 시 Last-Event-ID 이후부터 이어서 전송)
+- 단계 기록 카운터는 러너가 log_step 과 함께 갱신하는 run_summary 한 행을 그대로 보냄
+  (폴러가 시청 중인 런의 요약만 기본키로 읽고, 바뀐 경우에만 summary 이벤트 전송)
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from scripts.utils.log_storage import SQLITE, LogStorage
+from scripts.utils.run_events import RUN_FINISHED, build_run_snapshot, fetch_run_events, fold_run_events
+from scripts.utils.run_summary import fetch_run_summaries
+
+from .cache import TEST_LOG_STORAGE
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0             # 폴러의 data_version 확인 간격(초)
+BUFFER_SIZE = 5000              # 메모리에 보관하는 최근 이벤트 수
+HEARTBEAT_SECONDS = 15          # 프록시가 연결을 끊지 않도록 보내는 주석 간격
+MAX_STREAM_SECONDS = 1800       # 한 연결의 최대 유지 시간 (이후 브라우저가 자동 재연결)
+RETRY_MILLISECONDS = 3000
+DB_PAGE_SIZE = 1000             # 버퍼보다 오래된 지점에서 DB 로 한 번에 읽는 이벤트 수
+
+
+class RunEventFeed:
+    """run_event 폴링 결과를 여러 구독자에게 나눠 주는 프로세스 공용 피드"""
+
+    def __init__(self, storage: LogStorage = TEST_LOG_STORAGE, poll_interval: float = POLL_INTERVAL):
+        self.storage = storage
+        self.poll_interval = poll_interval
+        self._events: deque = deque(maxlen=BUFFER_SIZE)
+        self._last_id = 0
+        self._watched: Dict[str, int] = {}              # run_id -> 구독 중인 연결 수
+        self._summaries: Dict[str, Dict] = {}           # 시청 중인 런의 최근 run_summary
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._last_id = self._max_event_id()
+                self._thread = threading.Thread(target=self._poll, name="RunEventFeed", daemon=True)
+                self._thread.start()
+
+    def events_after(self, run_id: str, after_id: int) -> Tuple[List[Dict], int]:
+        """after_id 이후 run_id 이벤트와 확인한 마지막 피드 id (버퍼보다 오래된 지점이면 DB 조회)
+
+        DB 조회가 한 페이지를 채우면 마지막으로 읽은 이벤트 id 를 돌려주어 다음 호출에서 이어 읽음
+        """
+        with self._cond:
+            last_id = self._last_id
+            if after_id >= last_id:
+                return [], after_id
+            buffered = list(self._events) if self._events and self._events[0]["id"] <= after_id + 1 else None
+        if buffered is None:
+            with closing(self._connect()) as conn:
+                page = fetch_run_events(conn, run_id, after_id, limit=DB_PAGE_SIZE)
+            events = [event for event in page if event["id"] <= last_id]
+            if len(page) == DB_PAGE_SIZE and events and events[-1]["id"] < last_id:
+                return events, events[-1]["id"]
+            return events, last_id
+        return [event for event in buffered if event["id"] > after_id and event["run_id"] == run_id], last_id
+
+    def wait(self, seen_id: int, timeout: float, run_id: Optional[str] = None, summary: Optional[Dict] = None) -> int:
+        """피드의 마지막 id 가 seen_id 보다 커지거나 run_id 요약이 summary 와 달라질 때까지
+        최대 timeout 초 대기하고 마지막 id 반환"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_id > seen_id or
+                                (run_id is not None and self._summaries.get(run_id, summary) != summary), timeout)
+            return self._last_id
+
+    def watch(self, run_id: str, summary: Optional[Dict] = None):
+        """run_id 요약을 폴링 대상에 추가 (summary: 구독 시작 시 직접 읽은 값)"""
+        with self._cond:
+            self._watched[run_id] = self._watched.get(run_id, 0) + 1
+            if summary is not None:
+                self._summaries.setdefault(run_id, summary)
+
+    def unwatch(self, run_id: str):
+        with self._cond:
+            remaining = self._watched.get(run_id, 0) - 1
+            if remaining > 0:
+                self._watched[run_id] = remaining
+            else:
+                self._watched.pop(run_id, None)
+                self._summaries.pop(run_id, None)
+
+    def summary(self, run_id: str) -> Optional[Dict]:
+        with self._cond:
+            return self._summaries.get(run_id)
+
+    def _connect(self):
+        return self.storage.connect(readonly=True)
+
+    def _data_version(self, conn) -> Optional[int]:
+        """SQLite 는 다른 연결의 커밋마다 바뀌는 data_version, 그 외 저장소는 None (매 주기 조회)"""
+        if self.storage.name != SQLITE:
+            return None
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _max_event_id(self) -> int:
+        try:
+            with closing(self._connect()) as conn:
+                return conn.execute("SELECT COALESCE(MAX(id), 0) FROM run_event").fetchone()[0]
+        except self.storage.errors:
+            return 0
+
+    def _poll(self):
+        conn = None
+        data_version = None
+        while True:
+            try:
+                if conn is None:
+                    conn = self._connect()
+                version = self._data_version(conn)
+                committed = version is None or version != data_version
+                if committed:
+                    data_version = version
+                    while True:
+                        events = fetch_run_events(conn, after_id=self._last_id)
+                        if not events:
+                            break
+                        with self._cond:
+                            self._events.extend(events)
+                            self._last_id = events[-1]["id"]
+                            self._cond.notify_all()
+                if committed or self._has_unloaded_summaries():
+                    self._poll_summaries(conn)
+            except self.storage.errors as e:
+                # DB 가 아직 없거나 마이그레이션 전이면 다음 주기에 다시 연결
+                logger.debug(f"런 이벤트 폴링 실패: {e}")
+                if conn is not None:
+                    conn.close()
+                conn = None
+                data_version = None
+            time.sleep(self.poll_interval)
+
+    def _has_unloaded_summaries(self) -> bool:
+        """요약을 아직 읽지 않은 시청 런이 있는지 (재연결한 구독자 등)"""
+        with self._cond:
+            return any(run_id not in self._summaries for run_id in self._watched)
+
+    def _poll_summaries(self, conn):
+        """시청 중인 런의 run_summary 를 읽어 바뀐 경우 구독자를 깨움"""
+        with self._cond:
+            run_ids = list(self._watched)
+        if not run_ids:
+            return
+        summaries = fetch_run_summaries(conn, run_ids)
+        with self._cond:
+            changed = False
+            for run_id, summary in summaries.items():
+                if run_id in self._watched and self._summaries.get(run_id) != summary:
+                    self._summaries[run_id] = summary
+                    changed = True
+            if changed:
+                self._cond.notify_all()
+
+
+_feeds: Dict[str, RunEventFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def get_run_event_feed(storage: LogStorage = TEST_LOG_STORAGE) -> RunEventFeed:
+    with _feeds_lock:
+        feed = _feeds.get(storage.key)
+        if feed is None:
+            feed = _feeds[storage.key] = RunEventFeed(storage)
+    feed.start()
+    return feed
+
+
+def format_sse(event_type: str, data, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_run_events(run_id: str, after_id: Optional[int] = None,
+                      storage: LogStorage = TEST_LOG_STORAGE) -> Iterator[str]:
+    """SSE 본문 생성기: (after_id 가 없으면) snapshot 후 증분 이벤트, 런 종료 시 end 이벤트"""
+    feed = get_run_event_feed(storage)
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+
+    if after_id is None:
+        try:
+            with closing(feed._connect()) as conn:
+                snapshot = build_run_snapshot(conn, run_id)
+                snapshot["summary"] = fetch_run_summaries(conn, [run_id]).get(run_id)
+        except storage.errors as e:
+            logger.warning(f"런 스냅샷 조회 실패: {e}")
+            snapshot = fold_run_events([])
+            snapshot["summary"] = None
+        after_id = snapshot["last_id"]
+        yield format_sse("snapshot", snapshot, after_id or None)
+        # 이벤트가 없는 런(이벤트 기록 이전의 런 등)이나 이미 끝난 런은 연결을 유지하지 않음
+        if snapshot["finished"] or not after_id:
+            yield format_sse("end", {"run_id": run_id, "finished": snapshot["finished"]})
+            return
+
+        summary = snapshot["summary"]
+    else:
+        summary = None
+
+    # cursor: 이 연결이 확인을 마친 피드 위치 (다른 런 이벤트도 건너뛴 것으로 간주)
+    cursor = after_id
+    started = time.monotonic()
+    last_sent = time.monotonic()
+    feed.watch(run_id, summary)
+    try:
+        while time.monotonic() - started < MAX_STREAM_SECONDS:
+            current = feed.summary(run_id)
+            if current is not None and current != summary:
+                summary = current
+                yield format_sse("summary", summary)
+                last_sent = time.monotonic()
+            events, cursor = feed.events_after(run_id, cursor)
+            for event in events:
+                yield format_sse(event["type"], event, event["id"])
+                last_sent = time.monotonic()
+                if event["type"] == RUN_FINISHED:
+                    yield format_sse("end", {"run_id": run_id, "finished": True})
+                    return
+            if time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            feed.wait(cursor, HEARTBEAT_SECONDS, run_id, summary)
+    finally:
+        feed.unwatch(run_id)
@@ -0,0 +1,126 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa_monitor', '0002_alter_testapi_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_case_id', models.CharField(max_length=32, null=True)),
+                ('serial', models.CharField(max_length=64, null=True)),
+                ('model', models.CharField(max_length=64, null=True)),
+                ('os_version', models.CharField(max_length=32, null=True)),
+                ('tving_version', models.CharField(max_length=32, null=True)),
+                ('timestamp', models.CharField(max_length=32, null=True)),
+                ('url', models.TextField(null=True)),
+                ('method', models.CharField(max_length=10, null=True)),
+                ('status_code', models.IntegerField(null=True)),
+                ('elapsed', models.FloatField(null=True)),
+                ('run_id', models.CharField(max_length=32, null=True)),
+                ('created_at', models.CharField(max_length=32, null=True)),
+            ],
+            options={
+                'db_table': 'test_api',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ApiEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('host', models.CharField(max_length=255)),
+                ('path_template', models.TextField()),
+            ],
+            options={
+                'db_table': 'api_endpoint',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ApiRollupHourly',
+            fields=[
+                ('hour', models.CharField(max_length=19, primary_key=True, serialize=False)),
+                ('test_case_id', models.CharField(max_length=32)),
+                ('serial', models.CharField(max_length=64)),
+                ('call_count', models.IntegerField()),
+                ('error_count', models.IntegerField()),
+                ('timed_count', models.IntegerField()),
+                ('sum_elapsed', models.FloatField()),
+                ('min_elapsed', models.FloatField(null=True)),
+                ('max_elapsed', models.FloatField(null=True)),
+            ],
+            options={
+                'db_table': 'api_rollup_hourly',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ApiRollupStatusHourly',
+            fields=[
+                ('hour', models.CharField(max_length=19, primary_key=True, serialize=False)),
+                ('status_code', models.IntegerField(null=True)),
+                ('call_count', models.IntegerField()),
+                ('timed_count', models.IntegerField()),
+                ('sum_elapsed', models.FloatField()),
+            ],
+            options={
+                'db_table': 'api_rollup_status_hourly',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TestLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_case_id', models.CharField(max_length=32, null=True)),
+                ('step_name', models.TextField(null=True)),
+                ('start_time', models.CharField(max_length=32, null=True)),
+                ('end_time', models.CharField(max_length=32, null=True)),
+                ('elapsed', models.FloatField(null=True)),
+                ('status', models.CharField(max_length=16, null=True)),
+                ('error_msg', models.TextField(null=True)),
+                ('serial', models.CharField(max_length=64, null=True)),
+                ('model', models.CharField(max_length=64, null=True)),
+                ('os_version', models.CharField(max_length=32, null=True)),
+                ('tving_version', models.CharField(max_length=32, null=True)),
+                ('run_id', models.CharField(max_length=32, null=True)),
+            ],
+            options={
+                'db_table': 'test_log',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TestRailCase',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.TextField()),
+                ('automation_type', models.IntegerField(default=0)),
+                ('priority_id', models.IntegerField(null=True)),
+                ('section_id', models.IntegerField(null=True)),
+                ('created_on', models.IntegerField(null=True)),
+                ('updated_on', models.IntegerField()),
+                ('source', models.CharField(max_length=16)),
+                ('synced_at', models.FloatField()),
+            ],
+            options={
+                'db_table': 'testrail_case',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa_monitor', '0003_test_log_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunSummary',
+            fields=[
+                ('run_id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('total', models.IntegerField(default=0)),
+                ('passed', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('blocked', models.IntegerField(default=0)),
+                ('untested', models.IntegerField(default=0)),
+                ('retest', models.IntegerField(default=0)),
+                ('start_time', models.CharField(max_length=32, null=True)),
+                ('end_time', models.CharField(max_length=32, null=True)),
+                ('elapsed_sum', models.FloatField(default=0)),
+                ('elapsed_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'run_summary',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
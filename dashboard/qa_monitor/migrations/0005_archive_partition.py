@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa_monitor', '0004_run_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivePartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=32)),
+                ('day', models.CharField(max_length=10)),
+                ('run_id', models.CharField(max_length=32, null=True)),
+                ('path', models.TextField(unique=True)),
+                ('row_count', models.IntegerField()),
+                ('min_id', models.IntegerField(null=True)),
+                ('max_id', models.IntegerField(null=True)),
+                ('min_time', models.CharField(max_length=32, null=True)),
+                ('max_time', models.CharField(max_length=32, null=True)),
+                ('archived_at', models.CharField(max_length=32, null=True)),
+            ],
+            options={
+                'db_table': 'archive_partition',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa_monitor', '0005_archive_partition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestPhase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=32, null=True)),
+                ('test_case_id', models.CharField(max_length=32, null=True)),
+                ('serial', models.CharField(max_length=64, null=True)),
+                ('phase', models.CharField(max_length=16)),
+                ('start_time', models.CharField(max_length=32, null=True)),
+                ('end_time', models.CharField(max_length=32, null=True)),
+                ('elapsed', models.FloatField(null=True)),
+            ],
+            options={
+                'db_table': 'test_phase',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
@@ -39,3 +39,201 @@ class TestAPI(models.Model):
     
     def __str__(self):
         return f"API {self.method} {self.url} ({self.status_code})"
+
+
+# ---------------------------------------------------------------------------
+# 러너 DB(artifacts/test_log.db) 테이블 매핑
+# 스키마와 인덱스는 scripts/utils/db_migrations.py 가 관리하므로 managed = False 이고,
+# Meta.indexes 는 같은 이름으로 실제 인덱스를 기술합니다 (쿼리 작성 시 참고 / 다른 DB 로 이전 시 그대로 생성).
+# 시간 컬럼은 러너가 'YYYY-MM-DD HH:MM:SS[.ffffff]' 문자열로 기록하므로 CharField 로 매핑합니다.
+# DB 선택은 qa_monitor.routers.TestLogRouter 가 TestLogModel 하위 모델을 'testlog' 로 보냅니다.
+# ---------------------------------------------------------------------------
+
+class TestLogModel(models.Model):
+    """러너 DB 테이블 모델의 공통 베이스"""
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class TestLog(TestLogModel):
+    """테스트 실행 기록 (test_log)"""
+    test_case_id = models.CharField(max_length=32, null=True)
+    step_name = models.TextField(null=True)
+    start_time = models.CharField(max_length=32, null=True)
+    end_time = models.CharField(max_length=32, null=True)
+    elapsed = models.FloatField(null=True)
+    status = models.CharField(max_length=16, null=True)
+    error_msg = models.TextField(null=True)
+    serial = models.CharField(max_length=64, null=True)
+    model = models.CharField(max_length=64, null=True)
+    os_version = models.CharField(max_length=32, null=True)
+    tving_version = models.CharField(max_length=32, null=True)
+    run_id = models.CharField(max_length=32, null=True)
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'test_log'
+        indexes = [
+            models.Index(fields=['run_id', 'start_time'], name='idx_test_log_run_start'),
+            models.Index(fields=['start_time'], name='idx_test_log_start_time'),
+            models.Index(fields=['test_case_id', 'start_time'], name='idx_test_log_case_start'),
+            models.Index(fields=['run_id', 'serial', 'start_time'], name='idx_test_log_run_serial'),
+        ]
+
+
+class RunSummary(TestLogModel):
+    """런별 요약 (run_summary) - 배치 Writer 가 log_step 저장과 같은 트랜잭션에서 갱신"""
+    run_id = models.CharField(max_length=32, primary_key=True)
+    total = models.IntegerField(default=0)
+    passed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    blocked = models.IntegerField(default=0)
+    untested = models.IntegerField(default=0)
+    retest = models.IntegerField(default=0)
+    start_time = models.CharField(max_length=32, null=True)
+    end_time = models.CharField(max_length=32, null=True)
+    elapsed_sum = models.FloatField(default=0)
+    elapsed_count = models.IntegerField(default=0)
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'run_summary'
+        indexes = [
+            models.Index(fields=['start_time'], name='idx_run_summary_start'),
+        ]
+
+
+class TestPhase(TestLogModel):
+    """케이스 단계 구간 (test_phase) - 러너가 프록시/Maestro/스크린샷/API 캡처/업로드 구간을 기록"""
+    run_id = models.CharField(max_length=32, null=True)
+    test_case_id = models.CharField(max_length=32, null=True)
+    serial = models.CharField(max_length=64, null=True)
+    phase = models.CharField(max_length=16)
+    start_time = models.CharField(max_length=32, null=True)
+    end_time = models.CharField(max_length=32, null=True)
+    elapsed = models.FloatField(null=True)
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'test_phase'
+        indexes = [
+            models.Index(fields=['run_id', 'serial', 'start_time'], name='idx_test_phase_run_serial'),
+        ]
+
+
+class ArchivePartition(TestLogModel):
+    """Parquet 아카이브 파티션 매니페스트 (archive_partition) - scripts/utils/log_archive 가 기록"""
+    table_name = models.CharField(max_length=32)
+    day = models.CharField(max_length=10)
+    run_id = models.CharField(max_length=32, null=True)
+    path = models.TextField(unique=True)
+    row_count = models.IntegerField()
+    min_id = models.IntegerField(null=True)
+    max_id = models.IntegerField(null=True)
+    min_time = models.CharField(max_length=32, null=True)
+    max_time = models.CharField(max_length=32, null=True)
+    archived_at = models.CharField(max_length=32, null=True)
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'archive_partition'
+        indexes = [
+            models.Index(fields=['table_name', 'day'], name='idx_archive_partition_day'),
+            models.Index(fields=['table_name', 'run_id'], name='idx_archive_partition_run'),
+        ]
+
+
+class ApiEndpoint(TestLogModel):
+    """정규화된 API 엔드포인트 차원 (api_endpoint)"""
+    method = models.CharField(max_length=10)
+    host = models.CharField(max_length=255)
+    path_template = models.TextField()
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'api_endpoint'
+
+    @property
+    def label(self):
+        return f"{self.host}{self.path_template}"
+
+
+class ApiCall(TestLogModel):
+    """캡처된 API 호출 (test_api) - 본문은 api_body 저장소에 있음"""
+    test_case_id = models.CharField(max_length=32, null=True)
+    serial = models.CharField(max_length=64, null=True)
+    model = models.CharField(max_length=64, null=True)
+    os_version = models.CharField(max_length=32, null=True)
+    tving_version = models.CharField(max_length=32, null=True)
+    timestamp = models.CharField(max_length=32, null=True)
+    url = models.TextField(null=True)
+    method = models.CharField(max_length=10, null=True)
+    status_code = models.IntegerField(null=True)
+    elapsed = models.FloatField(null=True)
+    run_id = models.CharField(max_length=32, null=True)
+    created_at = models.CharField(max_length=32, null=True)
+    endpoint = models.ForeignKey(ApiEndpoint, null=True, on_delete=models.DO_NOTHING, db_constraint=False)
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'test_api'
+        indexes = [
+            models.Index(fields=['test_case_id', 'serial'], name='idx_test_api_case_serial'),
+            models.Index(fields=['test_case_id', 'created_at'], name='idx_test_api_case_created'),
+            models.Index(fields=['run_id', 'test_case_id'], name='idx_test_api_run_case'),
+            models.Index(fields=['created_at'], name='idx_test_api_created'),
+            models.Index(fields=['status_code'], name='idx_test_api_status'),
+            models.Index(fields=['endpoint', 'created_at'], name='idx_test_api_endpoint'),
+        ]
+
+
+class ApiRollupHourly(TestLogModel):
+    """API 지표 시간별 롤업 (api_rollup_hourly)
+
+    실제 기본키는 (hour, endpoint_id, test_case_id, serial) 복합키이므로 집계(values/annotate) 조회 전용입니다.
+    """
+    hour = models.CharField(max_length=19, primary_key=True)
+    endpoint = models.ForeignKey(ApiEndpoint, on_delete=models.DO_NOTHING, db_constraint=False)
+    test_case_id = models.CharField(max_length=32)
+    serial = models.CharField(max_length=64)
+    call_count = models.IntegerField()
+    error_count = models.IntegerField()
+    timed_count = models.IntegerField()
+    sum_elapsed = models.FloatField()
+    min_elapsed = models.FloatField(null=True)
+    max_elapsed = models.FloatField(null=True)
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'api_rollup_hourly'
+        indexes = [
+            models.Index(fields=['test_case_id', 'hour'], name='idx_api_rollup_case_hour'),
+        ]
+
+
+class ApiRollupStatusHourly(TestLogModel):
+    """상태 코드별 시간 롤업 (api_rollup_status_hourly) - 집계 조회 전용"""
+    hour = models.CharField(max_length=19, primary_key=True)
+    endpoint = models.ForeignKey(ApiEndpoint, on_delete=models.DO_NOTHING, db_constraint=False)
+    status_code = models.IntegerField(null=True)
+    call_count = models.IntegerField()
+    timed_count = models.IntegerField()
+    sum_elapsed = models.FloatField()
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'api_rollup_status_hourly'
+
+
+class TestRailCase(TestLogModel):
+    """TestRail 테스트케이스 로컬 카탈로그 (testrail_case, scripts.utils.testcase_catalog 가 동기화)"""
+    id = models.IntegerField(primary_key=True)
+    title = models.TextField()
+    automation_type = models.IntegerField(default=0)
+    priority_id = models.IntegerField(null=True)
+    section_id = models.IntegerField(null=True)
+    created_on = models.IntegerField(null=True)
+    updated_on = models.IntegerField()
+    source = models.CharField(max_length=16)
+    synced_at = models.FloatField()
+
+    class Meta(TestLogModel.Meta):
+        db_table = 'testrail_case'
+        indexes = [
+            models.Index(fields=['updated_on'], name='idx_testrail_case_updated'),
+            models.Index(fields=['automation_type', 'updated_on'], name='idx_testrail_case_automation'),
+        ]
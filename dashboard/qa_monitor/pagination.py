@@ -0,0 +1,96 @@
+"""
+대시보드 JSON API 키셋 페이지네이션
+OFFSET 대신 마지막 행의 정렬 키(예: (created_at, id))를 커서로 넘겨
+다음 페이지를 `(정렬 키) < (커서)` 범위 조건(쿼리셋 필터)으로 읽습니다.
+정렬 키와 같은 순서의 인덱스가 있으면 페이지 깊이와 테이블 크기에 관계없이
+페이지당 LIMIT 만큼만 인덱스를 읽습니다.
+
+- 커서는 정렬 키 값 JSON 을 urlsafe base64 로 감싼 불투명 문자열
+- 정렬 키의 마지막 컬럼은 유일해야 함 (보통 id)
+"""
+
+import base64
+import binascii
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """디코딩할 수 없는 커서 / 페이지 크기"""
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str], size: int) -> Optional[Tuple]:
+    """커서 문자열 -> 정렬 키 튜플 (없으면 None)"""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor(f"잘못된 커서: {token}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(f"잘못된 커서: {token}")
+    return tuple(values)
+
+
+def page_size(request, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """?limit= 값 (1 ~ MAX_PAGE_SIZE)"""
+    value = request.GET.get("limit")
+    if not value:
+        return default
+    if not value.isdigit() or int(value) < 1:
+        raise InvalidCursor(f"잘못된 limit: {value}")
+    return min(int(value), MAX_PAGE_SIZE)
+
+
+def keyset_page(queryset, order: Sequence[str], cursor: Optional[Tuple], limit: int,
+                descending: bool = True) -> Tuple[List[Dict], Optional[str]]:
+    """values() 쿼리셋에 키셋 범위를 붙여 한 페이지를 읽고 (행 목록, 다음 커서) 반환
+
+    order: 정렬 키 필드 (values() 결과에 같은 이름으로 포함되어야 함)
+    """
+    if cursor is not None:
+        op = "lt" if descending else "gt"
+        # (a, b) < (x, y)  ==  a < x OR (a = x AND b < y)
+        condition = Q(**{f"{order[-1]}__{op}": cursor[-1]})
+        for column, value in zip(reversed(order[:-1]), reversed(cursor[:-1])):
+            condition = Q(**{f"{column}__{op}": value}) | (Q(**{column: value}) & condition)
+        # 첫 정렬 키의 범위 조건을 따로 두어 인덱스 범위 탐색이 되도록 함
+        queryset = queryset.filter(Q(**{f"{order[0]}__{op}e": cursor[0]}), condition)
+    ordering = [f"-{column}" if descending else column for column in order]
+    rows = list(queryset.order_by(*ordering)[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][column] for column in order])
+    return rows, next_cursor
+
+
+def keyset_page_rows(rows: List[Dict], order: Sequence[str], cursor: Optional[Tuple], limit: int,
+                     descending: bool = True) -> Tuple[List[Dict], Optional[str]]:
+    """메모리의 행 목록(예: 아카이브 파티션에서 읽은 행)에 keyset_page 와 같은 커서 규칙을 적용
+
+    정렬 키에 None 이 있으면 빈 문자열로 비교 (SQLite 정렬에서 NULL 이 가장 작은 값인 것과 같음)
+    """
+    def key(row):
+        return tuple("" if row[column] is None else row[column] for column in order)
+
+    rows = sorted(rows, key=key, reverse=descending)
+    if cursor is not None:
+        position = tuple("" if value is None else value for value in cursor)
+        rows = [row for row in rows if (key(row) < position if descending else key(row) > position)]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][column] for column in order])
+    return rows, next_cursor
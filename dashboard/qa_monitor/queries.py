@@ -0,0 +1,84 @@
+"""
+대시보드 집계 쿼리셋
+여러 뷰가 같은 집계(런별 상태 카운트, 롤업 평균 응답시간 등)를 쓰므로
+annotate 식과 기본 쿼리셋을 한곳에 모아 재사용합니다.
+"""
+
+from django.db import connections
+from django.db.models import Avg, Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, NullIf
+
+from scripts.utils.run_summary import RUN_SUMMARY_STATUSES
+
+from .models import ApiCall, ApiRollupHourly, RunSummary
+from .routers import TEST_LOG_DB_ALIAS
+
+# run_summary 상태 카운트 컬럼과 같은 키
+TEST_STATUSES = RUN_SUMMARY_STATUSES
+
+
+def run_summaries(run_id=None, since=None):
+    """런별 요약 (상태 카운트, 시작/종료 시각, 평균/총 실행시간)
+
+    러너가 갱신하는 run_summary 를 읽으므로 test_log 를 다시 집계하지 않음
+    (run_id 는 기본키 조회, since 는 런 시작 시각 인덱스 범위 조회)
+    """
+    queryset = RunSummary.objects.all()
+    if run_id is not None:
+        queryset = queryset.filter(run_id=str(run_id))
+    if since is not None:
+        queryset = queryset.filter(start_time__gte=since)
+    return queryset.values('run_id', 'total', *TEST_STATUSES).annotate(
+        start=F('start_time'),
+        end=F('end_time'),
+        avg_elapsed=F('elapsed_sum') / NullIf(F('elapsed_count'), 0),
+        total_elapsed=F('elapsed_sum'),
+    )
+
+
+def api_call_stats():
+    """test_api 호출 수 / 평균 응답시간 / 실패(400 이상) 수 annotate 식"""
+    return {
+        'calls': Count('id'),
+        'avg_time': Avg('elapsed'),
+        'failed': Count('id', filter=Q(status_code__gte=400)),
+    }
+
+
+def case_api_stats(run_id, case_ids):
+    """런 안에서 케이스별 API 호출 통계 {test_case_id: {...}}"""
+    rows = (ApiCall.objects
+            .filter(run_id=str(run_id), test_case_id__in=list(case_ids))
+            .values('test_case_id')
+            .annotate(**api_call_stats()))
+    return {row.pop('test_case_id'): row for row in rows}
+
+
+def rollup_avg_elapsed():
+    """롤업 행을 합친 평균 응답시간 (timed_count 가중)"""
+    return Cast(Sum('sum_elapsed'), FloatField()) / NullIf(Sum('timed_count'), 0)
+
+
+def rollup_stats():
+    """api_rollup_hourly 집계 annotate 식"""
+    return {
+        'total_calls': Sum('call_count'),
+        'error_calls': Sum('error_count'),
+        'avg_response_time': rollup_avg_elapsed(),
+    }
+
+
+def rollups_between(start_hour=None, end_hour=None):
+    queryset = ApiRollupHourly.objects.all()
+    if start_hour is not None:
+        queryset = queryset.filter(hour__gte=start_hour)
+    if end_hour is not None:
+        queryset = queryset.filter(hour__lte=end_hour)
+    return queryset
+
+
+def raw_test_log_connection():
+    """scripts.utils 함수(sqlite3.Connection 을 받는)에 넘길 'testlog' 의 DB-API 연결 (CONN_MAX_AGE 로 재사용)"""
+    connection = connections[TEST_LOG_DB_ALIAS]
+    connection.ensure_connection()
+    return connection.connection
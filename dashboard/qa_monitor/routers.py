@@ -0,0 +1,31 @@
+"""
+DB 라우터
+러너 DB 테이블 모델(TestLogModel 하위)은 'testlog' 연결(artifacts/test_log.db)로,
+나머지 Django 모델은 'default' 연결로 보냅니다.
+러너 DB 스키마는 scripts/utils/db_migrations.py 가 관리하므로 'testlog' 에는 Django 마이그레이션을 적용하지 않습니다.
+"""
+
+TEST_LOG_DB_ALIAS = 'testlog'
+
+
+def _is_test_log_model(model) -> bool:
+    from .models import TestLogModel
+    return issubclass(model, TestLogModel)
+
+
+class TestLogRouter:
+    def db_for_read(self, model, **hints):
+        return TEST_LOG_DB_ALIAS if _is_test_log_model(model) else None
+
+    def db_for_write(self, model, **hints):
+        return TEST_LOG_DB_ALIAS if _is_test_log_model(model) else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if _is_test_log_model(type(obj1)) or _is_test_log_model(type(obj2)):
+            return _is_test_log_model(type(obj1)) and _is_test_log_model(type(obj2))
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == TEST_LOG_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,102 @@
+"""
+대시보드 공유 서비스
+앱 준비 시점(QaMonitorConfig.ready)에 한 번 초기화하여, 뷰가 요청마다 config.ini 를 다시 읽거나
+TestRail 클라이언트/로그 저장소 연결을 새로 만들지 않게 합니다.
+
+- config(): ConfigManager (config.ini 는 준비 시점에 한 번만 읽음)
+- testrail(): TestRailManager (첫 사용 시 생성해 프로세스 동안 재사용, HTTP 연결은 세션으로 유지)
+- log_db(): 스레드별로 재사용하는 로그 저장소 연결
+- ensure_schema(): 로그 저장소 스키마 마이그레이션을 첫 요청에서 한 번 실행 (request_started 시그널).
+  ready() 에서는 DB 에 접근하지 않으므로 migrate/shell 등 manage.py 명령은 test_log.db 를 건드리지 않음
+- TestRail 클라이언트(requests)처럼 일부 화면에서만 쓰는 모듈은 처음 쓰는 요청에서 import
+"""
+
+import contextlib
+import logging
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TEST_LOG_STORAGE = settings.TEST_LOG_STORAGE
+
+_lock = threading.RLock()        # testrail() 이 잠금 안에서 config() -> initialize() 를 호출
+_local = threading.local()
+_initialized = False
+_schema_ready = False
+_config = None
+_config_error = None
+_testrail = None
+
+
+def initialize():
+    """설정 로드 (여러 번 호출해도 한 번만 실행)"""
+    global _initialized, _config, _config_error
+    with _lock:
+        if _initialized:
+            return
+        _initialized = True
+        from scripts.config.config_manager import ConfigManager
+        try:
+            _config = ConfigManager()
+        except FileNotFoundError as e:
+            # TestRail 연동 화면만 영향을 받으므로 대시보드는 계속 실행
+            _config_error = e
+            logger.warning(f"설정 파일 없이 시작합니다 (TestRail 연동 비활성): {e}")
+
+
+def ensure_schema(**kwargs):
+    """로그 저장소 스키마 보장 (request_started 수신자, 성공할 때까지 요청마다 재시도)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _lock:
+        if _schema_ready:
+            return
+        try:
+            TEST_LOG_STORAGE.connect_ready().close()
+        except TEST_LOG_STORAGE.errors as e:
+            logger.warning(f"로그 저장소 스키마 확인 실패 (다음 요청에서 재시도): {e}")
+            return
+        _schema_ready = True
+
+
+def config():
+    """공유 ConfigManager (설정 파일이 없으면 준비 시점의 오류를 다시 발생)"""
+    initialize()
+    if _config is None:
+        raise _config_error
+    return _config
+
+
+def testrail():
+    """공유 TestRail 클라이언트 (설정값이 없으면 ValueError)"""
+    global _testrail
+    if _testrail is None:
+        with _lock:
+            if _testrail is None:
+                from scripts.testrail.testrail import TestRailManager
+                _testrail = TestRailManager(config().get_testrail_config())
+    return _testrail
+
+
+@contextlib.contextmanager
+def log_db():
+    """현재 스레드의 로그 저장소 연결을 빌려 씀 (닫지 않고 재사용)
+
+    블록이 끝나면 열린 읽기 트랜잭션을 정리하고, 저장소 오류가 나면 연결을 버려 다음 요청에서 다시 연결
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        ensure_schema()
+        conn = _local.conn = TEST_LOG_STORAGE.connect()
+    try:
+        yield conn
+    except TEST_LOG_STORAGE.errors:
+        _local.conn = None
+        with contextlib.suppress(Exception):
+            conn.close()
+        raise
+    else:
+        conn.rollback()
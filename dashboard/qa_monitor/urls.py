@@ -6,9 +6,13 @@ app_name = 'qa_monitor'
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('tests/', views.test_list, name='test_list'),
+    path('tests/api/', views.test_list_api, name='test_list_api'),
     path('tests/<int:test_id>/', views.test_detail, name='test_detail'),
     path('tests/<int:testcase_id>/detail/', views.testcase_detail, name='testcase_detail'),
     path('testrun/<int:run_id>/', views.testrun_detail, name='testrun_detail'),
+    path('testrun/<int:run_id>/events/', views.testrun_events, name='testrun_events'),
+    path('testrun/<int:run_id>/testcases/', views.testrun_testcases_api, name='testrun_testcases_api'),
+    path('testrun/<int:run_id>/timeline/', views.testrun_timeline_api, name='testrun_timeline_api'),
     path('test_result_test/', views.test_result_test, name='test_result_test'),
     
     # API 관련 화면
@@ -16,6 +20,7 @@ urlpatterns = [
     path('api/performance/', views.api_performance_chart, name='api_performance_chart'),
     path('api/errors/', views.api_error_analysis, name='api_error_analysis'),
     path('api/menu-logs/', views.menu_api_logs, name='menu_api_logs'),
+    path('api/menu-logs/calls/', views.menu_api_calls_api, name='menu_api_calls_api'),
     
 
 ]
\ No newline at end of file
@@ -2,160 +2,102 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 from django.shortcuts import render
-from scripts.config.config_manager import ConfigManager
-from scripts.testrail.testrail import TestRailManager
 import logging
 import datetime
+import time
 import pytz
-from django.http import JsonResponse
-from django.db.models import Avg, Count, Q
-from .models import TestCase, TestRun, TestAPI
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import DatabaseError
+from django.db.models import CharField, Count, Exists, F, FloatField, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Substr
+from .models import ApiCall, ApiRollupHourly, ApiRollupStatusHourly, TestLog, TestPhase, TestRailCase
+from . import archive, services
+from .cache import cached_view
+from .live import stream_run_events
+from .pagination import InvalidCursor, decode_cursor, keyset_page, keyset_page_rows, page_size
+from .queries import (TEST_STATUSES, case_api_stats, raw_test_log_connection, rollup_avg_elapsed,
+                      rollup_stats, rollups_between, run_summaries)
+from scripts.utils import run_timeline, testcase_catalog
 import json
 from datetime import datetime, timedelta
 logging.basicConfig(level=logging.WARNING)
 
+def _run_status(run):
+    """런 요약의 상태 분류 (상태별 통계용)"""
+    if run['total'] > 0 and run['failed'] == 0:
+        return 'Completed'
+    if run['failed'] > 0 and run['passed'] > 0:
+        return 'Partial'
+    if run['total'] > 0 and run['passed'] == 0:
+        return 'Failed'
+    return 'Unknown'
+
+@cached_view()
 def dashboard(request):
     print("[DEBUG] dashboard view 진입")
     
-    # 로컬 데이터베이스에서 데이터 가져오기
+    # 기준일 설정
+    now = datetime.now()
+    recent_7_days = now - timedelta(days=7)  # 최근 실행 이력용
+    recent_30_days = now - timedelta(days=30)  # 상태별 통계용
+    
+    status_counts = {'Completed': 0, 'Partial': 0, 'Failed': 0, 'Unknown': 0}
+    recent_runs = []
+    total_runs = 0
+    total_tests = 0
+    total_passed = 0
+    total_failed = 0
+    avg_duration = 0
+    
     try:
-        import sqlite3
-        import os
-        from datetime import datetime, timedelta
-        
-        # 데이터베이스 연결
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'artifacts', 'test_log.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # 기준일 설정
-        now = datetime.now()
-        recent_7_days = now - timedelta(days=7)  # 최근 실행 이력용
-        recent_30_days = now - timedelta(days=30)  # 상태별 통계용
-        
         print(f"[DEBUG] 기준일 - 최근 7일: {recent_7_days.strftime('%Y-%m-%d')}, 최근 30일: {recent_30_days.strftime('%Y-%m-%d')}")
         
-        # run_id 기준으로 그룹핑하여 최근 테스트런 정보 가져오기 (최근 7일)
-        cursor.execute("""
-            SELECT 
-                run_id,
-                COUNT(*) as total_tests,
-                COUNT(CASE WHEN status = '성공' THEN 1 END) as passed_tests,
-                COUNT(CASE WHEN status = '실패' THEN 1 END) as failed_tests,
-                COUNT(CASE WHEN status = '차단' THEN 1 END) as blocked_tests,
-                COUNT(CASE WHEN status = '미테스트' THEN 1 END) as untested_tests,
-                COUNT(CASE WHEN status = '재테스트' THEN 1 END) as retest_tests,
-                MIN(start_time) as run_start_time,
-                MAX(end_time) as run_end_time,
-                AVG(elapsed) as avg_elapsed
-            FROM test_log 
-            WHERE run_id IS NOT NULL 
-            AND start_time >= ?
-            GROUP BY run_id
-            ORDER BY run_start_time DESC 
-            LIMIT 10
-        """, (recent_7_days.strftime('%Y-%m-%d %H:%M:%S'),))
-        run_groups = cursor.fetchall()
+        # 최근 7일 안에 시작한 런 요약 (run_summary) - 한 번 읽어 상태별 통계와 최근 실행 이력에 함께 사용
+        runs = list(run_summaries(since=recent_7_days.strftime('%Y-%m-%d %H:%M:%S')).order_by('-start'))
         
         # 테스트런 기준 상태별 통계 (최근 7일)
-        cursor.execute("""
-            SELECT 
-                CASE 
-                    WHEN failed_tests = 0 AND total_tests > 0 THEN 'Completed'
-                    WHEN failed_tests > 0 AND passed_tests > 0 THEN 'Partial'
-                    WHEN passed_tests = 0 AND total_tests > 0 THEN 'Failed'
-                    ELSE 'Unknown'
-                END as run_status,
-                COUNT(*) as run_count,
-                SUM(total_tests) as total_test_count,
-                SUM(passed_tests) as total_passed,
-                SUM(failed_tests) as total_failed,
-                AVG(avg_elapsed) as avg_duration
-            FROM (
-                SELECT 
-                    run_id,
-                    COUNT(*) as total_tests,
-                    COUNT(CASE WHEN status = '성공' THEN 1 END) as passed_tests,
-                    COUNT(CASE WHEN status = '실패' THEN 1 END) as failed_tests,
-                    AVG(elapsed) as avg_elapsed
-                FROM test_log 
-                WHERE run_id IS NOT NULL 
-                AND start_time >= ?
-                GROUP BY run_id
-            ) run_summary
-            GROUP BY run_status
-        """, (recent_7_days.strftime('%Y-%m-%d %H:%M:%S'),))
-        run_status_data = cursor.fetchall()
-        
-        conn.close()
-        
-        # 테스트런 기준 상태별 통계 딕셔너리 생성
-        status_counts = {'Completed': 0, 'Partial': 0, 'Failed': 0, 'Unknown': 0}
-        total_runs = 0
-        total_tests = 0
-        total_passed = 0
-        total_failed = 0
-        avg_duration = 0
-        
-        for run_status, run_count, test_count, passed, failed, duration in run_status_data:
-            status_counts[run_status] = run_count
-            total_runs += run_count
-            total_tests += test_count or 0
-            total_passed += passed or 0
-            total_failed += failed or 0
-            if duration:
-                avg_duration = duration
-        
-        # 테스트런 단위로 데이터 포맷팅
-        recent_runs = []
-        for run_group in run_groups:
-            run_id, total_tests, passed_tests, failed_tests, blocked_tests, untested_tests, retest_tests, run_start_time, run_end_time, avg_elapsed = run_group
-            
+        durations = []
+        for run in runs:
+            status_counts[_run_status(run)] += 1
+            total_runs += 1
+            total_tests += run['total']
+            total_passed += run['passed']
+            total_failed += run['failed']
+            if run['avg_elapsed']:
+                durations.append(run['avg_elapsed'])
+        avg_duration = sum(durations) / len(durations) if durations else 0
+        
+        # 테스트런 단위로 데이터 포맷팅 (최근 10개)
+        for run in runs[:10]:
             # 실행시간 포맷팅
             try:
-                start_dt = datetime.fromisoformat(run_start_time.replace('Z', '+00:00'))
+                start_dt = datetime.fromisoformat(run['start'].replace('Z', '+00:00'))
                 execution_time = start_dt.strftime('%Y-%m-%d %H:%M:%S')
             except:
-                execution_time = run_start_time
+                execution_time = run['start']
             
             # 상태 결정 (대부분의 테스트가 성공하면 성공)
-            if passed_tests > failed_tests:
+            if run['passed'] > run['failed']:
                 display_status = 'Completed'
-            elif failed_tests > 0:
+            elif run['failed'] > 0:
                 display_status = 'Failed'
             else:
                 display_status = 'Running'
             
-            # 상태별 카운트
-            status_counts_detail = {
-                'passed': passed_tests,
-                'failed': failed_tests,
-                'blocked': blocked_tests,
-                'untested': untested_tests,
-                'retest': retest_tests
-            }
-            
             recent_runs.append({
-                'id': run_id,
-                'name': f'테스트런 {run_id}',
+                'id': run['run_id'],
+                'name': f"테스트런 {run['run_id']}",
                 'status': display_status,
                 'time': execution_time,
-                'elapsed': f"{avg_elapsed:.1f}s" if avg_elapsed else "N/A",
-                'total_tests': total_tests,
-                'status_counts': status_counts_detail
+                'elapsed': f"{run['avg_elapsed']:.1f}s" if run['avg_elapsed'] else "N/A",
+                'total_tests': run['total'],
+                'status_counts': {key: run[key] for key in TEST_STATUSES}
             })
         
-        print(f"[DEBUG] 런 단위 데이터: {len(run_groups)}개 런, 상태별 통계: {status_counts}")
+        print(f"[DEBUG] 런 단위 데이터: {len(runs)}개 런, 상태별 통계: {status_counts}")
         
     except Exception as e:
         print(f"[DEBUG] 로컬 데이터베이스 조회 실패: {e}")
-        status_counts = {'Completed': 0, 'Partial': 0, 'Failed': 0, 'Unknown': 0}
-        recent_runs = []
-        total_runs = 0
-        total_tests = 0
-        total_passed = 0
-        total_failed = 0
-        avg_duration = 0
     
     context = {
         'status_counts': status_counts,
@@ -173,154 +115,138 @@ def dashboard(request):
     }
     return render(request, 'qa_monitor/dashboard.html', context)
 
-def test_list(request):
-    """테스트케이스 목록 - TestRail 연동"""
-    import os
-    from scripts.config.config_manager import ConfigManager
-    from scripts.testrail.testrail import TestRailManager
+_case_sync_attempted = 0.0
+
+def _sync_case_catalog(conn):
+    """카탈로그 TTL 이 지났으면 TestRail 에서 재동기화"""
+    global _case_sync_attempted
     
-    try:
-        # TestRail 연결 시도 (임시로 비활성화)
+    # TestRail 이 응답하지 않을 때 매 요청마다 재시도하지 않도록 시도 간격도 SYNC_TTL 로 제한
+    now = time.time()
+    if testcase_catalog.is_stale(conn) and now - _case_sync_attempted >= testcase_catalog.SYNC_TTL:
+        _case_sync_attempted = now
+        state = testcase_catalog.catalog_state(conn)
         test_cases = []
         try:
-            config = ConfigManager()
-            testrail_config = config.get_testrail_config()
-            testrail = TestRailManager(testrail_config)
-            
-            # 모든 테스트케이스 가져오기
-            test_cases = testrail.get_test_cases()
+            test_cases = services.testrail().get_test_cases() or []
         except Exception as e:
             print(f"[WARNING] TestRail 연결 실패, 로컬 데이터만 사용: {e}")
-            test_cases = []
         
-        # TestRail에서 데이터를 가져오지 못한 경우 로컬 데이터베이스에서 가져오기
-        if not test_cases:
-            try:
-                import sqlite3
-                db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'artifacts', 'test_log.db')
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-                
-                # 로컬 DB에서 테스트케이스 정보 가져오기 (중복 제거)
-                cursor.execute("""
-                    SELECT test_case_id, 
-                           MAX(step_name) as step_name, 
-                           MAX(status) as status, 
-                           MAX(start_time) as start_time
-                    FROM test_log 
-                    WHERE test_case_id IS NOT NULL
-                    GROUP BY test_case_id
-                    ORDER BY MAX(start_time) DESC
-                """)
-                local_cases = cursor.fetchall()
-                conn.close()
-                
-                # 로컬 데이터를 TestRail 형식으로 변환
-                for case_data in local_cases:
-                    test_case_id, step_name, status, start_time = case_data
-                    test_cases.append({
-                        'id': test_case_id,
-                        'title': f'TC{test_case_id} - {step_name}',
-                        'custom_automation_type': 2,  # Maestro로 가정
-                        'priority_id': 1,
-                        'section_id': 1,
-                        'created_on': start_time,
-                        'updated_on': start_time
-                    })
-            except Exception as e:
-                print(f"[ERROR] 로컬 데이터베이스 조회 실패: {e}")
-                test_cases = []
-        
-        # 검색 및 필터링
-        search_query = request.GET.get('search', '')
-        automation_filter = request.GET.get('automation', 'all')
-        
-        filtered_cases = []
-        for case in test_cases:
-            # 검색 필터
-            if search_query and search_query.lower() not in case.get('title', '').lower():
-                continue
-                
-            # 자동화 상태 필터
-            automation_type = case.get('custom_automation_type', 0)
-            if automation_filter == 'automated' and automation_type != 2:  # 2 = Maestro
-                continue
-            elif automation_filter == 'manual' and automation_type != 0:  # 0 = Manual
-                continue
-            elif automation_filter == 'maestro' and automation_type != 2:
-                continue
-            
-            # 자동화 상태 텍스트 변환
-            automation_status = {
-                0: '수동',
-                1: '자동화',
-                2: 'Maestro'
-            }.get(automation_type, '미정')
-            
-            filtered_cases.append({
-                'id': case.get('id'),
-                'title': case.get('title'),
-                'automation_type': automation_type,
-                'automation_status': automation_status,
-                'priority': case.get('priority_id'),
-                'section_id': case.get('section_id'),
-                'created_on': case.get('created_on'),
-                'updated_on': case.get('updated_on')
-            })
-        
-        # 정렬 (최신 업데이트 순)
-        filtered_cases.sort(key=lambda x: x['updated_on'] or x['created_on'], reverse=True)
+        if test_cases:
+            testcase_catalog.sync_cases(conn, test_cases, 'testrail')
+        elif state is None or state['source'] == 'local':
+            # TestRail에서 데이터를 가져오지 못한 경우 로컬 데이터베이스의 케이스로 채움
+            testcase_catalog.sync_cases(conn, testcase_catalog.local_cases(conn), 'local')
+
+def test_list(request):
+    """테스트케이스 목록 - TestRail 연동 (목록은 test_list_api 에서 페이지 단위로 로드)"""
+    search_query = request.GET.get('search', '')
+    automation_filter = request.GET.get('automation', 'all')
+    
+    try:
+        with services.log_db() as conn:
+            _sync_case_catalog(conn)
+            counts = testcase_catalog.automation_counts(conn)
         
         # 통계 계산
-        total_cases = len(test_cases)
-        automated_cases = len([c for c in test_cases if c.get('custom_automation_type') == 2])
-        manual_cases = len([c for c in test_cases if c.get('custom_automation_type') == 0])
+        total_cases = sum(counts.values())
+        automated_cases = counts.get(testcase_catalog.MAESTRO, 0)
+        manual_cases = counts.get(testcase_catalog.MANUAL, 0)
         automation_rate = (automated_cases / total_cases * 100) if total_cases > 0 else 0
         
         context = {
-            'test_cases': filtered_cases,
             'total_cases': total_cases,
             'automated_cases': automated_cases,
             'manual_cases': manual_cases,
             'automation_rate': f"{automation_rate:.1f}%",
             'search_query': search_query,
             'automation_filter': automation_filter,
-            'filtered_count': len(filtered_cases)
+            'status_filter': request.GET.get('status', ''),
+            'serial_filter': request.GET.get('serial', ''),
         }
         
     except Exception as e:
         print(f"[ERROR] TestRail 테스트케이스 조회 실패: {e}")
         context = {
-            'test_cases': [],
             'total_cases': 0,
             'automated_cases': 0,
             'manual_cases': 0,
             'automation_rate': "0%",
             'search_query': '',
             'automation_filter': 'all',
-            'filtered_count': 0,
+            'status_filter': '',
+            'serial_filter': '',
             'error': f'TestRail 연결 실패: {str(e)}'
         }
     
     return render(request, 'qa_monitor/test_list.html', context)
 
+def test_list_api(request):
+    """테스트케이스 목록 JSON (최신 업데이트순 키셋 페이지)
+    
+    필터: search(제목 또는 케이스 ID), automation, status(최근 실행 상태), serial(실행 이력이 있는 단말)
+    """
+    search_query = request.GET.get('search', '').strip()
+    automation_filter = request.GET.get('automation', 'all')
+    status_filter = request.GET.get('status', '')
+    serial_filter = request.GET.get('serial', '')
+    
+    try:
+        limit = page_size(request)
+        cursor = decode_cursor(request.GET.get('cursor'), 2)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    # 케이스별 최근 실행 (test_log (test_case_id, start_time) 인덱스로 케이스당 한 행만 읽음)
+    case_runs = TestLog.objects.filter(test_case_id=Cast(OuterRef('id'), CharField()))
+    latest_run = case_runs.order_by('-start_time')
+    queryset = TestRailCase.objects.annotate(
+        last_status=Subquery(latest_run.values('status')[:1]),
+        last_run_time=Subquery(latest_run.values('start_time')[:1]),
+    )
+    case_id = search_query.upper().removeprefix('TC')
+    if case_id.isdigit():
+        queryset = queryset.filter(id=int(case_id))
+    elif search_query:
+        queryset = queryset.filter(title__icontains=search_query)
+    if automation_filter in testcase_catalog.AUTOMATION_FILTERS:
+        queryset = queryset.filter(automation_type=testcase_catalog.AUTOMATION_FILTERS[automation_filter])
+    if status_filter:
+        queryset = queryset.filter(last_status=status_filter)
+    if serial_filter:
+        queryset = queryset.filter(Exists(case_runs.filter(serial=serial_filter)))
+    
+    try:
+        rows, next_cursor = keyset_page(
+            queryset.values('id', 'title', 'automation_type', 'priority_id', 'section_id', 'created_on',
+                            'updated_on', 'last_status', 'last_run_time'),
+            ('updated_on', 'id'), cursor, limit,
+        )
+    except DatabaseError as e:
+        print(f"[ERROR] 테스트케이스 목록 조회 실패: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
+    
+    results = [{
+        'id': row['id'],
+        'title': row['title'],
+        'automation_type': row['automation_type'],
+        'automation_status': testcase_catalog.AUTOMATION_LABELS.get(row['automation_type'], '미정'),
+        'priority': row['priority_id'],
+        'section_id': row['section_id'],
+        'updated_on': testcase_catalog.format_epoch(row['updated_on'] or row['created_on']),
+        'last_status': row['last_status'],
+        'last_run_time': row['last_run_time'],
+    } for row in rows]
+    return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
 def test_detail(request, test_id):
     """테스트케이스 상세 정보 - TestRail 연동"""
-    from scripts.config.config_manager import ConfigManager
-    from scripts.testrail.testrail import TestRailManager
-    from scripts.utils.testlog_db import get_db_connection
-    import os
-    
     try:
-        # TestRail 연결 시도
+        # TestRail 연결 시도 (공유 클라이언트)
         test_case = None
         try:
-            config = ConfigManager()
-            testrail_config = config.get_testrail_config()
-            testrail = TestRailManager(testrail_config)
-            
             # 테스트케이스 상세 정보 가져오기
-            test_case = testrail.get_test_case(test_id)
+            test_case = services.testrail().get_test_case(test_id)
         except Exception as e:
             print(f"[WARNING] TestRail 연결 실패: {e}")
             test_case = None
@@ -348,9 +274,6 @@ def test_detail(request, test_id):
                 maestro_file = None
         
         # 로컬 DB에서 실행 이력 가져오기
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        db_path = os.path.join(project_root, "artifacts", "test_log.db")
-        
         execution_history = []
         performance_stats = {
             'total_runs': 0,
@@ -360,77 +283,55 @@ def test_detail(request, test_id):
         }
         
         try:
-            conn = get_db_connection(db_path)
-            cursor = conn.cursor()
+            case_runs = TestLog.objects.filter(test_case_id=str(test_id))
+            # 아카이브로 옮긴 과거 실행 기록도 이력/통계에 포함
+            archived_runs = archive.case_logs(test_id)
             
             # 최근 10회 실행 이력
-            cursor.execute("""
-                SELECT 
-                    run_id,
-                    status,
-                    start_time,
-                    end_time,
-                    elapsed,
-                    error_msg,
-                    serial,
-                    model
-                FROM test_log 
-                WHERE test_case_id = ?
-                ORDER BY start_time DESC
-                LIMIT 10
-            """, (test_id,))
-            
-            history_rows = cursor.fetchall()
-            for row in history_rows:
+            history_rows = list(case_runs.order_by('-start_time').values(
+                'run_id', 'status', 'start_time', 'end_time', 'elapsed', 'error_msg', 'serial', 'model'
+            )[:10])
+            history_rows += archived_runs
+            history_rows.sort(key=lambda row: row['start_time'] or '', reverse=True)
+            for row in history_rows[:10]:
                 execution_history.append({
-                    'run_id': row[0],
-                    'status': row[1],
-                    'start_time': row[2],
-                    'end_time': row[3],
-                    'elapsed': row[4],
-                    'error_msg': row[5],
-                    'device': f"{row[6]} ({row[7]})"
+                    'run_id': row['run_id'], 'status': row['status'], 'start_time': row['start_time'],
+                    'end_time': row['end_time'], 'elapsed': row['elapsed'], 'error_msg': row['error_msg'],
+                    'device': f"{row['serial']} ({row['model']})",
                 })
             
             # 성능 통계
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_runs,
-                    COUNT(CASE WHEN status = '성공' THEN 1 END) as success_runs,
-                    AVG(elapsed) as avg_duration,
-                    MAX(start_time) as last_execution
-                FROM test_log 
-                WHERE test_case_id = ?
-            """, (test_id,))
-            
-            stats_row = cursor.fetchone()
-            if stats_row and stats_row[0] > 0:
+            stats_row = case_runs.aggregate(
+                total_runs=Count('id'),
+                success_runs=Count('id', filter=Q(status='성공')),
+                timed_runs=Count('elapsed'),
+                total_duration=Sum('elapsed'),
+                last_execution=Max('start_time'),
+            )
+            for row in archived_runs:
+                stats_row['total_runs'] += 1
+                stats_row['success_runs'] += row['status'] == '성공'
+                if row['elapsed'] is not None:
+                    stats_row['timed_runs'] += 1
+                    stats_row['total_duration'] = (stats_row['total_duration'] or 0) + row['elapsed']
+                if row['start_time'] and (stats_row['last_execution'] is None or row['start_time'] > stats_row['last_execution']):
+                    stats_row['last_execution'] = row['start_time']
+            if stats_row['total_runs'] > 0:
                 performance_stats = {
-                    'total_runs': stats_row[0],
-                    'success_rate': (stats_row[1] / stats_row[0]) * 100,
-                    'avg_duration': stats_row[2] or 0,
-                    'last_execution': stats_row[3]
+                    'total_runs': stats_row['total_runs'],
+                    'success_rate': (stats_row['success_runs'] / stats_row['total_runs']) * 100,
+                    'avg_duration': (stats_row['total_duration'] or 0) / stats_row['timed_runs'] if stats_row['timed_runs'] else 0,
+                    'last_execution': stats_row['last_execution']
                 }
             
-            # API 호출 통계
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_calls,
-                    AVG(elapsed) as avg_response_time,
-                    COUNT(CASE WHEN status_code >= 400 THEN 1 END) as failed_calls
-                FROM test_api 
-                WHERE test_case_id = ?
-            """, (test_id,))
-            
-            api_stats_row = cursor.fetchone()
+            # API 호출 통계 (DB + 아카이브)
+            api_stats_row = archive.case_api_totals(test_id)
             api_stats = {
-                'total_calls': api_stats_row[0] if api_stats_row else 0,
-                'avg_response_time': api_stats_row[1] if api_stats_row else 0,
-                'failed_calls': api_stats_row[2] if api_stats_row else 0
+                'total_calls': api_stats_row['calls'],
+                'avg_response_time': api_stats_row['avg_time'] or 0,
+                'failed_calls': api_stats_row['failed']
             }
             
-            conn.close()
-            
         except Exception as e:
             print(f"[WARNING] 로컬 DB 조회 실패: {e}")
             api_stats = {'total_calls': 0, 'avg_response_time': 0, 'failed_calls': 0}
@@ -470,99 +371,46 @@ def testcase_detail(request, testcase_id):
     }
     return render(request, 'qa_monitor/testcase_detail.html', context)
 
+@cached_view()
 def testrun_detail(request, run_id):
     """테스트런 상세 정보 - 실제 데이터 활용"""
-    from scripts.utils.testlog_db import get_db_connection
-    import os
-    
-    # 프로젝트 루트 디렉토리 경로 설정
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    db_path = os.path.join(project_root, "artifacts", "test_log.db")
-    
     try:
-        conn = get_db_connection(db_path)
-        cursor = conn.cursor()
-        
         # 1. 테스트런 기본 정보 조회
-        cursor.execute("""
-            SELECT 
-                run_id,
-                COUNT(*) as total_tests,
-                COUNT(CASE WHEN status = '성공' THEN 1 END) as passed_tests,
-                COUNT(CASE WHEN status = '실패' THEN 1 END) as failed_tests,
-                COUNT(CASE WHEN status = '차단' THEN 1 END) as blocked_tests,
-                COUNT(CASE WHEN status = '미테스트' THEN 1 END) as untested_tests,
-                COUNT(CASE WHEN status = '재테스트' THEN 1 END) as retest_tests,
-                MIN(start_time) as run_start_time,
-                MAX(end_time) as run_end_time,
-                AVG(elapsed) as avg_elapsed,
-                SUM(elapsed) as total_elapsed
-            FROM test_log 
-            WHERE run_id = ?
-            GROUP BY run_id
-        """, (run_id,))
-        
-        run_info = cursor.fetchone()
+        run_info = next(iter(run_summaries(run_id=run_id)), None)
         
         if not run_info:
             context = {
                 'run_id': run_id,
                 'run_name': f'테스트런 {run_id}',
                 'error': '해당 테스트런을 찾을 수 없습니다.',
-                'testcases': []
             }
             return render(request, 'qa_monitor/testrun_detail.html', context)
         
-        # 2. 테스트케이스별 상세 정보 조회
-        cursor.execute("""
-            SELECT 
-                test_case_id,
-                step_name,
-                status,
-                start_time,
-                end_time,
-                elapsed,
-                error_msg,
-                serial,
-                model,
-                os_version,
-                tving_version
-            FROM test_log 
-            WHERE run_id = ?
-            ORDER BY start_time ASC
-        """, (run_id,))
-        
-        testcases = cursor.fetchall()
-        
-        # 3. API 호출 정보 조회
-        cursor.execute("""
-            SELECT 
-                test_case_id,
-                COUNT(*) as api_calls,
-                AVG(elapsed) as avg_response_time,
-                COUNT(CASE WHEN status_code >= 400 THEN 1 END) as failed_apis
-            FROM test_api 
-            WHERE run_id = ?
-            GROUP BY test_case_id
-        """, (run_id,))
-        
-        api_stats = {row[0]: {'calls': row[1], 'avg_time': row[2], 'failed': row[3]} for row in cursor.fetchall()}
-        
-        conn.close()
-        
-        # 4. 데이터 가공
+        # 2. 단말기 필터 목록 (테스트케이스 목록은 testrun_testcases_api 에서 페이지 단위로 로드)
+        if archive.run_archived(run_id):
+            # 아카이브로 옮긴 런은 런 파티션 파일에서 조회
+            devices = [{'serial': serial, 'model': model} for serial, model in sorted(
+                {(row['serial'], row['model']) for row in archive.run_logs(run_id) if row['serial'] is not None},
+                key=lambda device: (device[0], device[1] or ''))]
+        else:
+            devices = list(TestLog.objects
+                           .filter(run_id=str(run_id), serial__isnull=False)
+                           .values('serial', 'model')
+                           .distinct())
+        
+        # 3. 데이터 가공
         run_data = {
-            'id': run_info[0],
-            'total_tests': run_info[1],
-            'passed': run_info[2],
-            'failed': run_info[3],
-            'blocked': run_info[4],
-            'untested': run_info[5],
-            'retest': run_info[6],
-            'start_time': run_info[7],
-            'end_time': run_info[8],
-            'avg_elapsed': run_info[9],
-            'total_elapsed': run_info[10]
+            'id': run_info['run_id'],
+            'total_tests': run_info['total'],
+            'passed': run_info['passed'],
+            'failed': run_info['failed'],
+            'blocked': run_info['blocked'],
+            'untested': run_info['untested'],
+            'retest': run_info['retest'],
+            'start_time': run_info['start'],
+            'end_time': run_info['end'],
+            'avg_elapsed': run_info['avg_elapsed'],
+            'total_elapsed': run_info['total_elapsed']
         }
         
         # 성공률 계산
@@ -571,31 +419,12 @@ def testrun_detail(request, run_id):
         else:
             run_data['success_rate'] = 0
         
-        # 테스트케이스 데이터 가공
-        processed_testcases = []
-        for tc in testcases:
-            tc_data = {
-                'id': tc[0],
-                'step_name': tc[1],
-                'status': tc[2],
-                'start_time': tc[3],
-                'end_time': tc[4],
-                'elapsed': tc[5],
-                'error_msg': tc[6],
-                'serial': tc[7],
-                'model': tc[8],
-                'os_version': tc[9],
-                'tving_version': tc[10],
-                'api_stats': api_stats.get(tc[0], {'calls': 0, 'avg_time': 0, 'failed': 0})
-            }
-            processed_testcases.append(tc_data)
-        
         context = {
             'run_id': run_id,
             'run_name': f'테스트런 {run_id}',
             'run_data': run_data,
-            'testcases': processed_testcases,
-            'total_testcases': len(processed_testcases)
+            'devices': devices,
+            'total_testcases': run_data['total_tests']
         }
         
     except Exception as e:
@@ -604,42 +433,124 @@ def testrun_detail(request, run_id):
             'run_id': run_id,
             'run_name': f'테스트런 {run_id}',
             'error': f'데이터 조회 중 오류가 발생했습니다: {str(e)}',
-            'testcases': []
         }
     
     return render(request, 'qa_monitor/testrun_detail.html', context)
 
+@cached_view()
+def testrun_testcases_api(request, run_id):
+    """테스트런 테스트케이스 결과 JSON (시작 시간순 키셋 페이지, 필터: status, serial, search)"""
+    try:
+        limit = page_size(request)
+        cursor = decode_cursor(request.GET.get('cursor'), 2)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    status = request.GET.get('status')
+    serial = request.GET.get('serial')
+    search_query = request.GET.get('search', '').strip().upper().removeprefix('TC')
+    fields = ('id', 'test_case_id', 'step_name', 'status', 'start_time', 'end_time', 'elapsed',
+              'error_msg', 'serial', 'model', 'os_version', 'tving_version')
+    
+    try:
+        if archive.run_archived(run_id):
+            # 아카이브로 옮긴 런은 런 파티션 파일을 읽어 같은 조건/커서 규칙으로 페이지를 나눔
+            archived_rows = [{field: row[field] for field in fields} for row in archive.run_logs(run_id)
+                             if (not status or row['status'] == status)
+                             and (not serial or row['serial'] == serial)
+                             and (not search_query or row['test_case_id'] == search_query)]
+            rows, next_cursor = keyset_page_rows(archived_rows, ('start_time', 'id'), cursor, limit, descending=False)
+        else:
+            # (run_id, start_time) 인덱스 범위 안에서 시작 시간순으로 읽고 상태/단말 조건은 읽는 중에 거름
+            queryset = TestLog.objects.filter(run_id=str(run_id))
+            if status:
+                queryset = queryset.filter(status=status)
+            if serial:
+                queryset = queryset.filter(serial=serial)
+            if search_query:
+                queryset = queryset.filter(test_case_id=search_query)
+            rows, next_cursor = keyset_page(queryset.values(*fields), ('start_time', 'id'), cursor, limit,
+                                            descending=False)
+        # 현재 페이지 케이스의 API 호출 정보만 조회 (아카이브된 호출 포함)
+        case_ids = {row['test_case_id'] for row in rows if row['test_case_id'] is not None}
+        if not case_ids:
+            api_stats = {}
+        elif archive.ENABLED:
+            api_stats = archive.case_api_stats(run_id, case_ids)
+        else:
+            api_stats = case_api_stats(run_id, case_ids)
+    except DatabaseError as e:
+        print(f"[ERROR] 테스트런 테스트케이스 조회 실패: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
+    
+    results = []
+    for row in rows:
+        row.pop('id')
+        row['id'] = row.pop('test_case_id')
+        row['api_stats'] = api_stats.get(row['id'], {'calls': 0, 'avg_time': 0, 'failed': 0})
+        results.append(row)
+    return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
+@cached_view()
+def testrun_timeline_api(request, run_id):
+    """테스트런 단말별 타임라인 JSON (케이스/단계 구간, 유휴 구간, 단말별 유휴 비율)"""
+    try:
+        if archive.run_archived(run_id):
+            # 아카이브로 옮긴 런의 케이스 구간은 런 파티션 파일에서 읽음 (단계 구간은 DB 에 남아 있음)
+            cases = [{field: row[field] for field in run_timeline.CASE_FIELDS} for row in archive.run_logs(run_id)]
+        else:
+            # (run_id, serial, start_time) 인덱스 순서로 단말별 구간을 정렬 없이 읽음
+            cases = list(TestLog.objects
+                         .filter(run_id=str(run_id))
+                         .order_by('serial', 'start_time')
+                         .values(*run_timeline.CASE_FIELDS))
+        phases = list(TestPhase.objects
+                      .filter(run_id=str(run_id))
+                      .order_by('serial', 'start_time')
+                      .values(*run_timeline.PHASE_COLUMNS))
+    except DatabaseError as e:
+        print(f"[ERROR] 테스트런 타임라인 조회 실패: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
+    
+    if not cases and not phases:
+        return JsonResponse({'error': '해당 테스트런을 찾을 수 없습니다.'}, status=404)
+    return JsonResponse(run_timeline.build_timeline(cases, phases))
+
+def testrun_events(request, run_id):
+    """테스트런 실시간 진행 이벤트 스트림 (Server-Sent Events)"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    after_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    response = StreamingHttpResponse(stream_run_events(str(run_id), after_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx 등 프록시 버퍼링 방지
+    return response
+
 def test_result_test(request):
     return JsonResponse({"results": []}, safe=False)
 
+@cached_view()
 def api_dashboard(request):
     """API 성능 모니터링 대시보드"""
-    from scripts.utils.testlog_db import get_db_connection
+    from scripts.utils.api_rollup import hour_floor, query_latency
     
     # 최근 7일간의 API 통계
     end_date = datetime.now()
     start_date = end_date - timedelta(days=7)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # API 호출 통계
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_calls,
-                AVG(elapsed) as avg_response_time,
-                COUNT(CASE WHEN status_code >= 400 THEN 1 END) as failed_calls
-            FROM test_api 
-            WHERE created_at BETWEEN ? AND ?
-        """, (start_date.isoformat(), end_date.isoformat()))
-        
-        api_stats_row = cursor.fetchone()
+        # API 호출 통계 (시간별 롤업 기준)
+        start_hour, end_hour = hour_floor(start_date), hour_floor(end_date)
+        rollups = rollups_between(start_hour, end_hour)
+        
+        api_stats_row = rollups.aggregate(**rollup_stats())
         api_stats = {
-            'total_calls': api_stats_row[0] or 0,
-            'avg_response_time': api_stats_row[1] or 0,
-            'failed_calls': api_stats_row[2] or 0
+            'total_calls': api_stats_row['total_calls'] or 0,
+            'avg_response_time': api_stats_row['avg_response_time'] or 0,
+            'failed_calls': api_stats_row['error_calls'] or 0
         }
+        # 기간 전체 분위수는 시간 구간별 스케치 병합으로 계산
+        api_stats.update(query_latency(raw_test_log_connection(), start_hour=start_hour, end_hour=end_hour).percentiles())
         
         # 성공률 계산
         if api_stats['total_calls'] > 0:
@@ -648,34 +559,19 @@ def api_dashboard(request):
             api_stats['success_rate'] = 0
         
         # 테스트케이스별 API 호출 수
-        cursor.execute("""
-            SELECT 
-                test_case_id,
-                COUNT(*) as api_count,
-                AVG(elapsed) as avg_response_time
-            FROM test_api 
-            WHERE created_at BETWEEN ? AND ?
-            GROUP BY test_case_id
-            ORDER BY api_count DESC
-            LIMIT 10
-        """, (start_date.isoformat(), end_date.isoformat()))
-        
-        testcase_api_stats = cursor.fetchall()
+        testcase_api_stats = list(rollups
+                                  .values('test_case_id')
+                                  .annotate(api_count=Sum('call_count'), avg_response_time=rollup_avg_elapsed())
+                                  .order_by('-api_count')
+                                  .values_list('test_case_id', 'api_count', 'avg_response_time')[:10])
         
         # 시간대별 API 호출 분포
-        cursor.execute("""
-            SELECT 
-                strftime('%H', created_at) as hour,
-                COUNT(*) as call_count
-            FROM test_api 
-            WHERE created_at BETWEEN ? AND ?
-            GROUP BY hour
-            ORDER BY hour
-        """, (start_date.isoformat(), end_date.isoformat()))
-        
-        hourly_stats = cursor.fetchall()
-        
-        conn.close()
+        hourly_stats = list(rollups
+                            .annotate(hour_of_day=Substr('hour', 12, 2))
+                            .values('hour_of_day')
+                            .annotate(call_count=Sum('call_count'))
+                            .order_by('hour_of_day')
+                            .values_list('hour_of_day', 'call_count'))
         
     except Exception as e:
         print(f"[ERROR] API 대시보드 데이터 조회 실패: {e}")
@@ -698,129 +594,164 @@ def api_dashboard(request):
     
     return render(request, 'qa_monitor/api_dashboard.html', context)
 
+@cached_view()
 def api_performance_chart(request):
     """API 성능 차트 데이터"""
-    from scripts.utils.testlog_db import get_db_connection
+    from scripts.utils.api_rollup import hour_floor, hourly_latency
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # 최근 24시간 API 응답시간 데이터
-        cursor.execute("""
-            SELECT 
-                strftime('%H:%M', created_at) as time_slot,
-                AVG(elapsed) as avg_response_time,
-                COUNT(*) as call_count
-            FROM test_api 
-            WHERE created_at >= datetime('now', '-24 hours')
-            GROUP BY strftime('%H', created_at)
-            ORDER BY time_slot
-        """)
-        
-        performance_data = cursor.fetchall()
-        conn.close()
+        # 최근 24시간 API 응답시간 데이터 (시간별 롤업 기준)
+        since = hour_floor(datetime.utcnow() - timedelta(hours=24))
+        performance_data = list(ApiRollupHourly.objects
+                                .filter(hour__gt=since)
+                                .values('hour')
+                                .annotate(avg_response_time=rollup_avg_elapsed(), call_count=Sum('call_count'))
+                                .order_by('hour'))
+        latency_by_hour = hourly_latency(raw_test_log_connection(), performance_data[0]['hour']) if performance_data else {}
         
         chart_data = {
-            'labels': [row[0] for row in performance_data],
-            'response_times': [float(row[1]) if row[1] else 0 for row in performance_data],
-            'call_counts': [row[2] for row in performance_data]
+            'labels': [row['hour'][11:16] for row in performance_data],
+            'response_times': [float(row['avg_response_time']) if row['avg_response_time'] else 0 for row in performance_data],
+            'p95_response_times': [latency_by_hour[row['hour']].quantile(95) if row['hour'] in latency_by_hour else 0
+                                   for row in performance_data],
+            'call_counts': [row['call_count'] for row in performance_data]
         }
         
     except Exception as e:
         chart_data = {
             'labels': [],
             'response_times': [],
+            'p95_response_times': [],
             'call_counts': []
         }
     
     return JsonResponse(chart_data)
 
+@cached_view()
 def api_error_analysis(request):
     """API 오류 분석"""
-    from scripts.utils.testlog_db import get_db_connection
-    
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        status_errors = ApiRollupStatusHourly.objects.filter(status_code__gte=400)
         
         # 오류별 통계
-        cursor.execute("""
-            SELECT 
-                status_code,
-                COUNT(*) as error_count,
-                AVG(elapsed) as avg_response_time
-            FROM test_api 
-            WHERE status_code >= 400
-            GROUP BY status_code
-            ORDER BY error_count DESC
-        """)
-        
-        error_stats = cursor.fetchall()
-        
-        # 엔드포인트별 오류율
-        cursor.execute("""
-            SELECT 
-                endpoint,
-                COUNT(*) as total_calls,
-                COUNT(CASE WHEN status_code >= 400 THEN 1 END) as error_calls,
-                AVG(elapsed) as avg_response_time
-            FROM test_api 
-            GROUP BY endpoint
-            HAVING error_calls > 0
-            ORDER BY (CAST(error_calls AS FLOAT) / total_calls) DESC
-            LIMIT 10
-        """)
-        
-        endpoint_errors = cursor.fetchall()
-        
-        conn.close()
+        error_stats = [
+            {'status_code': row['status_code'], 'count': row['count'], 'avg_response_time': row['avg_response_time'] or 0}
+            for row in (status_errors
+                        .values('status_code')
+                        .annotate(count=Sum('call_count'), avg_response_time=rollup_avg_elapsed())
+                        .order_by('-count'))
+        ]
+        
+        # 엔드포인트별 오류율 (정규화된 endpoint_id 기준 롤업)
+        endpoint_rows = (ApiRollupHourly.objects
+                         .values('endpoint_id', 'endpoint__host', 'endpoint__path_template')
+                         .annotate(**rollup_stats())
+                         .filter(error_calls__gt=0)
+                         .annotate(error_rate=Cast('error_calls', FloatField()) / F('total_calls'))
+                         .order_by('-error_rate')[:10])
+        endpoint_errors = [
+            {
+                'endpoint': f"{row['endpoint__host']}{row['endpoint__path_template']}",
+                'total_calls': row['total_calls'],
+                'error_calls': row['error_calls'],
+                'error_rate': row['error_rate'] * 100,
+                'avg_response_time': row['avg_response_time'] or 0,
+            }
+            for row in endpoint_rows
+        ]
+        
+        # 오류가 많은 엔드포인트/상태코드 조합
+        error_urls = [
+            {'url': f"{row['endpoint__host']}{row['endpoint__path_template']}",
+             'status_code': row['status_code'], 'count': row['count']}
+            for row in (status_errors
+                        .values('endpoint_id', 'endpoint__host', 'endpoint__path_template', 'status_code')
+                        .annotate(count=Sum('call_count'))
+                        .order_by('-count')[:20])
+        ]
         
     except Exception as e:
         error_stats = []
         endpoint_errors = []
+        error_urls = []
     
     context = {
         'error_stats': error_stats,
-        'endpoint_errors': endpoint_errors
+        'endpoint_errors': endpoint_errors,
+        'error_urls': error_urls
     }
     
     return render(request, 'qa_monitor/api_error_analysis.html', context)
 
+@cached_view()
 def menu_api_logs(request):
-    """메뉴별 API 로그"""
-    from scripts.utils.testlog_db import get_db_connection
-    
+    """메뉴별 API 로그 (최근 호출 목록은 menu_api_calls_api 에서 페이지 단위로 로드)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # 메뉴별 API 호출 통계
-        cursor.execute("""
-            SELECT 
-                test_case_id,
-                COUNT(*) as api_count,
-                AVG(elapsed) as avg_response_time,
-                COUNT(CASE WHEN status_code >= 400 THEN 1 END) as error_count
-            FROM test_api 
-            GROUP BY test_case_id
-            ORDER BY api_count DESC
-            LIMIT 20
-        """)
-        
-        menu_api_stats = cursor.fetchall()
-        
-        conn.close()
+        rows = (ApiRollupHourly.objects
+                .values('test_case_id')
+                .annotate(**rollup_stats(), unique_apis=Count('endpoint_id', distinct=True))
+                .order_by('-total_calls')[:20])
+        
+        menu_api_stats = {
+            f"TC{row['test_case_id']}": {
+                'test_case_id': row['test_case_id'],
+                'total_calls': row['total_calls'],
+                'unique_apis': row['unique_apis'],
+                'success_calls': row['total_calls'] - row['error_calls'],
+                'error_calls': row['error_calls'],
+                'avg_response_time': row['avg_response_time'] or 0,
+            }
+            for row in rows
+        }
         
     except Exception as e:
-        menu_api_stats = []
+        menu_api_stats = {}
     
     context = {
-        'menu_api_stats': menu_api_stats
+        'menu_api_stats': menu_api_stats,
+        'total_menus': len(menu_api_stats)
     }
     
     return render(request, 'qa_monitor/menu_api_logs.html', context)
 
+@cached_view()
+def menu_api_calls_api(request):
+    """API 호출 로그 JSON (최신순 키셋 페이지, 필터: test_case_id, serial, run_id, status)
+    
+    status: 'success'(400 미만), 'error'(400 이상) 또는 상태 코드
+    """
+    try:
+        limit = page_size(request)
+        cursor = decode_cursor(request.GET.get('cursor'), 2)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    # test_case_id 가 있으면 (test_case_id, created_at), 없으면 (created_at) 인덱스를 최신순으로 읽음
+    queryset = ApiCall.objects.all()
+    for column in ('test_case_id', 'serial', 'run_id'):
+        if request.GET.get(column):
+            queryset = queryset.filter(**{column: request.GET[column]})
+    status_filter = request.GET.get('status', '')
+    if status_filter == 'success':
+        queryset = queryset.filter(status_code__lt=400)
+    elif status_filter == 'error':
+        queryset = queryset.filter(status_code__gte=400)
+    elif status_filter.isdigit():
+        queryset = queryset.filter(status_code=int(status_filter))
+    
+    try:
+        rows, next_cursor = keyset_page(
+            queryset.values('id', 'created_at', 'test_case_id', 'serial', 'run_id', 'method', 'url',
+                            'status_code', 'elapsed'),
+            ('created_at', 'id'), cursor, limit,
+        )
+    except DatabaseError as e:
+        print(f"[ERROR] API 호출 로그 조회 실패: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
+    
+    return JsonResponse({'results': rows, 'next_cursor': next_cursor})
+
 def extract_menu_from_title(title):
     """제목에서 메뉴명 추출"""
     if not title:
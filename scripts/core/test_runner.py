@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
+import json
 import subprocess
 import time
 import glob
@@ -14,7 +15,13 @@ from ..device.device_manager import DeviceInfo
 from ..utils.logger import get_logger
 from ..utils.log_manager import log_manager
 from ..testrail import testrail
-from scripts.utils.testlog_db import log_step, init_db
+from scripts.utils.testlog_db import log_step, log_phase, log_run_event, init_db, flush_log_steps, get_db_connection
+from scripts.utils.api_body_store import BodyStore
+from scripts.utils.api_regression import compare_with_baseline, compare_with_previous_version, refresh_run_stats
+from scripts.utils.api_stream_validator import read_stream_failure, read_stream_status
+from scripts.utils.log_storage import get_storage
+from scripts.utils.api_validation_config import APIValidationConfig
+from scripts.utils import run_events, run_timeline
 from ..utils.slack_notifier import slack_notifier
 
 # 로거 설정 (testrail_maestro_runner.py와 동일한 방식)
@@ -75,6 +82,8 @@ class TestRunner(ABC):
         pass
 
 class MaestroTestRunner(TestRunner):
+    API_WATCH_INTERVAL = 1.0  # 실시간 API 검증 상태 확인 간격(초)
+    
     def __init__(self, config_manager, testrail_manager=None):
         super().__init__(config_manager)
         self.maestro_flows: List[TestFlow] = []  # 타입을 TestFlow 리스트로 변경
@@ -119,6 +128,7 @@ class MaestroTestRunner(TestRunner):
                 ], check=False, timeout=10)
                 
                 device_proxy_duration = time.time() - device_proxy_start
+                self._record_phase(run_timeline.PHASE_PROXY, device_proxy_start, serial=device.serial)
                 logger.info(f"[{device.serial}] 프록시 설정 완료 (소요시간: {device_proxy_duration:.3f}초)")
                 
             except Exception as e:
@@ -219,6 +229,13 @@ class MaestroTestRunner(TestRunner):
             # 프록시 설정 (테스트 런 시작 시 한 번만)
             self._setup_proxy_for_all_devices(devices)
             
+            # 대시보드 실시간 진행 표시
+            self._emit_run_event(run_events.RUN_STARTED, payload={
+                'name': run_name,
+                'devices': [device.serial for device in devices],
+                'cases': [str(test_case['id']) for test_case in test_cases]
+            })
+            
             # Slack 테스트 시작 알림
             slack_notifier.send_test_start_notification(
                 run_name, len(devices), len(test_cases)
@@ -272,8 +289,7 @@ class MaestroTestRunner(TestRunner):
                         
                         while wait_count < max_wait and not api_data_ready:
                             try:
-                                import sqlite3
-                                conn = sqlite3.connect("artifacts/test_log.db")
+                                conn = get_db_connection()
                                 cursor = conn.cursor()
                                 
                                 # 모든 결과에 대해 API 데이터 확인
@@ -314,15 +330,27 @@ class MaestroTestRunner(TestRunner):
                         else:
                             logger.warning(f"일부 테스트가 아직 실행 중입니다. API 데이터 확인을 건너뜁니다.")
                     
-                    # TestRail 업로드 (API 데이터 포함)
+                    # TestRail 업로드 (API 데이터 포함) - 업로드 동안 모든 단말이 대기하므로 단말별 구간으로 기록
+                    upload_start_time = time.time()
                     self._upload_results_to_testrail(case_results, test_case['title'])
+                    upload_end_time = time.time()
+                    for result in case_results:
+                        self._record_phase(run_timeline.PHASE_UPLOAD, upload_start_time, upload_end_time,
+                                           result.case_id, result.serial)
             
-            # Slack 테스트 완료 알림
             results_summary = {}
             for result in self.results:
                 status = result.status
                 results_summary[status] = results_summary.get(status, 0) + 1
+            self._emit_run_event(run_events.RUN_FINISHED, payload=results_summary)
             
+            # 배치 Writer에 남은 테스트 로그 커밋
+            flush_log_steps(timeout=30)
+            
+            # 이전 앱 버전(없으면 직전 런들) 대비 API 회귀 확인
+            self._check_api_regressions()
+            
+            # Slack 테스트 완료 알림
             slack_notifier.send_test_complete_notification(run_name, results_summary)
             
             # 프록시 해제 (테스트 완료 후)
@@ -386,9 +414,15 @@ class MaestroTestRunner(TestRunner):
         error_msg = None
         mitmdump_proc = None
         api_dump_path = None
+        api_stream_failure = None
         screenshot_path = None
         logcat_path = None
         start_time = total_start_time  # 기존 코드 호환성
+        self._emit_run_event(run_events.CASE_STARTED, case_id, device.serial, payload={
+            'title': title,
+            'model': device.model,
+            'os_version': device.os_version
+        })
         try:
             # 로그 파일 경로 설정
             today = datetime.now().strftime('%Y%m%d')
@@ -400,12 +434,30 @@ class MaestroTestRunner(TestRunner):
             # mitmdump 백그라운드 실행 (테스트케이스별) - 명시적 포트 설정
             api_dump_path = log_dir / f"api_TC{case_id}.dump"
             logger.info(f"[{device.serial}] API 캡처 시작: {api_dump_path}")
+            mitmdump_cmd = ["mitmdump", "-p", "8080", "-w", str(api_dump_path), "--ssl-insecure"]
+            
+            # 실시간 API 검증: 검증 설정이 있으면 mitmdump 애드온이 응답마다 검증하고 상태 파일에 기록
+            api_validation_status_path = None
+            api_validation_config_path = self._find_api_validation_config(case_id)
+            if api_validation_config_path and self._config_flag('API_Validation', 'streaming', True):
+                api_validation_status_path = log_dir / f"api_validation_TC{case_id}.json"
+                api_validation_status_path.unlink(missing_ok=True)
+                mitmdump_cmd += [
+                    "-s", "scripts/utils/api_stream_validator.py",
+                    "--set", f"api_validation_config={api_validation_config_path}",
+                    "--set", f"api_validation_status={api_validation_status_path}",
+                ]
+                logger.info(f"[{device.serial}] 실시간 API 검증 활성화: {api_validation_config_path}")
+            
+            proxy_start_time = time.time()
             mitmdump_proc = subprocess.Popen(
-                ["mitmdump", "-p", "8080", "-w", str(api_dump_path), "--ssl-insecure"],
+                mitmdump_cmd,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL
             )
             time.sleep(2)  # 프록시 준비 대기 (SSL 인증서 처리 시간 고려)
+            proxy_end_time = time.time()
+            self._record_phase(run_timeline.PHASE_PROXY, proxy_start_time, proxy_end_time, case_id, device.serial)
             
             # 프록시는 이미 테스트 런 시작 시 설정됨 (성능 최적화)
             logger.info(f"[{device.serial}] 프록시 설정 완료됨 (테스트 런 시작 시 설정)")
@@ -420,10 +472,15 @@ class MaestroTestRunner(TestRunner):
             # 실시간 API 캡처 모니터링 시작
             logger.info(f"[{device.serial}] 실시간 API 캡처 모니터링 시작")
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300, encoding='utf-8')
+            result, api_stream_failure = self._run_maestro_with_api_watch(
+                cmd, device, api_validation_status_path,
+                abort_on_failure=self._config_flag('API_Validation', 'abort_on_failure', False),
+                case_id=case_id
+            )
             
             maestro_end_time = time.time()
             maestro_duration = maestro_end_time - maestro_start_time
+            self._record_phase(run_timeline.PHASE_MAESTRO, maestro_start_time, maestro_end_time, case_id, device.serial)
             logger.info(f"[{device.serial}] Maestro 실행 완료 (소요시간: {maestro_duration:.3f}초)")
 
             # 상세 로그 출력 (testrail_maestro_runner.py와 동일)
@@ -449,7 +506,12 @@ class MaestroTestRunner(TestRunner):
             output = (result.stdout or "") + (result.stderr or "")
             has_passed_message = "[Passed]" in output or "Flow Passed" in output
 
-            if result.returncode == 0:
+            if api_stream_failure:
+                # 캡처 중 필수 API 상태 코드 불일치 (fail-fast)
+                status = "실패"
+                error_msg = f"API 검증 실패 (실시간): {api_stream_failure['message']}"
+                logger.error(f"[{device.serial}] 테스트 실패 판정 ({error_msg})")
+            elif result.returncode == 0:
                 status = "성공"
                 if has_passed_message:
                     logger.info(f"[{device.serial}] 테스트 성공 판정 (returncode=0, [Passed] 감지)")
@@ -466,6 +528,11 @@ class MaestroTestRunner(TestRunner):
             if result.returncode != 0 or status == "실패":
                 # Maestro 오류 분석
                 maestro_errors = []
+                if api_stream_failure:
+                    maestro_errors.append(
+                        f"API Validation Error: {api_stream_failure['message']} "
+                        f"({api_stream_failure['method']} {api_stream_failure['url']})"
+                    )
                 if result.stderr:
                     maestro_errors.append(f"Maestro Error: {result.stderr}")
                 
@@ -523,6 +590,7 @@ class MaestroTestRunner(TestRunner):
                 )
 
             # --- 스크린샷 저장 (성공/실패 모두) ---
+            screenshot_start_time = time.time()
             screenshot_dir = Path(f"artifacts/images/{today}")
             screenshot_dir.mkdir(parents=True, exist_ok=True)
             timestamp = datetime.now().strftime('%H%M%S')
@@ -606,6 +674,7 @@ class MaestroTestRunner(TestRunner):
             
             if not screenshot_saved:
                 logger.error(f"스크린샷 저장 최종 실패: 모든 방법 시도했으나 성공하지 못함")
+            self._record_phase(run_timeline.PHASE_SCREENSHOT, screenshot_start_time, case_id=case_id, serial=device.serial)
 
             # 첨부파일 수집 (artifacts/result로 변경) + 스크린샷 + 로그캣 추가
             attachments = self._collect_attachments(device.serial, today)
@@ -676,6 +745,7 @@ class MaestroTestRunner(TestRunner):
             logger.info(f"[{device.serial}] 개별 테스트 완료 - 프록시는 런 완료 후 해제")
             
             # mitmdump 종료 및 API 분석
+            capture_start_time = time.time()
             if mitmdump_proc:
                 logger.info(f"[{device.serial}] mitmdump 프로세스 존재 - 종료 시작")
                 
@@ -774,8 +844,7 @@ class MaestroTestRunner(TestRunner):
                         
                         # API 캡처 완료 후 즉시 DB에서 통계 확인
                         try:
-                            import sqlite3
-                            conn = sqlite3.connect("artifacts/test_log.db")
+                            conn = get_db_connection()
                             cursor = conn.cursor()
                             cursor.execute("""
                                 SELECT COUNT(*) as api_count, 
@@ -793,6 +862,11 @@ class MaestroTestRunner(TestRunner):
                                     avg_response = float(stats[1]) if stats[1] is not None else 0.0
                                     failed_count = int(stats[2]) if stats[2] is not None else 0
                                     logger.info(f"[{device.serial}] API 통계 - 전체: {stats[0]}건, 평균응답: {avg_response:.3f}초, 실패: {failed_count}건")
+                                    self._emit_run_event(run_events.API_COUNTERS, case_id, device.serial, payload={
+                                        'calls': stats[0],
+                                        'avg_response': avg_response,
+                                        'failed': failed_count
+                                    })
                                 except (TypeError, ValueError) as e:
                                     logger.warning(f"[{device.serial}] API 통계 포맷 오류: {e}, 기본값 사용")
                                     logger.info(f"[{device.serial}] API 통계 - 전체: {stats[0]}건, 평균응답: 0.000초, 실패: 0건")
@@ -804,11 +878,11 @@ class MaestroTestRunner(TestRunner):
                         # API 검증 실행 (JSON 설정 파일 기반)
                         try:
                             from scripts.utils.maestro_api_validator import validate_maestro_test_with_api
-                            from scripts.utils.api_validation_config import APIValidationConfig
                             
-                            # API 검증 설정 로드
+                            # API 검증 설정 로드 (설정 파일은 TC 접두사가 붙은 ID로 저장됨)
                             config_manager = APIValidationConfig()
-                            api_config = config_manager.load_validation_config(str(case_id))
+                            api_config = (config_manager.load_validation_config(f"TC{case_id}")
+                                          or config_manager.load_validation_config(str(case_id)))
                             
                             if api_config and api_config.get('enabled', False):
                                 logger.info(f"[{device.serial}] API 검증 시작: TC{case_id}")
@@ -839,6 +913,8 @@ class MaestroTestRunner(TestRunner):
                     logger.warning(f"[{device.serial}] API 덤프 파일이 존재하지 않음: {api_dump_path}")
             else:
                 logger.warning(f"[{device.serial}] mitmdump 프로세스가 None입니다.")
+            if mitmdump_proc:
+                self._record_phase(run_timeline.PHASE_API_CAPTURE, capture_start_time, case_id=case_id, serial=device.serial)
             # 전체 성능 요약
             total_end_time = time.time()
             total_duration = total_end_time - total_start_time
@@ -864,6 +940,141 @@ class MaestroTestRunner(TestRunner):
                 tving_version=device.tving_version,
                 run_id=str(self.current_run_id) if self.current_run_id else None
             )
+            self._emit_run_event(run_events.CASE_FINISHED, case_id, device.serial, status=status, payload={
+                'elapsed': round(end_time - start_time, 2),
+                'error': error_msg
+            })
+    
+    def _emit_run_event(self, event_type: str, case_id: Optional[str] = None, serial: Optional[str] = None,
+                        status: Optional[str] = None, payload: Optional[Dict[str, Any]] = None):
+        """대시보드 실시간 진행 표시용 이벤트 기록 (실패해도 테스트 진행에는 영향 없음)"""
+        try:
+            log_run_event(self.current_run_id, event_type, case_id, serial, status, payload)
+        except Exception as e:
+            logger.warning(f"런 이벤트 기록 실패 ({event_type}): {e}")
+    
+    def _record_phase(self, phase: str, start_time: float, end_time: Optional[float] = None,
+                      case_id: Optional[str] = None, serial: Optional[str] = None):
+        """런 타임라인용 단계 구간 기록 (실패해도 테스트 진행에는 영향 없음)"""
+        try:
+            log_phase(self.current_run_id, phase, start_time, end_time, case_id, serial)
+        except Exception as e:
+            logger.warning(f"단계 구간 기록 실패 ({phase}): {e}")
+
+    def _check_api_regressions(self):
+        """현재 런을 이전 tving_version 런(없으면 직전 런들)과 비교하여 API 회귀를 기록/알림"""
+        if not self.current_run_id:
+            return
+        run_id = str(self.current_run_id)
+        storage = get_storage()
+        if not storage.analytics:
+            logger.info(f"API 회귀 비교 생략: {storage.name} 저장소는 런별 API 집계를 유지하지 않습니다.")
+            return
+        try:
+            conn = storage.connect()
+            try:
+                refresh_run_stats(conn)
+                report = compare_with_previous_version(conn, run_id) or compare_with_baseline(conn, run_id)
+            finally:
+                conn.close()
+        except storage.errors as e:
+            logger.warning(f"API 회귀 비교 실패: {e}")
+            return
+        
+        if report is None:
+            logger.info(f"API 회귀 비교 생략: 런 {run_id}와 비교할 이전 런이 없습니다.")
+            return
+        logger.info(report.format_text())
+        
+        report_path = Path(f"artifacts/api_regression_run{run_id}.json")
+        try:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+            logger.info(f"API 회귀 비교 결과 저장: {report_path}")
+        except OSError as e:
+            logger.warning(f"API 회귀 비교 결과 저장 실패: {e}")
+        
+        if report.regressions:
+            slack_notifier.send_api_performance_alert(
+                'api_regression',
+                f"런 {run_id} ({report.target_version or '-'}) API 회귀 {len(report.regressions)}건 "
+                f"(기준: {report.base_version or '-'})",
+                {
+                    'target_run': run_id,
+                    'base_runs': ", ".join(report.base_runs),
+                    'regressions': "\n".join(f"{d.label}: {', '.join(d.regressions)}" for d in report.regressions[:5])
+                }
+            )
+    
+    def _config_flag(self, section: str, key: str, default: bool) -> bool:
+        """config.ini 의 true/false 설정값 (없으면 default)"""
+        value = self.config.get(section, key, fallback=None) if self.config else None
+        if value is None:
+            return default
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
+    
+    def _find_api_validation_config(self, case_id) -> Optional[Path]:
+        """테스트케이스의 활성화된 API 검증 설정 파일 경로 (TC 접두사 유무 모두 확인)"""
+        validation_configs = APIValidationConfig()
+        for test_case_id in (f"TC{case_id}", str(case_id)):
+            config = validation_configs.load_validation_config(test_case_id)
+            if config is not None:
+                return validation_configs.get_config_path(test_case_id) if config.get('enabled', False) else None
+        return None
+    
+    def _run_maestro_with_api_watch(self, cmd: List[str], device: DeviceInfo, validation_status_path: Optional[Path],
+                                    abort_on_failure: bool = False, timeout: int = 300, case_id: Optional[str] = None):
+        """Maestro 를 실행하면서 실시간 API 검증 상태를 감시
+        
+        반환: (CompletedProcess, fail-fast 실패 정보 또는 None)
+        abort_on_failure 이면 필수 API 실패가 감지되는 즉시 Maestro 를 중단하여 단말 시간을 아낌
+        호출 수가 바뀔 때마다 대시보드 실시간 진행 표시용 api_progress 이벤트를 기록
+        """
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8')
+        deadline = time.time() + timeout
+        failure = None
+        reported_calls = None
+        while True:
+            try:
+                # communicate 는 타임아웃 후 다시 호출해도 출력이 유실되지 않음
+                stdout, stderr = proc.communicate(timeout=self.API_WATCH_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            
+            stream_status = read_stream_status(validation_status_path) if validation_status_path else None
+            if stream_status and stream_status.get('total_calls') != reported_calls:
+                reported_calls = stream_status.get('total_calls')
+                self._emit_run_event(run_events.API_PROGRESS, case_id, device.serial, payload={
+                    'total_calls': reported_calls,
+                    'unexpected_calls': stream_status.get('unexpected_calls'),
+                    'failures': [f.get('message') for f in stream_status.get('failures') or []]
+                })
+            
+            if failure is None and stream_status:
+                failure = (stream_status.get('failures') or [None])[0]
+                if failure:
+                    logger.warning(f"[{device.serial}] 실시간 API 검증 실패 감지: {failure['message']}")
+                    if abort_on_failure:
+                        logger.warning(f"[{device.serial}] API 검증 실패로 Maestro 플로우 조기 중단")
+                        proc.terminate()
+                        try:
+                            stdout, stderr = proc.communicate(timeout=10)
+                        except subprocess.TimeoutExpired:
+                            proc.kill()
+                            stdout, stderr = proc.communicate()
+                        stderr = (stderr or "") + f"\n[API 검증 실패로 조기 중단] {failure['message']}"
+                        break
+            
+            if time.time() > deadline:
+                proc.kill()
+                proc.communicate()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+        
+        # 실행 중에 감지하지 못한 마지막 실패 확인
+        if failure is None and validation_status_path:
+            failure = read_stream_failure(validation_status_path)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr), failure
     
     def _find_app_start_yaml(self) -> Optional[TestFlow]:
         """앱 시작 YAML 파일 찾기 (메타데이터 기반)"""
@@ -957,9 +1168,7 @@ class MaestroTestRunner(TestRunner):
 
             # --- 4. API 호출 요약/통계 (DB에서 조회) ---
             try:
-                import sqlite3
-                api_db = "artifacts/test_log.db"
-                conn = sqlite3.connect(api_db)
+                conn = get_db_connection()
                 c = conn.cursor()
                 case_ids = tuple(r.case_id for r in results)
                 serials = tuple(r.serial for r in results)
@@ -989,10 +1198,12 @@ class MaestroTestRunner(TestRunner):
             if overall_status == "실패":
                 # 실제 실패 API 상세 자동 추출
                 try:
-                    c = sqlite3.connect("artifacts/test_log.db").cursor()
+                    conn = get_db_connection()
+                    c = conn.cursor()
+                    bodies = BodyStore(conn)
                     for r in results:
                         c.execute("""
-                            SELECT url, status_code, elapsed, response_body
+                            SELECT url, status_code, elapsed, response_body_hash
                             FROM test_api
                             WHERE test_case_id=? AND serial=? AND status_code >= 400
                             ORDER BY id DESC LIMIT 5
@@ -1000,9 +1211,12 @@ class MaestroTestRunner(TestRunner):
                         fail_apis = c.fetchall()
                         if fail_apis:
                             comment_lines.append(f"[API 실패 상세] ({r.model}/{r.serial})")
-                            for url, status_code, elapsed, resp in fail_apis:
+                            resp_bodies = bodies.get_many(row[3] for row in fail_apis)
+                            for url, status_code, elapsed, resp_hash in fail_apis:
+                                resp = resp_bodies.get(resp_hash)
                                 resp_short = (resp[:200] + "...") if resp and len(resp) > 200 else resp
                                 comment_lines.append(f"- {url} (status: {status_code}, {elapsed if elapsed is not None else 'N/A'}s)\n  → {resp_short}")
+                    conn.close()
                 except Exception as e:
                     comment_lines.append(f"[API 실패 상세 추출 오류] {e}")
                 
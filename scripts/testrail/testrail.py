@@ -7,11 +7,13 @@ class TestRailAPI:
         self.url = url.rstrip('/')
         self.auth = (email, password)
         self.headers = {'Content-Type': 'application/json'}
+        # 같은 클라이언트로 여러 번 호출할 때 HTTP 연결(keep-alive)을 재사용
+        self.session = requests.Session()
 
     def _send_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
         api_url = f"{self.url}/index.php?/api/v2/{endpoint}"
         try:
-            response = requests.request(method, api_url, headers=self.headers, auth=self.auth, **kwargs)
+            response = self.session.request(method, api_url, headers=self.headers, auth=self.auth, **kwargs)
             response.raise_for_status()
             # GET 요청에 대한 응답이 비어있을 수 있음 (e.g. 204 No Content)
             if response.status_code == 204:
@@ -2,23 +2,118 @@
 """
 API 기반 자동 알림 시스템
 API 성능 저하나 오류 발생 시 자동으로 알림을 보냅니다.
+
+- check_api_performance(): 최근 1시간을 조회하는 일회성 점검
+- run_monitoring(): 수집 스트림 구독 방식의 상시 감시
+  PRAGMA data_version 으로 다른 프로세스(api_capture)의 커밋을 감지하면 마지막으로 처리한
+  test_api.id / api_anomaly.id 이후의 새 행만 읽어 분 단위 슬라이딩 윈도우에 반영하고,
+  새 행이 들어온 테스트케이스의 규칙만 평가합니다. 같은 알림은 쿨다운 동안 억제됩니다.
 """
 
 import sqlite3
 import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import logging
+from scripts.utils.log_storage import DEFAULT_DB_PATH
 from scripts.utils.slack_notifier import SlackNotifier
 
 logger = logging.getLogger(__name__)
 
+MINUTE_FORMAT = "%Y-%m-%d %H:%M"    # created_at(UTC) 앞 16자리와 같은 형식
+
+
+class SlidingWindow:
+    """분 단위 버킷으로 유지하는 API 호출 슬라이딩 윈도우 (합계는 증분 갱신)"""
+    
+    def __init__(self):
+        self.buckets = deque()   # [minute, calls, errors, timed, sum_elapsed, max_elapsed]
+        self.calls = 0
+        self.errors = 0
+        self.timed = 0
+        self.sum_elapsed = 0.0
+    
+    def add(self, minute: str, status_code: Optional[int], elapsed: Optional[float]):
+        if not self.buckets or self.buckets[-1][0] < minute:
+            self.buckets.append([minute, 0, 0, 0, 0.0, 0.0])
+        bucket = self.buckets[-1] if self.buckets[-1][0] <= minute else self._bucket(minute)
+        is_error = status_code is not None and status_code >= 400
+        bucket[1] += 1
+        bucket[2] += is_error
+        self.calls += 1
+        self.errors += is_error
+        if elapsed is not None:
+            bucket[3] += 1
+            bucket[4] += elapsed
+            bucket[5] = max(bucket[5], elapsed)
+            self.timed += 1
+            self.sum_elapsed += elapsed
+    
+    def _bucket(self, minute: str) -> list:
+        """늦게 도착한 행의 버킷 (드묾)"""
+        for bucket in self.buckets:
+            if bucket[0] == minute:
+                return bucket
+        bucket = [minute, 0, 0, 0, 0.0, 0.0]
+        self.buckets = deque(sorted([*self.buckets, bucket], key=lambda b: b[0]))
+        return bucket
+    
+    def expire(self, cutoff_minute: str):
+        while self.buckets and self.buckets[0][0] < cutoff_minute:
+            _, calls, errors, timed, total, _ = self.buckets.popleft()
+            self.calls -= calls
+            self.errors -= errors
+            self.timed -= timed
+            self.sum_elapsed -= total
+    
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+    
+    @property
+    def avg_response_time(self) -> Optional[float]:
+        return self.sum_elapsed / self.timed if self.timed else None
+    
+    @property
+    def max_response_time(self) -> Optional[float]:
+        return max(bucket[5] for bucket in self.buckets) if self.timed else None
+
+
+class AlertThrottle:
+    """같은 키(알림 유형, 대상)의 알림을 쿨다운 동안 억제하고 억제 건수를 누적"""
+    
+    def __init__(self, cooldown: timedelta):
+        self.cooldown = cooldown
+        self._last_sent: Dict[Tuple, datetime] = {}
+        self._suppressed: Dict[Tuple, int] = {}
+    
+    def allow(self, key: Tuple, now: datetime) -> Tuple[bool, int]:
+        """(전송 여부, 직전 전송 이후 억제된 건수)"""
+        last = self._last_sent.get(key)
+        if last is not None and now - last < self.cooldown:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False, 0
+        self._last_sent[key] = now
+        return True, self._suppressed.pop(key, 0)
+
+
 class APIAlertSystem:
     """API 기반 자동 알림 시스템"""
     
-    def __init__(self, db_path: str = "artifacts/test_log.db"):
+    WINDOW = timedelta(hours=1)              # 규칙 평가 윈도우
+    ALERT_COOLDOWN = timedelta(minutes=15)   # 같은 알림 재전송 간격
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
         self.slack_notifier = SlackNotifier()
+        self.throttle = AlertThrottle(self.ALERT_COOLDOWN)
+        
+        # 스트림 구독 상태
+        self._overall = SlidingWindow()
+        self._cases: Dict[str, SlidingWindow] = {}
+        self._last_api_id = 0
+        self._last_anomaly_id = 0
         
         # 알림 임계값 설정
         self.thresholds = {
@@ -222,31 +317,211 @@ class APIAlertSystem:
             except Exception as e:
                 logger.error(f"알림 전송 실패: {e}")
     
-    def run_monitoring(self, interval_minutes: int = 5) -> None:
-        """지속적인 모니터링 실행"""
-        logger.info(f"API 모니터링 시작 (체크 간격: {interval_minutes}분)")
+    # ------------------------------------------------------------------ 스트림 구독
+    def start_stream(self, conn: sqlite3.Connection) -> None:
+        """최근 윈도우로 상태를 초기화하고 이후 새 행만 처리하도록 위치를 기록"""
+        self._overall = SlidingWindow()
+        self._cases = {}
+        since = (datetime.utcnow() - self.WINDOW).strftime('%Y-%m-%d %H:%M:%S')
+        rows = conn.execute("""
+            SELECT id, test_case_id, status_code, elapsed, created_at FROM test_api
+            WHERE created_at >= ? ORDER BY created_at
+        """, (since,))
+        self._ingest(rows)
+        self._last_api_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM test_api").fetchone()[0]
+        self._last_anomaly_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM api_anomaly").fetchone()[0]
+    
+    def process_new_rows(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """마지막 처리 위치 이후의 새 행을 반영하고, 영향받은 대상의 규칙만 평가한 알림 반환"""
+        rows = conn.execute("""
+            SELECT id, test_case_id, status_code, elapsed, created_at FROM test_api
+            WHERE id > ? ORDER BY id
+        """, (self._last_api_id,)).fetchall()
+        touched = self._ingest(rows)
         
-        while True:
-            try:
-                alerts = self.check_api_performance()
-                self.send_alerts(alerts)
-                
-                logger.info(f"API 모니터링 체크 완료: {len(alerts)}개 알림")
-                
-                # 대기
-                time.sleep(interval_minutes * 60)
-                
-            except KeyboardInterrupt:
-                logger.info("API 모니터링 중단")
-                break
-            except Exception as e:
-                logger.error(f"API 모니터링 오류: {e}")
-                time.sleep(60)  # 오류 시 1분 대기
+        cutoff = (datetime.utcnow() - self.WINDOW).strftime(MINUTE_FORMAT)
+        self._overall.expire(cutoff)
+        for test_case_id in list(self._cases):
+            window = self._cases[test_case_id]
+            window.expire(cutoff)
+            if not window.calls:
+                del self._cases[test_case_id]
+        
+        alerts = []
+        if rows:
+            alerts.extend(self._evaluate_overall(self._overall))
+            for test_case_id in touched:
+                if test_case_id in self._cases:
+                    alerts.extend(self._evaluate_test_case(test_case_id, self._cases[test_case_id]))
+        alerts.extend(self._new_anomaly_alerts(conn))
+        return self._throttle(alerts)
+    
+    def _ingest(self, rows) -> set:
+        touched = set()
+        for api_id, test_case_id, status_code, elapsed, created_at in rows:
+            self._last_api_id = max(self._last_api_id, api_id)
+            if not created_at:
+                continue
+            minute = created_at[:16]
+            elapsed = float(elapsed) if elapsed is not None else None
+            self._overall.add(minute, status_code, elapsed)
+            if test_case_id:
+                self._cases.setdefault(test_case_id, SlidingWindow()).add(minute, status_code, elapsed)
+                touched.add(test_case_id)
+        return touched
+    
+    def _evaluate_overall(self, window: SlidingWindow) -> List[Dict[str, Any]]:
+        """전체 윈도우 규칙 (_check_overall_performance 와 같은 기준)"""
+        alerts = []
+        if window.calls < self.thresholds['min_api_calls']:
+            return alerts
+        if window.error_rate > self.thresholds['error_rate']:
+            alerts.append({
+                'type': 'system_high_error_rate',
+                'severity': 'critical',
+                'message': f"전체 시스템 API 오류율이 높습니다: {window.error_rate:.1%}",
+                'details': {
+                    'error_rate': window.error_rate,
+                    'total_calls': window.calls,
+                    'error_count': window.errors,
+                    'test_cases': len(self._cases)
+                }
+            })
+        avg_response = window.avg_response_time
+        if avg_response and avg_response > self.thresholds['avg_response_time']:
+            alerts.append({
+                'type': 'system_slow_response',
+                'severity': 'high',
+                'message': f"전체 시스템 평균 응답시간이 느립니다: {avg_response:.2f}초",
+                'details': {
+                    'avg_response_time': avg_response,
+                    'total_calls': window.calls
+                }
+            })
+        return alerts
+    
+    def _evaluate_test_case(self, test_case_id: str, window: SlidingWindow) -> List[Dict[str, Any]]:
+        """테스트케이스 윈도우 규칙 (_check_specific_test_case 와 같은 기준)"""
+        alerts = []
+        if window.calls < self.thresholds['min_api_calls']:
+            return alerts
+        if window.error_rate > self.thresholds['error_rate']:
+            alerts.append({
+                'type': 'high_error_rate',
+                'test_case_id': test_case_id,
+                'severity': 'high',
+                'message': f"테스트케이스 {test_case_id}의 API 오류율이 높습니다: {window.error_rate:.1%}",
+                'details': {
+                    'error_rate': window.error_rate,
+                    'total_calls': window.calls,
+                    'error_count': window.errors
+                }
+            })
+        avg_response = window.avg_response_time
+        max_response = window.max_response_time
+        if (avg_response and avg_response > self.thresholds['avg_response_time']) or \
+                (max_response and max_response > self.thresholds['max_response_time']):
+            alerts.append({
+                'type': 'slow_response',
+                'test_case_id': test_case_id,
+                'severity': 'medium',
+                'message': f"테스트케이스 {test_case_id}의 응답시간이 느립니다: "
+                           f"평균 {avg_response:.2f}초, 최대 {max_response:.2f}초",
+                'details': {
+                    'avg_response_time': avg_response,
+                    'max_response_time': max_response
+                }
+            })
+        return alerts
+    
+    def _new_anomaly_alerts(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """수집 시점에 기록된 엔드포인트 응답시간 이상(api_anomaly)을 알림으로 변환"""
+        rows = conn.execute("""
+            SELECT a.id, a.endpoint_id, a.test_case_id, a.value, a.baseline_mean, a.z_score, t.url
+            FROM api_anomaly a JOIN test_api t ON t.id = a.api_id
+            WHERE a.id > ? ORDER BY a.id
+        """, (self._last_anomaly_id,)).fetchall()
+        alerts = []
+        for anomaly_id, endpoint_id, test_case_id, value, mean, z_score, url in rows:
+            self._last_anomaly_id = anomaly_id
+            alerts.append({
+                'type': 'endpoint_latency_anomaly',
+                'test_case_id': test_case_id,
+                'endpoint_id': endpoint_id,
+                'severity': 'high',
+                'message': f"엔드포인트 응답시간 이상: {url} {value:.2f}초 (평균 {mean:.2f}초, z={z_score:.1f})",
+                'details': {
+                    'url': url,
+                    'response_time': value,
+                    'baseline_mean': mean,
+                    'z_score': z_score
+                }
+            })
+        return alerts
+    
+    def _throttle(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """(유형, 대상)별 중복 제거 및 쿨다운 적용"""
+        now = datetime.now()
+        allowed, seen = [], set()
+        for alert in alerts:
+            key = (alert['type'], alert.get('test_case_id'), alert.get('endpoint_id'))
+            if key in seen:
+                continue
+            seen.add(key)
+            send, suppressed = self.throttle.allow(key, now)
+            if send:
+                if suppressed:
+                    alert.setdefault('details', {})['suppressed'] = suppressed
+                allowed.append(alert)
+        return allowed
+    
+    def run_monitoring(self, poll_seconds: float = 1.0) -> None:
+        """수집 스트림을 구독하여 새 행이 커밋될 때마다 규칙을 평가 (상시 실행)"""
+        logger.info(f"API 모니터링 시작 (커밋 감지 간격: {poll_seconds}초)")
+        
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            self.start_stream(conn)
+            self.send_alerts(self._throttle(
+                self._evaluate_overall(self._overall) +
+                [alert for test_case_id, window in self._cases.items()
+                 for alert in self._evaluate_test_case(test_case_id, window)]
+            ))
+            data_version = None
+            while True:
+                try:
+                    # data_version 은 다른 연결이 커밋할 때만 바뀌므로 변경이 없으면 테이블을 읽지 않음
+                    current = conn.execute("PRAGMA data_version").fetchone()[0]
+                    if current != data_version:
+                        data_version = current
+                        alerts = self.process_new_rows(conn)
+                        if alerts:
+                            self.send_alerts(alerts)
+                            logger.info(f"API 모니터링: {len(alerts)}개 알림")
+                    time.sleep(poll_seconds)
+                    
+                except KeyboardInterrupt:
+                    logger.info("API 모니터링 중단")
+                    break
+                except Exception as e:
+                    # 상시 실행이므로 DB/Slack 오류나 잘못된 행이 있어도 중단하지 않음
+                    # (처리 위치는 행마다 전진하므로 같은 행에서 반복 실패하지 않음, 다음 주기에 다시 조회)
+                    logger.error(f"API 모니터링 오류: {e}")
+                    data_version = None
+                    time.sleep(60)  # 오류 시 1분 대기
+        finally:
+            conn.close()
 
 if __name__ == "__main__":
     # 사용 예시
+    import sys
     alert_system = APIAlertSystem()
     
+    # 상시 감시: python -m scripts.utils.api_alert_system --watch
+    if "--watch" in sys.argv:
+        alert_system.run_monitoring()
+        sys.exit(0)
+    
     # 현재 API 성능 체크
     alerts = alert_system.check_api_performance()
     
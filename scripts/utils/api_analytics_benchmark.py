@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+API 분석 백엔드 벤치마크
+행 단위(튜플 순회) 분석과 컬럼형(NumPy) 분석의 로드/계산 시간을 비교합니다.
+--db 를 지정하지 않으면 임시 DB에 합성 test_api 데이터를 --rows 건 생성합니다.
+
+사용법: python scripts/utils/api_analytics_benchmark.py [--rows 1000000] [--db artifacts/test_log.db]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.api_columnar import APIColumns, group_percentile, group_stats, load_api_columns
+from scripts.utils.api_rollup import percentile
+from scripts.utils.db_migrations import migrate
+
+ENDPOINT_COUNT = 200
+TEST_CASE_COUNT = 50
+INSERT_BATCH = 50000
+
+
+def generate_data(conn: sqlite3.Connection, rows: int, seed: int = 42):
+    """합성 test_api 행 생성 (엔드포인트 ENDPOINT_COUNT 개, 최근 48시간 분포)"""
+    rng = random.Random(seed)
+    conn.executemany(
+        "INSERT INTO api_endpoint (id, method, host, path_template) VALUES (?, ?, ?, ?)",
+        [(i, rng.choice(("GET", "GET", "POST")), "api.tving.com", f"/v{i % 3 + 1}/resource{i}/{{id}}")
+         for i in range(1, ENDPOINT_COUNT + 1)],
+    )
+    methods = {row[0]: row[1] for row in conn.execute("SELECT id, method FROM api_endpoint")}
+    now = datetime.utcnow()
+
+    def make_row(i: int) -> tuple:
+        endpoint_id = rng.randint(1, ENDPOINT_COUNT)
+        status = 200 if rng.random() > 0.05 else rng.choice((400, 404, 500, 503))
+        elapsed = rng.lognormvariate(-1.5, 0.8) if rng.random() > 0.01 else None
+        created_at = (now - timedelta(seconds=rng.randint(0, 48 * 3600))).strftime('%Y-%m-%d %H:%M:%S')
+        return (f"TC{rng.randint(1, TEST_CASE_COUNT)}", f"R{i % 8}",
+                f"https://api.tving.com/v{endpoint_id % 3 + 1}/resource{endpoint_id}/{rng.randint(1, 500)}",
+                methods[endpoint_id], status, elapsed, endpoint_id, created_at)
+
+    for start in range(0, rows, INSERT_BATCH):
+        conn.executemany("""
+            INSERT INTO test_api (test_case_id, serial, url, method, status_code, elapsed, endpoint_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [make_row(i) for i in range(start, min(start + INSERT_BATCH, rows))])
+    conn.commit()
+
+
+# ---------------------------------------------------------------------- 행 단위 (기존 방식)
+def load_rows(conn: sqlite3.Connection) -> list:
+    return conn.execute("""
+        SELECT t.url, t.method, t.status_code, t.elapsed, e.host || e.path_template
+        FROM test_api t LEFT JOIN api_endpoint e ON e.id = t.endpoint_id
+    """).fetchall()
+
+
+def analyze_rows(rows: list) -> Dict:
+    """기존 분석기와 같은 방식: 튜플을 순회하며 리스트/딕셔너리에 누적"""
+    response_times = [float(r[3]) for r in rows if r[3] is not None]
+    error_count = sum(1 for r in rows if (r[2] or 0) >= 400)
+
+    endpoints: Dict[str, Dict] = {}
+    url_counts: Dict[str, int] = defaultdict(int)
+    for url, method, status_code, elapsed, endpoint in rows:
+        url_counts[url] += 1
+        key = f"{method} {endpoint or url}"
+        stats = endpoints.setdefault(key, {'count': 0, 'errors': 0, 'times': []})
+        stats['count'] += 1
+        if elapsed is not None:
+            stats['times'].append(float(elapsed))
+        if (status_code or 0) >= 400:
+            stats['errors'] += 1
+    for stats in endpoints.values():
+        times = sorted(stats.pop('times'))
+        stats['avg'] = sum(times) / len(times) if times else 0
+        stats['max'] = times[-1] if times else 0
+        stats['p95'] = percentile(times, 95) or 0
+
+    ordered = sorted(response_times)
+    return {
+        'total': len(rows),
+        'errors': error_count,
+        'p95': percentile(ordered, 95),
+        'endpoints': len(endpoints),
+        'duplicate_urls': sum(1 for count in url_counts.values() if count > 1),
+    }
+
+
+# ---------------------------------------------------------------------- 컬럼형
+def analyze_columns(columns: APIColumns) -> Dict:
+    """같은 지표를 컬럼 배열 벡터 연산으로 계산"""
+    errors = columns.error_mask
+    size = len(columns.endpoints)
+    group_stats(columns.endpoint_codes, size, columns.elapsed, errors)
+    group_percentile(columns.endpoint_codes, size, columns.elapsed, 95)
+    url_counts = columns.counts(columns.url_codes, columns.urls)
+    return {
+        'total': len(columns),
+        'errors': int(np.count_nonzero(errors)),
+        'p95': float(np.percentile(columns.timed_elapsed, 95)),
+        'endpoints': size,
+        'duplicate_urls': int(np.count_nonzero(url_counts > 1)),
+    }
+
+
+def timed(func: Callable, *args) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="API 분석 행 단위/컬럼형 벤치마크")
+    parser.add_argument("--rows", type=int, default=1000000, help="합성 데이터 행 수 (--db 미지정 시)")
+    parser.add_argument("--db", help="기존 test_log.db 경로 (지정 시 합성 데이터 생성 생략)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.db:
+        db_path = args.db
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, "benchmark.db")
+
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    if temp_dir:
+        print(f"합성 데이터 {args.rows:,}건 생성 중...")
+        generate_data(conn, args.rows)
+
+    row_load, rows = timed(load_rows, conn)
+    row_calc, row_result = timed(analyze_rows, rows)
+    del rows
+    col_load, columns = timed(load_api_columns, conn)
+    col_calc, col_result = timed(analyze_columns, columns)
+    conn.close()
+    if temp_dir:
+        temp_dir.cleanup()
+
+    print(f"\n=== API 분석 벤치마크 ({row_result['total']:,}행, 엔드포인트 {col_result['endpoints']}개) ===")
+    print(f"{'':8} {'로드':>10} {'계산':>10} {'합계':>10}")
+    print(f"{'행 단위':8} {row_load:>9.2f}s {row_calc:>9.2f}s {row_load + row_calc:>9.2f}s")
+    print(f"{'컬럼형':8} {col_load:>9.2f}s {col_calc:>9.2f}s {col_load + col_calc:>9.2f}s")
+    print(f"계산 {row_calc / col_calc:.1f}배, 전체 {(row_load + row_calc) / (col_load + col_calc):.1f}배 빠름")
+
+    for key in ('total', 'errors', 'duplicate_urls'):
+        if row_result[key] != col_result[key]:
+            print(f"⚠️ 결과 불일치: {key} {row_result[key]} != {col_result[key]}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
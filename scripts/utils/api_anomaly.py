@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+API 응답시간 이상 감지 (수집 시점 온라인 감지)
+엔드포인트별 응답시간 평균/분산을 Welford 알고리즘으로 누적하여 api_latency_baseline 에 저장하고,
+새 test_api 행이 들어올 때 해당 엔드포인트 기준선과 비교하여 느린 응답을 api_anomaly 에 기록합니다.
+
+- 기준선은 행마다 O(1)로 갱신되며, 비교는 행을 반영하기 전 기준선으로 수행
+- 표본이 MIN_BASELINE_SAMPLES 미만인 엔드포인트는 판정하지 않음
+- 워터마크(마지막으로 처리한 test_api.id)는 api_rollup_state 에 함께 보관
+- 리포트는 원본을 다시 스캔하지 않고 recent_anomalies()로 기록된 이상만 조회
+
+사용법: python scripts/utils/api_anomaly.py [--db artifacts/test_log.db] [--rebuild]
+"""
+
+import argparse
+import logging
+import math
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.api_rollup import UNKNOWN_ENDPOINT, get_watermark, run_immediate, set_watermark
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+BASELINE_TABLE = "api_latency_baseline"
+ANOMALY_TABLE = "api_anomaly"
+WATERMARK_NAME = ANOMALY_TABLE
+
+Z_THRESHOLD = 3.0               # 기준선 평균 + 3σ 초과 시 이상
+MIN_BASELINE_SAMPLES = 30       # 판정에 필요한 최소 표본 수
+MIN_EXCESS_SECONDS = 0.1        # 분산이 매우 작을 때 미세한 차이로 판정되지 않도록 하는 최소 초과량
+FETCH_SIZE = 10000
+# 재집계에 읽는 test_api 컬럼 (아카이브 행도 이 컬럼만 붙임)
+REBUILD_COLUMNS = ("id", "endpoint_id", "test_case_id", "run_id", "elapsed", "created_at")
+
+
+@dataclass
+class LatencyBaseline:
+    """엔드포인트별 응답시간 누적 통계 (Welford)"""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def z_score(self, value: float) -> Optional[float]:
+        """기준선 대비 z 점수 (표본 부족 또는 분산 0이면 None)"""
+        std = self.std
+        if self.count < MIN_BASELINE_SAMPLES or std == 0:
+            return None
+        return (value - self.mean) / std
+
+    def is_anomaly(self, value: float) -> bool:
+        z = self.z_score(value)
+        return z is not None and z > Z_THRESHOLD and value - self.mean > MIN_EXCESS_SECONDS
+
+
+def refresh_anomalies(conn: sqlite3.Connection) -> int:
+    """워터마크 이후 새 행을 기준선에 반영하고, 새로 기록한 이상 건수를 반환"""
+    flagged = run_immediate(conn, update_anomalies)
+    if flagged:
+        logger.info(f"API 응답시간 이상 감지: {flagged}건")
+    return flagged
+
+
+def rebuild_anomalies(conn: sqlite3.Connection, archive_dir: Optional[str] = None) -> int:
+    """기준선과 이상 기록을 비우고 전체 행을 다시 처리 (아카이브로 옮긴 행 포함)"""
+    from scripts.utils.log_archive import rebuild_source  # log_archive 가 이 모듈을 import 하므로 지연 import
+
+    def rebuild(conn: sqlite3.Connection) -> int:
+        conn.execute(f"DELETE FROM {BASELINE_TABLE}")
+        conn.execute(f"DELETE FROM {ANOMALY_TABLE}")
+        set_watermark(conn, WATERMARK_NAME, 0)
+        return update_anomalies(conn)
+
+    with rebuild_source(conn, REBUILD_COLUMNS, archive_dir):
+        return run_immediate(conn, rebuild)
+
+
+def update_anomalies(conn: sqlite3.Connection) -> int:
+    """refresh_anomalies 의 본체 - 트랜잭션은 호출자가 관리 (마이그레이션 백필에서 사용)"""
+    watermark = get_watermark(conn, WATERMARK_NAME)
+    max_id = conn.execute("SELECT MAX(id) FROM test_api").fetchone()[0] or 0
+    if max_id <= watermark:
+        return 0
+
+    baselines = _load_baselines(conn)
+    touched = set()
+    flagged = 0
+    cursor = conn.execute("""
+        SELECT id, endpoint_id, test_case_id, run_id, elapsed, created_at
+        FROM test_api
+        WHERE id > ? AND id <= ? AND elapsed IS NOT NULL
+        ORDER BY id
+    """, (watermark, max_id))
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        anomalies = []
+        for api_id, endpoint_id, test_case_id, run_id, elapsed, created_at in rows:
+            endpoint_id = endpoint_id if endpoint_id is not None else UNKNOWN_ENDPOINT
+            baseline = baselines.get(endpoint_id)
+            if baseline is None:
+                baseline = baselines[endpoint_id] = LatencyBaseline()
+            elapsed = float(elapsed)
+            if baseline.is_anomaly(elapsed):
+                anomalies.append((api_id, endpoint_id, test_case_id, run_id, "slow_response", elapsed,
+                                  baseline.mean, baseline.std, baseline.z_score(elapsed), created_at))
+            baseline.add(elapsed)
+            touched.add(endpoint_id)
+        conn.executemany(f"""
+            INSERT OR IGNORE INTO {ANOMALY_TABLE} (api_id, endpoint_id, test_case_id, run_id, type, value,
+                                                   baseline_mean, baseline_std, z_score, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, anomalies)
+        flagged += len(anomalies)
+
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {BASELINE_TABLE} (endpoint_id, sample_count, mean, m2) VALUES (?, ?, ?, ?)",
+        [(endpoint_id, baselines[endpoint_id].count, baselines[endpoint_id].mean, baselines[endpoint_id].m2)
+         for endpoint_id in touched],
+    )
+    set_watermark(conn, WATERMARK_NAME, max_id)
+    return flagged
+
+
+def recent_anomalies(conn: sqlite3.Connection, since: str, limit: int = 100) -> List[Dict]:
+    """since 이후 기록된 이상을 z 점수 내림차순으로 반환"""
+    rows = conn.execute(f"""
+        SELECT t.url, t.method, a.test_case_id, a.type, a.value, a.baseline_mean, a.baseline_std, a.z_score, a.created_at
+        FROM {ANOMALY_TABLE} a
+        JOIN test_api t ON t.id = a.api_id
+        WHERE a.created_at > ?
+        ORDER BY a.z_score DESC
+        LIMIT ?
+    """, (since, limit)).fetchall()
+    return [
+        {
+            "url": url,
+            "method": method,
+            "test_case_id": test_case_id,
+            "type": anomaly_type,
+            "value": value,
+            "baseline_mean": mean,
+            "baseline_std": std,
+            "z_score": z_score,
+            "threshold": mean + Z_THRESHOLD * std,
+            "created_at": created_at,
+        }
+        for url, method, test_case_id, anomaly_type, value, mean, std, z_score, created_at in rows
+    ]
+
+
+def _load_baselines(conn: sqlite3.Connection) -> Dict[int, LatencyBaseline]:
+    return {
+        endpoint_id: LatencyBaseline(count, mean, m2)
+        for endpoint_id, count, mean, m2 in conn.execute(
+            f"SELECT endpoint_id, sample_count, mean, m2 FROM {BASELINE_TABLE}"
+        )
+    }
+
+
+def main() -> int:
+    from scripts.utils.db_migrations import migrate  # db_migrations 가 이 모듈을 import 하므로 지연 import
+
+    parser = argparse.ArgumentParser(description="API 응답시간 이상 감지 갱신")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="test_log.db 경로")
+    parser.add_argument("--rebuild", action="store_true", help="기준선을 비우고 전체 행 재처리")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    migrate(conn)
+    try:
+        flagged = rebuild_anomalies(conn) if args.rebuild else refresh_anomalies(conn)
+    except RuntimeError as e:
+        print(f"API 이상 감지 재처리 실패: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"API 이상 감지 완료: {flagged}건 기록")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+API 요청/응답 본문 저장소
+본문을 SHA-256 해시로 식별하여 api_body 테이블에 한 번만 압축 저장하고,
+test_api 에는 request_body_hash / response_body_hash 만 기록합니다.
+
+- 압축: zstandard 설치 시 zstd, 없으면 zlib
+- 사전: 저장된 본문 샘플로 압축 사전을 만들어 api_body_dict 에 보관하고 이후 저장에 사용
+  (반복되는 JSON 키/구조가 많은 작은 응답의 압축률 향상)
+"""
+
+import hashlib
+import sqlite3
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BODY_TABLE = "api_body"
+BODY_DICT_TABLE = "api_body_dict"
+
+CODEC_RAW = "raw"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+DEFAULT_CODEC = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+MIN_COMPRESS_SIZE = 64          # 이보다 짧은 본문은 압축하지 않음
+DICT_SIZE = 32 * 1024           # zlib 윈도우 크기와 동일
+MIN_TRAIN_SAMPLES = 100         # 사전 학습에 필요한 최소 본문 수
+TRAIN_SAMPLE_LIMIT = 1000
+
+
+def body_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BodyStore:
+    """api_body 테이블 저장/조회 (프로세스 내 해시/사전 캐시)"""
+
+    def __init__(self, conn: sqlite3.Connection, codec: str = DEFAULT_CODEC):
+        self.conn = conn
+        self.codec = codec
+        self._known: set = set()
+        self._dicts: Dict[int, Tuple[str, bytes]] = {}
+        # zstd 압축기/해제기는 사전별로 한 번만 만들어 재사용 (사전 로드 비용이 본문 압축보다 큼)
+        self._compressors: Dict[Optional[int], "zstandard.ZstdCompressor"] = {}
+        self._decompressors: Dict[Optional[int], "zstandard.ZstdDecompressor"] = {}
+        self._dict_id = self._latest_dict_id()
+
+    # ------------------------------------------------------------------ 저장
+    def put(self, text: Optional[str]) -> Optional[str]:
+        """본문을 저장하고 해시를 반환 (None이면 저장하지 않음)"""
+        if text is None:
+            return None
+        data = text.encode("utf-8", "replace")
+        digest = body_hash(data)
+        if digest in self._known:
+            return digest
+
+        codec, dict_id, payload = self._compress(data)
+        self.conn.execute(
+            f"INSERT OR IGNORE INTO {BODY_TABLE} (hash, codec, dict_id, size, data) VALUES (?, ?, ?, ?, ?)",
+            (digest, codec, dict_id, len(data), payload),
+        )
+        self._known.add(digest)
+        return digest
+
+    def _compress(self, data: bytes) -> Tuple[str, Optional[int], bytes]:
+        if len(data) < MIN_COMPRESS_SIZE:
+            return CODEC_RAW, None, data
+        dictionary = self._load_dict(self._dict_id) if self._dict_id is not None else None
+        if self.codec == CODEC_ZSTD:
+            payload = self._zstd_compressor(self._dict_id if dictionary else None).compress(data)
+        else:
+            compressor = zlib.compressobj(6, zdict=dictionary[1]) if dictionary else zlib.compressobj(6)
+            payload = compressor.compress(data) + compressor.flush()
+        if len(payload) >= len(data):
+            return CODEC_RAW, None, data
+        return self.codec, self._dict_id if dictionary else None, payload
+
+    # ------------------------------------------------------------------ 조회
+    def get(self, digest: Optional[str]) -> Optional[str]:
+        """해시로 본문 조회 (없으면 None)"""
+        if not digest:
+            return None
+        return self.get_many([digest]).get(digest)
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, str]:
+        """여러 해시의 본문을 한 번에 조회"""
+        wanted = list({d for d in digests if d})
+        bodies: Dict[str, str] = {}
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT hash, codec, dict_id, data FROM {BODY_TABLE} WHERE hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for digest, codec, dict_id, payload in rows:
+                bodies[digest] = self.decode(codec, dict_id, payload)
+        return bodies
+
+    def decode(self, codec: str, dict_id: Optional[int], payload: bytes) -> str:
+        """api_body 행(codec, dict_id, data)을 원문 텍스트로 복원 (아카이브로 옮긴 본문 조회에도 사용)"""
+        return self._decompress(codec, dict_id, payload).decode("utf-8", "replace")
+
+    def _decompress(self, codec: str, dict_id: Optional[int], payload: bytes) -> bytes:
+        if codec == CODEC_RAW:
+            return bytes(payload)
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd로 압축된 본문을 읽으려면 zstandard 패키지가 필요합니다.")
+            return self._zstd_decompressor(dict_id).decompress(payload)
+        dictionary = self._load_dict(dict_id)[1] if dict_id is not None else None
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
+
+    def _zstd_compressor(self, dict_id: Optional[int]) -> "zstandard.ZstdCompressor":
+        compressor = self._compressors.get(dict_id)
+        if compressor is None:
+            params = {"dict_data": zstandard.ZstdCompressionDict(self._load_dict(dict_id)[1])} if dict_id is not None else {}
+            compressor = self._compressors[dict_id] = zstandard.ZstdCompressor(level=3, **params)
+        return compressor
+
+    def _zstd_decompressor(self, dict_id: Optional[int]) -> "zstandard.ZstdDecompressor":
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            params = {"dict_data": zstandard.ZstdCompressionDict(self._load_dict(dict_id)[1])} if dict_id is not None else {}
+            decompressor = self._decompressors[dict_id] = zstandard.ZstdDecompressor(**params)
+        return decompressor
+
+    # ------------------------------------------------------------------ 사전
+    def _latest_dict_id(self) -> Optional[int]:
+        row = self.conn.execute(
+            f"SELECT MAX(id) FROM {BODY_DICT_TABLE} WHERE codec = ?", (self.codec,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _load_dict(self, dict_id: int) -> Tuple[str, bytes]:
+        cached = self._dicts.get(dict_id)
+        if cached is None:
+            row = self.conn.execute(
+                f"SELECT codec, data FROM {BODY_DICT_TABLE} WHERE id = ?", (dict_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"압축 사전을 찾을 수 없습니다: {dict_id}")
+            cached = self._dicts[dict_id] = (row[0], bytes(row[1]))
+        return cached
+
+    def ensure_dictionary(self) -> Optional[int]:
+        """사전이 없고 샘플이 충분하면 사전을 학습하여 저장 (이후 put 부터 적용)"""
+        if self._dict_id is None:
+            count = self.conn.execute(
+                f"SELECT COUNT(*) FROM {BODY_TABLE} WHERE codec != ?", (CODEC_RAW,)
+            ).fetchone()[0]
+            if count >= MIN_TRAIN_SAMPLES:
+                self.train_dictionary()
+        return self._dict_id
+
+    def train_dictionary(self, sample_limit: int = TRAIN_SAMPLE_LIMIT) -> Optional[int]:
+        """최근 본문 샘플로 압축 사전을 학습하여 저장하고 id 반환"""
+        rows = self.conn.execute(
+            f"SELECT codec, dict_id, data FROM {BODY_TABLE} WHERE codec != ? ORDER BY rowid DESC LIMIT ?",
+            (CODEC_RAW, sample_limit),
+        ).fetchall()
+        samples = [self._decompress(codec, dict_id, payload) for codec, dict_id, payload in rows]
+        dictionary = self._build_dictionary(samples)
+        if not dictionary:
+            return None
+        cursor = self.conn.execute(
+            f"INSERT INTO {BODY_DICT_TABLE} (codec, data) VALUES (?, ?)", (self.codec, dictionary)
+        )
+        self._dict_id = cursor.lastrowid
+        self._dicts[self._dict_id] = (self.codec, dictionary)
+        return self._dict_id
+
+    def _build_dictionary(self, samples: List[bytes]) -> Optional[bytes]:
+        if len(samples) < MIN_TRAIN_SAMPLES:
+            return None
+        if self.codec == CODEC_ZSTD:
+            try:
+                return zstandard.train_dictionary(DICT_SIZE, samples).as_bytes()
+            except zstandard.ZstdError:
+                return None
+        # zlib 사전: 공통 구조가 몰려 있는 본문 앞부분을 모으고, 최근 샘플이 끝(가까운 거리)에 오도록 배치
+        prefix_size = max(DICT_SIZE // len(samples), 256)
+        return b"".join(sample[:prefix_size] for sample in reversed(samples))[-DICT_SIZE:]
@@ -1,51 +1,33 @@
 import os
-import sqlite3
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from mitmproxy import io
 from mitmproxy.exceptions import FlowReadException
+from scripts.utils.api_anomaly import refresh_anomalies
+from scripts.utils.api_body_store import BodyStore
+from scripts.utils.api_endpoint import EndpointRegistry
+from scripts.utils.api_regression import refresh_run_stats
+from scripts.utils.api_rollup import refresh_rollups
+from scripts.utils.api_sequence_index import refresh_sequences
+from scripts.utils.log_storage import get_storage
 
-DB_PATH = "artifacts/test_log.db"
 API_TABLE = "test_api"
+API_COLUMNS = (
+    "test_case_id", "serial", "model", "os_version", "tving_version", "timestamp", "url", "method",
+    "status_code", "elapsed", "request_body_hash", "response_body_hash", "run_id", "endpoint_id",
+)
 
 def ensure_api_table():
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
-    try:
-        cur = conn.execute("PRAGMA journal_mode;")
-        mode = cur.fetchone()[0]
-        if mode.lower() != "wal":
-            try:
-                conn.execute('PRAGMA journal_mode=WAL;')
-            except sqlite3.OperationalError:
-                pass  # locked 등 오류 발생 시 무시
-    except Exception:
-        pass
-    cursor = conn.cursor()
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS {API_TABLE} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            test_case_id TEXT,
-            serial TEXT,
-            model TEXT,
-            os_version TEXT,
-            tving_version TEXT,
-            timestamp TEXT,
-            url TEXT,
-            method TEXT,
-            status_code INTEGER,
-            elapsed REAL,
-            request_body TEXT,
-            response_body TEXT,
-            run_id TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    conn.close()
+    # 저장소 연결 시 SQLite 는 WAL 모드 설정, 스키마 마이그레이션/생성
+    get_storage().connect_ready().close()
 
 def parse_mitmproxy_dump(dump_path, test_case_id, serial, model, os_version, tving_version, timestamp, run_id=None):
-    ensure_api_table()
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
-    # WAL 모드 재설정은 생략 (ensure_api_table에서만 시도)
-    cursor = conn.cursor()
+    storage = get_storage()
+    conn = storage.connect_ready()
+    endpoints = EndpointRegistry(conn)
+    bodies = BodyStore(conn)
+    # 수집한 행은 마지막에 한 번에 저장 (SQLite executemany / PostgreSQL COPY)
+    rows = []
     
     processed_count = 0
     error_count = 0
@@ -68,25 +50,12 @@ def parse_mitmproxy_dump(dump_path, test_case_id, serial, model, os_version, tvi
                             elapsed = flow.response.timestamp_end - flow.request.timestamp_start
                         else:
                             elapsed = None
-                        request_body = flow.request.get_text(strict=False)
-                        response_body = flow.response.get_text(strict=False)
-                        # 인코딩 에러 방지: 유니코드 치환 및 예외 처리
                         try:
-                            if request_body is not None:
-                                request_body = request_body.encode('utf-8', 'replace').decode('utf-8', 'replace')
-                        except Exception:
-                            request_body = '[ENCODING ERROR]'
-                        try:
-                            if response_body is not None:
-                                response_body = response_body.encode('utf-8', 'replace').decode('utf-8', 'replace')
-                        except Exception:
-                            response_body = '[ENCODING ERROR]'
-                        
-                        try:
-                            cursor.execute(f"""
-                                INSERT INTO {API_TABLE} (test_case_id, serial, model, os_version, tving_version, timestamp, url, method, status_code, elapsed, request_body, response_body, run_id)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (test_case_id, serial, model, os_version, tving_version, timestamp, url, method, status_code, elapsed, request_body, response_body, run_id))
+                            # 본문은 해시 기반 압축 저장소에 한 번만 저장하고 test_api 에는 해시만 기록
+                            # (인코딩 불가 문자는 저장 시 치환)
+                            request_body_hash = bodies.put(flow.request.get_text(strict=False))
+                            response_body_hash = bodies.put(flow.response.get_text(strict=False))
+                            rows.append((test_case_id, serial, model, os_version, tving_version, timestamp, url, method, status_code, elapsed, request_body_hash, response_body_hash, run_id, endpoints.get_id(url, method)))
                             processed_count += 1
                         except Exception as e:
                             error_count += 1
@@ -122,10 +91,7 @@ def parse_mitmproxy_dump(dump_path, test_case_id, serial, model, os_version, tvi
                     status_match = re.search(r'status_code;(\d+):(\d+)', content)
                     status_code = int(status_match.group(2)) if status_match else 200
                     
-                    cursor.execute(f"""
-                        INSERT INTO {API_TABLE} (test_case_id, serial, model, os_version, tving_version, timestamp, url, method, status_code, elapsed, request_body, response_body, run_id)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (test_case_id, serial, model, os_version, tving_version, timestamp, url, method, status_code, None, None, None, run_id))
+                    rows.append((test_case_id, serial, model, os_version, tving_version, timestamp, url, method, status_code, None, None, None, run_id, endpoints.get_id(url, method)))
                     processed_count += 1
                 except Exception as e:
                     error_count += 1
@@ -134,7 +100,47 @@ def parse_mitmproxy_dump(dump_path, test_case_id, serial, model, os_version, tvi
         except Exception as e:
             print(f"방법 2도 실패: {e}")
     
-    conn.commit()
+    try:
+        storage.insert_rows(conn, API_TABLE, API_COLUMNS, rows)
+        conn.commit()
+    except storage.errors as e:
+        conn.rollback()
+        conn.close()
+        print(f"DB 저장 오류 ({len(rows)}건 미저장): {e}")
+        return
+    if not storage.analytics:
+        # 롤업/이상 감지/회귀 집계/시퀀스 인덱스는 SQLite 저장소에서만 유지
+        conn.close()
+        print(f"API 캡처 완료: 총 {processed_count}건 저장, {error_count}건 오류")
+        return
+    # 본문이 충분히 쌓이면 압축 사전 학습 (다음 캡처부터 적용)
+    try:
+        if bodies.ensure_dictionary() is not None:
+            conn.commit()
+    except storage.errors as e:
+        print(f"본문 압축 사전 학습 실패: {e}")
+    # 새로 수집된 행이 속한 시간 구간의 롤업 갱신
+    try:
+        refresh_rollups(conn)
+    except storage.errors as e:
+        print(f"API 롤업 갱신 실패 (다음 수집 시 재시도): {e}")
+    # 엔드포인트별 기준선 갱신 및 느린 응답 이상 기록
+    try:
+        flagged = refresh_anomalies(conn)
+        if flagged:
+            print(f"응답시간 이상 {flagged}건 감지")
+    except storage.errors as e:
+        print(f"API 이상 감지 실패 (다음 수집 시 재시도): {e}")
+    # 런 간 회귀 비교용 런별 집계 갱신
+    try:
+        refresh_run_stats(conn)
+    except storage.errors as e:
+        print(f"런별 API 집계 갱신 실패 (다음 수집 시 재시도): {e}")
+    # 호출 시퀀스/n-gram 인덱스 갱신
+    try:
+        refresh_sequences(conn)
+    except storage.errors as e:
+        print(f"API 시퀀스 인덱스 갱신 실패 (다음 수집 시 재시도): {e}")
     conn.close()
     print(f"API 캡처 완료: 총 {processed_count}건 저장, {error_count}건 오류")
 
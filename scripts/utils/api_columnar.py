@@ -0,0 +1,206 @@
+"""
+test_api 컬럼형(NumPy) 로더
+분석기들이 행 단위 튜플을 순회하지 않고 벡터 연산으로 지표를 계산할 수 있도록
+test_api 를 컬럼별 NumPy 배열로 읽어옵니다.
+
+- elapsed: float64 (NULL 은 NaN)
+- status: int32 (NULL 은 0)
+- url/method/endpoint: 사전 인코딩된 int32 코드 + 코드별 원래 값 목록
+  (endpoint 는 "METHOD host/템플릿경로", 엔드포인트 정보가 없으면 "METHOD 쿼리 스트링을 뗀 URL")
+- endpoint 는 정수 endpoint_id 를 np.unique 로 인코딩하므로 행마다 문자열을 만들지 않음
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+FETCH_SIZE = 50000
+
+# 엔드포인트가 있는 행은 정수 endpoint_id 만 읽고(라벨은 차원 테이블에서 한 번에 조회),
+# 엔드포인트가 없는 행만 "METHOD 쿼리를 뗀 URL" 라벨을 만든다
+_COLUMNS_SQL = """
+    SELECT
+        t.elapsed,
+        COALESCE(t.status_code, 0),
+        COALESCE(t.url, ''),
+        t.endpoint_id,
+        CASE WHEN t.endpoint_id IS NULL
+             THEN COALESCE(t.method, 'GET') || ' ' || rtrim(substr(t.url, 1, instr(t.url || '?', '?') - 1))
+        END
+    FROM test_api t
+"""
+
+
+@dataclass
+class APIColumns:
+    """test_api 컬럼 배열 묶음"""
+    elapsed: np.ndarray
+    status: np.ndarray
+    url_codes: np.ndarray
+    urls: List[str]
+    method_codes: np.ndarray
+    methods: List[str]
+    endpoint_codes: np.ndarray
+    endpoints: List[str]
+    _timed: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    @property
+    def timed_elapsed(self) -> np.ndarray:
+        """응답시간이 있는 호출의 응답시간 배열"""
+        if self._timed is None:
+            self._timed = self.elapsed[~np.isnan(self.elapsed)]
+        return self._timed
+
+    @property
+    def error_mask(self) -> np.ndarray:
+        return self.status >= 400
+
+    def counts(self, codes: np.ndarray, dictionary: Sequence[str]) -> np.ndarray:
+        """코드별 호출 수 (dictionary 순서)"""
+        return np.bincount(codes, minlength=len(dictionary))
+
+    @classmethod
+    def from_records(cls, api_data: Iterable[Dict]) -> "APIColumns":
+        """get_recent_api_data() 형식의 dict 목록을 컬럼으로 변환"""
+        builder = _ColumnBuilder()
+        builder.extend(
+            (
+                item.get('elapsed'),
+                item.get('status_code') or 0,
+                item.get('url') or '',
+                None,
+                f"{item.get('method') or 'GET'} {item.get('endpoint') or (item.get('url') or '').split('?')[0]}",
+            )
+            for item in api_data
+        )
+        return builder.build()
+
+
+class _ColumnBuilder:
+    """청크 단위로 행을 받아 컬럼 배열과 사전을 누적
+
+    행 형식: (elapsed, status_code, url, endpoint_id, 라벨) - 라벨은 endpoint_id 가 없을 때만 사용
+    """
+
+    def __init__(self):
+        self._elapsed: List[np.ndarray] = []
+        self._status: List[np.ndarray] = []
+        self._url_codes: List[np.ndarray] = []
+        self._endpoint_keys: List[np.ndarray] = []
+        self._urls: Dict[str, int] = {}
+        self._labels: Dict[str, int] = {}
+
+    def extend(self, rows: Iterable[tuple]):
+        rows = list(rows)
+        if not rows:
+            return
+        elapsed, status, urls, endpoint_ids, labels = zip(*rows)
+        self._elapsed.append(np.array(elapsed, dtype=np.float64))      # None -> NaN
+        self._status.append(np.array(status, dtype=np.int32))
+        self._url_codes.append(_encode(urls, self._urls))
+
+        # 엔드포인트 키: endpoint_id(양수) 또는 라벨 코드의 음수 (-1, -2, ...)
+        keys = np.fromiter((value or 0 for value in endpoint_ids), dtype=np.int64, count=len(rows))
+        missing = np.flatnonzero(keys == 0)
+        if len(missing):
+            keys[missing] = -1 - _encode([labels[i] for i in missing], self._labels).astype(np.int64)
+        self._endpoint_keys.append(keys)
+
+    def build(self, conn: Optional[sqlite3.Connection] = None) -> APIColumns:
+        elapsed = _concat(self._elapsed, np.float64)
+        status = _concat(self._status, np.int32)
+        url_codes = _concat(self._url_codes, np.int32)
+        keys, endpoint_codes = np.unique(_concat(self._endpoint_keys, np.int64), return_inverse=True)
+
+        labels = list(self._labels)
+        known = _endpoint_labels(conn, keys[keys > 0]) if conn is not None else {}
+        endpoints = [labels[-1 - key] if key < 0 else known.get(key, f"UNKNOWN #{key}") for key in keys.tolist()]
+
+        # 메서드는 엔드포인트 라벨의 접두사이므로 엔드포인트 코드에서 파생
+        method_index: Dict[str, int] = {}
+        endpoint_methods = _encode([label.split(' ', 1)[0] for label in endpoints], method_index)
+        method_codes = endpoint_methods[endpoint_codes] if len(endpoint_codes) else np.empty(0, dtype=np.int32)
+
+        return APIColumns(elapsed, status, url_codes, list(self._urls), method_codes, list(method_index),
+                          endpoint_codes.astype(np.int32), endpoints)
+
+
+def _concat(chunks: List[np.ndarray], dtype) -> np.ndarray:
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+
+def _encode(values: Sequence[str], index: Dict[str, int]) -> np.ndarray:
+    """문자열을 사전 코드로 변환 (index 는 청크 간 공유되며 삽입 순서가 코드 순서)"""
+    setdefault = index.setdefault
+    return np.fromiter((setdefault(value, len(index)) for value in values), dtype=np.int32, count=len(values))
+
+
+def _endpoint_labels(conn: sqlite3.Connection, endpoint_ids: np.ndarray) -> Dict[int, str]:
+    """endpoint_id -> "METHOD host/템플릿경로" (차원 테이블은 작으므로 필요한 id만 나눠 조회)"""
+    labels: Dict[int, str] = {}
+    ids = endpoint_ids.tolist()
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        labels.update(conn.execute(
+            f"SELECT id, method || ' ' || host || path_template FROM api_endpoint "
+            f"WHERE id IN ({','.join('?' * len(chunk))})",
+            chunk,
+        ).fetchall())
+    return labels
+
+
+def load_api_columns(
+    conn: sqlite3.Connection,
+    where: str = "",
+    params: Sequence = (),
+    order_by: str = "",
+) -> APIColumns:
+    """test_api 를 컬럼 배열로 로드 (where/order_by 는 t. 접두사로 test_api 컬럼 참조)"""
+    sql = _COLUMNS_SQL
+    if where:
+        sql += f" WHERE {where}"
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+
+    builder = _ColumnBuilder()
+    cursor = conn.execute(sql, tuple(params))
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        builder.extend(rows)
+    return builder.build(conn)
+
+
+def group_stats(codes: np.ndarray, size: int, elapsed: np.ndarray, errors: np.ndarray) -> Dict[str, np.ndarray]:
+    """코드별 호출 수/오류 수/응답시간 합계·건수·최대값 (벡터 연산)"""
+    timed = ~np.isnan(elapsed)
+    filled = np.where(timed, elapsed, 0.0)
+    max_elapsed = np.full(size, -np.inf)
+    np.maximum.at(max_elapsed, codes[timed], elapsed[timed])
+    return {
+        "count": np.bincount(codes, minlength=size),
+        "errors": np.bincount(codes, weights=errors, minlength=size).astype(np.int64),
+        "timed": np.bincount(codes, weights=timed, minlength=size).astype(np.int64),
+        "sum": np.bincount(codes, weights=filled, minlength=size),
+        "max": max_elapsed,
+    }
+
+
+def group_percentile(codes: np.ndarray, size: int, elapsed: np.ndarray, q: float) -> np.ndarray:
+    """코드별 응답시간 분위수 (q: 0~100, 값이 없으면 NaN)"""
+    timed = ~np.isnan(elapsed)
+    codes, values = codes[timed], elapsed[timed]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    result = np.full(size, np.nan)
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    for group in np.split(np.arange(len(codes)), boundaries):
+        if len(group):
+            result[codes[group[0]]] = np.percentile(values[group], q)
+    return result
@@ -0,0 +1,74 @@
+"""
+API 엔드포인트 정규화
+수집 시점에 URL을 (method, host, 템플릿 경로)로 정규화하여 api_endpoint 차원 테이블에 저장하고,
+test_api 에는 정수 endpoint_id 만 기록합니다.
+
+예) GET https://api.tving.com/v2/media/12345/info?screenCode=CSSD0100
+    -> GET api.tving.com /v2/media/{id}/info
+"""
+
+import re
+import sqlite3
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+ENDPOINT_TABLE = "api_endpoint"
+
+# 경로 세그먼트 치환 규칙 (위에서부터 먼저 매칭되는 규칙 적용)
+_SEGMENT_RULES = [
+    (re.compile(r"^\d+$"), "{id}"),
+    (re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"), "{uuid}"),
+    (re.compile(r"^[0-9a-fA-F]{16,}$"), "{hash}"),
+    # TVING 콘텐츠 코드 (예: P001234567, E003456789, CSSD0100 같은 화면 코드는 제외)
+    (re.compile(r"^[A-Za-z]{1,3}\d{5,}$"), "{code}"),
+]
+
+EndpointKey = Tuple[str, str, str]
+
+
+def template_path(path: str) -> str:
+    """경로의 가변 세그먼트(숫자 ID, UUID, 해시, 콘텐츠 코드)를 플레이스홀더로 치환"""
+    segments = []
+    for segment in path.split("/"):
+        for pattern, placeholder in _SEGMENT_RULES:
+            if segment and pattern.match(segment):
+                segment = placeholder
+                break
+        segments.append(segment)
+    return "/".join(segments) or "/"
+
+
+def normalize_endpoint(url: str, method: Optional[str] = "GET") -> EndpointKey:
+    """URL을 (method, host, 템플릿 경로)로 정규화 (쿼리 스트링/프래그먼트 제거)"""
+    parts = urlsplit(url or "")
+    host = (parts.hostname or "").lower()
+    return (method or "GET").upper(), host, template_path(parts.path)
+
+
+def format_endpoint(host: str, path_template: str) -> str:
+    """표시용 엔드포인트 문자열"""
+    return f"{host}{path_template}"
+
+
+class EndpointRegistry:
+    """api_endpoint 차원 테이블 조회/등록 (프로세스 내 캐시)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._cache: Dict[EndpointKey, int] = {}
+
+    def get_id(self, url: str, method: Optional[str] = "GET") -> int:
+        """URL에 해당하는 endpoint_id 반환 (없으면 등록)"""
+        key = normalize_endpoint(url, method)
+        endpoint_id = self._cache.get(key)
+        if endpoint_id is not None:
+            return endpoint_id
+
+        self.conn.execute(
+            f"INSERT OR IGNORE INTO {ENDPOINT_TABLE} (method, host, path_template) VALUES (?, ?, ?)", key
+        )
+        endpoint_id = self.conn.execute(
+            f"SELECT id FROM {ENDPOINT_TABLE} WHERE method = ? AND host = ? AND path_template = ?", key
+        ).fetchone()[0]
+        self._cache[key] = endpoint_id
+        return endpoint_id
@@ -10,12 +10,19 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple
 import logging
 
+import numpy as np
+
+from scripts.utils.api_columnar import APIColumns, load_api_columns
+from scripts.utils.api_sequence_index import back_to_back_duplicates, endpoint_labels
+from scripts.utils.log_archive import API_METRIC_COLUMNS, attach_archive, default_archive_dir
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
 logger = logging.getLogger(__name__)
 
 class APIOptimizationAdvisor:
     """API 기반 테스트 최적화 제안 시스템"""
     
-    def __init__(self, db_path: str = "artifacts/test_log.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
     
     def analyze_test_efficiency(self, test_case_id: str = None) -> Dict[str, Any]:
@@ -24,6 +31,10 @@ class APIOptimizationAdvisor:
         cursor = conn.cursor()
         
         try:
+            # 아카이브로 옮긴 과거 호출도 같은 SQL 로 분석
+            attach_archive(conn, default_archive_dir(self.db_path), "test_api",
+                           equals={"test_case_id": str(test_case_id)} if test_case_id else None,
+                           columns=API_METRIC_COLUMNS)
             if test_case_id:
                 return self._analyze_specific_test_case(cursor, test_case_id)
             else:
@@ -33,17 +44,10 @@ class APIOptimizationAdvisor:
     
     def _analyze_specific_test_case(self, cursor, test_case_id: str) -> Dict[str, Any]:
         """특정 테스트케이스 효율성 분석"""
-        # API 호출 패턴 분석
-        cursor.execute("""
-            SELECT url, method, status_code, elapsed, created_at
-            FROM test_api 
-            WHERE test_case_id = ?
-            ORDER BY created_at
-        """, (test_case_id,))
+        # API 호출 패턴 분석 (컬럼 배열)
+        api_calls = load_api_columns(cursor.connection, "t.test_case_id = ?", (test_case_id,), order_by="t.created_at")
         
-        api_calls = cursor.fetchall()
-        
-        if not api_calls:
+        if not len(api_calls):
             return {
                 'test_case_id': test_case_id,
                 'efficiency_score': 0,
@@ -53,8 +57,9 @@ class APIOptimizationAdvisor:
         # 효율성 분석
         efficiency_analysis = self._calculate_efficiency_score(api_calls)
         
-        # 중복 API 호출 분석
+        # 중복 API 호출 분석 (연속 중복은 시퀀스 인덱스에서 조회)
         duplicate_analysis = self._analyze_duplicate_calls(api_calls)
+        duplicate_analysis['back_to_back'] = self._analyze_back_to_back_calls(cursor.connection, test_case_id)
         
         # 불필요한 API 호출 분석
         unnecessary_analysis = self._analyze_unnecessary_calls(api_calls)
@@ -131,31 +136,29 @@ class APIOptimizationAdvisor:
             ]
         }
     
-    def _calculate_efficiency_score(self, api_calls: List[Tuple]) -> Dict[str, Any]:
+    def _calculate_efficiency_score(self, api_calls: APIColumns) -> Dict[str, Any]:
         """효율성 점수 계산"""
-        if not api_calls:
+        total_calls = len(api_calls)
+        if not total_calls:
             return {'score': 0, 'unique_endpoints': 0}
         
-        urls = [call[0] for call in api_calls]
-        response_times = [call[3] for call in api_calls if call[3] is not None]
-        status_codes = [call[2] for call in api_calls]
-        
-        # 고유 엔드포인트 수
-        unique_endpoints = len(set(urls))
+        # 고유 엔드포인트 수 (URL 사전 크기)
+        unique_endpoints = len(api_calls.urls)
         
         # 응답 시간 효율성 (빠를수록 높은 점수)
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        response_times = api_calls.timed_elapsed
+        avg_response_time = float(response_times.mean()) if len(response_times) else 0
         response_efficiency = max(0, 1 - (avg_response_time / 5))  # 5초 이상이면 0점
         
         # 오류율 효율성 (오류가 없을수록 높은 점수)
-        error_count = sum(1 for code in status_codes if code >= 400)
-        error_efficiency = 1 - (error_count / len(status_codes)) if status_codes else 1
+        error_count = int(np.count_nonzero(api_calls.error_mask))
+        error_efficiency = 1 - (error_count / total_calls)
         
         # API 다양성 효율성 (적절한 다양성)
         diversity_efficiency = min(1, unique_endpoints / 10)  # 10개 이상이면 만점
         
         # 중복 호출 효율성 (중복이 적을수록 높은 점수)
-        duplicate_efficiency = 1 - (len(urls) - unique_endpoints) / len(urls) if urls else 1
+        duplicate_efficiency = 1 - (total_calls - unique_endpoints) / total_calls
         
         # 종합 점수
         total_score = (
@@ -170,44 +173,55 @@ class APIOptimizationAdvisor:
             'unique_endpoints': unique_endpoints,
             'avg_response_time': avg_response_time,
             'error_count': error_count,
-            'duplicate_count': len(urls) - unique_endpoints
+            'duplicate_count': total_calls - unique_endpoints
         }
     
-    def _analyze_duplicate_calls(self, api_calls: List[Tuple]) -> Dict[str, Any]:
+    def _analyze_duplicate_calls(self, api_calls: APIColumns) -> Dict[str, Any]:
         """중복 API 호출 분석"""
-        url_counts = {}
-        for call in api_calls:
-            url = call[0]
-            url_counts[url] = url_counts.get(url, 0) + 1
-        
-        duplicate_calls = {url: count for url, count in url_counts.items() if count > 1}
+        url_counts = api_calls.counts(api_calls.url_codes, api_calls.urls)
+        duplicate_codes = np.flatnonzero(url_counts > 1)
+        duplicate_calls = {api_calls.urls[code]: int(url_counts[code]) for code in duplicate_codes}
         
         return {
-            'duplicate_count': sum(count - 1 for count in duplicate_calls.values()),
+            'duplicate_count': int((url_counts[duplicate_codes] - 1).sum()),
             'duplicate_urls': duplicate_calls,
             'potential_savings': len(duplicate_calls)
         }
     
-    def _analyze_unnecessary_calls(self, api_calls: List[Tuple]) -> Dict[str, Any]:
+    def _analyze_back_to_back_calls(self, conn: sqlite3.Connection, test_case_id: str) -> List[Dict[str, Any]]:
+        """같은 엔드포인트를 연달아 호출한 중복 (전체 이력의 n-gram 인덱스 기준)"""
+        labels = endpoint_labels(conn)
+        return [
+            {
+                'endpoint': labels.get(item['endpoint_id'], f"endpoint #{item['endpoint_id']}"),
+                'repeats': item['repeats'],
+                'runs': item['groups']
+            }
+            for item in back_to_back_duplicates(conn, test_case_id=test_case_id, limit=10)
+        ]
+    
+    def _analyze_unnecessary_calls(self, api_calls: APIColumns) -> Dict[str, Any]:
         """불필요한 API 호출 분석"""
-        unnecessary_calls = []
+        # 4xx, 5xx 오류는 불필요한 호출로 간주하고, 나머지 중 응답시간이 너무 긴 호출
+        error_mask = api_calls.error_mask
+        with np.errstate(invalid='ignore'):
+            slow_mask = ~error_mask & (api_calls.elapsed > 3.0)
         
-        for i, call in enumerate(api_calls):
-            url, method, status_code, elapsed = call[0], call[1], call[2], call[3]
-            
-            # 4xx, 5xx 오류는 불필요한 호출로 간주
-            if status_code >= 400:
+        unnecessary_calls = []
+        for i in np.flatnonzero(error_mask | slow_mask):
+            url = api_calls.urls[api_calls.url_codes[i]]
+            if error_mask[i]:
+                status_code = int(api_calls.status[i])
                 unnecessary_calls.append({
-                    'index': i,
+                    'index': int(i),
                     'url': url,
                     'reason': f'HTTP {status_code} 오류',
                     'status_code': status_code
                 })
-            
-            # 응답시간이 너무 긴 호출
-            elif elapsed and elapsed > 3.0:
+            else:
+                elapsed = float(api_calls.elapsed[i])
                 unnecessary_calls.append({
-                    'index': i,
+                    'index': int(i),
                     'url': url,
                     'reason': f'응답시간 {elapsed:.2f}초 (3초 초과)',
                     'response_time': elapsed
@@ -233,6 +247,9 @@ class APIOptimizationAdvisor:
         if duplicates['duplicate_count'] > 0:
             suggestions.append(f"중복 API 호출이 {duplicates['duplicate_count']}건 있습니다. 캐싱이나 호출 최적화를 고려하세요.")
         
+        for item in duplicates.get('back_to_back', [])[:3]:
+            suggestions.append(f"{item['endpoint']} 를 연달아 호출한 경우가 {item['repeats']}회 있습니다. 불필요한 재요청인지 확인하세요.")
+        
         # 불필요한 호출 기반 제안
         if unnecessary['unnecessary_count'] > 0:
             suggestions.append(f"불필요한 API 호출이 {unnecessary['unnecessary_count']}건 있습니다. 오류 처리와 타임아웃 설정을 개선하세요.")
@@ -7,17 +7,44 @@ API 호출 패턴 학습 및 비정상 패턴 감지
 import sqlite3
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
-import re
+from dataclasses import dataclass
+
+from scripts.utils.api_anomaly import recent_anomalies
+from scripts.utils.api_sequence_index import SEQUENCE_TABLE, decode_sequence, endpoint_labels, top_transitions
+from scripts.utils.log_storage import DEFAULT_DB_PATH
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class PatternBucket:
+    """(엔드포인트, 메서드, 상태코드, 시간대) 단위 SQL 집계 결과"""
+    endpoint: str
+    method: str
+    status_code: int
+    hour: int
+    calls: int
+    timed: int
+    total_elapsed: float
+    min_elapsed: Optional[float]
+    max_elapsed: Optional[float]
+
+
 class APIPatternAnalyzer:
-    """API 패턴 분석 클래스"""
+    """API 패턴 분석 클래스
+
+    원본 행을 파이썬으로 가져오지 않고, 분석 기간의 test_api 를 SQL 한 번으로
+    (엔드포인트, 메서드, 상태코드, 시간대) 단위로 집계한 뒤 각 분석을 작은 집계 결과 위에서 수행합니다.
+    시퀀스는 수집 시 유지되는 호출 시퀀스 인덱스(api_sequence/api_ngram)에서 읽고,
+    느린 응답은 수집 시점에 엔드포인트별 기준선으로 판정해 둔 api_anomaly 를 읽습니다.
+    """
+    
+    MAX_SEQUENCE_LENGTH = 50     # 테스트케이스별로 반환할 최대 시퀀스 길이
+    MAX_SLOW_RESPONSES = 100     # 느린 응답 이상 감지 최대 건수
     
-    def __init__(self, db_path: str = "artifacts/test_log.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
         self.pattern_cache = {}
         self.anomaly_threshold = 0.1  # 10% 이상 차이나면 이상으로 판단
@@ -25,19 +52,24 @@ class APIPatternAnalyzer:
     def analyze_api_patterns(self, hours: int = 24) -> Dict:
         """API 호출 패턴 분석"""
         try:
-            api_data = self._get_api_data(hours)
-            if not api_data:
-                return {"status": "no_data", "message": "분석할 데이터가 없습니다."}
-            
-            # 다양한 패턴 분석
-            patterns = {
-                "endpoint_frequency": self._analyze_endpoint_frequency(api_data),
-                "method_distribution": self._analyze_method_distribution(api_data),
-                "status_code_patterns": self._analyze_status_patterns(api_data),
-                "timing_patterns": self._analyze_timing_patterns(api_data),
-                "request_sequences": self._analyze_request_sequences(api_data),
-                "anomalies": self._detect_anomalies(api_data)
-            }
+            conn = sqlite3.connect(self.db_path)
+            try:
+                cutoff = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+                buckets = self._aggregate(conn, cutoff)
+                if not buckets:
+                    return {"status": "no_data", "message": "분석할 데이터가 없습니다."}
+                
+                # 다양한 패턴 분석
+                patterns = {
+                    "endpoint_frequency": self._analyze_endpoint_frequency(buckets),
+                    "method_distribution": self._analyze_method_distribution(buckets),
+                    "status_code_patterns": self._analyze_status_patterns(buckets),
+                    "timing_patterns": self._analyze_timing_patterns(buckets),
+                    "request_sequences": self._analyze_request_sequences(conn, cutoff),
+                    "anomalies": self._detect_anomalies(conn, cutoff, buckets)
+                }
+            finally:
+                conn.close()
             
             return {
                 "status": "success",
@@ -50,55 +82,41 @@ class APIPatternAnalyzer:
             logger.error(f"패턴 분석 실패: {e}")
             return {"status": "error", "message": str(e)}
     
-    def _get_api_data(self, hours: int) -> List[Dict]:
-        """API 데이터 조회"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            
-            cursor.execute("""
-                SELECT url, method, status_code, elapsed, created_at, test_case_id, serial
+    def _aggregate(self, conn: sqlite3.Connection, cutoff: str) -> List[PatternBucket]:
+        """분석 기간의 API 호출을 (엔드포인트, 메서드, 상태코드, 시간대) 단위로 집계"""
+        rows = conn.execute("""
+            SELECT 
+                COALESCE(e.host || e.path_template, 'unknown') as endpoint,
+                a.method, a.status_code, a.hour, a.calls, a.timed, a.total_elapsed, a.min_elapsed, a.max_elapsed
+            FROM (
+                SELECT 
+                    endpoint_id,
+                    COALESCE(method, 'GET') as method,
+                    COALESCE(status_code, 200) as status_code,
+                    CAST(strftime('%H', created_at) AS INTEGER) as hour,
+                    COUNT(*) as calls,
+                    COUNT(elapsed) as timed,
+                    COALESCE(SUM(elapsed), 0) as total_elapsed,
+                    MIN(elapsed) as min_elapsed,
+                    MAX(elapsed) as max_elapsed
                 FROM test_api 
                 WHERE created_at > ?
-                ORDER BY created_at ASC
-            """, (cutoff_time.strftime('%Y-%m-%d %H:%M:%S'),))
-            
-            results = cursor.fetchall()
-            conn.close()
-            
-            return [
-                {
-                    'url': row[0],
-                    'method': row[1],
-                    'status_code': row[2],
-                    'elapsed': row[3],
-                    'created_at': row[4],
-                    'test_case_id': row[5],
-                    'serial': row[6]
-                }
-                for row in results
-            ]
-            
-        except Exception as e:
-            logger.error(f"API 데이터 조회 실패: {e}")
-            return []
+                GROUP BY endpoint_id, method, status_code, hour
+            ) a
+            LEFT JOIN api_endpoint e ON e.id = a.endpoint_id
+        """, (cutoff,)).fetchall()
+        return [PatternBucket(*row) for row in rows]
     
-    def _analyze_endpoint_frequency(self, api_data: List[Dict]) -> Dict:
+    def _analyze_endpoint_frequency(self, buckets: List[PatternBucket]) -> Dict:
         """엔드포인트 호출 빈도 분석"""
         endpoint_counter = Counter()
         endpoint_methods = defaultdict(set)
         
-        for item in api_data:
-            url = item.get('url', '')
-            method = item.get('method', 'GET')
-            
-            # URL 정규화 (쿼리 파라미터 제거)
-            normalized_url = re.sub(r'\?.*$', '', url)
-            endpoint_counter[normalized_url] += 1
-            endpoint_methods[normalized_url].add(method)
+        for bucket in buckets:
+            endpoint_counter[bucket.endpoint] += bucket.calls
+            endpoint_methods[bucket.endpoint].add(bucket.method)
         
+        total_requests = sum(endpoint_counter.values())
         # 상위 10개 엔드포인트
         top_endpoints = endpoint_counter.most_common(10)
         
@@ -108,7 +126,7 @@ class APIPatternAnalyzer:
                 {
                     "url": endpoint,
                     "count": count,
-                    "percentage": (count / len(api_data)) * 100,
+                    "percentage": (count / total_requests) * 100,
                     "methods": list(endpoint_methods[endpoint])
                 }
                 for endpoint, count in top_endpoints
@@ -116,15 +134,14 @@ class APIPatternAnalyzer:
             "endpoint_distribution": dict(endpoint_counter)
         }
     
-    def _analyze_method_distribution(self, api_data: List[Dict]) -> Dict:
+    def _analyze_method_distribution(self, buckets: List[PatternBucket]) -> Dict:
         """HTTP 메서드 분포 분석"""
         method_counter = Counter()
         
-        for item in api_data:
-            method = item.get('method', 'GET')
-            method_counter[method] += 1
+        for bucket in buckets:
+            method_counter[bucket.method] += bucket.calls
         
-        total_requests = len(api_data)
+        total_requests = sum(method_counter.values())
         
         return {
             "total_requests": total_requests,
@@ -138,17 +155,16 @@ class APIPatternAnalyzer:
             ]
         }
     
-    def _analyze_status_patterns(self, api_data: List[Dict]) -> Dict:
+    def _analyze_status_patterns(self, buckets: List[PatternBucket]) -> Dict:
         """상태 코드 패턴 분석"""
         status_counter = Counter()
         status_by_endpoint = defaultdict(Counter)
         
-        for item in api_data:
-            status = item.get('status_code', 200)
-            url = re.sub(r'\?.*$', '', item.get('url', ''))
-            
-            status_counter[status] += 1
-            status_by_endpoint[url][status] += 1
+        for bucket in buckets:
+            status_counter[bucket.status_code] += bucket.calls
+            status_by_endpoint[bucket.endpoint][bucket.status_code] += bucket.calls
+        
+        total_requests = sum(status_counter.values())
         
         # 오류 패턴 분석
         error_patterns = []
@@ -171,112 +187,125 @@ class APIPatternAnalyzer:
                 {
                     "status_code": status,
                     "count": count,
-                    "percentage": (count / len(api_data)) * 100
+                    "percentage": (count / total_requests) * 100
                 }
                 for status, count in status_counter.most_common()
             ],
             "error_patterns": sorted(error_patterns, key=lambda x: x['error_rate'], reverse=True)
         }
     
-    def _analyze_timing_patterns(self, api_data: List[Dict]) -> Dict:
+    def _analyze_timing_patterns(self, buckets: List[PatternBucket]) -> Dict:
         """타이밍 패턴 분석"""
-        timing_data = []
-        
-        for item in api_data:
-            elapsed = item.get('elapsed')
-            if elapsed:
-                timing_data.append(float(elapsed))
-        
-        if not timing_data:
+        timed_buckets = [bucket for bucket in buckets if bucket.timed]
+        if not timed_buckets:
             return {"message": "타이밍 데이터가 없습니다."}
         
         # 시간대별 분석
-        hourly_timing = defaultdict(list)
-        for item in api_data:
-            if item.get('elapsed'):
-                created_at = datetime.fromisoformat(item['created_at'].replace('Z', '+00:00'))
-                hour = created_at.hour
-                hourly_timing[hour].append(float(item['elapsed']))
-        
-        hourly_stats = {}
-        for hour, times in hourly_timing.items():
-            hourly_stats[hour] = {
-                "avg_response_time": sum(times) / len(times),
-                "max_response_time": max(times),
-                "min_response_time": min(times),
-                "request_count": len(times)
+        hourly = defaultdict(lambda: {"count": 0, "total": 0.0, "min": None, "max": None})
+        for bucket in timed_buckets:
+            stats = hourly[bucket.hour]
+            stats["count"] += bucket.timed
+            stats["total"] += bucket.total_elapsed
+            stats["min"] = bucket.min_elapsed if stats["min"] is None else min(stats["min"], bucket.min_elapsed)
+            stats["max"] = bucket.max_elapsed if stats["max"] is None else max(stats["max"], bucket.max_elapsed)
+        
+        hourly_stats = {
+            hour: {
+                "avg_response_time": stats["total"] / stats["count"],
+                "max_response_time": stats["max"],
+                "min_response_time": stats["min"],
+                "request_count": stats["count"]
             }
+            for hour, stats in hourly.items()
+        }
         
+        total_timed = sum(stats["count"] for stats in hourly.values())
         return {
             "overall_timing": {
-                "avg_response_time": sum(timing_data) / len(timing_data),
-                "max_response_time": max(timing_data),
-                "min_response_time": min(timing_data),
-                "total_requests": len(timing_data)
+                "avg_response_time": sum(stats["total"] for stats in hourly.values()) / total_timed,
+                "max_response_time": max(stats["max"] for stats in hourly.values()),
+                "min_response_time": min(stats["min"] for stats in hourly.values()),
+                "total_requests": total_timed
             },
-            "hourly_timing": dict(hourly_stats)
+            "hourly_timing": hourly_stats
         }
     
-    def _analyze_request_sequences(self, api_data: List[Dict]) -> Dict:
-        """요청 시퀀스 패턴 분석"""
-        # 테스트 케이스별 시퀀스 분석
-        test_sequences = defaultdict(list)
-        
-        for item in api_data:
-            test_case_id = item.get('test_case_id')
-            if test_case_id:
-                url = re.sub(r'\?.*$', '', item.get('url', ''))
-                test_sequences[test_case_id].append(url)
+    def _analyze_request_sequences(self, conn: sqlite3.Connection, cutoff: str) -> Dict:
+        """요청 시퀀스 패턴 분석 (수집 시 유지되는 시퀀스 인덱스에서 조회)"""
+        groups = conn.execute(f"""
+            SELECT test_case_id, call_count, endpoints
+            FROM {SEQUENCE_TABLE}
+            WHERE last_seen > ? AND test_case_id != ''
+            ORDER BY last_seen
+        """, (cutoff,)).fetchall()
+        labels = endpoint_labels(conn)
+        
+        # 테스트케이스별 호출 수 합계와 가장 최근 그룹의 시퀀스 (앞부분 MAX_SEQUENCE_LENGTH 개)
+        sequence_lengths = defaultdict(int)
+        latest_sequences = {}
+        windowed = []
+        for test_case_id, call_count, blob in groups:
+            sequence_lengths[test_case_id] += call_count
+            latest_sequences[test_case_id] = blob
+            windowed.append((test_case_id, decode_sequence(blob)))
+        
+        def label(endpoint_id: int) -> str:
+            return labels.get(endpoint_id, 'unknown')
         
         # 공통 시퀀스 패턴 찾기
         sequence_patterns = []
-        for test_case_id, sequence in test_sequences.items():
-            if len(sequence) >= 3:  # 3개 이상의 요청이 있는 시퀀스만
+        for test_case_id, length in sequence_lengths.items():
+            if length >= 3:  # 3개 이상의 요청이 있는 시퀀스만
+                sequence = decode_sequence(latest_sequences[test_case_id])[:self.MAX_SEQUENCE_LENGTH]
                 sequence_patterns.append({
                     "test_case_id": test_case_id,
-                    "sequence": sequence,
-                    "length": len(sequence)
+                    "sequence": [label(endpoint_id) for endpoint_id in sequence.tolist()],
+                    "length": length
                 })
         
         # 가장 긴 시퀀스 찾기
         longest_sequence = max(sequence_patterns, key=lambda x: x['length']) if sequence_patterns else None
         
         return {
-            "total_test_cases": len(test_sequences),
+            "total_test_cases": len(sequence_lengths),
             "sequence_patterns": sequence_patterns,
             "longest_sequence": longest_sequence,
-            "avg_sequence_length": sum(len(seq) for seq in test_sequences.values()) / len(test_sequences) if test_sequences else 0
+            "avg_sequence_length": sum(sequence_lengths.values()) / len(sequence_lengths) if sequence_lengths else 0,
+            "common_transitions": [
+                {
+                    "from": label(item["transition"][0]),
+                    "to": label(item["transition"][1]),
+                    "count": item["count"],
+                    "test_cases": item["test_cases"]
+                }
+                for item in top_transitions(windowed, limit=10)
+            ]
         }
     
-    def _detect_anomalies(self, api_data: List[Dict]) -> List[Dict]:
+    def _detect_anomalies(self, conn: sqlite3.Connection, cutoff: str, buckets: List[PatternBucket]) -> List[Dict]:
         """이상 패턴 감지"""
         anomalies = []
         
-        # 1. 비정상적으로 긴 응답 시간
-        response_times = [float(item.get('elapsed', 0)) for item in api_data if item.get('elapsed')]
-        if response_times:
-            avg_response_time = sum(response_times) / len(response_times)
-            threshold = avg_response_time * 3  # 평균의 3배
-            
-            for item in api_data:
-                if item.get('elapsed') and float(item['elapsed']) > threshold:
-                    anomalies.append({
-                        "type": "slow_response",
-                        "severity": "high",
-                        "message": f"비정상적으로 긴 응답 시간: {item['elapsed']}초",
-                        "url": item.get('url'),
-                        "method": item.get('method'),
-                        "value": float(item['elapsed']),
-                        "threshold": threshold
-                    })
+        # 1. 비정상적으로 긴 응답 시간 (수집 시점에 엔드포인트별 기준선 평균+3σ로 판정된 기록)
+        for anomaly in recent_anomalies(conn, cutoff, self.MAX_SLOW_RESPONSES):
+            anomalies.append({
+                "type": anomaly["type"],
+                "severity": "high",
+                "message": f"비정상적으로 긴 응답 시간: {anomaly['value']}초 "
+                           f"(엔드포인트 평균 {anomaly['baseline_mean']:.3f}초, z={anomaly['z_score']:.1f})",
+                "url": anomaly["url"],
+                "method": anomaly["method"],
+                "value": float(anomaly["value"]),
+                "threshold": anomaly["threshold"],
+                "z_score": anomaly["z_score"]
+            })
         
         # 2. 높은 오류율 엔드포인트
         endpoint_errors = defaultdict(lambda: {"total": 0, "errors": 0})
-        for item in api_data:
-            url = re.sub(r'\?.*$', '', item.get('url', ''))
-            endpoint_errors[url]["total"] += 1
-            if item.get('status_code', 200) >= 400:
-                endpoint_errors[url]["errors"] += 1
+        for bucket in buckets:
+            endpoint_errors[bucket.endpoint]["total"] += bucket.calls
+            if bucket.status_code >= 400:
+                endpoint_errors[bucket.endpoint]["errors"] += bucket.calls
         
         for url, stats in endpoint_errors.items():
             error_rate = (stats["errors"] / stats["total"]) * 100
@@ -292,10 +321,7 @@ class APIPatternAnalyzer:
                 })
         
         # 3. 비정상적인 요청 빈도
-        endpoint_frequency = Counter()
-        for item in api_data:
-            url = re.sub(r'\?.*$', '', item.get('url', ''))
-            endpoint_frequency[url] += 1
+        endpoint_frequency = Counter({url: stats["total"] for url, stats in endpoint_errors.items()})
         
         if endpoint_frequency:
             avg_frequency = sum(endpoint_frequency.values()) / len(endpoint_frequency)
@@ -356,7 +382,7 @@ class APIPatternAnalyzer:
             report += "- 데이터가 없습니다.\n"
         
         # 오류 패턴
-        error_patterns = patterns.get('status_patterns', {}).get('error_patterns', [])
+        error_patterns = patterns.get('status_code_patterns', {}).get('error_patterns', [])
         if error_patterns:
             report += f"\n🚨 오류율이 높은 엔드포인트:\n"
             for error in error_patterns[:3]:
@@ -7,11 +7,20 @@ API 성능 모니터링 및 알림 시스템
 import sqlite3
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import json
 
+import numpy as np
+
+from scripts.utils.api_columnar import APIColumns, group_percentile, group_stats, load_api_columns
+from scripts.utils.api_endpoint import format_endpoint
+from scripts.utils.api_rollup import hour_floor, hourly_latency, query_latency
+from scripts.utils.latency_sketch import DDSketch
+from scripts.utils.log_archive import API_METRIC_COLUMNS, attach_archive, default_archive_dir
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -26,7 +35,7 @@ class PerformanceThreshold:
 class APIPerformanceMonitor:
     """API 성능 모니터링 클래스"""
     
-    def __init__(self, db_path: str = "artifacts/test_log.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
         self.threshold = PerformanceThreshold()
         self.alert_history = []
@@ -37,14 +46,18 @@ class APIPerformanceMonitor:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # 최근 N분간의 API 데이터 조회
+            # 최근 N분간의 API 데이터 조회 (기간이 아카이브 기준일을 넘으면 아카이브 행 포함)
             cutoff_time = datetime.now() - timedelta(minutes=minutes)
+            attach_archive(conn, default_archive_dir(self.db_path), "test_api",
+                           since=cutoff_time.strftime('%Y-%m-%d %H:%M:%S'), columns=API_METRIC_COLUMNS)
             
             cursor.execute("""
-                SELECT url, method, status_code, elapsed, created_at
-                FROM test_api 
-                WHERE created_at > ?
-                ORDER BY created_at DESC
+                SELECT t.url, t.method, t.status_code, t.elapsed, t.created_at,
+                       t.endpoint_id, e.host, e.path_template
+                FROM test_api t
+                LEFT JOIN api_endpoint e ON e.id = t.endpoint_id
+                WHERE t.created_at > ?
+                ORDER BY t.created_at DESC
             """, (cutoff_time.strftime('%Y-%m-%d %H:%M:%S'),))
             
             results = cursor.fetchall()
@@ -56,7 +69,9 @@ class APIPerformanceMonitor:
                     'method': row[1],
                     'status_code': row[2],
                     'elapsed': row[3],
-                    'created_at': row[4]
+                    'created_at': row[4],
+                    'endpoint_id': row[5],
+                    'endpoint': format_endpoint(row[6], row[7]) if row[5] is not None else None
                 }
                 for row in results
             ]
@@ -65,27 +80,39 @@ class APIPerformanceMonitor:
             logger.error(f"API 데이터 조회 실패: {e}")
             return []
     
-    def analyze_performance(self, api_data: List[Dict]) -> Dict:
-        """API 성능 분석"""
-        if not api_data:
+    def get_recent_api_columns(self, minutes: int = 10) -> APIColumns:
+        """최근 API 데이터를 컬럼 배열로 조회"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cutoff = (datetime.now() - timedelta(minutes=minutes)).strftime('%Y-%m-%d %H:%M:%S')
+            attach_archive(conn, default_archive_dir(self.db_path), "test_api", since=cutoff, columns=API_METRIC_COLUMNS)
+            return load_api_columns(conn, "t.created_at > ?", (cutoff,))
+        finally:
+            conn.close()
+    
+    def analyze_performance(self, api_data: Union[List[Dict], APIColumns]) -> Dict:
+        """API 성능 분석 (dict 목록 또는 컬럼 배열)"""
+        columns = api_data if isinstance(api_data, APIColumns) else APIColumns.from_records(api_data)
+        if not len(columns):
             return {"status": "no_data", "message": "분석할 데이터가 없습니다."}
         
-        # 기본 통계 계산
-        total_requests = len(api_data)
-        response_times = [float(item.get('elapsed', 0)) for item in api_data if item.get('elapsed')]
-        error_requests = [item for item in api_data if item.get('status_code', 200) >= 400]
+        # 기본 통계 계산 (벡터 연산)
+        total_requests = len(columns)
+        response_times = columns.timed_elapsed
+        error_count = int(np.count_nonzero(columns.error_mask))
         
-        if not response_times:
+        if not len(response_times):
             return {"status": "no_timing_data", "message": "응답 시간 데이터가 없습니다."}
         
         # 성능 지표 계산
-        avg_response_time = sum(response_times) / len(response_times)
-        max_response_time = max(response_times)
-        min_response_time = min(response_times)
-        error_rate = (len(error_requests) / total_requests) * 100
+        avg_response_time = float(response_times.mean())
+        max_response_time = float(response_times.max())
+        min_response_time = float(response_times.min())
+        p50, p95, p99 = (float(v) for v in np.percentile(response_times, [50, 95, 99]))
+        error_rate = (error_count / total_requests) * 100
         
         # 엔드포인트별 분석
-        endpoint_stats = self._analyze_by_endpoint(api_data)
+        endpoint_stats = self._analyze_by_endpoint(columns)
         
         # 임계값 체크
         alerts = self._check_thresholds(avg_response_time, max_response_time, error_rate)
@@ -96,52 +123,37 @@ class APIPerformanceMonitor:
             "avg_response_time": avg_response_time,
             "max_response_time": max_response_time,
             "min_response_time": min_response_time,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
             "error_rate": error_rate,
             "endpoint_stats": endpoint_stats,
             "alerts": alerts,
             "timestamp": datetime.now().isoformat()
         }
     
-    def _analyze_by_endpoint(self, api_data: List[Dict]) -> Dict:
-        """엔드포인트별 성능 분석"""
-        endpoint_stats = {}
-        
-        for item in api_data:
-            url = item.get('url', 'unknown')
-            method = item.get('method', 'GET')
-            key = f"{method} {url}"
-            
-            if key not in endpoint_stats:
-                endpoint_stats[key] = {
-                    'count': 0,
-                    'response_times': [],
-                    'errors': 0,
-                    'methods': set()
-                }
-            
-            endpoint_stats[key]['count'] += 1
-            endpoint_stats[key]['methods'].add(method)
-            
-            if item.get('elapsed'):
-                endpoint_stats[key]['response_times'].append(float(item['elapsed']))
-            
-            if item.get('status_code', 200) >= 400:
-                endpoint_stats[key]['errors'] += 1
+    def _analyze_by_endpoint(self, columns: APIColumns) -> Dict:
+        """엔드포인트별 성능 분석 ("METHOD 엔드포인트" 코드 기준 벡터 집계)"""
+        size = len(columns.endpoints)
+        stats = group_stats(columns.endpoint_codes, size, columns.elapsed, columns.error_mask)
+        p95 = group_percentile(columns.endpoint_codes, size, columns.elapsed, 95)
         
-        # 통계 계산
-        for key, stats in endpoint_stats.items():
-            if stats['response_times']:
-                stats['avg_response_time'] = sum(stats['response_times']) / len(stats['response_times'])
-                stats['max_response_time'] = max(stats['response_times'])
-                stats['error_rate'] = (stats['errors'] / stats['count']) * 100
-            else:
-                stats['avg_response_time'] = 0
-                stats['max_response_time'] = 0
-                stats['error_rate'] = 0
-            
-            # 불필요한 데이터 제거
-            del stats['response_times']
-            stats['methods'] = list(stats['methods'])
+        endpoint_stats = {}
+        for code, key in enumerate(columns.endpoints):
+            count = int(stats['count'][code])
+            if not count:
+                continue
+            timed = int(stats['timed'][code])
+            errors = int(stats['errors'][code])
+            endpoint_stats[key] = {
+                'count': count,
+                'errors': errors,
+                'methods': [key.split(' ', 1)[0]],
+                'avg_response_time': float(stats['sum'][code] / timed) if timed else 0,
+                'max_response_time': float(stats['max'][code]) if timed else 0,
+                'p95_response_time': float(p95[code]) if timed else 0,
+                'error_rate': (errors / count) * 100 if timed else 0
+            }
         
         return endpoint_stats
     
@@ -203,35 +215,39 @@ class APIPerformanceMonitor:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # 시간별 성능 데이터 조회
+            # 시간별 성능 데이터 조회 (시간별 롤업 기준)
             cutoff_time = datetime.now() - timedelta(hours=hours)
             
             cursor.execute("""
                 SELECT 
-                    strftime('%Y-%m-%d %H:00:00', created_at) as hour,
-                    COUNT(*) as request_count,
-                    AVG(elapsed) as avg_response_time,
-                    MAX(elapsed) as max_response_time,
-                    COUNT(CASE WHEN status_code >= 400 THEN 1 END) as error_count
-                FROM test_api 
-                WHERE created_at > ?
-                GROUP BY strftime('%Y-%m-%d %H:00:00', created_at)
+                    hour,
+                    SUM(call_count) as request_count,
+                    SUM(sum_elapsed) / NULLIF(SUM(timed_count), 0) as avg_response_time,
+                    MAX(max_elapsed) as max_response_time,
+                    SUM(error_count) as error_count
+                FROM api_rollup_hourly 
+                WHERE hour >= ?
+                GROUP BY hour
                 ORDER BY hour
-            """, (cutoff_time.strftime('%Y-%m-%d %H:%M:%S'),))
+            """, (hour_floor(cutoff_time),))
             
             results = cursor.fetchall()
+            # 시간별 분위수는 구간별 스케치 병합으로 계산
+            latency_by_hour = hourly_latency(conn, hour_floor(cutoff_time))
             conn.close()
             
             trends = []
             for row in results:
                 hour, request_count, avg_response_time, max_response_time, error_count = row
                 error_rate = (error_count / request_count * 100) if request_count > 0 else 0
+                latency = latency_by_hour.get(hour, DDSketch())
                 
                 trends.append({
                     'hour': hour,
                     'request_count': request_count,
                     'avg_response_time': avg_response_time or 0,
                     'max_response_time': max_response_time or 0,
+                    **latency.percentiles(),
                     'error_rate': error_rate
                 })
             
@@ -241,10 +257,30 @@ class APIPerformanceMonitor:
             logger.error(f"트렌드 분석 실패: {e}")
             return {"status": "error", "message": str(e)}
     
+    def get_latency_percentiles(self, hours: int = 24, endpoint_id: Optional[int] = None,
+                                test_case_id: Optional[str] = None) -> Dict:
+        """기간/엔드포인트/테스트케이스별 응답시간 분위수 (롤업 스케치 병합, 원본 미조회)"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            start_hour = hour_floor(datetime.now() - timedelta(hours=hours))
+            latency = query_latency(conn, start_hour=start_hour, endpoint_id=endpoint_id, test_case_id=test_case_id)
+            conn.close()
+            
+            return {
+                "status": "success",
+                "count": latency.count,
+                "avg_response_time": latency.avg,
+                **latency.percentiles()
+            }
+            
+        except Exception as e:
+            logger.error(f"분위수 조회 실패: {e}")
+            return {"status": "error", "message": str(e)}
+    
     def generate_performance_report(self) -> str:
         """성능 리포트 생성"""
         # 최근 데이터 분석
-        recent_data = self.get_recent_api_data(30)  # 30분간
+        recent_data = self.get_recent_api_columns(30)  # 30분간
         analysis = self.analyze_performance(recent_data)
         
         if analysis.get('status') != 'success':
@@ -262,6 +298,7 @@ class APIPerformanceMonitor:
 - 총 요청 수: {analysis['total_requests']:,}개
 - 평균 응답 시간: {analysis['avg_response_time']:.3f}초
 - 최대 응답 시간: {analysis['max_response_time']:.3f}초
+- p95 / p99 응답 시간: {analysis['p95']:.3f}초 / {analysis['p99']:.3f}초
 - 오류율: {analysis['error_rate']:.1f}%
 
 🚨 알림 상태:
@@ -294,7 +331,7 @@ def main():
     monitor = APIPerformanceMonitor()
     
     # 성능 분석
-    recent_data = monitor.get_recent_api_data(10)
+    recent_data = monitor.get_recent_api_columns(10)
     analysis = monitor.analyze_performance(recent_data)
     
     print("=== API 성능 분석 결과 ===")
@@ -10,12 +10,18 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import logging
 
+from scripts.utils.api_columnar import APIColumns, load_api_columns
+from scripts.utils.api_rollup import query_latency
+from scripts.utils.latency_sketch import DDSketch
+from scripts.utils.log_archive import API_METRIC_COLUMNS, attach_archive, default_archive_dir
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
 logger = logging.getLogger(__name__)
 
 class APIQualityAnalyzer:
     """API 기반 테스트 품질 분석기"""
     
-    def __init__(self, db_path: str = "artifacts/test_log.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
     
     def analyze_test_case_quality(self, test_case_id: str) -> Dict[str, Any]:
@@ -24,6 +30,10 @@ class APIQualityAnalyzer:
         cursor = conn.cursor()
         
         try:
+            # 아카이브로 옮긴 과거 호출도 같은 SQL 로 집계 (응답시간 분포는 롤업이 전체 이력을 유지)
+            attach_archive(conn, default_archive_dir(self.db_path), "test_api",
+                           equals={"test_case_id": str(test_case_id)}, columns=API_METRIC_COLUMNS)
+            
             # API 호출 통계
             cursor.execute("""
                 SELECT 
@@ -39,15 +49,11 @@ class APIQualityAnalyzer:
             
             stats = cursor.fetchone()
             
-            # API 호출 패턴 분석
-            cursor.execute("""
-                SELECT url, method, status_code, elapsed
-                FROM test_api 
-                WHERE test_case_id = ?
-                ORDER BY created_at
-            """, (test_case_id,))
+            # API 호출 패턴 분석 (컬럼 배열)
+            api_calls = load_api_columns(conn, "t.test_case_id = ?", (test_case_id,), order_by="t.created_at")
             
-            api_calls = cursor.fetchall()
+            # 응답시간 분포는 시간별 롤업 스케치 병합으로 계산 (원본 응답시간 목록 미사용)
+            latency = query_latency(conn, test_case_id=test_case_id)
             
             # 품질 점수 계산
             quality_score = self._calculate_quality_score(stats, api_calls)
@@ -56,7 +62,7 @@ class APIQualityAnalyzer:
             sequence_analysis = self._analyze_api_sequence(api_calls)
             
             # 성능 분석
-            performance_analysis = self._analyze_performance(stats, api_calls)
+            performance_analysis = self._analyze_performance(stats, latency)
             
             return {
                 'test_case_id': test_case_id,
@@ -77,7 +83,7 @@ class APIQualityAnalyzer:
         finally:
             conn.close()
     
-    def _calculate_quality_score(self, stats: tuple, api_calls: List[tuple]) -> float:
+    def _calculate_quality_score(self, stats: tuple, api_calls: APIColumns) -> float:
         """테스트 품질 점수 계산 (0-100)"""
         total_calls, avg_response, error_count, unique_endpoints, min_response, max_response = stats
         
@@ -101,22 +107,19 @@ class APIQualityAnalyzer:
         diversity_score = min(15, unique_endpoints * 3)  # 5개 이상 엔드포인트면 만점
         
         # 5. 일관성 점수 (10점)
-        consistency_score = 10 if len(set(call[0] for call in api_calls)) > 1 else 5
+        consistency_score = 10 if len(api_calls.urls) > 1 else 5
         
         total_score = call_score + error_score + response_score + diversity_score + consistency_score
         return min(100, total_score)
     
-    def _analyze_api_sequence(self, api_calls: List[tuple]) -> Dict[str, Any]:
+    def _analyze_api_sequence(self, api_calls: APIColumns) -> Dict[str, Any]:
         """API 호출 시퀀스 분석"""
-        if not api_calls:
+        if not len(api_calls):
             return {'pattern': 'no_calls', 'complexity': 'low'}
         
-        urls = [call[0] for call in api_calls]
-        methods = [call[1] for call in api_calls]
-        
-        # 패턴 분석
-        unique_urls = len(set(urls))
-        unique_methods = len(set(methods))
+        # 패턴 분석 (사전 인코딩된 코드 사전 크기 = 고유 값 수)
+        unique_urls = len(api_calls.urls)
+        unique_methods = len(api_calls.methods)
         
         # 복잡도 계산
         complexity = 'low'
@@ -126,9 +129,9 @@ class APIQualityAnalyzer:
             complexity = 'medium'
         
         # 시퀀스 패턴
-        if len(urls) == 1:
+        if len(api_calls) == 1:
             pattern = 'single_endpoint'
-        elif len(set(urls)) == len(urls):
+        elif unique_urls == len(api_calls):
             pattern = 'unique_sequence'
         else:
             pattern = 'repeated_sequence'
@@ -141,14 +144,11 @@ class APIQualityAnalyzer:
             'total_calls': len(api_calls)
         }
     
-    def _analyze_performance(self, stats: tuple, api_calls: List[tuple]) -> Dict[str, Any]:
+    def _analyze_performance(self, stats: tuple, latency: DDSketch) -> Dict[str, Any]:
         """성능 분석"""
         total_calls, avg_response, error_count, unique_endpoints, min_response, max_response = stats
         
-        # 응답 시간 분포
-        response_times = [call[3] for call in api_calls if call[3] is not None]
-        
-        if not response_times:
+        if latency.count == 0:
             return {'status': 'no_data'}
         
         # 성능 등급
@@ -163,19 +163,24 @@ class APIQualityAnalyzer:
         else:
             performance_grade = 'poor'
         
+        # 응답 시간 분포 (스케치 구간 경계 기준 근사)
+        fast = latency.count_below(0.5)
+        below_slow = latency.count_below(2.0)
+        
         return {
             'performance_grade': performance_grade,
             'avg_response_time': avg_response,
             'min_response_time': min_response,
             'max_response_time': max_response,
+            **latency.percentiles(),
             'response_time_distribution': {
-                'fast': len([rt for rt in response_times if rt < 0.5]),
-                'normal': len([rt for rt in response_times if 0.5 <= rt < 2.0]),
-                'slow': len([rt for rt in response_times if rt >= 2.0])
+                'fast': fast,
+                'normal': below_slow - fast,
+                'slow': latency.count - below_slow
             }
         }
     
-    def _generate_recommendations(self, stats: tuple, api_calls: List[tuple]) -> List[str]:
+    def _generate_recommendations(self, stats: tuple, api_calls: APIColumns) -> List[str]:
         """개선 권장사항 생성"""
         recommendations = []
         total_calls, avg_response, error_count, unique_endpoints, min_response, max_response = stats
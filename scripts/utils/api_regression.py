@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+런 간 API 회귀 비교
+두 run_id, 또는 한 런과 이전 런들(롤링 기준선/이전 앱 버전)의 엔드포인트별·테스트케이스별
+호출 수, p95 응답시간, 오류율, 응답 본문 크기 변화를 계산하고 회귀를 표시합니다.
+
+- api_run_stats: (run_id, 엔드포인트, 테스트케이스) 단위 누적 집계 + 응답시간 스케치
+  수집 직후 refresh_run_stats()가 워터마크 이후 새 행만 더하므로(스케치는 병합) 원본을 다시 읽지 않음
+- 여러 런을 기준선으로 쓸 때는 합계를 런 수로 나누고 스케치를 병합하여 비교
+
+사용법:
+    python scripts/utils/api_regression.py --target 1234 --base 1200
+    python scripts/utils/api_regression.py --target 1234 --previous-version
+    python scripts/utils/api_regression.py --target 1234 --baseline 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.api_endpoint import format_endpoint
+from scripts.utils.api_rollup import UNKNOWN_ENDPOINT, UNKNOWN_KEY, get_watermark, run_immediate, set_watermark
+from scripts.utils.latency_sketch import DDSketch
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+RUN_STATS_TABLE = "api_run_stats"
+WATERMARK_NAME = RUN_STATS_TABLE
+
+# 회귀 판정 기준
+P95_RATIO = 1.2             # p95 20% 이상 증가
+P95_MIN_DELTA = 0.1         # 그리고 0.1초 이상 증가
+ERROR_RATE_DELTA = 0.05     # 오류율 5%p 이상 증가
+CALL_COUNT_RATIO = 1.5      # 호출 수 50% 이상 증가
+PAYLOAD_RATIO = 1.3         # 평균 응답 본문 30% 이상 증가
+PAYLOAD_MIN_DELTA = 1024    # 그리고 1KB 이상 증가
+MIN_CALLS = 5               # 양쪽 모두 이 호출 수 이상일 때만 판정
+
+
+@dataclass
+class RunStats:
+    """한 그룹의 누적 집계 (여러 런/엔드포인트를 merge 로 합산)"""
+    calls: int = 0
+    errors: int = 0
+    payload_count: int = 0
+    payload_bytes: int = 0
+    sketch: DDSketch = field(default_factory=DDSketch)
+
+    def merge(self, other: "RunStats") -> "RunStats":
+        self.calls += other.calls
+        self.errors += other.errors
+        self.payload_count += other.payload_count
+        self.payload_bytes += other.payload_bytes
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.sketch.quantile(95)
+
+    @property
+    def avg_payload(self) -> Optional[float]:
+        return self.payload_bytes / self.payload_count if self.payload_count else None
+
+
+@dataclass
+class MetricDelta:
+    """한 엔드포인트/테스트케이스의 기준선 대비 변화"""
+    key: Any
+    label: str
+    base_calls: float
+    target_calls: int
+    base_p95: Optional[float]
+    target_p95: Optional[float]
+    base_error_rate: float
+    target_error_rate: float
+    base_payload: Optional[float]
+    target_payload: Optional[float]
+    regressions: List[str] = field(default_factory=list)
+
+    @property
+    def p95_delta(self) -> Optional[float]:
+        if self.base_p95 is None or self.target_p95 is None:
+            return None
+        return self.target_p95 - self.base_p95
+
+    @property
+    def error_rate_delta(self) -> float:
+        return self.target_error_rate - self.base_error_rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "label": self.label,
+            "base_calls": self.base_calls,
+            "target_calls": self.target_calls,
+            "base_p95": self.base_p95,
+            "target_p95": self.target_p95,
+            "p95_delta": self.p95_delta,
+            "base_error_rate": self.base_error_rate,
+            "target_error_rate": self.target_error_rate,
+            "error_rate_delta": self.error_rate_delta,
+            "base_payload": self.base_payload,
+            "target_payload": self.target_payload,
+            "regressions": self.regressions,
+        }
+
+
+@dataclass
+class RegressionReport:
+    """런 비교 결과"""
+    target_run: str
+    base_runs: List[str]
+    target_version: Optional[str]
+    base_version: Optional[str]
+    endpoints: List[MetricDelta]
+    test_cases: List[MetricDelta]
+
+    @property
+    def regressions(self) -> List[MetricDelta]:
+        return [delta for delta in self.endpoints + self.test_cases if delta.regressions]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "target_run": self.target_run,
+            "base_runs": self.base_runs,
+            "target_version": self.target_version,
+            "base_version": self.base_version,
+            "endpoints": [delta.to_dict() for delta in self.endpoints],
+            "test_cases": [delta.to_dict() for delta in self.test_cases],
+            "regression_count": len(self.regressions),
+        }
+
+    def format_text(self, limit: int = 20) -> str:
+        lines = [
+            f"=== API 회귀 비교: 런 {self.target_run} ({self.target_version or '-'}) "
+            f"vs 기준 {', '.join(self.base_runs)} ({self.base_version or '-'}) ===",
+            f"엔드포인트 {len(self.endpoints)}개, 테스트케이스 {len(self.test_cases)}개 비교, "
+            f"회귀 {len(self.regressions)}건",
+        ]
+        for delta in self.regressions[:limit]:
+            lines.append(f"🔴 {delta.label}: {', '.join(delta.regressions)}")
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------- 런별 집계 유지
+def refresh_run_stats(conn: sqlite3.Connection) -> int:
+    """워터마크 이후 새 행을 런별 집계에 더하고, 반영한 행 수를 반환"""
+    return run_immediate(conn, update_run_stats)
+
+
+def update_run_stats(conn: sqlite3.Connection) -> int:
+    """refresh_run_stats 의 본체 - 트랜잭션은 호출자가 관리 (마이그레이션 백필에서 사용)"""
+    watermark = get_watermark(conn, WATERMARK_NAME)
+    max_id = conn.execute("SELECT MAX(id) FROM test_api").fetchone()[0] or 0
+    if max_id <= watermark:
+        return 0
+
+    groups: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+    rows = conn.execute("""
+        SELECT t.run_id, t.endpoint_id, t.test_case_id, t.tving_version, t.created_at, t.status_code, t.elapsed, b.size
+        FROM test_api t
+        LEFT JOIN api_body b ON b.hash = t.response_body_hash
+        WHERE t.id > ? AND t.id <= ? AND t.run_id IS NOT NULL
+    """, (watermark, max_id))
+    added = 0
+    for run_id, endpoint_id, test_case_id, version, created_at, status_code, elapsed, size in rows:
+        key = (str(run_id), endpoint_id if endpoint_id is not None else UNKNOWN_ENDPOINT,
+               str(test_case_id or UNKNOWN_KEY))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"version": version, "first_seen": created_at, "stats": RunStats()}
+        stats = group["stats"]
+        stats.calls += 1
+        if status_code is not None and status_code >= 400:
+            stats.errors += 1
+        if elapsed is not None:
+            stats.sketch.add(float(elapsed))
+        if size is not None:
+            stats.payload_count += 1
+            stats.payload_bytes += size
+        if created_at and (group["first_seen"] is None or created_at < group["first_seen"]):
+            group["first_seen"] = created_at
+        group["version"] = group["version"] or version
+        added += 1
+
+    for key, group in groups.items():
+        stats = group["stats"]
+        existing = conn.execute(f"""
+            SELECT tving_version, first_seen, call_count, error_count, payload_count, payload_bytes, sketch
+            FROM {RUN_STATS_TABLE} WHERE run_id = ? AND endpoint_id = ? AND test_case_id = ?
+        """, key).fetchone()
+        version, first_seen = group["version"], group["first_seen"]
+        if existing:
+            old_version, old_first_seen, calls, errors, payload_count, payload_bytes, sketch = existing
+            stats.merge(RunStats(calls, errors, payload_count, payload_bytes,
+                                 DDSketch.from_bytes(sketch) if sketch else DDSketch()))
+            version = old_version or version
+            first_seen = min(filter(None, (old_first_seen, first_seen)), default=None)
+        conn.execute(f"""
+            INSERT OR REPLACE INTO {RUN_STATS_TABLE} (run_id, endpoint_id, test_case_id, tving_version, first_seen,
+                                                      call_count, error_count, payload_count, payload_bytes, sketch)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (*key, version, first_seen, stats.calls, stats.errors, stats.payload_count, stats.payload_bytes,
+              stats.sketch.to_bytes() if stats.sketch.count else None))
+    set_watermark(conn, WATERMARK_NAME, max_id)
+    return added
+
+
+# ---------------------------------------------------------------------- 비교
+def list_runs(conn: sqlite3.Connection) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """(run_id, tving_version, 첫 호출 시각) 목록 (오래된 순)"""
+    return conn.execute(f"""
+        SELECT run_id, MAX(tving_version), MIN(first_seen)
+        FROM {RUN_STATS_TABLE}
+        GROUP BY run_id
+        ORDER BY MIN(first_seen), run_id
+    """).fetchall()
+
+
+def load_run_profile(conn: sqlite3.Connection, run_ids: Sequence[str]) -> Dict[Tuple[int, str], RunStats]:
+    """런들의 (엔드포인트, 테스트케이스)별 집계를 합산"""
+    profile: Dict[Tuple[int, str], RunStats] = defaultdict(RunStats)
+    for run_id in run_ids:
+        rows = conn.execute(f"""
+            SELECT endpoint_id, test_case_id, call_count, error_count, payload_count, payload_bytes, sketch
+            FROM {RUN_STATS_TABLE} WHERE run_id = ?
+        """, (str(run_id),))
+        for endpoint_id, test_case_id, calls, errors, payload_count, payload_bytes, sketch in rows:
+            profile[(endpoint_id, test_case_id)].merge(RunStats(
+                calls, errors, payload_count, payload_bytes, DDSketch.from_bytes(sketch) if sketch else DDSketch()
+            ))
+    return profile
+
+
+def compare_runs(conn: sqlite3.Connection, base_run_ids: Sequence[str], target_run_id: str) -> RegressionReport:
+    """기준 런(들)과 대상 런 비교 (기준 런이 여러 개면 호출 수는 런당 평균)"""
+    base_run_ids = [str(run_id) for run_id in base_run_ids]
+    versions = {run_id: version for run_id, version, _ in list_runs(conn)}
+    base = load_run_profile(conn, base_run_ids)
+    target = load_run_profile(conn, [str(target_run_id)])
+    labels = _endpoint_labels(conn)
+    base_runs = max(len(base_run_ids), 1)
+
+    endpoints = _diff(_group(base, 0), _group(target, 0), base_runs,
+                      lambda endpoint_id: labels.get(endpoint_id, f"endpoint #{endpoint_id}"))
+    test_cases = _diff(_group(base, 1), _group(target, 1), base_runs,
+                       lambda test_case_id: f"TC{test_case_id}" if test_case_id else "(테스트케이스 없음)")
+    return RegressionReport(
+        target_run=str(target_run_id),
+        base_runs=base_run_ids,
+        target_version=versions.get(str(target_run_id)),
+        base_version=", ".join(sorted({versions.get(run_id) or "-" for run_id in base_run_ids})) or None,
+        endpoints=endpoints,
+        test_cases=test_cases,
+    )
+
+
+def compare_with_baseline(conn: sqlite3.Connection, run_id: str, baseline_size: int = 5) -> Optional[RegressionReport]:
+    """직전 baseline_size 개 런을 롤링 기준선으로 비교 (이전 런이 없으면 None)"""
+    previous = _previous_runs(conn, str(run_id))
+    if not previous:
+        return None
+    return compare_runs(conn, [run for run, _ in previous[-baseline_size:]], run_id)
+
+
+def compare_with_previous_version(conn: sqlite3.Connection, run_id: str,
+                                  baseline_size: int = 3) -> Optional[RegressionReport]:
+    """대상 런과 tving_version 이 다른 가장 최근 버전의 런들을 기준선으로 비교 (없으면 None)"""
+    runs = {run: version for run, version, _ in list_runs(conn)}
+    target_version = runs.get(str(run_id))
+    previous = [(run, version) for run, version in _previous_runs(conn, str(run_id))
+                if version and version != target_version]
+    if not previous:
+        return None
+    base_version = previous[-1][1]
+    base_runs = [run for run, version in previous if version == base_version][-baseline_size:]
+    return compare_runs(conn, base_runs, run_id)
+
+
+def _previous_runs(conn: sqlite3.Connection, run_id: str) -> List[Tuple[str, Optional[str]]]:
+    runs = list_runs(conn)
+    for index, (run, _, _) in enumerate(runs):
+        if run == run_id:
+            return [(previous, version) for previous, version, _ in runs[:index]]
+    return []
+
+
+def _group(profile: Dict[Tuple[int, str], RunStats], position: int) -> Dict[Any, RunStats]:
+    grouped: Dict[Any, RunStats] = defaultdict(RunStats)
+    for key, stats in profile.items():
+        grouped[key[position]].merge(stats)
+    return grouped
+
+
+def _diff(base: Dict[Any, RunStats], target: Dict[Any, RunStats], base_runs: int, label) -> List[MetricDelta]:
+    deltas = []
+    for key in sorted(set(base) | set(target), key=str):
+        before = base.get(key, RunStats())
+        after = target.get(key, RunStats())
+        delta = MetricDelta(
+            key=key,
+            label=label(key),
+            base_calls=before.calls / base_runs,
+            target_calls=after.calls,
+            base_p95=before.p95,
+            target_p95=after.p95,
+            base_error_rate=before.error_rate,
+            target_error_rate=after.error_rate,
+            base_payload=before.avg_payload,
+            target_payload=after.avg_payload,
+        )
+        delta.regressions = _detect_regressions(delta)
+        deltas.append(delta)
+    # 회귀가 있는 항목, p95 증가폭이 큰 항목 순
+    deltas.sort(key=lambda d: (not d.regressions, -(d.p95_delta or 0)))
+    return deltas
+
+
+def _detect_regressions(delta: MetricDelta) -> List[str]:
+    if delta.base_calls < MIN_CALLS or delta.target_calls < MIN_CALLS:
+        return []
+    found = []
+    if delta.p95_delta is not None and delta.base_p95 and \
+            delta.target_p95 > delta.base_p95 * P95_RATIO and delta.p95_delta > P95_MIN_DELTA:
+        found.append(f"p95 {delta.base_p95:.3f}초 → {delta.target_p95:.3f}초")
+    if delta.error_rate_delta > ERROR_RATE_DELTA:
+        found.append(f"오류율 {delta.base_error_rate:.1%} → {delta.target_error_rate:.1%}")
+    if delta.target_calls > delta.base_calls * CALL_COUNT_RATIO:
+        found.append(f"호출 수 {delta.base_calls:.0f} → {delta.target_calls}")
+    if delta.base_payload and delta.target_payload and delta.target_payload > delta.base_payload * PAYLOAD_RATIO \
+            and delta.target_payload - delta.base_payload > PAYLOAD_MIN_DELTA:
+        found.append(f"응답 크기 {delta.base_payload / 1024:.1f}KB → {delta.target_payload / 1024:.1f}KB")
+    return found
+
+
+def _endpoint_labels(conn: sqlite3.Connection) -> Dict[int, str]:
+    return {
+        endpoint_id: f"{method} {format_endpoint(host, path_template)}"
+        for endpoint_id, method, host, path_template in conn.execute(
+            "SELECT id, method, host, path_template FROM api_endpoint"
+        )
+    }
+
+
+def main() -> int:
+    from scripts.utils.db_migrations import migrate  # db_migrations 가 이 모듈을 import 하므로 지연 import
+
+    parser = argparse.ArgumentParser(description="런 간 API 회귀 비교")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="test_log.db 경로")
+    parser.add_argument("--target", required=True, help="비교 대상 run_id")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--base", nargs="+", help="기준 run_id (여러 개 가능)")
+    group.add_argument("--baseline", type=int, default=5, help="직전 N개 런을 기준선으로 사용 (기본)")
+    group.add_argument("--previous-version", action="store_true", help="이전 tving_version 런을 기준선으로 사용")
+    parser.add_argument("--json", help="비교 결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    migrate(conn)
+    refresh_run_stats(conn)
+    if args.base:
+        report = compare_runs(conn, args.base, args.target)
+    elif args.previous_version:
+        report = compare_with_previous_version(conn, args.target)
+    else:
+        report = compare_with_baseline(conn, args.target, args.baseline)
+    conn.close()
+
+    if report is None:
+        print("비교할 기준 런이 없습니다.")
+        return 0
+    print(report.format_text())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+    return 1 if report.regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+API 지표 시간별 롤업
+test_api 원본 행을 (시간, 엔드포인트, 테스트케이스, 단말) 단위로 미리 집계하여
+대시보드/모니터가 원본 테이블을 매번 스캔하지 않도록 합니다.
+
+- api_rollup_hourly: 호출 수, 오류 수, 응답시간 합/최소/최대, p50/p95/p99, 응답시간 스케치(DDSketch)
+- api_rollup_status_hourly: (시간, 엔드포인트, 상태코드)별 호출 수/응답시간 합 (오류 분석용)
+- 수집(api_capture) 직후 또는 컴팩션 작업에서 refresh_rollups()를 호출하면
+  워터마크(마지막으로 반영한 test_api.id) 이후 새 행만 읽어 기존 롤업 행(카운트/합/최소/최대/스케치)에 병합합니다.
+  같은 시간 구간의 이전 행은 다시 읽지 않으므로 갱신 비용은 새 행 수에만 비례합니다.
+- p50/p95/p99 는 새 키면 원본 값의 정확한 분위수(선형 보간), 기존 행과 병합한 키(같은 시간에 같은 단말/케이스가
+  다시 실행된 경우 등)면 병합한 스케치의 순위 기반 추정값 (표본이 적으면 보간한 분위수와 차이가 날 수 있음)
+- 여러 구간에 걸친 분위수는 query_latency()/hourly_latency()로 스케치를 병합하여 계산합니다.
+
+사용법: python scripts/utils/api_rollup.py [--db artifacts/test_log.db] [--rebuild]
+"""
+
+import argparse
+import logging
+import math
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.latency_sketch import DDSketch, merge_sketches
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "api_rollup_hourly"
+STATUS_ROLLUP_TABLE = "api_rollup_status_hourly"
+ROLLUP_STATE_TABLE = "api_rollup_state"
+
+HOUR_FORMAT = "%Y-%m-%d %H:00:00"
+HOUR_EXPR = "strftime('%Y-%m-%d %H:00:00', created_at)"
+
+# 롤업 키에 NULL 이 들어가면 PRIMARY KEY 로 중복을 막을 수 없으므로 기본값으로 치환
+UNKNOWN_ENDPOINT = 0
+UNKNOWN_KEY = ""
+
+# 재집계에 읽는 test_api 컬럼 (아카이브 행도 이 컬럼만 붙임)
+REBUILD_COLUMNS = ("id", "created_at", "endpoint_id", "test_case_id", "serial", "status_code", "elapsed")
+ROLLUP_CHUNK_ROWS = 200_000     # 백필처럼 새 행이 많을 때 한 번에 메모리에 모으는 test_api 행 수
+
+T = TypeVar("T")
+
+
+def hour_floor(value: datetime) -> str:
+    """datetime 을 롤업 시간 키('YYYY-MM-DD HH:00:00')로 변환"""
+    return value.strftime(HOUR_FORMAT)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """정렬된 값의 분위수 (선형 보간, q: 0~100)"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[int(position)]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def get_watermark(conn: sqlite3.Connection, name: str) -> int:
+    """파생 테이블 name 이 마지막으로 반영한 test_api.id (처음이면 0)"""
+    row = conn.execute(f"SELECT last_id FROM {ROLLUP_STATE_TABLE} WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def set_watermark(conn: sqlite3.Connection, name: str, last_id: int):
+    conn.execute(f"INSERT OR REPLACE INTO {ROLLUP_STATE_TABLE} (name, last_id) VALUES (?, ?)", (name, last_id))
+
+
+def run_immediate(conn: sqlite3.Connection, update: Callable[[sqlite3.Connection], T]) -> T:
+    """update(conn) 을 BEGIN IMMEDIATE 트랜잭션에서 실행하고 커밋 (예외 시 롤백 후 다시 발생)
+
+    워터마크를 읽기 전에 쓰기 락을 잡아야 다른 수집 프로세스와 같은 행을 두 번 반영하지 않습니다.
+    호출자 연결에 열린 트랜잭션이 있으면 BEGIN 전에 그대로 커밋하므로
+    (수집 직후 test_api 삽입 등) 되돌려야 할 변경이 남아 있는 상태로 호출하지 않아야 합니다.
+    롤업/이상 감지/런별 집계/시퀀스 인덱스 갱신이 모두 이 함수를 거칩니다.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = update(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return result
+
+
+def refresh_rollups(conn: sqlite3.Connection) -> int:
+    """워터마크 이후 새 행이 속한 시간 구간을 다시 집계하고, 갱신한 구간 수를 반환"""
+    refreshed = run_immediate(conn, update_rollups)
+    if refreshed:
+        logger.info(f"API 롤업 갱신: {refreshed}개 시간 구간")
+    return refreshed
+
+
+def rebuild_rollups(conn: sqlite3.Connection, archive_dir: Optional[str] = None) -> int:
+    """롤업을 비우고 전체 기간을 다시 집계 (아카이브로 옮긴 행 포함)"""
+    from scripts.utils.log_archive import rebuild_source  # log_archive 가 이 모듈을 import 하므로 지연 import
+
+    def rebuild(conn: sqlite3.Connection) -> int:
+        conn.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        conn.execute(f"DELETE FROM {STATUS_ROLLUP_TABLE}")
+        set_watermark(conn, ROLLUP_TABLE, 0)
+        return update_rollups(conn)
+
+    with rebuild_source(conn, REBUILD_COLUMNS, archive_dir):
+        return run_immediate(conn, rebuild)
+
+
+def update_rollups(conn: sqlite3.Connection) -> int:
+    """refresh_rollups 의 본체 - 트랜잭션은 호출자가 관리 (마이그레이션 백필에서 사용)"""
+    watermark = get_watermark(conn, ROLLUP_TABLE)
+    max_id = conn.execute("SELECT MAX(id) FROM test_api").fetchone()[0] or 0
+    if max_id <= watermark:
+        return 0
+
+    hours = set()
+    for start_id in range(watermark, max_id, ROLLUP_CHUNK_ROWS):
+        end_id = min(start_id + ROLLUP_CHUNK_ROWS, max_id)
+        rows = conn.execute(f"""
+            SELECT {HOUR_EXPR}, endpoint_id, test_case_id, serial, status_code, elapsed
+            FROM test_api
+            WHERE id > ? AND id <= ? AND created_at IS NOT NULL
+        """, (start_id, end_id))
+        hours.update(_merge_rows(conn, rows))
+    set_watermark(conn, ROLLUP_TABLE, max_id)
+    return len(hours)
+
+
+def _merge_rows(conn: sqlite3.Connection, rows) -> List[str]:
+    """새 test_api 행(hour, endpoint_id, test_case_id, serial, status_code, elapsed)을 롤업에 병합, 갱신한 시간 구간 반환"""
+    buckets: Dict[str, Dict[tuple, Dict]] = defaultdict(
+        lambda: defaultdict(lambda: {"calls": 0, "errors": 0, "elapsed": []}))
+    status_counts: Dict[str, Dict[tuple, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0, 0, 0.0]))
+    for hour, endpoint_id, test_case_id, serial, status_code, elapsed in rows:
+        endpoint_id = endpoint_id if endpoint_id is not None else UNKNOWN_ENDPOINT
+        bucket = buckets[hour][(endpoint_id, str(test_case_id or UNKNOWN_KEY), serial or UNKNOWN_KEY)]
+        bucket["calls"] += 1
+        if status_code is not None and status_code >= 400:
+            bucket["errors"] += 1
+        if elapsed is not None:
+            bucket["elapsed"].append(float(elapsed))
+        status = status_counts[hour][(endpoint_id, status_code)]
+        status[0] += 1
+        if elapsed is not None:
+            status[1] += 1
+            status[2] += float(elapsed)
+
+    for hour, hour_buckets in buckets.items():
+        _merge_hour(conn, hour, hour_buckets, status_counts[hour])
+    return list(buckets)
+
+
+def _merge_hour(conn: sqlite3.Connection, hour: str, buckets: Dict[tuple, Dict], status_counts: Dict[tuple, List[float]]):
+    """한 시간 구간의 새 집계를 기존 롤업 행과 병합하여 저장 (그 시간의 롤업 행만 읽음)"""
+    existing = {
+        tuple(row[:3]): row[3:] for row in conn.execute(f"""
+            SELECT endpoint_id, test_case_id, serial, call_count, error_count, timed_count,
+                   sum_elapsed, min_elapsed, max_elapsed, sketch
+            FROM {ROLLUP_TABLE} WHERE hour = ?
+        """, (hour,))
+    }
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO {ROLLUP_TABLE} (hour, endpoint_id, test_case_id, serial, call_count, error_count,
+                                               timed_count, sum_elapsed, min_elapsed, max_elapsed, p50, p95, p99, sketch)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [_merge_rollup_row(_rollup_row(hour, key, bucket), existing.get(key)) for key, bucket in buckets.items()])
+
+    # status_code 가 NULL 인 행은 PRIMARY KEY 충돌로 합쳐지지 않으므로 기존 행을 지우고 병합한 행을 다시 저장
+    existing_status = {
+        (endpoint_id, status_code): (count, timed, total)
+        for endpoint_id, status_code, count, timed, total in conn.execute(f"""
+            SELECT endpoint_id, status_code, call_count, timed_count, sum_elapsed
+            FROM {STATUS_ROLLUP_TABLE} WHERE hour = ?
+        """, (hour,))
+    }
+    merged_status = []
+    for (endpoint_id, status_code), (count, timed, total) in status_counts.items():
+        old_count, old_timed, old_total = existing_status.get((endpoint_id, status_code), (0, 0, 0.0))
+        merged_status.append((hour, endpoint_id, status_code, old_count + count, old_timed + timed,
+                              (old_total or 0.0) + total))
+    conn.executemany(f"""
+        DELETE FROM {STATUS_ROLLUP_TABLE} WHERE hour = ? AND endpoint_id = ? AND status_code IS ?
+    """, [row[:3] for row in merged_status])
+    conn.executemany(f"""
+        INSERT INTO {STATUS_ROLLUP_TABLE} (hour, endpoint_id, status_code, call_count, timed_count, sum_elapsed)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, merged_status)
+
+
+def _merge_rollup_row(new: tuple, old: Optional[tuple]) -> tuple:
+    """_rollup_row 결과에 기존 행(call_count, error_count, timed_count, sum, min, max, sketch)을 병합"""
+    if old is None:
+        return new
+    hour, endpoint_id, test_case_id, serial, calls, errors, timed, total, low, high, *_, sketch = new
+    old_calls, old_errors, old_timed, old_total, old_low, old_high, old_sketch = old
+    merged = DDSketch()
+    for blob in (old_sketch, sketch):
+        if blob is not None:
+            merged.merge(DDSketch.from_bytes(blob))
+    lows = [value for value in (old_low, low) if value is not None]
+    highs = [value for value in (old_high, high) if value is not None]
+    return (
+        hour, endpoint_id, test_case_id, serial,
+        old_calls + calls,
+        old_errors + errors,
+        old_timed + timed,
+        (old_total or 0.0) + total,
+        min(lows) if lows else None,
+        max(highs) if highs else None,
+        *(merged.quantile(q) for q in (50, 95, 99)),
+        merged.to_bytes() if merged.count else None,
+    )
+
+
+def _rollup_row(hour: str, key: tuple, bucket: Dict) -> tuple:
+    values = sorted(bucket["elapsed"])
+    return (
+        hour, *key,
+        bucket["calls"],
+        bucket["errors"],
+        len(values),
+        sum(values),
+        values[0] if values else None,
+        values[-1] if values else None,
+        percentile(values, 50),
+        percentile(values, 95),
+        percentile(values, 99),
+        DDSketch().update(values).to_bytes() if values else None,
+    )
+
+
+def query_latency(
+    conn: sqlite3.Connection,
+    start_hour: Optional[str] = None,
+    end_hour: Optional[str] = None,
+    endpoint_id: Optional[int] = None,
+    test_case_id: Optional[str] = None,
+    serial: Optional[str] = None,
+) -> DDSketch:
+    """조건에 맞는 롤업 구간의 스케치를 병합하여 반환 (원본 행은 읽지 않음)"""
+    conditions, params = ["sketch IS NOT NULL"], []
+    for clause, value in (("hour >= ?", start_hour), ("hour <= ?", end_hour),
+                          ("endpoint_id = ?", endpoint_id), ("test_case_id = ?", test_case_id),
+                          ("serial = ?", serial)):
+        if value is not None:
+            conditions.append(clause)
+            params.append(str(value) if clause.startswith("test_case_id") else value)
+    rows = conn.execute(
+        f"SELECT sketch FROM {ROLLUP_TABLE} WHERE {' AND '.join(conditions)}", params
+    )
+    return merge_sketches(row[0] for row in rows)
+
+
+def hourly_latency(conn: sqlite3.Connection, start_hour: str, end_hour: Optional[str] = None) -> Dict[str, DDSketch]:
+    """시간 구간별로 병합한 스케치 반환 ({hour: DDSketch})"""
+    rows = conn.execute(f"""
+        SELECT hour, sketch FROM {ROLLUP_TABLE}
+        WHERE hour >= ? AND hour <= ? AND sketch IS NOT NULL
+    """, (start_hour, end_hour or "9999-12-31 23:00:00"))
+    sketches: Dict[str, DDSketch] = {}
+    for hour, blob in rows:
+        sketches.setdefault(hour, DDSketch()).merge(DDSketch.from_bytes(blob))
+    return sketches
+
+
+def main() -> int:
+    from scripts.utils.db_migrations import migrate  # db_migrations 가 이 모듈을 import 하므로 지연 import
+
+    parser = argparse.ArgumentParser(description="API 지표 시간별 롤업 갱신")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="test_log.db 경로")
+    parser.add_argument("--rebuild", action="store_true", help="롤업을 비우고 전체 기간 재집계")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    migrate(conn)
+    try:
+        refreshed = rebuild_rollups(conn) if args.rebuild else refresh_rollups(conn)
+    except RuntimeError as e:
+        print(f"API 롤업 재집계 실패: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"API 롤업 갱신 완료: {refreshed}개 시간 구간")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
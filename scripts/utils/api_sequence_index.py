@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+API 호출 시퀀스 인덱스
+(run_id, 테스트케이스, 단말) 단위 호출 순서를 endpoint_id 정수 배열로 압축 저장하고,
+1~3-gram 을 정수 하나로 패킹한 역색인을 함께 유지하여 전체 이력에 대한 시퀀스 질의에 답합니다.
+
+- api_sequence: 그룹별 endpoint_id 배열 (int32 BLOB, 호출 순서 = test_api.id 순서)
+- api_ngram: (n, 패킹된 n-gram) -> 그룹별 출현 횟수 ("X 다음 Y 를 호출하는 케이스" 조회용)
+- 수집 직후 refresh_sequences()가 워터마크 이후 새 행을 그룹 배열 뒤에 붙이고 해당 그룹의 n-gram 만 다시 계산
+
+질의:
+- cases_calling([X, Y]): X 직후 Y 를 호출(adjacent) 또는 X 이후 언젠가 Y 를 호출하는 테스트케이스
+- back_to_back_duplicates(): 같은 엔드포인트를 연달아 호출한 중복
+- sequence_changes(): 직전 앱 버전 대비 호출 시퀀스가 바뀐 테스트케이스
+
+사용법:
+    python scripts/utils/api_sequence_index.py --calls 12 34
+    python scripts/utils/api_sequence_index.py --duplicates
+    python scripts/utils/api_sequence_index.py --changes [--version 9.2.0]
+"""
+
+import argparse
+import difflib
+import logging
+import os
+import sqlite3
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.api_endpoint import format_endpoint
+from scripts.utils.api_rollup import UNKNOWN_ENDPOINT, UNKNOWN_KEY, get_watermark, run_immediate, set_watermark
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_TABLE = "api_sequence"
+NGRAM_TABLE = "api_ngram"
+WATERMARK_NAME = SEQUENCE_TABLE
+
+MAX_N = 3                       # 색인하는 최대 n-gram 길이
+ID_BITS = 21                    # n-gram 패킹 시 endpoint_id 하나에 쓰는 비트 (3 x 21 = 63비트)
+ID_MASK = (1 << ID_BITS) - 1
+FETCH_SIZE = 10000
+# 재집계에 읽는 test_api 컬럼 (아카이브 행도 이 컬럼만 붙임)
+REBUILD_COLUMNS = ("id", "run_id", "test_case_id", "serial", "endpoint_id", "tving_version", "created_at")
+SEQUENCE_DTYPE = np.dtype("<i4")
+
+GroupKey = Tuple[str, str, str]     # (run_id, test_case_id, serial)
+
+
+@dataclass
+class SequenceChange:
+    """한 테스트케이스의 이전 버전 대비 시퀀스 변화"""
+    test_case_id: str
+    base_version: str
+    target_version: str
+    base_length: int
+    target_length: int
+    similarity: float
+    added_transitions: List[Tuple[int, int]] = field(default_factory=list)
+    removed_transitions: List[Tuple[int, int]] = field(default_factory=list)
+
+    def to_dict(self, labels: Optional[Dict[int, str]] = None) -> Dict:
+        label = (lambda endpoint_id: labels.get(endpoint_id, f"endpoint #{endpoint_id}")) if labels else str
+        return {
+            "test_case_id": self.test_case_id,
+            "base_version": self.base_version,
+            "target_version": self.target_version,
+            "base_length": self.base_length,
+            "target_length": self.target_length,
+            "similarity": self.similarity,
+            "added_transitions": [f"{label(a)} → {label(b)}" for a, b in self.added_transitions],
+            "removed_transitions": [f"{label(a)} → {label(b)}" for a, b in self.removed_transitions],
+        }
+
+
+# ---------------------------------------------------------------------- 인코딩
+def encode_sequence(endpoint_ids: Iterable[int]) -> bytes:
+    return np.fromiter(endpoint_ids, dtype=SEQUENCE_DTYPE).tobytes()
+
+
+def decode_sequence(blob: Optional[bytes]) -> np.ndarray:
+    return np.frombuffer(blob or b"", dtype=SEQUENCE_DTYPE)
+
+
+def pack_ngram(endpoint_ids: Sequence[int]) -> int:
+    """endpoint_id 1~MAX_N 개를 정수 하나로 패킹"""
+    gram = 0
+    for endpoint_id in endpoint_ids:
+        gram = (gram << ID_BITS) | (int(endpoint_id) & ID_MASK)
+    return gram
+
+
+def unpack_ngram(gram: int, n: int) -> Tuple[int, ...]:
+    return tuple((gram >> (ID_BITS * (n - 1 - i))) & ID_MASK for i in range(n))
+
+
+def ngram_counts(sequence: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """시퀀스의 n-gram 을 패킹한 값과 출현 횟수 (벡터 연산)"""
+    return np.unique(_packed_ngrams(sequence, n), return_counts=True)
+
+
+def _packed_ngrams(sequence: np.ndarray, n: int) -> np.ndarray:
+    """시퀀스의 모든 위치의 n-gram 을 패킹한 배열"""
+    if len(sequence) < n:
+        return np.empty(0, dtype=np.int64)
+    ids = sequence.astype(np.int64) & ID_MASK
+    packed = np.zeros(len(ids) - n + 1, dtype=np.int64)
+    for i in range(n):
+        packed = (packed << ID_BITS) | ids[i:len(ids) - n + 1 + i]
+    return packed
+
+
+# ---------------------------------------------------------------------- 인덱스 유지
+def refresh_sequences(conn: sqlite3.Connection) -> int:
+    """워터마크 이후 새 행을 시퀀스 인덱스에 반영하고, 반영한 행 수를 반환"""
+    return run_immediate(conn, update_sequences)
+
+
+def rebuild_sequences(conn: sqlite3.Connection, archive_dir: Optional[str] = None) -> int:
+    """시퀀스 인덱스를 비우고 전체 행을 다시 색인 (아카이브로 옮긴 행 포함)"""
+    from scripts.utils.log_archive import rebuild_source  # log_archive 가 이 모듈을 import 하므로 지연 import
+
+    def rebuild(conn: sqlite3.Connection) -> int:
+        conn.execute(f"DELETE FROM {SEQUENCE_TABLE}")
+        conn.execute(f"DELETE FROM {NGRAM_TABLE}")
+        set_watermark(conn, WATERMARK_NAME, 0)
+        return update_sequences(conn)
+
+    with rebuild_source(conn, REBUILD_COLUMNS, archive_dir):
+        return run_immediate(conn, rebuild)
+
+
+def update_sequences(conn: sqlite3.Connection) -> int:
+    """refresh_sequences 의 본체 - 트랜잭션은 호출자가 관리 (마이그레이션 백필에서 사용)"""
+    watermark = get_watermark(conn, WATERMARK_NAME)
+    max_id = conn.execute("SELECT MAX(id) FROM test_api").fetchone()[0] or 0
+    if max_id <= watermark:
+        return 0
+
+    # 새 행을 id 순서대로 그룹별로 모음 (그룹 안의 호출 순서 = 수집 순서)
+    appended: Dict[GroupKey, List[int]] = defaultdict(list)
+    meta: Dict[GroupKey, List[Optional[str]]] = {}
+    cursor = conn.execute("""
+        SELECT run_id, test_case_id, serial, endpoint_id, tving_version, created_at
+        FROM test_api
+        WHERE id > ? AND id <= ?
+        ORDER BY id
+    """, (watermark, max_id))
+    added = 0
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for run_id, test_case_id, serial, endpoint_id, version, created_at in rows:
+            key = (str(run_id or UNKNOWN_KEY), str(test_case_id or UNKNOWN_KEY), serial or UNKNOWN_KEY)
+            appended[key].append(endpoint_id if endpoint_id is not None else UNKNOWN_ENDPOINT)
+            info = meta.get(key)
+            if info is None:
+                meta[key] = [version, created_at, created_at]
+            else:
+                info[0] = info[0] or version
+                if created_at and (info[1] is None or created_at < info[1]):
+                    info[1] = created_at
+                if created_at and (info[2] is None or created_at > info[2]):
+                    info[2] = created_at
+        added += len(rows)
+
+    for key, endpoint_ids in appended.items():
+        version, first_seen, last_seen = meta[key]
+        existing = conn.execute(f"""
+            SELECT tving_version, first_seen, last_seen, endpoints
+            FROM {SEQUENCE_TABLE} WHERE run_id = ? AND test_case_id = ? AND serial = ?
+        """, key).fetchone()
+        blob = encode_sequence(endpoint_ids)
+        if existing:
+            old_version, old_first, old_last, old_blob = existing
+            blob = (old_blob or b"") + blob
+            version = old_version or version
+            first_seen = min(filter(None, (old_first, first_seen)), default=None)
+            last_seen = max(filter(None, (old_last, last_seen)), default=None)
+        sequence = decode_sequence(blob)
+        conn.execute(f"""
+            INSERT OR REPLACE INTO {SEQUENCE_TABLE} (run_id, test_case_id, serial, tving_version,
+                                                     first_seen, last_seen, call_count, endpoints)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (*key, version, first_seen, last_seen, len(sequence), blob))
+
+        # 경계의 n-gram 이 바뀌므로 그룹 n-gram 은 전체 배열로 다시 계산 (그룹 시퀀스는 짧음)
+        conn.execute(f"DELETE FROM {NGRAM_TABLE} WHERE run_id = ? AND test_case_id = ? AND serial = ?", key)
+        ngram_rows = []
+        for n in range(1, MAX_N + 1):
+            grams, counts = ngram_counts(sequence, n)
+            ngram_rows.extend((n, gram, key[1], key[0], key[2], count)
+                              for gram, count in zip(grams.tolist(), counts.tolist()))
+        conn.executemany(f"""
+            INSERT INTO {NGRAM_TABLE} (n, gram, test_case_id, run_id, serial, count) VALUES (?, ?, ?, ?, ?, ?)
+        """, ngram_rows)
+
+    set_watermark(conn, WATERMARK_NAME, max_id)
+    return added
+
+
+# ---------------------------------------------------------------------- 질의
+def load_sequences(conn: sqlite3.Connection, test_case_id: Optional[str] = None,
+                   since: Optional[str] = None) -> Dict[GroupKey, np.ndarray]:
+    """그룹별 시퀀스 (test_case_id/마지막 호출 시각으로 필터)"""
+    conditions, params = [], []
+    if test_case_id is not None:
+        conditions.append("test_case_id = ?")
+        params.append(str(test_case_id))
+    if since is not None:
+        conditions.append("last_seen > ?")
+        params.append(since)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return {
+        (run_id, case, serial): decode_sequence(blob)
+        for run_id, case, serial, blob in conn.execute(
+            f"SELECT run_id, test_case_id, serial, endpoints FROM {SEQUENCE_TABLE} {where}", params
+        )
+    }
+
+
+def cases_calling(conn: sqlite3.Connection, endpoint_ids: Sequence[int],
+                  adjacent: bool = True) -> Dict[str, int]:
+    """endpoint_ids 순서대로 호출한 테스트케이스 -> 해당 그룹(런/단말) 수
+
+    adjacent=True 면 연속 호출만, False 면 사이에 다른 호출이 있어도 순서만 맞으면 일치.
+    MAX_N 이하의 연속 패턴은 n-gram 색인만으로 답하고, 나머지는 색인으로 후보를 줄인 뒤 배열에서 확인합니다.
+    """
+    endpoint_ids = [int(endpoint_id) for endpoint_id in endpoint_ids]
+    if not endpoint_ids:
+        return {}
+    if adjacent and len(endpoint_ids) <= MAX_N:
+        rows = conn.execute(f"""
+            SELECT test_case_id, COUNT(*) FROM {NGRAM_TABLE}
+            WHERE n = ? AND gram = ?
+            GROUP BY test_case_id
+        """, (len(endpoint_ids), pack_ngram(endpoint_ids))).fetchall()
+        return dict(rows)
+
+    # 후보: 패턴의 모든 엔드포인트(연속이면 모든 bigram)를 포함하는 그룹의 교집합
+    if adjacent:
+        postings = [(2, pack_ngram(endpoint_ids[i:i + 2])) for i in range(len(endpoint_ids) - 1)]
+    else:
+        postings = [(1, endpoint_id) for endpoint_id in set(endpoint_ids)]
+    candidates = None
+    for n, gram in postings:
+        groups = set(conn.execute(
+            f"SELECT run_id, test_case_id, serial FROM {NGRAM_TABLE} WHERE n = ? AND gram = ?", (n, gram)
+        ).fetchall())
+        candidates = groups if candidates is None else candidates & groups
+        if not candidates:
+            return {}
+
+    pattern = np.array(endpoint_ids, dtype=SEQUENCE_DTYPE)
+    matched: Dict[str, int] = Counter()
+    for key in candidates:
+        row = conn.execute(
+            f"SELECT endpoints FROM {SEQUENCE_TABLE} WHERE run_id = ? AND test_case_id = ? AND serial = ?", key
+        ).fetchone()
+        sequence = decode_sequence(row[0]) if row else decode_sequence(None)
+        if _contains(sequence, pattern, adjacent):
+            matched[key[1]] += 1
+    return dict(matched)
+
+
+def _contains(sequence: np.ndarray, pattern: np.ndarray, adjacent: bool) -> bool:
+    if adjacent:
+        if len(sequence) < len(pattern):
+            return False
+        windows = np.lib.stride_tricks.sliding_window_view(sequence, len(pattern))
+        return bool((windows == pattern).all(axis=1).any())
+    position = 0
+    for endpoint_id in pattern:
+        hits = np.flatnonzero(sequence[position:] == endpoint_id)
+        if not len(hits):
+            return False
+        position += int(hits[0]) + 1
+    return True
+
+
+def back_to_back_duplicates(conn: sqlite3.Connection, test_case_id: Optional[str] = None,
+                            limit: int = 50) -> List[Dict]:
+    """같은 엔드포인트를 연달아 호출한 중복 (테스트케이스·엔드포인트별 합계, 많은 순)"""
+    sql = f"""
+        SELECT test_case_id, gram & {ID_MASK}, SUM(count), COUNT(*)
+        FROM {NGRAM_TABLE}
+        WHERE n = 2 AND (gram >> {ID_BITS}) = (gram & {ID_MASK})
+    """
+    params: List = []
+    if test_case_id is not None:
+        sql += " AND test_case_id = ?"
+        params.append(str(test_case_id))
+    sql += " GROUP BY test_case_id, gram ORDER BY SUM(count) DESC LIMIT ?"
+    params.append(limit)
+    return [
+        {"test_case_id": case, "endpoint_id": endpoint_id, "repeats": repeats, "groups": groups}
+        for case, endpoint_id, repeats, groups in conn.execute(sql, params)
+    ]
+
+
+def top_transitions(sequences: Iterable[Tuple[str, np.ndarray]], limit: int = 20) -> List[Dict]:
+    """(테스트케이스, 시퀀스) 목록에서 가장 자주 나타나는 연속 호출(bigram) - 배열 연산으로 집계"""
+    grams, case_codes = [], []
+    cases: Dict[str, int] = {}
+    for test_case_id, sequence in sequences:
+        packed = _packed_ngrams(sequence, 2)
+        grams.append(packed)
+        case_codes.append(np.full(len(packed), cases.setdefault(test_case_id, len(cases)), dtype=np.int64))
+    if not grams:
+        return []
+    grams, case_codes = np.concatenate(grams), np.concatenate(case_codes)
+    values, counts = np.unique(grams, return_counts=True)
+    # 테스트케이스 수: (gram, 케이스) 쌍을 중복 제거한 뒤 gram 별로 셈
+    pairs = np.unique(np.stack([grams, case_codes], axis=1), axis=0)
+    case_counts = np.unique(pairs[:, 0], return_counts=True)[1]
+    order = np.argsort(-counts, kind="stable")[:limit]
+    return [
+        {"transition": unpack_ngram(int(values[i]), 2), "count": int(counts[i]), "test_cases": int(case_counts[i])}
+        for i in order
+    ]
+
+
+def list_versions(conn: sqlite3.Connection) -> List[str]:
+    """시퀀스가 있는 tving_version 목록 (처음 관측된 순)"""
+    return [row[0] for row in conn.execute(f"""
+        SELECT tving_version FROM {SEQUENCE_TABLE}
+        WHERE tving_version IS NOT NULL AND tving_version != ''
+        GROUP BY tving_version
+        ORDER BY MIN(first_seen)
+    """)]
+
+
+def sequence_changes(conn: sqlite3.Connection, target_version: Optional[str] = None,
+                     base_version: Optional[str] = None, test_case_id: Optional[str] = None) -> List[SequenceChange]:
+    """base_version(기본: target 직전 버전) 대비 대표 시퀀스가 바뀐 테스트케이스
+
+    버전별 대표 시퀀스는 해당 버전 런/단말에서 가장 많이 관측된 배열 (동률이면 최근 것).
+    """
+    versions = list_versions(conn)
+    if not versions:
+        return []
+    target_version = target_version or versions[-1]
+    if base_version is None:
+        previous = versions[:versions.index(target_version)] if target_version in versions else []
+        if not previous:
+            return []
+        base_version = previous[-1]
+
+    base = _representative_sequences(conn, base_version, test_case_id)
+    target = _representative_sequences(conn, target_version, test_case_id)
+    changes = []
+    for case in sorted(set(base) & set(target)):
+        before, after = base[case], target[case]
+        if before == after:
+            continue
+        before_ids, after_ids = decode_sequence(before), decode_sequence(after)
+        before_pairs = set(zip(before_ids[:-1].tolist(), before_ids[1:].tolist()))
+        after_pairs = set(zip(after_ids[:-1].tolist(), after_ids[1:].tolist()))
+        changes.append(SequenceChange(
+            test_case_id=case,
+            base_version=base_version,
+            target_version=target_version,
+            base_length=len(before_ids),
+            target_length=len(after_ids),
+            similarity=difflib.SequenceMatcher(None, before_ids.tolist(), after_ids.tolist(),
+                                               autojunk=False).ratio(),
+            added_transitions=sorted(after_pairs - before_pairs),
+            removed_transitions=sorted(before_pairs - after_pairs),
+        ))
+    changes.sort(key=lambda change: change.similarity)
+    return changes
+
+
+def _representative_sequences(conn: sqlite3.Connection, version: str,
+                              test_case_id: Optional[str]) -> Dict[str, bytes]:
+    sql = f"SELECT test_case_id, endpoints FROM {SEQUENCE_TABLE} WHERE tving_version = ?"
+    params: List = [version]
+    if test_case_id is not None:
+        sql += " AND test_case_id = ?"
+        params.append(str(test_case_id))
+    sql += " ORDER BY last_seen"
+    observed: Dict[str, Counter] = defaultdict(Counter)
+    for case, blob in conn.execute(sql, params):
+        observed[case][blob or b""] += 1
+    # 관측 순(last_seen)으로 넣었으므로 역순으로 비교하면 동률일 때 최근 배열이 선택됨
+    return {
+        case: max(reversed(list(counts)), key=counts.__getitem__)
+        for case, counts in observed.items()
+    }
+
+
+def endpoint_labels(conn: sqlite3.Connection) -> Dict[int, str]:
+    return {
+        endpoint_id: f"{method} {format_endpoint(host, path_template)}"
+        for endpoint_id, method, host, path_template in conn.execute(
+            "SELECT id, method, host, path_template FROM api_endpoint"
+        )
+    }
+
+
+def main() -> int:
+    from scripts.utils.db_migrations import migrate  # db_migrations 가 이 모듈을 import 하므로 지연 import
+
+    parser = argparse.ArgumentParser(description="API 호출 시퀀스 인덱스 질의")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="test_log.db 경로")
+    parser.add_argument("--rebuild", action="store_true", help="인덱스를 비우고 전체 행 재색인")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--calls", nargs="+", type=int, metavar="ENDPOINT_ID",
+                       help="주어진 endpoint_id 순서로 호출한 테스트케이스")
+    group.add_argument("--duplicates", action="store_true", help="같은 엔드포인트 연속 호출")
+    group.add_argument("--changes", action="store_true", help="이전 버전 대비 시퀀스가 바뀐 테스트케이스")
+    parser.add_argument("--gap", action="store_true", help="--calls 에서 사이에 다른 호출을 허용")
+    parser.add_argument("--version", help="--changes 대상 tving_version (기본: 최신)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    migrate(conn)
+    try:
+        added = rebuild_sequences(conn) if args.rebuild else refresh_sequences(conn)
+    except RuntimeError as e:
+        conn.close()
+        print(f"API 시퀀스 재색인 실패: {e}")
+        return 1
+    labels = endpoint_labels(conn)
+
+    def label(endpoint_id: int) -> str:
+        return labels.get(endpoint_id, f"endpoint #{endpoint_id}")
+
+    if args.calls:
+        matched = cases_calling(conn, args.calls, adjacent=not args.gap)
+        print(f"{' → '.join(label(e) for e in args.calls)}: 테스트케이스 {len(matched)}개")
+        for case, groups in sorted(matched.items(), key=lambda item: -item[1]):
+            print(f"  TC{case}: {groups}개 런/단말")
+    elif args.duplicates:
+        for item in back_to_back_duplicates(conn):
+            print(f"  TC{item['test_case_id']}: {label(item['endpoint_id'])} 연속 {item['repeats']}회 "
+                  f"({item['groups']}개 런/단말)")
+    elif args.changes:
+        changes = sequence_changes(conn, args.version)
+        print(f"시퀀스 변경 테스트케이스 {len(changes)}개")
+        for change in changes:
+            print(f"  TC{change.test_case_id}: {change.base_version} → {change.target_version} "
+                  f"길이 {change.base_length} → {change.target_length}, 유사도 {change.similarity:.0%}")
+            for a, b in change.added_transitions[:5]:
+                print(f"    + {label(a)} → {label(b)}")
+            for a, b in change.removed_transitions[:5]:
+                print(f"    - {label(a)} → {label(b)}")
+    else:
+        print(f"시퀀스 인덱스 갱신 완료: {added}건 반영")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
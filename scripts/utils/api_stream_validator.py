@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+캡처 중 실시간 API 검증 (mitmdump 애드온)
+mitmdump 가 응답을 받을 때마다 현재 테스트케이스의 API 검증 설정(expected_apis)으로 호출을 분류하고,
+필수 API 가 예상과 다른 상태 코드를 반환하면 즉시 실패(fail-fast)로 상태 파일에 기록합니다.
+러너는 상태 파일을 감시하다가 설정에 따라 Maestro 플로우를 조기 중단할 수 있습니다.
+
+사용법:
+    mitmdump -p 8080 -w api.dump -s scripts/utils/api_stream_validator.py \\
+        --set api_validation_config=config/api_validation/TC314789_api_validation.json \\
+        --set api_validation_status=artifacts/logs/<serial>/api_validation_TC314789.json
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.maestro_api_validator import compile_pattern_index
+
+try:
+    from mitmproxy import ctx
+except ImportError:
+    ctx = None
+
+STATUS_RUNNING = "RUNNING"
+STATUS_FAIL = "FAIL"
+STATUS_DONE = "DONE"
+
+
+class StreamingValidationState:
+    """expected_apis 규칙으로 호출을 하나씩 평가하는 상태 (mitmproxy 와 무관하게 재사용 가능)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.test_case_id = config.get("test_case_id")
+        self.expected_apis: List[Dict[str, Any]] = config.get("expected_apis", [])
+        self.index = compile_pattern_index(tuple(api.get("pattern", "") for api in self.expected_apis))
+        self.methods = [api.get("method", "GET").upper() for api in self.expected_apis]
+        self.matched_counts = [0] * len(self.expected_apis)
+        self.failures: List[Dict[str, Any]] = []
+        self.total_calls = 0
+        self.unexpected_calls = 0
+
+    def observe(self, url: str, method: str, status_code: Optional[int], elapsed: Optional[float]) -> Optional[Dict[str, Any]]:
+        """호출 하나를 반영하고, 필수 API 상태 코드 불일치면 실패 정보를 반환"""
+        self.total_calls += 1
+        matched = self.index.match(url or "")
+        if not matched:
+            self.unexpected_calls += 1
+            return None
+
+        failure = None
+        method = (method or "").upper()
+        for i in matched:
+            if self.methods[i] != method:
+                continue
+            self.matched_counts[i] += 1
+            expected_api = self.expected_apis[i]
+            expected_status = expected_api.get("expected_status", 200)
+            if expected_api.get("required", True) and status_code != expected_status:
+                failure = {
+                    "name": expected_api.get("name"),
+                    "pattern": expected_api.get("pattern"),
+                    "url": url,
+                    "method": method,
+                    "status_code": status_code,
+                    "expected_status": expected_status,
+                    "elapsed": elapsed,
+                    "message": f"{expected_api.get('name')}: 상태 코드 불일치 (예상 {expected_status}, 실제 {status_code})",
+                }
+                self.failures.append(failure)
+        return failure
+
+    @property
+    def status(self) -> str:
+        return STATUS_FAIL if self.failures else STATUS_RUNNING
+
+    def missing_required(self) -> List[str]:
+        """아직 한 번도 호출되지 않은 필수 API 이름"""
+        return [
+            api.get("name") for api, count in zip(self.expected_apis, self.matched_counts)
+            if count == 0 and api.get("required", True)
+        ]
+
+    def summary(self, final: bool = False) -> Dict[str, Any]:
+        return {
+            "test_case_id": self.test_case_id,
+            "status": self.status if not final or self.failures else STATUS_DONE,
+            "total_calls": self.total_calls,
+            "unexpected_calls": self.unexpected_calls,
+            "failures": self.failures,
+            "missing_required": self.missing_required() if final else [],
+            "updated_at": time.time(),
+        }
+
+
+def write_status(path: str, summary: Dict[str, Any]):
+    """상태 파일을 원자적으로 교체 (러너가 쓰는 중인 파일을 읽지 않도록)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, default=str)
+    os.replace(temp_path, path)
+
+
+def read_stream_status(path) -> Optional[Dict[str, Any]]:
+    """상태 파일 전체 (없거나 읽을 수 없으면 None)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_stream_failure(path) -> Optional[Dict[str, Any]]:
+    """상태 파일에서 첫 번째 fail-fast 실패를 읽음 (없거나 아직 통과 중이면 None)"""
+    summary = read_stream_status(path)
+    failures = (summary or {}).get("failures") or []
+    return failures[0] if failures else None
+
+
+class StreamingAPIValidator:
+    """mitmdump 애드온: 응답마다 StreamingValidationState 에 반영하고 실패 시 상태 파일 갱신"""
+
+    def __init__(self):
+        self.state: Optional[StreamingValidationState] = None
+        self.status_path: Optional[str] = None
+
+    def load(self, loader):
+        loader.add_option("api_validation_config", str, "", "테스트케이스 API 검증 설정 JSON 경로")
+        loader.add_option("api_validation_status", str, "", "실시간 검증 상태 파일 경로")
+
+    def configure(self, updated):
+        if "api_validation_config" in updated and ctx.options.api_validation_config:
+            with open(ctx.options.api_validation_config, "r", encoding="utf-8") as f:
+                self.state = StreamingValidationState(json.load(f))
+        if "api_validation_status" in updated:
+            self.status_path = ctx.options.api_validation_status or None
+        if self.state and self.status_path:
+            write_status(self.status_path, self.state.summary())
+
+    def response(self, flow):
+        if self.state is None:
+            return
+        request, response = flow.request, flow.response
+        elapsed = None
+        if response.timestamp_end and request.timestamp_start:
+            elapsed = response.timestamp_end - request.timestamp_start
+        failure = self.state.observe(request.pretty_url, request.method, response.status_code, elapsed)
+        if failure:
+            ctx.log.warn(f"[API 검증] fail-fast: {failure['message']} ({failure['url']})")
+            if self.status_path:
+                write_status(self.status_path, self.state.summary())
+
+    def done(self):
+        if self.state and self.status_path:
+            write_status(self.status_path, self.state.summary(final=True))
+
+
+addons = [StreamingAPIValidator()]
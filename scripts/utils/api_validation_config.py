@@ -1,22 +1,145 @@
 """
 API 검증 설정 관리 시스템
 Maestro YAML과 분리된 API 검증 설정을 관리
+
+설정 파일은 디렉터리별 레지스트리(ValidationConfigRegistry)에 한 번 읽어 두고,
+패턴도 함께 컴파일해 둡니다. 변경 감지는 CHECK_INTERVAL 마다 디렉터리/파일 mtime 을 비교하는
+방식이라 상시 실행되는 러너/대시보드도 재시작 없이 수정 사항을 반영하며,
+그 사이의 조회는 파일을 읽지 않고 메모리에서 처리합니다.
 """
 
 import json
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from scripts.utils.maestro_api_validator import APIPatternIndex, compile_pattern_index
+
 logger = logging.getLogger(__name__)
 
+CONFIG_SUFFIX = "_api_validation.json"
+
+
+class ValidationConfigRegistry:
+    """config_dir 의 검증 설정 메모리 캐시 (mtime 기반 무효화, 스레드 안전)"""
+    
+    CHECK_INTERVAL = 2.0  # 변경 확인 최소 간격(초) - 그 사이 조회는 stat 도 하지 않음
+    
+    def __init__(self, config_dir: Path):
+        self.config_dir = config_dir
+        self._lock = threading.RLock()
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Tuple[Path, int, int]] = {}   # test_case_id -> (경로, mtime_ns, size)
+        self._dir_mtime: Optional[int] = None
+        self._checked_at = 0.0
+    
+    def get(self, test_case_id: str) -> Optional[Dict[str, Any]]:
+        self._refresh_if_due()
+        return self._configs.get(test_case_id)
+    
+    def get_path(self, test_case_id: str) -> Optional[Path]:
+        self._refresh_if_due()
+        entry = self._files.get(test_case_id)
+        return entry[0] if entry else None
+    
+    def all(self) -> List[Dict[str, Any]]:
+        self._refresh_if_due()
+        return list(self._configs.values())
+    
+    def pattern_index(self, test_case_id: str) -> Optional[APIPatternIndex]:
+        """설정의 expected_apis 패턴을 컴파일한 인덱스 (설정 로드 시 미리 컴파일됨)"""
+        config = self.get(test_case_id)
+        if config is None:
+            return None
+        return compile_pattern_index(tuple(api.get('pattern', '') for api in config.get('expected_apis', [])))
+    
+    def invalidate(self):
+        """다음 조회에서 즉시 변경을 확인 (이 프로세스에서 파일을 쓰거나 지운 직후 호출)"""
+        self._checked_at = 0.0
+    
+    def _refresh_if_due(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return
+        with self._lock:
+            if now - self._checked_at < self.CHECK_INTERVAL:
+                return
+            self._refresh()
+            self._checked_at = time.monotonic()
+    
+    def _refresh(self):
+        try:
+            dir_mtime = self.config_dir.stat().st_mtime_ns
+        except OSError:
+            self._configs, self._files = {}, {}
+            return
+        
+        # 파일 추가/삭제/이름 변경은 디렉터리 mtime 으로, 제자리 수정은 파일 mtime/크기로 감지
+        if dir_mtime != self._dir_mtime:
+            paths = {path.name[:-len(CONFIG_SUFFIX)]: path for path in self.config_dir.glob(f"*{CONFIG_SUFFIX}")}
+            self._dir_mtime = dir_mtime
+        else:
+            paths = {test_case_id: entry[0] for test_case_id, entry in self._files.items()}
+        
+        configs: Dict[str, Dict[str, Any]] = {}
+        files: Dict[str, Tuple[Path, int, int]] = {}
+        for test_case_id, path in paths.items():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            cached = self._files.get(test_case_id)
+            if cached and cached[1:] == (stat.st_mtime_ns, stat.st_size) and test_case_id in self._configs:
+                configs[test_case_id] = self._configs[test_case_id]
+            else:
+                config = self._load_file(path)
+                if config is None:
+                    continue
+                configs[test_case_id] = config
+                # 패턴을 미리 컴파일 (잘못된 패턴은 로드 시점에 경고)
+                try:
+                    compile_pattern_index(tuple(api.get('pattern', '') for api in config.get('expected_apis', [])))
+                except Exception as e:
+                    logger.warning(f"API 검증 패턴 컴파일 실패 {path}: {e}")
+                logger.info(f"API 검증 설정 로드: {path}")
+            files[test_case_id] = (path, stat.st_mtime_ns, stat.st_size)
+        
+        self._configs, self._files = configs, files
+    
+    @staticmethod
+    def _load_file(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"설정 파일 로드 실패 {path}: {e}")
+            return None
+
+
+_registries: Dict[Path, ValidationConfigRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_config_registry(config_dir) -> ValidationConfigRegistry:
+    """설정 디렉터리별 프로세스 공유 레지스트리"""
+    key = Path(config_dir).resolve()
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ValidationConfigRegistry(key)
+        return registry
+
+
 class APIValidationConfig:
     """API 검증 설정 관리 클래스"""
     
     def __init__(self, config_dir: str = "config/api_validation"):
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(parents=True, exist_ok=True)
+        self.registry = get_config_registry(self.config_dir)
     
     def create_validation_config(self, test_case_id: str, expected_apis: List[Dict[str, Any]]) -> str:
         """테스트케이스별 API 검증 설정 생성"""
@@ -28,11 +151,12 @@ class APIValidationConfig:
             "description": f"API 검증 설정 for {test_case_id}"
         }
         
-        config_file = self.config_dir / f"{test_case_id}_api_validation.json"
+        config_file = self.config_dir / f"{test_case_id}{CONFIG_SUFFIX}"
         
         try:
             with open(config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
+            self.registry.invalidate()
             
             logger.info(f"API 검증 설정 생성: {config_file}")
             return str(config_file)
@@ -42,44 +166,29 @@ class APIValidationConfig:
             return None
     
     def load_validation_config(self, test_case_id: str) -> Optional[Dict[str, Any]]:
-        """테스트케이스별 API 검증 설정 로드"""
-        config_file = self.config_dir / f"{test_case_id}_api_validation.json"
-        
-        if not config_file.exists():
-            return None
-        
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            logger.info(f"API 검증 설정 로드: {config_file}")
-            return config
-            
-        except Exception as e:
-            logger.error(f"API 검증 설정 로드 실패: {e}")
-            return None
+        """테스트케이스별 API 검증 설정 조회 (레지스트리 캐시 - 반환된 dict 는 공유되므로 수정하지 말 것)"""
+        return self.registry.get(test_case_id)
+    
+    def get_config_path(self, test_case_id: str) -> Optional[Path]:
+        """테스트케이스별 API 검증 설정 파일 경로"""
+        return self.registry.get_path(test_case_id)
+    
+    def get_pattern_index(self, test_case_id: str) -> Optional[APIPatternIndex]:
+        """테스트케이스별 컴파일된 expected_apis 패턴 인덱스"""
+        return self.registry.pattern_index(test_case_id)
     
     def get_all_configs(self) -> List[Dict[str, Any]]:
         """모든 API 검증 설정 조회"""
-        configs = []
-        
-        for config_file in self.config_dir.glob("*_api_validation.json"):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    configs.append(config)
-            except Exception as e:
-                logger.error(f"설정 파일 로드 실패 {config_file}: {e}")
-        
-        return configs
+        return self.registry.all()
     
     def delete_validation_config(self, test_case_id: str) -> bool:
         """API 검증 설정 삭제"""
-        config_file = self.config_dir / f"{test_case_id}_api_validation.json"
+        config_file = self.config_dir / f"{test_case_id}{CONFIG_SUFFIX}"
         
         if config_file.exists():
             try:
                 config_file.unlink()
+                self.registry.invalidate()
                 logger.info(f"API 검증 설정 삭제: {config_file}")
                 return True
             except Exception as e:
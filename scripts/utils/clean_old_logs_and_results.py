@@ -1,6 +1,10 @@
 import os
+import sys
 import time
 import shutil
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils import log_archive
+from scripts.utils.log_storage import SQLITE, load_storage
 
 TARGET_DIRS = ["logs", "result"]
 DAYS = 7  # 7일 이상 지난 파일/폴더 삭제
@@ -28,4 +32,16 @@ for base_dir in TARGET_DIRS:
                     shutil.rmtree(dir_path)
                     print(f"[DELETE] 빈 폴더: {dir_path}")
             except Exception as e:
-                print(f"[ERROR] 폴더 삭제 실패: {dir_path} - {e}") 
\ No newline at end of file
+                print(f"[ERROR] 폴더 삭제 실패: {dir_path} - {e}")
+
+# DB 로그 행은 삭제하지 않고 Parquet 아카이브로 이동 (SQLite 저장소, pyarrow 설치 시)
+storage = load_storage()
+if storage.name != SQLITE or log_archive.pa is None:
+    print("[SKIP] DB 로그 아카이브: SQLite 저장소 + pyarrow 필요")
+elif os.path.exists(storage.path):
+    try:
+        stats = log_archive.archive_old_rows(storage.path, log_archive.DEFAULT_RETENTION_DAYS)
+        print(f"[ARCHIVE] test_log {stats['test_log']}행, test_api {stats['test_api']}행 "
+              f"({log_archive.DEFAULT_RETENTION_DAYS}일 이전) -> {log_archive.default_archive_dir(storage.path)}")
+    except Exception as e:
+        print(f"[ERROR] DB 로그 아카이브 실패: {e}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+대시보드 시작/요청 지연 벤치마크
+URL 마다 새 프로세스를 띄워 Django 초기화(앱 준비 포함) 시간, 첫 요청(cold) 지연, 이후 요청(warm) 지연을 측정합니다.
+--db 를 지정하지 않으면 임시 DB에 합성 이력(scripts/utils/synthetic_data)을 생성합니다.
+
+- 요청은 Django 테스트 클라이언트로 보내므로 서버 없이 뷰/미들웨어/템플릿 시간만 측정
+- TestRail 카탈로그는 합성 케이스로 동기화해 두어 측정 중 TestRail 을 호출하지 않음
+- --no-cache 는 매 요청 전에 응답 캐시를 비워 캐시 적중 없이 뷰 자체 시간을 측정
+
+사용법:
+    python scripts/utils/dashboard_benchmark.py [--days 30] [--repeat 20] [--cold-runs 3]
+    python scripts/utils/dashboard_benchmark.py --db artifacts/test_log.db --url /testrun/1234/
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# scripts.utils 분석 모듈(numpy 등)은 워커 프로세스의 초기화 시간에 섞이지 않도록 사용하는 함수 안에서 import
+
+DASHBOARD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../dashboard'))
+
+DEFAULT_URLS = (
+    "/",
+    "/tests/",
+    "/tests/api/",
+    "/testrun/{run_id}/",
+    "/testrun/{run_id}/testcases/",
+    "/api/",
+    "/api/performance/",
+    "/api/errors/",
+    "/api/menu-logs/",
+    "/api/menu-logs/calls/",
+)
+
+
+def run_worker(url: str, repeat: int, no_cache: bool) -> Dict:
+    """새 프로세스 안에서 Django 초기화 -> 첫 요청 -> repeat 회 반복 요청 시간을 측정"""
+    started = time.perf_counter()
+    sys.path.insert(0, DASHBOARD_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+    import django
+    django.setup()
+    from django.core.cache import cache
+    from django.test import Client
+    setup = time.perf_counter() - started
+
+    client = Client()
+    timings = []
+    status_codes = set()
+    for _ in range(repeat + 1):
+        if no_cache:
+            cache.clear()
+        request_started = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - request_started)
+        status_codes.add(response.status_code)
+    return {"setup": setup, "cold": timings[0], "warm": timings[1:], "status": sorted(status_codes)}
+
+
+def _spawn(db_path: str, url: str, repeat: int, no_cache: bool) -> Dict:
+    env = dict(os.environ, QA_MONITOR_TEST_LOG_DB=db_path)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", url, "--repeat", str(repeat)]
+    if no_cache:
+        command.append("--no-cache")
+    output = subprocess.run(command, env=env, cwd=DASHBOARD_DIR, capture_output=True, text=True, check=True).stdout
+    # 뷰의 디버그 출력 뒤 마지막 줄이 결과 JSON
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _latest_run(db_path: str) -> Optional[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT run_id FROM run_summary ORDER BY start_time DESC LIMIT 1").fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:8.1f}" if value is not None else f"{'-':>8}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="대시보드 시작/요청 지연(cold/warm) 벤치마크")
+    parser.add_argument("--db", help="기존 test_log.db 경로 (지정 시 합성 데이터 생성 생략)")
+    parser.add_argument("--days", type=int, default=30, help="합성 이력 기간(일, --db 미지정 시 하루 1런)")
+    parser.add_argument("--url", action="append", help="측정할 URL (반복 가능, 기본: 주요 화면/JSON API)")
+    parser.add_argument("--repeat", type=int, default=20, help="URL 별 warm 요청 횟수")
+    parser.add_argument("--cold-runs", type=int, default=3, help="URL 별 새 프로세스(cold) 측정 횟수")
+    parser.add_argument("--no-cache", action="store_true", help="매 요청 전에 응답 캐시 비우기")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repeat, args.no_cache)))
+        return 0
+
+    from scripts.utils.api_rollup import percentile, refresh_rollups
+    from scripts.utils.db_migrations import migrate
+    from scripts.utils.synthetic_data import DEFAULT_FLOWS, generate_history
+
+    temp_dir = None
+    if args.db:
+        db_path = os.path.abspath(args.db)
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, "benchmark.db")
+        conn = sqlite3.connect(db_path)
+        migrate(conn)
+        print(f"합성 데이터 생성 중: 런 {args.days}개 x 케이스 {DEFAULT_FLOWS}개...")
+        generate_history(conn, days=args.days, runs_per_day=1, calls_per_case=10, derived=False)
+        refresh_rollups(conn)
+        conn.close()
+
+    run_id = _latest_run(db_path) or "1"
+    urls = [url.format(run_id=run_id) for url in (args.url or DEFAULT_URLS)]
+    print(f"\n=== 대시보드 지연 (cold {args.cold_runs}회 / warm {args.repeat}회, 단위 ms"
+          f"{', 캐시 비움' if args.no_cache else ''}) ===")
+    print(f"{'URL':34} {'초기화':>8} {'cold':>8} {'warm p50':>8} {'warm p95':>8}  상태")
+    failed = False
+    try:
+        for url in urls:
+            results = [_spawn(db_path, url, args.repeat, args.no_cache) for _ in range(args.cold_runs)]
+            warm = sorted(value for result in results for value in result["warm"])
+            status = sorted({code for result in results for code in result["status"]})
+            failed |= any(code >= 500 for code in status)
+            print(f"{url:34} {_ms(statistics.median(r['setup'] for r in results))} "
+                  f"{_ms(statistics.median(r['cold'] for r in results))} "
+                  f"{_ms(percentile(warm, 50))} {_ms(percentile(warm, 95))}  {status}")
+    finally:
+        if temp_dir:
+            temp_dir.cleanup()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
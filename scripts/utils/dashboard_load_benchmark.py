@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+대시보드 부하(데이터 규모) 벤치마크
+합성 이력(scripts/utils/synthetic_data, 기본 1년치)이 쌓인 DB 로 qa_monitor 의 모든 URL 을 Django 테스트 클라이언트로
+반복 요청하여 뷰별 지연(p50/p95)과 요청당 SQL 쿼리 수를 측정합니다. 이력이 늘어날 때 화면이 느려지는 회귀를 추적하는 용도입니다.
+
+- URL 은 qa_monitor.urls 의 urlpatterns 에서 모두 가져오고, 경로 인자는 DB 의 최신 런 / 가장 많이 실행된 케이스로 채움
+- 기본으로 매 요청 전에 응답 캐시를 비워 뷰 자체 시간을 측정 (--cached 는 캐시 적중 포함)
+- SQL 쿼리 수는 'testlog' / 'default' 연결과 공유 로그 저장소 연결(services.log_db)의 SQLite 트레이스로 셈
+  (ORM 과 scripts.utils 분석 함수의 원시 쿼리 모두 포함, BEGIN/COMMIT/PRAGMA 등 제어 문은 제외)
+- 런 이벤트(SSE)처럼 요청마다 새로 여는 연결의 쿼리는 세지 않음
+- test_detail 은 config.ini 가 없으면 TestRail 조회 없이 오류 화면을 반환하므로 그 경우의 시간만 측정됨
+- --json 으로 결과를 저장해 두면 이후 측정과 비교할 수 있음
+
+사용법:
+    python scripts/utils/dashboard_load_benchmark.py [--db artifacts/synthetic_test_log.db] [--days 365] [--repeat 20]
+    python scripts/utils/dashboard_load_benchmark.py --db /tmp/small.db --days 30 --json artifacts/dashboard_load.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+DASHBOARD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../dashboard'))
+CONTROL_STATEMENTS = ("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA", "SAVEPOINT", "RELEASE")
+
+
+class QueryCounter:
+    """SQLite 연결들의 트레이스 콜백으로 실행된 SQL 문 수를 셈"""
+
+    def __init__(self):
+        self.count = 0
+        self.hooked: Dict[int, sqlite3.Connection] = {}
+
+    def _trace(self, statement: str):
+        if not statement.lstrip().upper().startswith(CONTROL_STATEMENTS):
+            self.count += 1
+
+    def hook(self, conn):
+        """연결에 트레이스 콜백 설치 (CONN_MAX_AGE 만료/헬스 체크로 바뀐 연결은 다시 설치)"""
+        if isinstance(conn, sqlite3.Connection) and self.hooked.get(id(conn)) is not conn:
+            conn.set_trace_callback(self._trace)
+            self.hooked[id(conn)] = conn
+
+
+def _setup_django(db_path: str):
+    os.environ["QA_MONITOR_TEST_LOG_DB"] = db_path
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+    sys.path.insert(0, DASHBOARD_DIR)
+    import django
+    django.setup()
+
+
+def _sample_ids(db_path: str) -> Dict[str, int]:
+    """경로 인자 샘플: 최신 런과 가장 많이 실행된 케이스"""
+    conn = sqlite3.connect(db_path)
+    try:
+        run = conn.execute("SELECT run_id FROM run_summary ORDER BY start_time DESC LIMIT 1").fetchone()
+        case = conn.execute("""
+            SELECT test_case_id FROM test_log GROUP BY test_case_id ORDER BY COUNT(*) DESC LIMIT 1
+        """).fetchone()
+    finally:
+        conn.close()
+    case_id = int(case[0]) if case and str(case[0]).isdigit() else 1
+    return {"run_id": int(run[0]) if run and str(run[0]).isdigit() else 1, "test_id": case_id, "testcase_id": case_id}
+
+
+def dashboard_urls(samples: Dict[str, int]) -> List[tuple]:
+    """qa_monitor 의 모든 (뷰 이름, URL)"""
+    from django.urls import reverse
+    from qa_monitor import urls
+
+    targets = []
+    for pattern in urls.urlpatterns:
+        kwargs = {name: samples[name] for name in pattern.pattern.converters}
+        targets.append((pattern.name, reverse(f"{urls.app_name}:{pattern.name}", kwargs=kwargs)))
+    return targets
+
+
+def measure(url: str, repeat: int, cached: bool, counter: QueryCounter) -> Dict:
+    """url 을 (첫 요청 + repeat 회) 요청하여 지연/쿼리 수/상태 코드 수집"""
+    from django.core.cache import caches
+    from django.db import connections
+    from django.test import Client
+
+    from qa_monitor import services
+    from qa_monitor.cache import CACHE_ALIAS
+
+    client = Client()
+    timings, queries, status_codes = [], [], set()
+    for _ in range(repeat + 1):
+        if not cached:
+            caches[CACHE_ALIAS].clear()
+        for connection in connections.all():
+            connection.ensure_connection()
+            counter.hook(connection.connection)
+        with services.log_db() as conn:
+            counter.hook(conn)
+        counter.count = 0
+        started = time.perf_counter()
+        # 뷰의 디버그 출력은 결과 표에 섞이지 않게 버림
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.get(url)
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        timings.append(time.perf_counter() - started)
+        queries.append(counter.count)
+        status_codes.add(response.status_code)
+    return {"cold": timings[0], "timings": sorted(timings[1:]), "queries": sorted(queries[1:]) or queries,
+            "status": sorted(status_codes)}
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:9.1f}" if value is not None else f"{'-':>9}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="대시보드 뷰별 지연(p50/p95)/SQL 쿼리 수 벤치마크 (합성 이력 DB)")
+    parser.add_argument("--db", default="artifacts/synthetic_test_log.db", help="측정할 DB (없으면 합성 이력 생성)")
+    parser.add_argument("--days", type=int, default=365, help="DB 가 없을 때 생성할 합성 이력 기간(일)")
+    parser.add_argument("--repeat", type=int, default=20, help="URL 별 반복 요청 횟수 (첫 요청 제외)")
+    parser.add_argument("--url", action="append", help="추가로 측정할 URL (반복 가능)")
+    parser.add_argument("--cached", action="store_true", help="응답 캐시를 비우지 않고 측정")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db)
+    if not os.path.exists(db_path):
+        from scripts.utils.db_migrations import migrate
+        from scripts.utils.synthetic_data import generate_history
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        print(f"{db_path} 가 없어 합성 이력 {args.days}일치를 생성합니다...")
+        conn = sqlite3.connect(db_path)
+        try:
+            migrate(conn)
+            conn.execute("PRAGMA journal_mode=WAL")
+            generate_history(conn, days=args.days, progress=True)
+        finally:
+            conn.close()
+
+    _setup_django(db_path)
+    from scripts.utils.api_rollup import percentile
+
+    samples = _sample_ids(db_path)
+    targets = dashboard_urls(samples) + [("(추가)", url) for url in args.url or ()]
+    with sqlite3.connect(db_path) as conn:
+        rows = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("run_summary", "test_log", "test_api")}
+    print(f"\n=== 대시보드 부하 벤치마크: 런 {rows['run_summary']:,}개, test_log {rows['test_log']:,}행, "
+          f"test_api {rows['test_api']:,}행 (반복 {args.repeat}회, 단위 ms{', 캐시 사용' if args.cached else ''}) ===")
+    print(f"{'뷰':24} {'URL':34} {'첫 요청':>9} {'p50':>9} {'p95':>9} {'쿼리':>5}  상태")
+
+    counter = QueryCounter()
+    results = []
+    for name, url in targets:
+        result = measure(url, args.repeat, args.cached, counter)
+        timings = result["timings"]
+        item = {
+            "view": name,
+            "url": url,
+            "cold_ms": result["cold"] * 1000,
+            "p50_ms": percentile(timings, 50) * 1000 if timings else None,
+            "p95_ms": percentile(timings, 95) * 1000 if timings else None,
+            "queries": percentile(result["queries"], 50),
+            "status": result["status"],
+        }
+        results.append(item)
+        print(f"{name:24} {url:34} {_ms(result['cold'])} {_ms(percentile(timings, 50))} "
+              f"{_ms(percentile(timings, 95))} {item['queries']:5.0f}  {item['status']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"db": db_path, "rows": rows, "repeat": args.repeat, "cached": args.cached,
+                       "measured_at": time.strftime('%Y-%m-%d %H:%M:%S'), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json}")
+    return 1 if any(code >= 500 for item in results for code in item["status"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""
+test_log.db 스키마 마이그레이션
+PRAGMA user_version 으로 적용된 버전을 관리하고, 순서대로 마이그레이션을 적용합니다.
+테이블을 만드는 모든 진입점(init_db, ensure_api_table 등)은 migrate()를 호출합니다.
+"""
+
+import logging
+import sqlite3
+from typing import Callable, List, Tuple
+
+from scripts.utils.api_anomaly import update_anomalies
+from scripts.utils.api_body_store import BodyStore
+from scripts.utils.api_endpoint import EndpointRegistry
+from scripts.utils.api_regression import update_run_stats
+from scripts.utils.api_rollup import update_rollups
+from scripts.utils.api_sequence_index import update_sequences
+from scripts.utils.run_summary import rebuild_run_summary
+
+logger = logging.getLogger(__name__)
+
+
+def _create_base_tables(conn: sqlite3.Connection):
+    """v1: 기존 test_log / test_api 테이블"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS test_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            test_case_id TEXT,
+            step_name TEXT,
+            start_time DATETIME,
+            end_time DATETIME,
+            elapsed REAL,
+            status TEXT,
+            error_msg TEXT,
+            serial TEXT,
+            model TEXT,
+            os_version TEXT,
+            tving_version TEXT,
+            run_id TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS test_api (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            test_case_id TEXT,
+            serial TEXT,
+            model TEXT,
+            os_version TEXT,
+            tving_version TEXT,
+            timestamp TEXT,
+            url TEXT,
+            method TEXT,
+            status_code INTEGER,
+            elapsed REAL,
+            request_body TEXT,
+            response_body TEXT,
+            run_id TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _create_query_indexes(conn: sqlite3.Connection):
+    """v2: 대시보드/러너 조회 조건에 맞춘 보조 인덱스"""
+    statements = [
+        # test_log: 런 상세, 최근 N일 런 목록, 케이스별 실행 이력
+        "CREATE INDEX IF NOT EXISTS idx_test_log_run_start ON test_log (run_id, start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_test_log_start_time ON test_log (start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_test_log_case_start ON test_log (test_case_id, start_time)",
+        # test_api: 케이스/단말별 통계, 케이스별 시간순 조회, 런별 집계, 기간/오류 집계
+        "CREATE INDEX IF NOT EXISTS idx_test_api_case_serial ON test_api (test_case_id, serial)",
+        "CREATE INDEX IF NOT EXISTS idx_test_api_case_created ON test_api (test_case_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_test_api_run_case ON test_api (run_id, test_case_id)",
+        "CREATE INDEX IF NOT EXISTS idx_test_api_created ON test_api (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_test_api_status ON test_api (status_code)",
+    ]
+    for statement in statements:
+        conn.execute(statement)
+
+
+def _create_endpoint_dimension(conn: sqlite3.Connection):
+    """v3: api_endpoint 차원 테이블 + test_api.endpoint_id (기존 행 백필)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_endpoint (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            method TEXT NOT NULL,
+            host TEXT NOT NULL,
+            path_template TEXT NOT NULL,
+            UNIQUE (method, host, path_template)
+        )
+    """)
+    _add_column(conn, "test_api", "endpoint_id", "INTEGER REFERENCES api_endpoint(id)")
+
+    registry = EndpointRegistry(conn)
+    rows = conn.execute(
+        "SELECT id, url, method FROM test_api WHERE endpoint_id IS NULL AND url IS NOT NULL"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE test_api SET endpoint_id = ? WHERE id = ?",
+        [(registry.get_id(url, method), row_id) for row_id, url, method in rows],
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_test_api_endpoint ON test_api (endpoint_id, created_at)")
+
+
+def _create_body_store(conn: sqlite3.Connection):
+    """v4: 요청/응답 본문을 SHA-256 기반 압축 저장소(api_body)로 이전"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_body_dict (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_body (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            dict_id INTEGER REFERENCES api_body_dict(id),
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    """)
+    _add_column(conn, "test_api", "request_body_hash", "TEXT")
+    _add_column(conn, "test_api", "response_body_hash", "TEXT")
+
+    # 기존 인라인 본문 이전 (메모리 사용을 줄이기 위해 id 구간별로 처리)
+    store = BodyStore(conn)
+    last_id = 0
+    while True:
+        rows = conn.execute("""
+            SELECT id, request_body, response_body FROM test_api
+            WHERE id > ? AND (request_body IS NOT NULL OR response_body IS NOT NULL)
+            ORDER BY id LIMIT 1000
+        """, (last_id,)).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            "UPDATE test_api SET request_body_hash = ?, response_body_hash = ?, "
+            "request_body = NULL, response_body = NULL WHERE id = ?",
+            [(store.put(request_body), store.put(response_body), row_id)
+             for row_id, request_body, response_body in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def _create_rollup_tables(conn: sqlite3.Connection):
+    """v5: API 지표 시간별 롤업 테이블"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_rollup_hourly (
+            hour TEXT NOT NULL,
+            endpoint_id INTEGER NOT NULL,
+            test_case_id TEXT NOT NULL,
+            serial TEXT NOT NULL,
+            call_count INTEGER NOT NULL,
+            error_count INTEGER NOT NULL,
+            timed_count INTEGER NOT NULL,
+            sum_elapsed REAL NOT NULL,
+            min_elapsed REAL,
+            max_elapsed REAL,
+            p50 REAL,
+            p95 REAL,
+            p99 REAL,
+            PRIMARY KEY (hour, endpoint_id, test_case_id, serial)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_rollup_status_hourly (
+            hour TEXT NOT NULL,
+            endpoint_id INTEGER NOT NULL,
+            status_code INTEGER,
+            call_count INTEGER NOT NULL,
+            timed_count INTEGER NOT NULL,
+            sum_elapsed REAL NOT NULL,
+            PRIMARY KEY (hour, endpoint_id, status_code)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_rollup_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_api_rollup_case_hour ON api_rollup_hourly (test_case_id, hour)")
+    # 백필은 v6에서 스케치 컬럼 추가 후 수행
+
+
+def _add_rollup_sketches(conn: sqlite3.Connection):
+    """v6: 시간별 롤업에 병합 가능한 응답시간 스케치 추가 (기존 데이터 전체 구간 백필)"""
+    _add_column(conn, "api_rollup_hourly", "sketch", "BLOB")
+    # 롤업은 새 행을 기존 행에 병합하므로 워터마크와 함께 기존 행도 비우고 처음부터 집계
+    conn.execute("DELETE FROM api_rollup_hourly")
+    conn.execute("DELETE FROM api_rollup_status_hourly")
+    conn.execute("DELETE FROM api_rollup_state WHERE name = 'api_rollup_hourly'")
+    update_rollups(conn)
+
+
+def _create_anomaly_tables(conn: sqlite3.Connection):
+    """v7: 엔드포인트별 응답시간 기준선(Welford)과 수집 시점 이상 기록 (기존 행 백필)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_latency_baseline (
+            endpoint_id INTEGER PRIMARY KEY,
+            sample_count INTEGER NOT NULL,
+            mean REAL NOT NULL,
+            m2 REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_anomaly (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            api_id INTEGER NOT NULL UNIQUE REFERENCES test_api(id),
+            endpoint_id INTEGER NOT NULL,
+            test_case_id TEXT,
+            run_id TEXT,
+            type TEXT NOT NULL,
+            value REAL NOT NULL,
+            baseline_mean REAL,
+            baseline_std REAL,
+            z_score REAL,
+            created_at DATETIME
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_api_anomaly_created ON api_anomaly (created_at)")
+    update_anomalies(conn)
+
+
+def _create_run_stats(conn: sqlite3.Connection):
+    """v8: 런 간 회귀 비교용 (run_id, 엔드포인트, 테스트케이스) 누적 집계 (기존 행 백필)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_run_stats (
+            run_id TEXT NOT NULL,
+            endpoint_id INTEGER NOT NULL,
+            test_case_id TEXT NOT NULL,
+            tving_version TEXT,
+            first_seen DATETIME,
+            call_count INTEGER NOT NULL,
+            error_count INTEGER NOT NULL,
+            payload_count INTEGER NOT NULL,
+            payload_bytes INTEGER NOT NULL,
+            sketch BLOB,
+            PRIMARY KEY (run_id, endpoint_id, test_case_id)
+        ) WITHOUT ROWID
+    """)
+    update_run_stats(conn)
+
+
+def _create_sequence_index(conn: sqlite3.Connection):
+    """v9: (run_id, 테스트케이스, 단말)별 호출 시퀀스 + n-gram 역색인 (기존 행 백필)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_sequence (
+            run_id TEXT NOT NULL,
+            test_case_id TEXT NOT NULL,
+            serial TEXT NOT NULL,
+            tving_version TEXT,
+            first_seen DATETIME,
+            last_seen DATETIME,
+            call_count INTEGER NOT NULL,
+            endpoints BLOB,
+            PRIMARY KEY (run_id, test_case_id, serial)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_api_sequence_case ON api_sequence (test_case_id, last_seen)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_api_sequence_version ON api_sequence (tving_version, last_seen)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_ngram (
+            n INTEGER NOT NULL,
+            gram INTEGER NOT NULL,
+            test_case_id TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            serial TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (n, gram, test_case_id, run_id, serial)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_api_ngram_group ON api_ngram (run_id, test_case_id, serial)")
+    update_sequences(conn)
+
+
+def _create_run_events(conn: sqlite3.Connection):
+    """v10: 대시보드 실시간 진행 표시용 런 이벤트"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_event (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            event_type TEXT NOT NULL,
+            test_case_id TEXT,
+            serial TEXT,
+            status TEXT,
+            payload TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_run_event_run ON run_event (run_id, id)")
+
+
+def _create_case_catalog(conn: sqlite3.Connection):
+    """v11: TestRail 테스트케이스 로컬 카탈로그 (목록 화면 키셋 페이지 조회용)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS testrail_case (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            automation_type INTEGER NOT NULL DEFAULT 0,
+            priority_id INTEGER,
+            section_id INTEGER,
+            created_on INTEGER,
+            updated_on INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        )
+    """)
+    # (updated_on, id) / (automation_type, updated_on, id) 순서로 최신 업데이트순 페이지를 인덱스에서 바로 읽음
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_testrail_case_updated ON testrail_case (updated_on)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_testrail_case_automation ON testrail_case (automation_type, updated_on)")
+
+
+def _create_run_summary(conn: sqlite3.Connection):
+    """v12: 런별 요약 (배치 Writer 가 log_step 과 같은 트랜잭션에서 갱신) + 기존 test_log 백필"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_summary (
+            run_id TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            passed INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            blocked INTEGER NOT NULL DEFAULT 0,
+            untested INTEGER NOT NULL DEFAULT 0,
+            retest INTEGER NOT NULL DEFAULT 0,
+            start_time DATETIME,
+            end_time DATETIME,
+            elapsed_sum REAL NOT NULL DEFAULT 0,
+            elapsed_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_run_summary_start ON run_summary (start_time)")
+    rebuild_run_summary(conn)
+
+
+def _create_archive_manifest(conn: sqlite3.Connection):
+    """v13: Parquet 아카이브 파티션 매니페스트 (log_archive 가 행 삭제와 같은 트랜잭션에서 기록)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive_partition (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            run_id TEXT,
+            path TEXT NOT NULL UNIQUE,
+            row_count INTEGER NOT NULL,
+            min_id INTEGER,
+            max_id INTEGER,
+            min_time TEXT,
+            max_time TEXT,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # 기간 조회(table_name, day) / 런 조회(table_name, run_id) 시 필요한 파티션만 고름
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_archive_partition_day ON archive_partition (table_name, day)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_archive_partition_run ON archive_partition (table_name, run_id)")
+
+
+def _create_run_timeline(conn: sqlite3.Connection):
+    """v14: 케이스 단계 구간(test_phase) + 단말별 타임라인 인덱스"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS test_phase (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            test_case_id TEXT,
+            serial TEXT,
+            phase TEXT NOT NULL,
+            start_time DATETIME,
+            end_time DATETIME,
+            elapsed REAL
+        )
+    """)
+    # 런 타임라인은 (run_id, serial, start_time) 순서로 단말별 구간을 정렬 없이 읽음
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_test_phase_run_serial ON test_phase (run_id, serial, start_time)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_test_log_run_serial ON test_log (run_id, serial, start_time)")
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, definition: str):
+    """컬럼이 없을 때만 ALTER TABLE ADD COLUMN"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# (버전, 설명, 적용 함수) - 버전은 반드시 1씩 증가
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "기본 테이블 생성", _create_base_tables),
+    (2, "조회용 보조 인덱스 생성", _create_query_indexes),
+    (3, "엔드포인트 차원 테이블", _create_endpoint_dimension),
+    (4, "본문 압축 저장소", _create_body_store),
+    (5, "API 지표 시간별 롤업", _create_rollup_tables),
+    (6, "롤업 응답시간 스케치", _add_rollup_sketches),
+    (7, "응답시간 기준선/이상 감지", _create_anomaly_tables),
+    (8, "런별 API 집계 (회귀 비교)", _create_run_stats),
+    (9, "API 호출 시퀀스/n-gram 인덱스", _create_sequence_index),
+    (10, "런 진행 이벤트", _create_run_events),
+    (11, "TestRail 테스트케이스 카탈로그", _create_case_catalog),
+    (12, "런별 요약 (상태 카운트/시작·종료/실행시간)", _create_run_summary),
+    (13, "Parquet 아카이브 파티션 매니페스트", _create_archive_manifest),
+    (14, "케이스 단계 구간/단말별 타임라인 인덱스", _create_run_timeline),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """미적용 마이그레이션을 순서대로 적용하고 최종 스키마 버전을 반환"""
+    current = get_schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return current
+    if conn.in_transaction:
+        conn.commit()
+
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        # 다른 프로세스가 먼저 적용했을 수 있으므로 쓰기 락을 잡은 뒤 버전을 다시 확인
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.execute("COMMIT")
+                continue
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+            logger.info(f"DB 마이그레이션 적용: v{version} {description}")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        current = version
+    return current
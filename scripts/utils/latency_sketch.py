@@ -0,0 +1,135 @@
+"""
+응답시간 분위수 스케치 (DDSketch)
+값을 상대 오차(relative_accuracy) 이내의 로그 구간에 누적하여 메모리 사용량이 데이터 양과
+무관하게 유지되고, 같은 정확도의 스케치끼리는 구간별 카운트를 더하는 것만으로 병합됩니다.
+시간별 롤업에 직렬화(to_bytes)하여 저장하고, 임의 기간의 p95/p99 는 스케치 병합으로 계산합니다.
+
+참고: Masson et al., "DDSketch: A Fast and Fully-Mergeable Quantile Sketch with
+Relative-Error Guarantees" (VLDB 2019)
+"""
+
+import math
+import struct
+from typing import Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_INDEXABLE_VALUE = 1e-9      # 이하 값은 0 구간으로 집계
+
+_HEADER = struct.Struct("<BdQQddd I")
+_FORMAT_VERSION = 1
+
+
+class DDSketch:
+    """상대 오차가 보장되는 병합 가능한 분위수 스케치 (0 이상 값 전용)"""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy 는 0과 1 사이여야 합니다.")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # ------------------------------------------------------------------ 누적
+    def add(self, value: float, count: int = 1) -> None:
+        value = float(value)
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update(self, values: Iterable[float]) -> "DDSketch":
+        for value in values:
+            if value is not None:
+                self.add(value)
+        return self
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """다른 스케치를 이 스케치에 병합 (같은 정확도만 가능)"""
+        if other.count == 0:
+            return self
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("정확도가 다른 스케치는 병합할 수 없습니다.")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    # ------------------------------------------------------------------ 조회
+    @property
+    def avg(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """분위수 (q: 0~100), 비어 있으면 None"""
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def count_below(self, value: float) -> int:
+        """value 미만으로 추정되는 값의 개수 (구간 경계 기준 근사)"""
+        if value <= MIN_INDEXABLE_VALUE:
+            return 0
+        limit = math.ceil(math.log(value) / self._log_gamma)
+        return self.zero_count + sum(count for index, count in self.bins.items() if index < limit)
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        return {"p50": self.quantile(50), "p95": self.quantile(95), "p99": self.quantile(99)}
+
+    # ------------------------------------------------------------------ 직렬화
+    def to_bytes(self) -> bytes:
+        indexes = sorted(self.bins)
+        header = _HEADER.pack(
+            _FORMAT_VERSION, self.relative_accuracy, self.count, self.zero_count,
+            self.sum, self.min, self.max, len(indexes),
+        )
+        return (header
+                + struct.pack(f"<{len(indexes)}i", *indexes)
+                + struct.pack(f"<{len(indexes)}Q", *(self.bins[i] for i in indexes)))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DDSketch":
+        version, accuracy, count, zero_count, total, minimum, maximum, size = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스케치 형식입니다: v{version}")
+        sketch = cls(accuracy)
+        offset = _HEADER.size
+        indexes = struct.unpack_from(f"<{size}i", data, offset)
+        counts = struct.unpack_from(f"<{size}Q", data, offset + 4 * size)
+        sketch.bins = dict(zip(indexes, counts))
+        sketch.count, sketch.zero_count = count, zero_count
+        sketch.sum, sketch.min, sketch.max = total, minimum, maximum
+        return sketch
+
+
+def merge_sketches(blobs: Iterable[Optional[bytes]],
+                   relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> DDSketch:
+    """직렬화된 스케치들을 하나로 병합"""
+    merged = DDSketch(relative_accuracy)
+    for blob in blobs:
+        if blob:
+            merged.merge(DDSketch.from_bytes(blob))
+    return merged
@@ -10,6 +10,8 @@ import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from scripts.utils.latency_sketch import DDSketch
+
 logger = logging.getLogger(__name__)
 
 class LLMSummarizer:
@@ -95,18 +97,19 @@ class LLMSummarizer:
         if not api_data:
             return "분석할 API 데이터가 없습니다."
         
-        # API 성능 통계 계산
-        response_times = [float(item.get('elapsed', 0)) for item in api_data if item.get('elapsed')]
-        error_count = len([item for item in api_data if item.get('status_code', 200) >= 400])
+        # API 성능 통계 계산 (응답시간은 리스트 대신 스케치에 누적)
+        latency = DDSketch().update(float(item['elapsed']) for item in api_data if item.get('elapsed'))
+        error_count = sum(1 for item in api_data if item.get('status_code', 200) >= 400)
         
-        if not response_times:
+        if latency.count == 0:
             return "응답 시간 데이터가 없습니다."
         
         stats = {
             "total_requests": len(api_data),
-            "avg_response_time": sum(response_times) / len(response_times),
-            "max_response_time": max(response_times),
-            "min_response_time": min(response_times),
+            "avg_response_time": latency.avg,
+            "max_response_time": latency.max,
+            "min_response_time": latency.min,
+            **latency.percentiles(),
             "error_rate": (error_count / len(api_data)) * 100
         }
         
@@ -118,6 +121,7 @@ API 통계:
 - 평균 응답 시간: {stats['avg_response_time']:.3f}초
 - 최대 응답 시간: {stats['max_response_time']:.3f}초
 - 최소 응답 시간: {stats['min_response_time']:.3f}초
+- p95 / p99 응답 시간: {stats['p95']:.3f}초 / {stats['p99']:.3f}초
 - 오류율: {stats['error_rate']:.1f}%
 
 분석 요청사항:
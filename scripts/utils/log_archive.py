@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+test_log / test_api 컬럼형 아카이브 (Parquet)
+오래된 행을 날짜/런 단위 Parquet 파티션으로 옮기고 DB 에서 삭제하여 test_log.db 를 작게 유지합니다.
+
+- 파티션: <archive_dir>/<테이블>/day=YYYY-MM-DD/run=<run_id>/part-<최소 id>-<최대 id>.parquet
+  (archive_dir 기본값은 DB 파일 옆 archive/, 컬럼 타입은 DB 선언 타입 그대로)
+- test_log 는 런 단위로 옮김 (run_summary 종료 시각이 기준일 이전인 런 전체, run_id 없는 행은 시작 시각 기준)
+  -> 한 런은 DB 나 아카이브 중 한쪽에만 있고, run_summary 는 그대로 남아 런 목록/상세 요약은 계속 조회됨
+- test_api 는 created_at(UTC) 기준으로 행 단위로 옮기고, 남은 행이 참조하지 않는 본문(api_body)도 함께 옮김
+- 옮기기 전에 롤업/이상 감지/회귀 집계/시퀀스 인덱스를 먼저 갱신하므로 파생 테이블은 그대로 유지
+- archive_partition 매니페스트는 행 삭제와 같은 트랜잭션에서 기록 (매니페스트에 없는 파일은 다음 실행 때 정리)
+- 조회: ArchiveReader.read() 로 필요한 파티션만 읽거나, attach_archive() 로 분석용 연결에서
+  같은 이름의 TEMP VIEW(DB 행 + 아카이브 행)를 만들어 기존 SQL 을 그대로 사용
+- 파생 테이블 --rebuild 는 rebuild_source() 로 아카이브 행을 붙여 전체 이력을 다시 집계
+  (pyarrow 가 없으면 아카이브 구간 이력이 사라지므로 재집계를 거부)
+
+SQLite 저장소 전용이며 pyarrow 가 필요합니다.
+
+사용법:
+    python scripts/utils/log_archive.py --days 90
+    python scripts/utils/log_archive.py --days 90 --dry-run
+    python scripts/utils/log_archive.py --list
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.api_anomaly import refresh_anomalies
+from scripts.utils.api_body_store import BODY_TABLE, BodyStore
+from scripts.utils.api_regression import refresh_run_stats
+from scripts.utils.api_rollup import refresh_rollups
+from scripts.utils.api_sequence_index import refresh_sequences
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # 아카이브를 쓰지 않으면 불필요
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_TABLE = "archive_partition"
+ARCHIVE_DIR_NAME = "archive"
+DEFAULT_RETENTION_DAYS = 90
+DELETE_CHUNK = 500
+
+# 테이블 -> 파티션 날짜 컬럼
+ARCHIVED_TABLES = {
+    "test_log": "start_time",
+    "test_api": "created_at",
+}
+NO_RUN = "_none"
+
+# 분석기가 attach_archive() 로 붙이는 test_api 컬럼 (레거시 본문 컬럼 등은 읽지 않음)
+API_METRIC_COLUMNS = ("id", "test_case_id", "serial", "run_id", "url", "method", "status_code", "elapsed",
+                      "endpoint_id", "created_at")
+
+
+def default_archive_dir(db_path: str) -> str:
+    """DB 파일 옆 archive/ 디렉터리"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR_NAME)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet 아카이브에는 pyarrow 패키지가 필요합니다. (pip install pyarrow)")
+
+
+def table_schema(conn: sqlite3.Connection, table: str) -> "pa.Schema":
+    """DB 선언 타입 기준 Arrow 스키마 (파일마다 같은 스키마로 기록하여 파티션을 합쳐 읽을 수 있게 함)"""
+    fields = []
+    for _, name, declared, *_ in conn.execute(f"PRAGMA main.table_info({table})"):
+        declared = (declared or "").upper()
+        if "INT" in declared:
+            kind = pa.int64()
+        elif any(token in declared for token in ("REAL", "FLOA", "DOUB")):
+            kind = pa.float64()
+        elif "BLOB" in declared:
+            kind = pa.binary()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(name, kind))
+    return pa.schema(fields)
+
+
+def _coerce(values: List[Any], kind: "pa.DataType") -> List[Any]:
+    """SQLite 동적 타입 값을 선언 타입으로 맞춤 (변환할 수 없는 값은 None)"""
+    if pa.types.is_string(kind):
+        return [value if value is None or isinstance(value, str) else str(value) for value in values]
+    if pa.types.is_binary(kind):
+        return [value if value is None or isinstance(value, bytes) else bytes(value) if isinstance(value, (bytearray, memoryview)) else str(value).encode("utf-8") for value in values]
+    convert = int if pa.types.is_integer(kind) else float
+    coerced = []
+    for value in values:
+        try:
+            coerced.append(None if value is None else convert(value))
+        except (TypeError, ValueError):
+            coerced.append(None)
+    return coerced
+
+
+def _write_parquet(path: str, schema: "pa.Schema", rows: List[tuple]) -> None:
+    """임시 파일에 쓴 뒤 이름을 바꿔 완성된 파일만 보이게 함"""
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = [pa.array(_coerce(list(values), field.type), type=field.type) for values, field in zip(columns, schema)]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(pa.Table.from_arrays(arrays, schema=schema), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def _safe_component(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+# ---------------------------------------------------------------------------- 매니페스트
+
+
+def list_partitions(conn: sqlite3.Connection, table: str, since: Optional[str] = None, until: Optional[str] = None,
+                    run_id: Optional[str] = None) -> List[tuple]:
+    """조건에 걸치는 파티션 (path, day, run_id, row_count) - since/until 은 날짜 문자열, until 은 미포함"""
+    sql = f"SELECT path, day, run_id, row_count FROM {MANIFEST_TABLE} WHERE table_name = ?"
+    params: List[Any] = [table]
+    if since is not None:
+        sql += " AND day >= ?"
+        params.append(since[:10])
+    if until is not None:
+        sql += " AND day <= ?"
+        params.append(until[:10])
+    if run_id is not None:
+        sql += " AND run_id = ?"
+        params.append(str(run_id))
+    return conn.execute(sql + " ORDER BY day, id", params).fetchall()
+
+
+def has_archive(conn: sqlite3.Connection, table: Optional[str] = None) -> bool:
+    """아카이브된 파티션이 하나라도 있는지 (매니페스트 테이블이 없으면 False)"""
+    try:
+        if table is None:
+            row = conn.execute(f"SELECT 1 FROM {MANIFEST_TABLE} LIMIT 1").fetchone()
+        else:
+            row = conn.execute(f"SELECT 1 FROM {MANIFEST_TABLE} WHERE table_name = ? LIMIT 1", (table,)).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return row is not None
+
+
+# ---------------------------------------------------------------------------- 압축(이동)
+
+
+class LogArchiver:
+    """오래된 test_log / test_api 행을 Parquet 파티션으로 옮기는 압축 작업"""
+
+    def __init__(self, conn: sqlite3.Connection, archive_dir: str, dry_run: bool = False):
+        _require_pyarrow()
+        self.conn = conn
+        self.archive_dir = archive_dir
+        self.dry_run = dry_run
+        self.stats: Dict[str, int] = {"test_log": 0, "test_api": 0, "api_body": 0, "files": 0}
+
+    def run(self, days: int) -> Dict[str, int]:
+        self._remove_orphans()
+        if not self.dry_run:
+            self._refresh_derived()
+        local_cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d 00:00:00")
+        utc_cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d 00:00:00")
+        self._archive_test_log(local_cutoff)
+        self._archive_test_api(utc_cutoff)
+        if not self.dry_run and self.stats["test_api"]:
+            self._archive_bodies()
+        return self.stats
+
+    def _refresh_derived(self):
+        """옮길 행이 파생 테이블에 모두 반영되도록 워터마크 이후 행을 먼저 집계"""
+        for name, refresh in (("API 롤업", refresh_rollups), ("API 이상 감지", refresh_anomalies),
+                              ("런별 API 집계", refresh_run_stats), ("API 시퀀스 인덱스", refresh_sequences)):
+            refresh(self.conn)
+            logger.debug(f"{name} 갱신 완료")
+
+    # -------------------------------------------------------------- test_log
+    def _archive_test_log(self, cutoff: str):
+        schema = table_schema(self.conn, "test_log")
+        columns = ", ".join(schema.names)
+        # 종료 시각이 기준일 이전인 런은 런 전체를 옮김 (run_summary 는 러너가 유지하는 런별 한 행)
+        run_ids = [row[0] for row in self.conn.execute(
+            "SELECT run_id FROM run_summary WHERE end_time < ? ORDER BY start_time", (cutoff,))]
+        for run_id in run_ids:
+            rows = self.conn.execute(
+                f"SELECT {columns} FROM test_log WHERE run_id = ? ORDER BY start_time, id", (run_id,)).fetchall()
+            self._move_rows("test_log", schema, rows)
+        rows = self.conn.execute(
+            f"SELECT {columns} FROM test_log WHERE run_id IS NULL AND start_time < ? ORDER BY start_time, id",
+            (cutoff,)).fetchall()
+        self._move_rows("test_log", schema, rows)
+
+    # -------------------------------------------------------------- test_api
+    def _archive_test_api(self, cutoff: str):
+        schema = table_schema(self.conn, "test_api")
+        # 날짜 목록을 먼저 읽고 하루치씩 조회를 끝낸 뒤 옮김 (열린 SELECT 커서가 있는 테이블에서 DELETE 하지 않음,
+        # 메모리에는 하루치만 보관)
+        days = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT substr(created_at, 1, 10) FROM test_api WHERE created_at < ? ORDER BY 1", (cutoff,))]
+        for day in days:
+            next_day = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+            rows = self.conn.execute(f"""
+                SELECT {', '.join(schema.names)} FROM test_api
+                WHERE created_at >= ? AND created_at < ? ORDER BY created_at, id
+            """, (day, min(next_day, cutoff))).fetchall()
+            self._move_rows("test_api", schema, rows)
+
+    # -------------------------------------------------------------- 공통
+    def _partitions(self, table: str, schema: "pa.Schema", rows: List[tuple]) -> Dict[Tuple[str, Optional[str]], List[tuple]]:
+        time_index = schema.names.index(ARCHIVED_TABLES[table])
+        run_index = schema.names.index("run_id")
+        partitions: Dict[Tuple[str, Optional[str]], List[tuple]] = {}
+        for row in rows:
+            run_id = row[run_index]
+            key = ((row[time_index] or "")[:10] or "unknown", None if run_id is None else str(run_id))
+            partitions.setdefault(key, []).append(row)
+        return partitions
+
+    def _move_rows(self, table: str, schema: "pa.Schema", rows: List[tuple]):
+        """파티션 파일을 쓰고, 매니페스트 기록과 행 삭제를 한 트랜잭션으로 커밋"""
+        if not rows:
+            return
+        id_index = schema.names.index("id")
+        time_index = schema.names.index(ARCHIVED_TABLES[table])
+        manifest = []
+        for (day, run_id), part_rows in self._partitions(table, schema, rows).items():
+            ids = [row[id_index] for row in part_rows]
+            times = [row[time_index] for row in part_rows if row[time_index] is not None]
+            relative = os.path.join(table, f"day={day}", f"run={_safe_component(run_id or NO_RUN)}",
+                                    f"part-{min(ids)}-{max(ids)}.parquet")
+            if not self.dry_run:
+                _write_parquet(os.path.join(self.archive_dir, relative), schema, part_rows)
+            manifest.append((table, day, run_id, relative, len(part_rows), min(ids), max(ids),
+                             min(times, default=None), max(times, default=None), ids))
+        self.stats[table] += len(rows)
+        self.stats["files"] += len(manifest)
+        if self.dry_run:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for *entry, ids in manifest:
+                self.conn.execute(f"""
+                    INSERT OR REPLACE INTO {MANIFEST_TABLE}
+                        (table_name, day, run_id, path, row_count, min_id, max_id, min_time, max_time)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, entry)
+                for start in range(0, len(ids), DELETE_CHUNK):
+                    chunk = ids[start:start + DELETE_CHUNK]
+                    self.conn.execute(f"DELETE FROM {table} WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _archive_bodies(self):
+        """남은 test_api 행이 참조하지 않는 본문을 한 파일로 옮기고 삭제 (압축 사전은 DB 에 유지)"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            unreferenced = f"""
+                FROM {BODY_TABLE} WHERE hash NOT IN (
+                    SELECT request_body_hash FROM test_api WHERE request_body_hash IS NOT NULL
+                    UNION SELECT response_body_hash FROM test_api WHERE response_body_hash IS NOT NULL)
+            """
+            schema = table_schema(self.conn, BODY_TABLE)
+            rows = self.conn.execute(f"SELECT {', '.join(schema.names)} {unreferenced}").fetchall()
+            if rows:
+                day = datetime.now().strftime("%Y-%m-%d")
+                relative = os.path.join(BODY_TABLE, f"day={day}", f"part-{int(time.time() * 1000)}.parquet")
+                _write_parquet(os.path.join(self.archive_dir, relative), schema, rows)
+                self.conn.execute(f"""
+                    INSERT INTO {MANIFEST_TABLE} (table_name, day, run_id, path, row_count)
+                    VALUES (?, ?, NULL, ?, ?)
+                """, (BODY_TABLE, day, relative, len(rows)))
+                self.conn.execute(f"DELETE {unreferenced}")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.stats["api_body"] += len(rows)
+        self.stats["files"] += 1 if rows else 0
+
+    def _remove_orphans(self):
+        """이전 실행이 파일만 쓰고 커밋하지 못한 파일(매니페스트에 없는 파일) 정리"""
+        if not os.path.isdir(self.archive_dir):
+            return
+        known = {row[0] for row in self.conn.execute(f"SELECT path FROM {MANIFEST_TABLE}")}
+        for root, _, files in os.walk(self.archive_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.relpath(path, self.archive_dir) not in known and (name.endswith(".parquet") or name.endswith(".tmp")):
+                    if not self.dry_run:
+                        os.remove(path)
+                    logger.info(f"커밋되지 않은 아카이브 파일 정리: {path}")
+
+
+# ---------------------------------------------------------------------------- 조회
+
+
+class ArchiveReader:
+    """매니페스트로 필요한 파티션만 골라 읽는 아카이브 조회"""
+
+    def __init__(self, conn: sqlite3.Connection, archive_dir: str):
+        _require_pyarrow()
+        self.conn = conn
+        self.archive_dir = archive_dir
+
+    def files(self, table: str, since: Optional[str] = None, until: Optional[str] = None,
+              run_id: Optional[str] = None) -> List[str]:
+        return [os.path.join(self.archive_dir, path)
+                for path, *_ in list_partitions(self.conn, table, since, until, run_id)]
+
+    def read(self, table: str, columns: Optional[Sequence[str]] = None, since: Optional[str] = None,
+             until: Optional[str] = None, run_id: Optional[str] = None, filter=None) -> "pa.Table":
+        """아카이브 행을 Arrow 테이블로 읽음
+
+        since/until: 파티션 날짜 컬럼(test_log.start_time / test_api.created_at) 범위 (until 미포함)
+        filter: 추가 행 조건 (pyarrow.dataset 식, 예: ds.field("test_case_id") == "123")
+        """
+        schema = table_schema(self.conn, table)
+        files = self.files(table, since, until, run_id)
+        if not files:
+            return schema.empty_table().select(list(columns)) if columns else schema.empty_table()
+        condition = filter
+        time_column = ARCHIVED_TABLES.get(table)
+        for op, value in (("ge", since), ("lt", until)):
+            if value is None or time_column is None:
+                continue
+            term = ds.field(time_column) >= value if op == "ge" else ds.field(time_column) < value
+            condition = term if condition is None else condition & term
+        if run_id is not None:
+            term = ds.field("run_id") == str(run_id)
+            condition = term if condition is None else condition & term
+        dataset = ds.dataset(files, schema=schema, format="parquet")
+        return dataset.to_table(columns=list(columns) if columns else None, filter=condition)
+
+    def rows(self, table: str, columns: Sequence[str], **kwargs) -> List[Dict[str, Any]]:
+        return self.read(table, columns, **kwargs).to_pylist()
+
+    def bodies(self, digests: Sequence[str]) -> Dict[str, str]:
+        """아카이브로 옮긴 본문 조회 (DB 에 남은 본문은 BodyStore.get_many 사용)"""
+        wanted = [digest for digest in set(digests) if digest]
+        if not wanted:
+            return {}
+        table = self.read(BODY_TABLE, ["hash", "codec", "dict_id", "data"], filter=ds.field("hash").isin(wanted))
+        store = BodyStore(self.conn)
+        return {row["hash"]: store.decode(row["codec"], row["dict_id"], row["data"])
+                for row in table.to_pylist()}
+
+
+def attach_archive(conn: sqlite3.Connection, archive_dir: str, table: str, since: Optional[str] = None,
+                   until: Optional[str] = None, run_id: Optional[str] = None,
+                   equals: Optional[Dict[str, Any]] = None, columns: Optional[Sequence[str]] = None) -> int:
+    """분석용 연결에 아카이브 행을 붙여 기존 SQL 이 그대로 DB + 아카이브 행을 읽게 함
+
+    조건에 맞는 아카이브 행을 temp.<table>_archive 에 적재하고, 같은 이름의 TEMP VIEW <table>
+    (main.<table> UNION ALL temp.<table>_archive)를 만듦. 접두사 없는 테이블 이름은 temp 스키마를 먼저 찾으므로
+    이후 이 연결의 SELECT 는 아카이브 행을 포함함 (쓰기용 연결에는 사용 금지).
+    equals 는 컬럼 = 값 조건(예: {"test_case_id": "123"}), columns 를 지정하면 해당 컬럼만 읽고
+    나머지 아카이브 컬럼은 NULL. 붙인 행 수를 반환.
+    """
+    if not has_archive(conn, table):
+        return 0
+    if pa is None:
+        logger.warning(f"pyarrow 가 없어 {table} 아카이브 행을 제외하고 분석합니다.")
+        return 0
+    condition = None
+    for column, value in (equals or {}).items():
+        term = ds.field(column) == value
+        condition = term if condition is None else condition & term
+    archived = ArchiveReader(conn, archive_dir).read(table, columns, since=since, until=until, run_id=run_id,
+                                                     filter=condition)
+    detach_archive(conn, table)
+    conn.execute(f"CREATE TEMP TABLE {table}_archive AS SELECT * FROM main.{table} WHERE 0")
+    if archived.num_rows:
+        names = ", ".join(archived.column_names)
+        placeholders = ", ".join("?" * archived.num_columns)
+        for batch in archived.to_batches(max_chunksize=10000):
+            conn.executemany(f"INSERT INTO temp.{table}_archive ({names}) VALUES ({placeholders})",
+                             zip(*(column.to_pylist() for column in batch.columns)))
+    conn.execute(f"CREATE TEMP VIEW {table} AS SELECT * FROM main.{table} UNION ALL SELECT * FROM temp.{table}_archive")
+    return archived.num_rows
+
+
+def detach_archive(conn: sqlite3.Connection, table: str) -> None:
+    conn.execute(f"DROP VIEW IF EXISTS temp.{table}")
+    conn.execute(f"DROP TABLE IF EXISTS temp.{table}_archive")
+
+
+@contextlib.contextmanager
+def rebuild_source(conn: sqlite3.Connection, columns: Sequence[str], archive_dir: Optional[str] = None):
+    """파생 테이블 재집계(--rebuild) 동안 아카이브로 옮긴 test_api 행을 연결에 붙임
+
+    재집계는 워터마크를 0으로 돌려 test_api 전체를 다시 읽으므로, 아카이브 행을 붙이지 않으면
+    롤업/기준선/시퀀스에서 아카이브 구간 이력이 사라짐. columns 는 재집계가 읽는 컬럼 (id 포함),
+    archive_dir 기본값은 연결한 DB 파일 옆 archive/. pyarrow 가 없으면 RuntimeError.
+    """
+    if not has_archive(conn, "test_api"):
+        yield
+        return
+    if pa is None:
+        raise RuntimeError("아카이브된 test_api 행이 있어 pyarrow 없이 재집계하면 아카이브 구간 이력이 사라집니다. "
+                           "pyarrow 를 설치하거나 --rebuild 없이 워터마크 이후 행만 갱신하세요.")
+    if archive_dir is None:
+        db_file = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+        archive_dir = default_archive_dir(db_file)
+    attached = attach_archive(conn, archive_dir, "test_api", columns=columns)
+    # 재집계는 id 범위로 읽으므로 적재한 아카이브 행에도 id 인덱스
+    conn.execute("CREATE INDEX temp.idx_test_api_archive_id ON test_api_archive (id)")
+    if conn.in_transaction:
+        conn.commit()
+    logger.info(f"재집계에 아카이브 test_api {attached}행 포함")
+    try:
+        yield
+    finally:
+        detach_archive(conn, "test_api")
+
+
+# ---------------------------------------------------------------------------- CLI
+
+
+def archive_old_rows(db_path: str = DEFAULT_DB_PATH, days: int = DEFAULT_RETENTION_DAYS,
+                     archive_dir: Optional[str] = None, dry_run: bool = False) -> Dict[str, int]:
+    """days 일보다 오래된 행을 아카이브로 옮기고 옮긴 행/파일 수 반환"""
+    from scripts.utils.db_migrations import migrate
+
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        migrate(conn)
+        stats = LogArchiver(conn, archive_dir or default_archive_dir(db_path), dry_run).run(days)
+        if not dry_run and (stats["test_log"] or stats["test_api"]):
+            # 삭제한 페이지를 파일에서 반환 (WAL 체크포인트 후 VACUUM)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+        return stats
+    finally:
+        conn.close()
+
+
+def _print_partitions(db_path: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        if not has_archive(conn):
+            print("아카이브된 파티션이 없습니다.")
+            return
+        for table, files, rows, first_day, last_day in conn.execute(f"""
+            SELECT table_name, COUNT(*), SUM(row_count), MIN(day), MAX(day)
+            FROM {MANIFEST_TABLE} GROUP BY table_name ORDER BY table_name
+        """):
+            print(f"{table}: {rows}행, 파일 {files}개 ({first_day} ~ {last_day})")
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="오래된 test_log/test_api 행을 Parquet 아카이브로 이동")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="test_log.db 경로")
+    parser.add_argument("--archive-dir", help="아카이브 디렉터리 (기본: DB 파일 옆 archive/)")
+    parser.add_argument("--days", type=int, default=DEFAULT_RETENTION_DAYS, help="DB 에 남길 기간(일)")
+    parser.add_argument("--dry-run", action="store_true", help="옮길 행 수만 계산")
+    parser.add_argument("--list", action="store_true", help="아카이브 파티션 요약 출력")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.list:
+        _print_partitions(args.db)
+        return 0
+    started = time.perf_counter()
+    stats = archive_old_rows(args.db, args.days, args.archive_dir, args.dry_run)
+    action = "이동 예정" if args.dry_run else "이동 완료"
+    print(f"{action}: test_log {stats['test_log']}행, test_api {stats['test_api']}행, "
+          f"본문 {stats['api_body']}건, 파일 {stats['files']}개 ({time.perf_counter() - started:.1f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,13 +7,67 @@ API 호출 데이터를 검증하여 테스트 품질을 향상
 import sqlite3
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 import json
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+
+class APIPatternIndex:
+    """expected_apis 패턴을 한 번 컴파일한 결합 매처
+
+    패턴마다 선택적 lookahead 그룹 하나를 두는 정규식 하나로 결합하여
+    re.match 한 번으로 URL 에 매칭되는 모든 패턴을 구합니다 (패턴이 서로 겹쳐도 모두 검출).
+    캡처 그룹이나 역참조가 있는 패턴은 결합하지 않고 패턴별 re.search 로 매칭합니다.
+    같은 URL 의 분류 결과는 캐시하여 반복 호출된 URL 은 다시 매칭하지 않습니다.
+    """
+    
+    MAX_CACHED_URLS = 10000
+    
+    def __init__(self, patterns: Tuple[str, ...]):
+        self.patterns = patterns
+        # 개별 컴파일로 잘못된 패턴은 기존과 같이 re.error 로 알림
+        self._compiled = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        # 자체 캡처 그룹이 있는 패턴은 결합하면 역참조 번호가 어긋나므로 개별 매칭
+        self._combined_indices = [i for i, compiled in enumerate(self._compiled) if not compiled.groups]
+        self._separate_indices = [i for i, compiled in enumerate(self._compiled) if compiled.groups]
+        try:
+            self._combined = re.compile(
+                "".join(f"(?=.*?(?P<p{i}>{patterns[i]}))?" for i in self._combined_indices),
+                re.IGNORECASE | re.DOTALL,
+            ) if self._combined_indices else None
+        except re.error:
+            # 인라인 플래그 등으로 결합할 수 없으면 모두 개별 매칭으로 대체
+            self._combined = None
+            self._combined_indices = []
+            self._separate_indices = list(range(len(patterns)))
+        self._cache: Dict[str, Tuple[int, ...]] = {}
+    
+    def match(self, url: str) -> Tuple[int, ...]:
+        """url 에 매칭되는 패턴 인덱스 (매칭 없으면 빈 튜플)"""
+        matched = self._cache.get(url)
+        if matched is None:
+            found = [i for i in self._separate_indices if self._compiled[i].search(url)]
+            if self._combined is not None:
+                # 모든 lookahead 가 선택적이므로 match 는 항상 성공, 그룹 이름으로 패턴 인덱스를 읽음
+                combined = self._combined.match(url)
+                found.extend(i for i in self._combined_indices if combined.group(f"p{i}") is not None)
+            matched = tuple(sorted(found))
+            if len(self._cache) >= self.MAX_CACHED_URLS:
+                self._cache.clear()
+            self._cache[url] = matched
+        return matched
+
+
+@lru_cache(maxsize=64)
+def compile_pattern_index(patterns: Tuple[str, ...]) -> APIPatternIndex:
+    """같은 패턴 묶음(같은 검증 설정)은 프로세스 내에서 한 번만 컴파일"""
+    return APIPatternIndex(patterns)
+
+
 class MaestroAPIValidator:
     """Maestro API 검증 클래스 (JSON 설정 기반)"""
     
@@ -34,13 +88,16 @@ class MaestroAPIValidator:
                     'validation_results': {}
                 }
             
+            # 한 번의 순회로 예상 API별 매칭 호출, 예상하지 못한 호출, 성능 이슈를 분류
+            matches, unexpected_apis, performance_issues = self._classify_calls(expected_apis, api_calls)
+            
             # 각 예상 API에 대해 검증 수행
             validation_results = {}
             passed_count = 0
             failed_count = 0
             
-            for expected_api in expected_apis:
-                result = self._validate_single_api(expected_api, api_calls, test_case_id)
+            for expected_api, matching_calls in zip(expected_apis, matches):
+                result = self._evaluate_expected_api(expected_api, matching_calls)
                 validation_results[expected_api['name']] = result
                 
                 if result['status'] == 'PASS':
@@ -48,12 +105,6 @@ class MaestroAPIValidator:
                 else:
                     failed_count += 1
             
-            # 예상하지 못한 API 호출 찾기
-            unexpected_apis = self._find_unexpected_apis(expected_apis, api_calls)
-            
-            # 성능 이슈 체크
-            performance_issues = self._check_performance_issues(api_calls)
-            
             # 전체 상태 결정
             overall_status = 'PASS' if failed_count == 0 else 'FAIL'
             
@@ -102,28 +153,49 @@ class MaestroAPIValidator:
             logger.error(f"API 호출 데이터 조회 실패: {e}")
             return []
     
+    def _classify_calls(self, expected_apis: List[Dict[str, Any]], api_calls: List[tuple]
+                        ) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """API 호출을 한 번 순회하며 (예상 API별 매칭 호출, 예상하지 못한 호출, 성능 이슈)로 분류"""
+        index = compile_pattern_index(tuple(api.get('pattern', '') for api in expected_apis))
+        methods = [api.get('method', 'GET').upper() for api in expected_apis]
+        matches: List[List[Dict[str, Any]]] = [[] for _ in expected_apis]
+        unexpected = []
+        issues = []
+        
+        for url, call_method, status_code, elapsed, created_at in api_calls:
+            call = {
+                'url': url,
+                'method': call_method,
+                'status_code': status_code,
+                'elapsed': elapsed,
+                'created_at': created_at
+            }
+            matched = index.match(url or '')
+            if not matched:
+                # 예상 패턴과 매칭되지 않는 API 호출 (메서드 무관)
+                unexpected.append(call)
+            call_method = (call_method or '').upper()
+            for i in matched:
+                if methods[i] == call_method:
+                    matches[i].append(call)
+            
+            issue = self._performance_issue(call)
+            if issue:
+                issues.append(issue)
+        
+        return matches, unexpected, issues
+    
     def _validate_single_api(self, expected_api: Dict[str, Any], api_calls: List[tuple], test_case_id: str) -> Dict[str, Any]:
         """단일 API 검증"""
+        matches, _, _ = self._classify_calls([expected_api], api_calls)
+        return self._evaluate_expected_api(expected_api, matches[0])
+    
+    def _evaluate_expected_api(self, expected_api: Dict[str, Any], matching_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """예상 API에 매칭된 호출들로 검증 결과 결정"""
         pattern = expected_api.get('pattern', '')
-        method = expected_api.get('method', 'GET')
         expected_status = expected_api.get('expected_status', 200)
         required = expected_api.get('required', True)
         
-        # 패턴 매칭으로 API 호출 찾기
-        matching_calls = []
-        for call in api_calls:
-            url, call_method, status_code, elapsed, created_at = call
-            
-            if (re.search(pattern, url, re.IGNORECASE) and 
-                call_method.upper() == method.upper()):
-                matching_calls.append({
-                    'url': url,
-                    'method': call_method,
-                    'status_code': status_code,
-                    'elapsed': elapsed,
-                    'created_at': created_at
-                })
-        
         if not matching_calls:
             if required:
                 return {
@@ -153,7 +225,7 @@ class MaestroAPIValidator:
             }
         
         # 성능 검증 (선택적)
-        slow_calls = [call for call in matching_calls if call['elapsed'] > 5.0]  # 5초 이상
+        slow_calls = [call for call in matching_calls if (call['elapsed'] or 0) > 5.0]  # 5초 이상
         
         if slow_calls:
             return {
@@ -173,52 +245,48 @@ class MaestroAPIValidator:
     
     def _find_unexpected_apis(self, expected_apis: List[Dict[str, Any]], api_calls: List[tuple]) -> List[Dict[str, Any]]:
         """예상하지 못한 API 호출 찾기"""
-        expected_patterns = [api['pattern'] for api in expected_apis]
-        unexpected = []
-        
-        for call in api_calls:
-            url, method, status_code, elapsed, created_at = call
-            
-            # 예상 패턴과 매칭되지 않는 API 호출
-            is_expected = any(re.search(pattern, url, re.IGNORECASE) for pattern in expected_patterns)
-            
-            if not is_expected:
-                unexpected.append({
-                    'url': url,
-                    'method': method,
-                    'status_code': status_code,
-                    'elapsed': elapsed,
-                    'created_at': created_at
-                })
-        
+        _, unexpected, _ = self._classify_calls(expected_apis, api_calls)
         return unexpected
     
     def _check_performance_issues(self, api_calls: List[tuple]) -> List[Dict[str, Any]]:
         """성능 이슈 체크"""
         issues = []
         
-        for call in api_calls:
-            url, method, status_code, elapsed, created_at = call
-            
-            if elapsed > 10.0:  # 10초 이상
-                issues.append({
-                    'type': 'SLOW_RESPONSE',
-                    'url': url,
-                    'method': method,
-                    'elapsed': elapsed,
-                    'message': f'매우 느린 응답: {elapsed:.2f}초'
-                })
-            elif status_code >= 500:
-                issues.append({
-                    'type': 'SERVER_ERROR',
-                    'url': url,
-                    'method': method,
-                    'status_code': status_code,
-                    'message': f'서버 오류: {status_code}'
-                })
+        for url, method, status_code, elapsed, created_at in api_calls:
+            issue = self._performance_issue({
+                'url': url,
+                'method': method,
+                'status_code': status_code,
+                'elapsed': elapsed
+            })
+            if issue:
+                issues.append(issue)
         
         return issues
     
+    def _performance_issue(self, call: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """단일 호출의 성능 이슈 (없으면 None)"""
+        elapsed = call['elapsed']
+        status_code = call['status_code']
+        
+        if elapsed is not None and elapsed > 10.0:  # 10초 이상
+            return {
+                'type': 'SLOW_RESPONSE',
+                'url': call['url'],
+                'method': call['method'],
+                'elapsed': elapsed,
+                'message': f'매우 느린 응답: {elapsed:.2f}초'
+            }
+        if status_code is not None and status_code >= 500:
+            return {
+                'type': 'SERVER_ERROR',
+                'url': call['url'],
+                'method': call['method'],
+                'status_code': status_code,
+                'message': f'서버 오류: {status_code}'
+            }
+        return None
+    
     def generate_validation_report(self, validation_results: Dict[str, Any]) -> str:
         """검증 결과 리포트 생성"""
         report = []
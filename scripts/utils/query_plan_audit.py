@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+쿼리 플랜 감사 도구
+대시보드/러너/분석기가 사용하는 쿼리에 EXPLAIN QUERY PLAN을 실행하여
+test_log / test_api / run_summary 등을 전체 스캔하는 쿼리가 있으면 실패(exit 1)합니다.
+
+- 테이블 전체 스캔뿐 아니라 'SCAN ... USING (COVERING) INDEX' 전체 인덱스 스캔도 실패로 판정
+- 의도한 스캔(예: 인덱스 순서로 읽다가 LIMIT 에서 멈추는 키셋 페이지)은 KnownQuery.allowed_scans 에
+  테이블 이름을 명시해 허용
+
+사용법: python scripts/utils/query_plan_audit.py [--db artifacts/test_log.db]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.db_migrations import migrate
+from scripts.utils.log_storage import DEFAULT_DB_PATH
+
+AUDITED_TABLES = ("test_log", "test_api", "run_summary", "archive_partition", "test_phase", "testrail_case")
+
+
+@dataclass
+class KnownQuery:
+    """감사 대상 쿼리"""
+    name: str
+    sql: str
+    params: Tuple = ()
+    allowed_scans: Tuple[str, ...] = ()     # 의도적으로 스캔하는 테이블 (이유는 쿼리 옆 주석으로)
+
+
+@dataclass
+class AuditResult:
+    """쿼리별 감사 결과"""
+    query: KnownQuery
+    plan: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+    allowed: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.full_scans
+
+
+KNOWN_QUERIES: List[KnownQuery] = [
+    # --- qa_monitor.views.dashboard ---
+    KnownQuery("dashboard.recent_runs", """
+        SELECT run_id, total, passed, failed, start_time, end_time, elapsed_sum / NULLIF(elapsed_count, 0)
+        FROM run_summary
+        WHERE start_time >= ?
+        ORDER BY start_time DESC
+    """, ("2000-01-01 00:00:00",)),
+    # --- scripts.utils.testcase_catalog (TestRail 연결 불가 시 로컬 케이스) ---
+    KnownQuery("test_list.local_cases", """
+        SELECT test_case_id, MAX(step_name), MAX(start_time)
+        FROM test_log
+        WHERE test_case_id IS NOT NULL
+        GROUP BY test_case_id
+    """),
+    # --- qa_monitor.views.test_detail ---
+    KnownQuery("test_detail.history", """
+        SELECT run_id, status, start_time, end_time, elapsed, error_msg, serial, model
+        FROM test_log WHERE test_case_id = ? ORDER BY start_time DESC LIMIT 10
+    """, ("1",)),
+    KnownQuery("test_detail.stats", """
+        SELECT COUNT(*), AVG(elapsed), MAX(start_time) FROM test_log WHERE test_case_id = ?
+    """, ("1",)),
+    KnownQuery("test_detail.api_stats", """
+        SELECT COUNT(*), AVG(elapsed), COUNT(CASE WHEN status_code >= 400 THEN 1 END)
+        FROM test_api WHERE test_case_id = ?
+    """, ("1",)),
+    # --- qa_monitor.views.testrun_detail ---
+    KnownQuery("testrun_detail.summary", """
+        SELECT run_id, total, passed, failed, start_time, end_time, elapsed_sum / NULLIF(elapsed_count, 0), elapsed_sum
+        FROM run_summary WHERE run_id = ?
+    """, ("1",)),
+    # --- qa_monitor.live (시청 중인 런 요약 폴링) ---
+    KnownQuery("live.run_summaries", """
+        SELECT run_id, total, passed, failed, blocked, untested, retest FROM run_summary WHERE run_id IN (?, ?)
+    """, ("1", "2")),
+    KnownQuery("archive.run_archived", """
+        SELECT 1 FROM archive_partition WHERE table_name = ? AND run_id = ? LIMIT 1
+    """, ("test_log", "1")),
+    KnownQuery("log_archive.api_days", """
+        SELECT DISTINCT substr(created_at, 1, 10) FROM test_api WHERE created_at < ? ORDER BY 1
+    """, ("2000-01-01 00:00:00",)),
+    KnownQuery("log_archive.api_day_rows", """
+        SELECT * FROM test_api
+        WHERE created_at >= ? AND created_at < ? ORDER BY created_at, id
+    """, ("2000-01-01", "2000-01-02")),
+    KnownQuery("log_archive.list_partitions", """
+        SELECT path, day, run_id, row_count FROM archive_partition
+        WHERE table_name = ? AND day >= ? AND day <= ? ORDER BY day, id
+    """, ("test_api", "2025-01-01", "2025-12-31")),
+    KnownQuery("testrun_detail.devices", """
+        SELECT DISTINCT serial, model FROM test_log WHERE run_id = ? AND serial IS NOT NULL
+    """, ("1",)),
+    # --- qa_monitor.views.testrun_timeline_api ((run_id, serial, start_time) 인덱스 순서로 읽어 정렬 없음) ---
+    KnownQuery("testrun_timeline.cases", """
+        SELECT test_case_id, step_name, status, serial, model, start_time, end_time FROM test_log
+        WHERE run_id = ? ORDER BY serial, start_time
+    """, ("1",)),
+    KnownQuery("testrun_timeline.phases", """
+        SELECT run_id, test_case_id, serial, phase, start_time, end_time, elapsed FROM test_phase
+        WHERE run_id = ? ORDER BY serial, start_time
+    """, ("1",)),
+    # --- qa_monitor.views.testrun_testcases_api (키셋 페이지) ---
+    KnownQuery("testrun_testcases.page", """
+        SELECT id, test_case_id, step_name, status, start_time, elapsed, serial FROM test_log
+        WHERE run_id = ? AND status = ? AND (start_time, id) > (?, ?)
+        ORDER BY start_time ASC, id ASC LIMIT 51
+    """, ("1", "성공", "2000-01-01 00:00:00", 0)),
+    KnownQuery("testrun_testcases.api_stats", """
+        SELECT test_case_id, COUNT(*), AVG(elapsed) FROM test_api
+        WHERE run_id = ? AND test_case_id IN (?, ?) GROUP BY test_case_id
+    """, ("1", "1", "2")),
+    # --- qa_monitor.views.test_list_api (testrail_case 키셋 페이지 + 최근 실행) ---
+    KnownQuery("test_list.case_page", """
+        SELECT id, title,
+               (SELECT status FROM test_log WHERE test_log.test_case_id = CAST(testrail_case.id AS TEXT)
+                ORDER BY start_time DESC LIMIT 1) AS last_status
+        FROM testrail_case
+        WHERE automation_type = ? AND (updated_on, id) < (?, ?)
+        ORDER BY updated_on DESC, id DESC LIMIT 51
+    """, (2, 2000000000, 0)),
+    KnownQuery("test_list.case_serial", """
+        SELECT id FROM testrail_case
+        WHERE EXISTS (SELECT 1 FROM test_log
+                      WHERE test_log.test_case_id = CAST(testrail_case.id AS TEXT) AND serial = ?)
+        ORDER BY updated_on DESC, id DESC LIMIT 51
+    """, ("emulator-5554",),
+        # updated_on 인덱스 순서로 카탈로그를 읽다가 단말 실행 이력이 있는 51건에서 멈추는 키셋 페이지
+        allowed_scans=("testrail_case",)),
+    # --- qa_monitor.views.menu_api_calls_api (키셋 페이지) ---
+    KnownQuery("menu_api_calls.case_page", """
+        SELECT id, created_at, method, url, status_code, elapsed FROM test_api
+        WHERE test_case_id = ? AND (created_at, id) < (?, ?)
+        ORDER BY created_at DESC, id DESC LIMIT 51
+    """, ("1", "2100-01-01 00:00:00", 0)),
+    KnownQuery("menu_api_calls.page", """
+        SELECT id, created_at, method, url, status_code, elapsed FROM test_api
+        WHERE status_code >= 400 AND (created_at, id) < (?, ?)
+        ORDER BY created_at DESC, id DESC LIMIT 51
+    """, ("2100-01-01 00:00:00", 0)),
+    # --- scripts.core.test_runner ---
+    KnownQuery("runner.case_device_api_stats", """
+        SELECT COUNT(*), AVG(elapsed), SUM(CASE WHEN status_code >= 400 THEN 1 ELSE 0 END)
+        FROM test_api WHERE test_case_id = ? AND serial = ?
+    """, ("1", "emulator-5554")),
+    KnownQuery("runner.failed_apis", """
+        SELECT url, status_code, elapsed, response_body_hash FROM test_api
+        WHERE test_case_id = ? AND serial = ? AND status_code >= 400
+        ORDER BY id DESC LIMIT 5
+    """, ("1", "emulator-5554")),
+    # --- scripts.utils.api_rollup ---
+    KnownQuery("rollup.new_rows", """
+        SELECT strftime('%Y-%m-%d %H:00:00', created_at), endpoint_id, test_case_id, serial, status_code, elapsed
+        FROM test_api
+        WHERE id > ? AND id <= ? AND created_at IS NOT NULL
+    """, (0, 100)),
+    # --- scripts.utils.api_regression ---
+    KnownQuery("run_stats.new_rows", """
+        SELECT t.run_id, t.endpoint_id, t.test_case_id, t.tving_version, t.created_at, t.status_code, t.elapsed, b.size
+        FROM test_api t LEFT JOIN api_body b ON b.hash = t.response_body_hash
+        WHERE t.id > ? AND t.id <= ? AND t.run_id IS NOT NULL
+    """, (0, 100)),
+    # --- scripts.utils.api_alert_system (스트림 구독) ---
+    KnownQuery("alert_stream.seed_window", """
+        SELECT id, test_case_id, status_code, elapsed, created_at FROM test_api
+        WHERE created_at >= ? ORDER BY created_at
+    """, ("2000-01-01 00:00:00",)),
+    KnownQuery("alert_stream.new_rows", """
+        SELECT id, test_case_id, status_code, elapsed, created_at FROM test_api WHERE id > ? ORDER BY id
+    """, (0,)),
+    KnownQuery("alert_stream.new_anomalies", """
+        SELECT a.id, a.endpoint_id, a.test_case_id, a.value, a.baseline_mean, a.z_score, t.url
+        FROM api_anomaly a JOIN test_api t ON t.id = a.api_id WHERE a.id > ? ORDER BY a.id
+    """, (0,)),
+    # --- scripts.utils 분석기 ---
+    KnownQuery("analyzers.recent_window", """
+        SELECT url, method, status_code, elapsed, created_at FROM test_api
+        WHERE created_at > ? ORDER BY created_at DESC
+    """, ("2000-01-01 00:00:00",)),
+    KnownQuery("pattern_analyzer.aggregate", """
+        SELECT endpoint_id, method, status_code, CAST(strftime('%H', created_at) AS INTEGER) as hour,
+               COUNT(*), COUNT(elapsed), SUM(elapsed), MIN(elapsed), MAX(elapsed)
+        FROM test_api WHERE created_at > ? GROUP BY endpoint_id, method, status_code, hour
+    """, ("2000-01-01 00:00:00",)),
+    KnownQuery("pattern_analyzer.case_counts", """
+        SELECT test_case_id, COUNT(*) FROM test_api
+        WHERE created_at > ? AND test_case_id IS NOT NULL AND test_case_id != '' GROUP BY test_case_id
+    """, ("2000-01-01 00:00:00",)),
+    KnownQuery("pattern_analyzer.case_sequence", """
+        SELECT endpoint_id FROM test_api WHERE test_case_id = ? AND created_at > ?
+        ORDER BY created_at, id LIMIT 50
+    """, ("1", "2000-01-01 00:00:00")),
+    # --- scripts.utils.api_anomaly ---
+    KnownQuery("anomaly.new_rows", """
+        SELECT id, endpoint_id, test_case_id, run_id, elapsed, created_at FROM test_api
+        WHERE id > ? AND id <= ? AND elapsed IS NOT NULL ORDER BY id
+    """, (0, 100)),
+    KnownQuery("anomaly.recent", """
+        SELECT t.url, t.method, a.test_case_id, a.type, a.value, a.baseline_mean, a.baseline_std, a.z_score, a.created_at
+        FROM api_anomaly a JOIN test_api t ON t.id = a.api_id
+        WHERE a.created_at > ? ORDER BY a.z_score DESC LIMIT 100
+    """, ("2000-01-01 00:00:00",)),
+    # --- scripts.utils.api_sequence_index ---
+    KnownQuery("sequence.new_rows", """
+        SELECT run_id, test_case_id, serial, endpoint_id, tving_version, created_at FROM test_api
+        WHERE id > ? AND id <= ? ORDER BY id
+    """, (0, 100)),
+    KnownQuery("analyzers.case_window", """
+        SELECT url, method, status_code, elapsed, created_at FROM test_api
+        WHERE test_case_id = ? AND created_at > ? ORDER BY created_at DESC
+    """, ("1", "2000-01-01 00:00:00")),
+    KnownQuery("analyzers.case_calls", """
+        SELECT url, method, status_code, elapsed FROM test_api
+        WHERE test_case_id = ? ORDER BY created_at
+    """, ("1",)),
+]
+
+
+_SCAN_RE = re.compile(r"\bSCAN (?:TABLE )?(\w+)")
+
+
+def find_full_scans(plan: List[str], allowed: Sequence[str] = ()) -> List[str]:
+    """플랜 중 감사 대상 테이블을 스캔하는 단계 (사용하는 인덱스와 무관, allowed 테이블 제외)"""
+    scans = []
+    for detail in plan:
+        match = _SCAN_RE.search(detail)
+        if match and match.group(1) in AUDITED_TABLES and match.group(1) not in allowed:
+            scans.append(detail)
+    return scans
+
+
+def audit_queries(conn: sqlite3.Connection, queries: List[KnownQuery] = None) -> List[AuditResult]:
+    """모든 쿼리의 EXPLAIN QUERY PLAN을 수집하고 전체 스캔 여부를 판정"""
+    results = []
+    for query in queries or KNOWN_QUERIES:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", query.params).fetchall()
+        plan = [row[-1] for row in rows]
+        scans = find_full_scans(plan)
+        full_scans = find_full_scans(plan, query.allowed_scans)
+        results.append(AuditResult(query=query, plan=plan, full_scans=full_scans,
+                                   allowed=[detail for detail in scans if detail not in full_scans]))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="test_log.db 쿼리 플랜 감사")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH,
+                        help="감사할 DB 경로 (없으면 메모리 DB에 최신 스키마로 감사)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="통과한 쿼리의 플랜도 출력")
+    args = parser.parse_args()
+
+    db_path = args.db if os.path.exists(args.db) else ":memory:"
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+
+    results = audit_queries(conn)
+    conn.close()
+
+    failed = [r for r in results if not r.ok]
+    for result in results:
+        mark = "✅" if result.ok else "❌"
+        print(f"{mark} {result.query.name}{' (허용된 스캔: ' + ', '.join(result.query.allowed_scans) + ')' if result.allowed else ''}")
+        if args.verbose or not result.ok:
+            for detail in result.plan:
+                print(f"    {detail}")
+
+    print(f"\n총 {len(results)}개 쿼리 중 전체 스캔 {len(failed)}개 (DB: {db_path})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
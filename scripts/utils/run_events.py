@@ -0,0 +1,117 @@
+"""
+테스트런 진행 이벤트
+러너가 테스트케이스/단말 상태 전이와 API 카운터를 run_event 테이블에 기록하고,
+대시보드는 이벤트 id 이후의 증분만 읽어 브라우저로 푸시(SSE)합니다.
+
+- 기록은 log_step 과 같은 배치 Writer(testlog_db.log_run_event)로 처리되어 러너를 막지 않음
+- 이벤트는 삽입만 하므로 (run_id, id) 인덱스 범위 조회로 증분을 읽음
+- fold_run_events()로 이벤트를 접어 현재 상태 스냅샷을 만들고, 브라우저는 같은 규칙으로 증분을 적용
+"""
+
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+RUN_EVENT_TABLE = "run_event"
+
+# 이벤트 종류
+RUN_STARTED = "run_started"
+CASE_STARTED = "case_started"
+API_PROGRESS = "api_progress"        # 캡처 중 실시간 검증 애드온이 센 호출 수
+API_COUNTERS = "api_counters"        # 캡처 저장 후 test_api 기준 확정 카운터
+CASE_FINISHED = "case_finished"
+RUN_FINISHED = "run_finished"
+
+RUN_EVENT_COLUMNS = ("run_id", "event_type", "test_case_id", "serial", "status", "payload", "created_at")
+
+
+def make_run_event_record(run_id, event_type: str, test_case_id: Optional[str] = None, serial: Optional[str] = None,
+                          status: Optional[str] = None, payload: Optional[Dict[str, Any]] = None,
+                          created_at: Optional[str] = None) -> tuple:
+    """RUN_EVENT_COLUMNS 순서의 레코드 튜플 (payload 는 JSON 문자열로 저장)"""
+    return (
+        str(run_id) if run_id is not None else None,
+        event_type,
+        str(test_case_id) if test_case_id is not None else None,
+        serial,
+        status,
+        json.dumps(payload, ensure_ascii=False, default=str) if payload else None,
+        created_at,
+    )
+
+
+def _row_to_event(row: tuple) -> Dict[str, Any]:
+    event_id, run_id, event_type, test_case_id, serial, status, payload, created_at = row
+    return {
+        "id": event_id,
+        "run_id": run_id,
+        "type": event_type,
+        "test_case_id": test_case_id,
+        "serial": serial,
+        "status": status,
+        "payload": json.loads(payload) if payload else {},
+        "created_at": created_at,
+    }
+
+
+def fetch_run_events(conn: sqlite3.Connection, run_id: Optional[str] = None, after_id: int = 0,
+                     limit: int = 1000) -> List[Dict[str, Any]]:
+    """after_id 이후 이벤트 (run_id 를 주면 해당 런만)"""
+    if run_id is None:
+        rows = conn.execute(f"""
+            SELECT id, run_id, event_type, test_case_id, serial, status, payload, created_at
+            FROM {RUN_EVENT_TABLE} WHERE id > ? ORDER BY id LIMIT ?
+        """, (after_id, limit)).fetchall()
+    else:
+        rows = conn.execute(f"""
+            SELECT id, run_id, event_type, test_case_id, serial, status, payload, created_at
+            FROM {RUN_EVENT_TABLE} WHERE run_id = ? AND id > ? ORDER BY id LIMIT ?
+        """, (str(run_id), after_id, limit)).fetchall()
+    return [_row_to_event(row) for row in rows]
+
+
+def fold_run_events(events: Iterable[Dict[str, Any]], state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """이벤트를 순서대로 적용한 런 상태 (브라우저 쪽 증분 적용 규칙과 동일)"""
+    state = state or {"last_id": 0, "run": {}, "finished": False, "devices": {}}
+    for event in events:
+        state["last_id"] = max(state["last_id"], event["id"])
+        event_type, payload = event["type"], event["payload"]
+        if event_type == RUN_STARTED:
+            state["run"] = dict(payload, started_at=event["created_at"])
+        elif event_type == RUN_FINISHED:
+            state["finished"] = True
+            state["run"]["summary"] = payload
+        elif event["test_case_id"] is not None:
+            key = f"{event['test_case_id']}|{event['serial'] or ''}"
+            device = state["devices"].setdefault(key, {
+                "test_case_id": event["test_case_id"],
+                "serial": event["serial"],
+                "status": None,
+                "api_calls": 0,
+                "api_failed": 0,
+            })
+            if event_type == CASE_STARTED:
+                device.update(payload, status="실행 중", started_at=event["created_at"])
+            elif event_type == API_PROGRESS:
+                device["api_calls"] = payload.get("total_calls", device["api_calls"])
+                device["api_failed"] = len(payload.get("failures") or []) or device["api_failed"]
+            elif event_type == API_COUNTERS:
+                device["api_calls"] = payload.get("calls", device["api_calls"])
+                device["api_failed"] = payload.get("failed", device["api_failed"])
+                device["avg_response"] = payload.get("avg_response")
+            elif event_type == CASE_FINISHED:
+                device.update(payload, status=event["status"], finished_at=event["created_at"])
+    return state
+
+
+def build_run_snapshot(conn: sqlite3.Connection, run_id: str) -> Dict[str, Any]:
+    """런의 모든 이벤트를 접은 현재 상태"""
+    state = None
+    after_id = 0
+    while True:
+        events = fetch_run_events(conn, run_id, after_id)
+        if not events:
+            break
+        state = fold_run_events(events, state)
+        after_id = events[-1]["id"]
+    return state or fold_run_events([])
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+런 요약 테이블 (run_summary)
+런별 상태 카운트, 시작/종료 시각, 실행시간 합계를 한 행으로 유지합니다.
+
+- 배치 Writer 가 log_step 레코드를 test_log 에 저장하는 같은 트랜잭션에서 update_run_summary()로 갱신
+  (스풀 재적용으로 log_step 이 중복 저장되면 요약도 같이 중복 집계되어 test_log 와 항상 일치)
+- 대시보드 런 목록/상세와 실시간 진행 패널은 test_log 를 다시 집계하지 않고 run_id 기본키로 한 행만 읽음
+- UPSERT(ON CONFLICT DO UPDATE)만 사용하므로 SQLite 와 PostgreSQL 저장소에서 같은 SQL 로 동작
+- 기존 데이터 백필/불일치 복구는 rebuild_run_summary() (마이그레이션 v12, --rebuild)
+  (아카이브로 옮긴 런은 test_log 에 행이 없으므로 재집계 대상에서 빠지고 요약 행이 그대로 남음)
+
+사용법:
+    python scripts/utils/run_summary.py --rebuild
+    python scripts/utils/run_summary.py --run 1234
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+RUN_SUMMARY_TABLE = "run_summary"
+
+# 요약 컬럼 -> test_log.status 값 (대시보드 상태별 카운트와 같은 키)
+RUN_SUMMARY_STATUSES = {
+    "passed": "성공",
+    "failed": "실패",
+    "blocked": "차단",
+    "untested": "미테스트",
+    "retest": "재테스트",
+}
+_STATUS_COLUMNS = {status: column for column, status in RUN_SUMMARY_STATUSES.items()}
+
+_COUNTER_COLUMNS = ("total", *RUN_SUMMARY_STATUSES, "elapsed_sum", "elapsed_count")
+RUN_SUMMARY_COLUMNS = ("run_id", "total", *RUN_SUMMARY_STATUSES, "start_time", "end_time", "elapsed_sum", "elapsed_count")
+
+
+def _earlier(column: str) -> str:
+    return (f"CASE WHEN {RUN_SUMMARY_TABLE}.{column} IS NULL OR excluded.{column} < {RUN_SUMMARY_TABLE}.{column} "
+            f"THEN excluded.{column} ELSE {RUN_SUMMARY_TABLE}.{column} END")
+
+
+def _later(column: str) -> str:
+    return (f"CASE WHEN {RUN_SUMMARY_TABLE}.{column} IS NULL OR excluded.{column} > {RUN_SUMMARY_TABLE}.{column} "
+            f"THEN excluded.{column} ELSE {RUN_SUMMARY_TABLE}.{column} END")
+
+
+UPSERT_SQL = f"""
+    INSERT INTO {RUN_SUMMARY_TABLE} ({", ".join(RUN_SUMMARY_COLUMNS)})
+    VALUES ({", ".join("?" for _ in RUN_SUMMARY_COLUMNS)})
+    ON CONFLICT (run_id) DO UPDATE SET
+        {", ".join(f"{column} = {RUN_SUMMARY_TABLE}.{column} + excluded.{column}" for column in _COUNTER_COLUMNS)},
+        start_time = {_earlier("start_time")},
+        end_time = {_later("end_time")}
+"""
+
+# test_log 전체를 다시 집계하는 백필 (UPSERT 와 같은 규칙: 상태 카운트, MIN/MAX 시각, NULL 이 아닌 실행시간 합계).
+# test_log 에 행이 남아 있는 런만 덮어쓰므로, 행을 Parquet 아카이브로 옮긴 런(log_archive)의 요약은 유지됨
+REBUILD_SQL = f"""
+    INSERT INTO {RUN_SUMMARY_TABLE} ({", ".join(RUN_SUMMARY_COLUMNS)})
+    SELECT run_id, COUNT(*),
+           {", ".join("SUM(CASE WHEN status = ? THEN 1 ELSE 0 END)" for _ in RUN_SUMMARY_STATUSES)},
+           MIN(start_time), MAX(end_time), COALESCE(SUM(elapsed), 0), COUNT(elapsed)
+    FROM test_log
+    WHERE run_id IS NOT NULL
+    GROUP BY run_id
+    ON CONFLICT (run_id) DO UPDATE SET
+        {", ".join(f"{column} = excluded.{column}" for column in RUN_SUMMARY_COLUMNS[1:])}
+"""
+
+
+def summarize_steps(records: Iterable[Sequence[Any]]) -> List[tuple]:
+    """(run_id, status, start_time, end_time, elapsed) 레코드를 런별 UPSERT 행으로 합침 (run_id 없는 행 제외)"""
+    runs: Dict[str, Dict[str, Any]] = {}
+    for run_id, status, start_time, end_time, elapsed in records:
+        if run_id is None:
+            continue
+        summary = runs.get(run_id)
+        if summary is None:
+            summary = runs[run_id] = dict.fromkeys(_COUNTER_COLUMNS, 0)
+            summary.update(run_id=str(run_id), start_time=start_time, end_time=end_time)
+        summary["total"] += 1
+        column = _STATUS_COLUMNS.get(status)
+        if column is not None:
+            summary[column] += 1
+        if start_time is not None and (summary["start_time"] is None or start_time < summary["start_time"]):
+            summary["start_time"] = start_time
+        if end_time is not None and (summary["end_time"] is None or end_time > summary["end_time"]):
+            summary["end_time"] = end_time
+        if elapsed is not None:
+            summary["elapsed_sum"] += elapsed
+            summary["elapsed_count"] += 1
+    return [tuple(summary[column] for column in RUN_SUMMARY_COLUMNS) for summary in runs.values()]
+
+
+def update_run_summary(conn, records: Iterable[Sequence[Any]]) -> int:
+    """test_log 에 저장한 레코드만큼 run_summary 를 증분 갱신 (호출자의 트랜잭션 안에서 실행)"""
+    rows = summarize_steps(records)
+    if rows:
+        conn.executemany(UPSERT_SQL, rows)
+    return len(rows)
+
+
+def rebuild_run_summary(conn) -> int:
+    """run_summary 를 test_log 에서 다시 집계 (호출자의 트랜잭션 안에서 실행)"""
+    conn.execute(REBUILD_SQL, tuple(RUN_SUMMARY_STATUSES.values()))
+    return conn.execute(f"SELECT COUNT(*) FROM {RUN_SUMMARY_TABLE}").fetchone()[0]
+
+
+def fetch_run_summaries(conn, run_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """run_id 목록의 요약 {run_id: {...}} (기본키 조회)"""
+    run_ids = [str(run_id) for run_id in run_ids]
+    if not run_ids:
+        return {}
+    rows = conn.execute(f"""
+        SELECT {", ".join(RUN_SUMMARY_COLUMNS)} FROM {RUN_SUMMARY_TABLE}
+        WHERE run_id IN ({", ".join("?" for _ in run_ids)})
+    """, run_ids).fetchall()
+    summaries = {}
+    for row in rows:
+        summary = dict(zip(RUN_SUMMARY_COLUMNS, row))
+        summary["avg_elapsed"] = summary["elapsed_sum"] / summary["elapsed_count"] if summary["elapsed_count"] else None
+        summaries[summary["run_id"]] = summary
+    return summaries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # log_storage 가 PostgreSQL 스키마 백필에 이 모듈을 쓰므로 실행 시점에 import
+    from scripts.utils.log_storage import load_storage
+
+    parser = argparse.ArgumentParser(description="런 요약 테이블 재집계/조회")
+    parser.add_argument("--config", help="저장소 설정 파일 (기본 config/config.ini)")
+    parser.add_argument("--rebuild", action="store_true", help="test_log 에서 run_summary 를 다시 집계")
+    parser.add_argument("--run", action="append", default=[], help="요약을 출력할 run_id (반복 가능)")
+    args = parser.parse_args(argv)
+
+    storage = load_storage(args.config)
+    conn = storage.connect_ready()
+    try:
+        if args.rebuild:
+            with conn:
+                count = rebuild_run_summary(conn)
+            print(f"run_summary 재집계 완료: {count}개 런")
+        for run_id, summary in fetch_run_summaries(conn, args.run).items():
+            print(run_id, summary)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
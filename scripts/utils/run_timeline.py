@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+런 타임라인 (단말별 Gantt)
+런의 케이스 실행 구간(test_log)과 단계 구간(test_phase: 프록시/Maestro/스크린샷/API 캡처/업로드)을 단말별로 모으고,
+런 구간 중 케이스를 실행하지 않은 유휴 구간과 유휴 비율을 계산합니다. 단말 팜이 놀고 있는 구간을 찾는 용도입니다.
+
+- 러너는 log_step 과 같은 배치 Writer 로 단계 구간을 test_phase 에 기록 (testlog_db.log_phase)
+- 케이스/단계 모두 (run_id, serial, start_time) 인덱스 순서로 읽으므로 정렬 없이 단말별로 이어서 처리
+- 유휴 시간 = 런 구간(모든 단말의 첫 시작 ~ 마지막 종료) - 단말의 케이스 실행 구간 합집합
+  (런 시작 프록시 설정이나 케이스 사이 TestRail 업로드 구간은 유휴로 집계되고 단계 구간으로 원인을 표시)
+- 구간 시각은 런 시작 기준 초(offset)로도 내려주어 화면에서 바로 배치
+
+사용법:
+    python scripts/utils/run_timeline.py --run 1234
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+PHASE_TABLE = "test_phase"
+
+PHASE_PROXY = "proxy"              # 단말 프록시 설정 / 케이스별 mitmdump 시작
+PHASE_MAESTRO = "maestro"          # Maestro 플로우 실행
+PHASE_SCREENSHOT = "screenshot"    # 결과 스크린샷 저장
+PHASE_API_CAPTURE = "api_capture"  # mitmdump 종료 + API 덤프 분석/DB 저장
+PHASE_UPLOAD = "upload"            # TestRail 결과 업로드
+PHASES = (PHASE_PROXY, PHASE_MAESTRO, PHASE_SCREENSHOT, PHASE_API_CAPTURE, PHASE_UPLOAD)
+
+PHASE_COLUMNS = ("run_id", "test_case_id", "serial", "phase", "start_time", "end_time", "elapsed")
+CASE_FIELDS = ("test_case_id", "step_name", "status", "serial", "model", "start_time", "end_time")
+
+MIN_GAP_SECONDS = 1.0              # 이보다 짧은 케이스 사이 간격은 유휴 구간 목록에서 제외 (합계에는 포함)
+
+
+def parse_time(value) -> Optional[datetime]:
+    """'YYYY-MM-DD HH:MM:SS[.ffffff]' 문자열(또는 datetime)을 datetime 으로"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def merge_intervals(intervals: Iterable[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """겹치거나 맞닿은 구간을 합친 정렬된 구간 목록"""
+    merged: List[List[float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _span(row: Dict[str, Any], origin: datetime) -> Optional[Tuple[float, float]]:
+    start, end = parse_time(row.get("start_time")), parse_time(row.get("end_time"))
+    if start is None:
+        return None
+    offset = (start - origin).total_seconds()
+    return offset, max(offset, (end - origin).total_seconds() if end else offset)
+
+
+def build_timeline(cases: Sequence[Dict[str, Any]], phases: Sequence[Dict[str, Any]] = (),
+                   min_gap: float = MIN_GAP_SECONDS) -> Dict[str, Any]:
+    """케이스/단계 행(dict)으로 단말별 구간, 유휴 구간, 유휴 비율 계산
+
+    cases: CASE_FIELDS 키를 가진 test_log 행, phases: PHASE_COLUMNS 키를 가진 test_phase 행
+    """
+    times = [(start, parse_time(row.get("end_time")) or start)
+             for row in (*cases, *phases) if (start := parse_time(row.get("start_time")))]
+    if not times:
+        return {"start": None, "end": None, "span": 0.0, "devices": [], "summary": None}
+    origin, finish = min(start for start, _ in times), max(end for _, end in times)
+    span = (finish - origin).total_seconds()
+
+    devices: Dict[str, Dict[str, Any]] = {}
+
+    def device(serial, model=None):
+        item = devices.setdefault(serial, {"serial": serial, "model": model, "cases": [], "phases": []})
+        item["model"] = item["model"] or model
+        return item
+
+    for row in cases:
+        interval = _span(row, origin)
+        if interval is None or row.get("serial") is None:
+            continue
+        device(row["serial"], row.get("model"))["cases"].append({
+            "test_case_id": row["test_case_id"],
+            "title": row.get("step_name"),
+            "status": row.get("status"),
+            "offset": round(interval[0], 3),
+            "duration": round(interval[1] - interval[0], 3),
+        })
+    for row in phases:
+        interval = _span(row, origin)
+        if interval is None or row.get("serial") is None:
+            continue
+        device(row["serial"])["phases"].append({
+            "phase": row["phase"],
+            "test_case_id": row.get("test_case_id"),
+            "offset": round(interval[0], 3),
+            "duration": round(interval[1] - interval[0], 3),
+        })
+
+    total_busy = 0.0
+    for item in devices.values():
+        busy = merge_intervals((case["offset"], case["offset"] + case["duration"]) for case in item["cases"])
+        busy_seconds = sum(end - start for start, end in busy)
+        gaps = []
+        cursor = 0.0
+        for start, end in [*busy, (span, span)]:
+            if start - cursor >= min_gap:
+                gaps.append({"offset": round(cursor, 3), "duration": round(start - cursor, 3)})
+            cursor = max(cursor, end)
+        phase_totals: Dict[str, float] = {}
+        for phase in item["phases"]:
+            phase_totals[phase["phase"]] = round(phase_totals.get(phase["phase"], 0.0) + phase["duration"], 3)
+        item.update({
+            "busy": round(busy_seconds, 3),
+            "idle": round(span - busy_seconds, 3),
+            "idle_pct": round((span - busy_seconds) / span * 100, 1) if span > 0 else 0.0,
+            "gaps": gaps,
+            "phase_totals": phase_totals,
+        })
+        total_busy += busy_seconds
+
+    capacity = span * len(devices)
+    return {
+        "start": str(origin),
+        "end": str(finish),
+        "span": round(span, 3),
+        "devices": sorted(devices.values(), key=lambda item: item["serial"]),
+        "summary": {
+            "devices": len(devices),
+            "busy": round(total_busy, 3),
+            "idle": round(capacity - total_busy, 3),
+            "idle_pct": round((capacity - total_busy) / capacity * 100, 1) if capacity > 0 else 0.0,
+        },
+    }
+
+
+def fetch_run_timeline(conn, run_id: str, min_gap: float = MIN_GAP_SECONDS) -> Dict[str, Any]:
+    """저장소 연결에서 런의 케이스/단계 구간을 읽어 build_timeline 결과 반환 (SQLite/PostgreSQL 공통 SQL)"""
+    cases = [dict(zip(CASE_FIELDS, row)) for row in conn.execute(f"""
+        SELECT {', '.join(CASE_FIELDS)} FROM test_log
+        WHERE run_id = ? ORDER BY serial, start_time
+    """, (str(run_id),))]
+    phases = [dict(zip(PHASE_COLUMNS, row)) for row in conn.execute(f"""
+        SELECT {', '.join(PHASE_COLUMNS)} FROM {PHASE_TABLE}
+        WHERE run_id = ? ORDER BY serial, start_time
+    """, (str(run_id),))]
+    return build_timeline(cases, phases, min_gap)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from scripts.utils.log_storage import load_storage
+
+    parser = argparse.ArgumentParser(description="런의 단말별 실행/유휴 구간 요약")
+    parser.add_argument("--config", help="저장소 설정 파일 (기본 config/config.ini)")
+    parser.add_argument("--run", required=True, help="run_id")
+    parser.add_argument("--min-gap", type=float, default=MIN_GAP_SECONDS, help="표시할 최소 유휴 구간(초)")
+    args = parser.parse_args(argv)
+
+    conn = load_storage(args.config).connect_ready()
+    try:
+        timeline = fetch_run_timeline(conn, args.run, args.min_gap)
+    finally:
+        conn.close()
+    if not timeline["devices"]:
+        print(f"런 {args.run} 의 실행 기록이 없습니다.")
+        return 1
+    summary = timeline["summary"]
+    print(f"런 {args.run}: {timeline['start']} ~ {timeline['end']} ({timeline['span']:.0f}초), "
+          f"단말 {summary['devices']}대, 유휴 {summary['idle_pct']}%")
+    for item in timeline["devices"]:
+        phases = ", ".join(f"{name} {seconds:.0f}초" for name, seconds in item["phase_totals"].items())
+        print(f"  {item['serial']:20} 케이스 {len(item['cases']):4}개  실행 {item['busy']:8.0f}초  "
+              f"유휴 {item['idle']:8.0f}초 ({item['idle_pct']:5.1f}%)  유휴 구간 {len(item['gaps'])}개"
+              f"{'  [' + phases + ']' if phases else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,8 +19,8 @@ class SlackNotifier:
     """Slack 알림 시스템 클래스"""
     
     def __init__(self, webhook_url: Optional[str] = None):
-        self.webhook_url = webhook_url or self._get_webhook_url()
         self.logger = logging.getLogger("SlackNotifier")
+        self.webhook_url = webhook_url or self._get_webhook_url()
         
     def _get_webhook_url(self) -> str:
         """설정 파일에서 Slack Webhook URL 가져오기"""
@@ -173,6 +173,20 @@ class SlackNotifier:
             )
             return self.send_message(message)
         return True
+    
+    def send_api_performance_alert(self, alert_type: str, message_text: str, details: Dict[str, Any]) -> bool:
+        """API 모니터링 알림 (APIAlertSystem)"""
+        fields = [{"title": "유형", "value": alert_type, "short": True}]
+        fields.extend(
+            {"title": key, "value": f"{value:.3f}" if isinstance(value, float) else str(value), "short": True}
+            for key, value in details.items()
+        )
+        message = SlackMessage(
+            text=f"🚨 *API 모니터링 알림*\n• {message_text}",
+            attachments=[{"color": "danger", "fields": fields}],
+            icon_emoji=":rotating_light:"
+        )
+        return self.send_message(message)
 
 # 전역 인스턴스
 slack_notifier = SlackNotifier() 
\ No newline at end of file
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+합성 테스트 이력 생성기
+test_log / test_api / run_event / test_phase 에 실제 단말 팜과 비슷한 런 이력을 채워 대시보드/분석기의 규모 테스트에 사용합니다.
+
+- 플로우: maestro_flows 의 TC 플로우(케이스 ID/제목)를 쓰고 --flows 개가 될 때까지 합성 플로우로 채움
+- 런: 하루 --runs-per-day 회, 단말 팜(--devices 대)에서 4~8대를 골라 플로우를 나눠 순서대로 실행
+  (케이스 사이 준비/대기 시간 포함, 플로우별 기본 소요 시간과 실패율이 다름)
+- 단계 구간: 런 시작 프록시 설정, 케이스별 프록시/Maestro/스크린샷/API 캡처, 케이스 뒤 TestRail 업로드
+  (가끔 단말 재연결로 몇 분씩 쉬는 구간 포함 - 런 타임라인의 유휴 구간 확인용)
+- API: tving.com 엔드포인트 분포(호출 비중, 응답시간 중앙값, 오류율)에서 플로우마다 고정된 엔드포인트 묶음을 골라 호출
+  (앱 버전에 따라 일부 엔드포인트가 느려지는 구간 포함)
+- 런 요약/롤업/이상 감지/회귀 집계/시퀀스 인덱스와 TestRail 카탈로그까지 갱신하여 실제 DB 와 같은 상태로 만듦
+
+사용법:
+    python scripts/utils/synthetic_data.py --db artifacts/synthetic_test_log.db --days 365
+    python scripts/utils/synthetic_data.py --db /tmp/small.db --days 30 --runs-per-day 1 --calls-per-case 10
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.api_anomaly import refresh_anomalies
+from scripts.utils.api_endpoint import EndpointRegistry
+from scripts.utils.api_regression import refresh_run_stats
+from scripts.utils.api_rollup import refresh_rollups
+from scripts.utils.api_sequence_index import refresh_sequences
+from scripts.utils.db_migrations import migrate
+from scripts.utils.run_events import (API_COUNTERS, CASE_FINISHED, CASE_STARTED, RUN_EVENT_COLUMNS, RUN_FINISHED,
+                                      RUN_STARTED, make_run_event_record)
+from scripts.utils.run_summary import rebuild_run_summary
+from scripts.utils.run_timeline import (PHASE_API_CAPTURE, PHASE_COLUMNS, PHASE_MAESTRO, PHASE_PROXY, PHASE_SCREENSHOT,
+                                        PHASE_TABLE, PHASE_UPLOAD)
+from scripts.utils.testcase_catalog import MAESTRO, sync_cases
+
+FLOW_DIR = Path(__file__).resolve().parent.parent.parent / "maestro_flows"
+DEFAULT_FLOWS = 80
+FLUSH_ROWS = 50000
+FIRST_RUN_ID = 100000
+
+DEVICE_MODELS = (
+    ("SM-S928N", "14"), ("SM-S918N", "14"), ("SM-S908N", "13"), ("SM-G991N", "13"), ("SM-A546S", "14"),
+    ("SM-F946N", "14"), ("SM-A536N", "12"), ("Pixel 8", "14"), ("Pixel 6a", "13"), ("LM-V510N", "12"),
+)
+TVING_VERSIONS = ("8.9.0", "8.9.5", "9.0.0", "9.0.2", "9.1.0", "9.1.3", "9.2.0", "9.2.1", "9.3.0", "9.4.0",
+                  "9.4.2", "9.5.0")
+ERROR_MESSAGES = (
+    "Element not found: id=btn_play",
+    "Assertion is false: \"로그인\" is visible",
+    "Timeout waiting for screen: 홈",
+    "Maestro 실행 시간 초과",
+    "adb: device offline",
+    "API 검증 실패: 필수 API 미호출",
+)
+
+
+@dataclass(frozen=True)
+class EndpointProfile:
+    """합성 엔드포인트 (호출 비중, 응답시간 중앙값(초), 오류율)"""
+    method: str
+    host: str
+    path: str            # {code}/{id}/{hash} 는 호출마다 값으로 채움 (api_endpoint 템플릿 규칙에 맞는 세그먼트)
+    weight: float
+    median: float
+    error_rate: float
+
+
+ENDPOINT_PROFILES = (
+    EndpointProfile("GET", "image.tving.com", "/upload/cms/caip/CAIP0900/{code}/dims/resize/480", 25, 0.04, 0.002),
+    EndpointProfile("GET", "image.tving.com", "/ntgs/thumbnail/{hash}", 10, 0.05, 0.003),
+    EndpointProfile("GET", "api.tving.com", "/v2/media/contents/{code}", 12, 0.18, 0.01),
+    EndpointProfile("GET", "api.tving.com", "/v2/media/stream/info", 10, 0.32, 0.02),
+    EndpointProfile("GET", "api.tving.com", "/v2/media/bands", 9, 0.22, 0.01),
+    EndpointProfile("GET", "api.tving.com", "/v2/operator/highlights", 8, 0.15, 0.005),
+    EndpointProfile("GET", "api.tving.com", "/v2/media/episodes", 6, 0.20, 0.01),
+    EndpointProfile("POST", "api.tving.com", "/v2/media/playback/log", 5, 0.08, 0.005),
+    EndpointProfile("GET", "api.tving.com", "/v2/media/lives", 4, 0.25, 0.015),
+    EndpointProfile("GET", "api.tving.com", "/v1/user/profiles", 4, 0.12, 0.01),
+    EndpointProfile("GET", "api.tving.com", "/v3/search/contents", 3, 0.40, 0.02),
+    EndpointProfile("GET", "ad.tving.com", "/api/v1/ads", 3, 0.55, 0.05),
+    EndpointProfile("GET", "api.tving.com", "/v1/user/subscription", 2, 0.14, 0.01),
+    EndpointProfile("POST", "user.tving.com", "/pc/user/doLogin.tving", 1.5, 0.45, 0.03),
+    EndpointProfile("POST", "api.tving.com", "/v1/user/profiles/{id}", 1, 0.20, 0.02),
+    EndpointProfile("GET", "gateway.tving.com", "/v1/config/app", 1, 0.09, 0.002),
+)
+# 이 버전에서는 스트림 정보 API 가 느려짐 (회귀 비교/이상 감지 확인용)
+SLOW_VERSIONS = {"9.2.0": ("/v2/media/stream/info", 1.8), "9.4.0": ("/v3/search/contents", 2.5)}
+
+
+@dataclass
+class Flow:
+    """합성 플로우 (케이스 ID, 제목, 기본 소요 시간, 실패율, 호출 엔드포인트 묶음)"""
+    case_id: str
+    title: str
+    base_duration: float
+    flakiness: float
+    endpoints: Tuple[EndpointProfile, ...]
+    endpoint_weights: Tuple[float, ...]
+
+
+def load_flows(count: int = DEFAULT_FLOWS, rng: Optional[random.Random] = None) -> List[Flow]:
+    """maestro_flows 의 TC 플로우 + 합성 플로우 count 개"""
+    rng = rng or random.Random(0)
+    named: Dict[str, str] = {}
+    for path in sorted(FLOW_DIR.rglob("TC*.yaml")):
+        match = re.match(r"TC(\d+)_(.+)\.yaml$", path.name)
+        if match and match.group(1).strip("0"):
+            named.setdefault(match.group(1), match.group(2).replace("___", " - ").replace("_", " "))
+    cases = list(named.items())[:count]
+    next_id = max((int(case_id) for case_id, _ in cases), default=314900) + 1
+    while len(cases) < count:
+        cases.append((str(next_id), f"합성 플로우 {next_id}"))
+        next_id += 1
+
+    flows = []
+    for case_id, title in cases:
+        endpoints = tuple(rng.sample(ENDPOINT_PROFILES, rng.randint(4, 10)))
+        # 이미지 요청은 거의 모든 화면에서 발생
+        if ENDPOINT_PROFILES[0] not in endpoints:
+            endpoints += (ENDPOINT_PROFILES[0],)
+        flows.append(Flow(
+            case_id=case_id,
+            title=title,
+            base_duration=rng.uniform(20, 150),
+            flakiness=rng.choice((0.01, 0.02, 0.03, 0.05, 0.12)),
+            endpoints=endpoints,
+            endpoint_weights=tuple(profile.weight * rng.uniform(0.5, 1.5) for profile in endpoints),
+        ))
+    return flows
+
+
+def make_devices(count: int, rng: random.Random) -> List[Tuple[str, str, str]]:
+    """(serial, model, os_version) 단말 팜"""
+    devices = []
+    for index in range(count):
+        model, os_version = DEVICE_MODELS[index % len(DEVICE_MODELS)]
+        devices.append((f"R3C{rng.choice('NTRW')}{index:03d}{rng.randint(1000, 9999)}", model, os_version))
+    return devices
+
+
+def _fill_path(path: str, rng: random.Random) -> str:
+    # 해시는 a~f 로 시작 (숫자만인 세그먼트는 {id} 로 분류됨)
+    return (path.replace("{code}", f"{rng.choice('PEMC')}{rng.randint(1000000, 9999999):09d}")
+            .replace("{id}", str(rng.randint(1, 5000)))
+            .replace("{hash}", f"{rng.getrandbits(64) | 0xa << 60:016x}"))
+
+
+def _fmt(value: datetime) -> str:
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class HistoryGenerator:
+    """런 단위로 test_log / test_api / run_event / test_phase 행을 만들어 배치로 저장"""
+
+    def __init__(self, conn: sqlite3.Connection, flows: Sequence[Flow], devices: Sequence[Tuple[str, str, str]],
+                 calls_per_case: int, rng: random.Random):
+        self.conn = conn
+        self.flows = flows
+        self.devices = devices
+        self.calls_per_case = calls_per_case
+        self.rng = rng
+        self.endpoints = EndpointRegistry(conn)
+        self.log_rows: List[tuple] = []
+        self.api_rows: List[tuple] = []
+        self.event_rows: List[tuple] = []
+        self.phase_rows: List[tuple] = []
+        self.counts = {"runs": 0, "test_log": 0, "test_api": 0, "run_event": 0, "test_phase": 0}
+        # test_api.created_at 은 UTC (SQLite CURRENT_TIMESTAMP), test_log 시각은 로컬 시각
+        self.utc_offset = timedelta(seconds=time.altzone if time.daylight else time.timezone)
+
+    def add_run(self, run_id: str, started: datetime, tving_version: str):
+        rng = self.rng
+        devices = rng.sample(self.devices, rng.randint(min(4, len(self.devices)), min(8, len(self.devices))))
+        flows = list(self.flows)
+        rng.shuffle(flows)
+        statuses = {"성공": 0, "실패": 0}
+        self.event_rows.append(make_run_event_record(
+            run_id, RUN_STARTED, payload={"devices": len(devices), "cases": len(flows), "tving_version": tving_version},
+            created_at=_fmt(started + self.utc_offset)))
+        finished = started
+        for index, (serial, model, os_version) in enumerate(devices):
+            clock = started + timedelta(seconds=rng.uniform(5, 60))    # 단말 준비(설치/프록시 설정)
+            self._add_phase(run_id, None, serial, PHASE_PROXY, clock - timedelta(seconds=1), 1.0)
+            for flow in flows[index::len(devices)]:
+                clock += timedelta(seconds=rng.expovariate(1 / 8))     # 케이스 사이 대기
+                if rng.random() < 0.02:
+                    clock += timedelta(seconds=rng.uniform(120, 600))  # 단말 재연결
+                clock = self._add_case(run_id, flow, serial, model, os_version, tving_version, clock, statuses)
+                upload = rng.uniform(0.5, 4)
+                self._add_phase(run_id, flow.case_id, serial, PHASE_UPLOAD, clock, upload)
+                clock += timedelta(seconds=upload)
+            finished = max(finished, clock)
+        self.event_rows.append(make_run_event_record(run_id, RUN_FINISHED, payload=statuses,
+                                                     created_at=_fmt(finished + self.utc_offset)))
+        self.counts["runs"] += 1
+        if len(self.api_rows) >= FLUSH_ROWS:
+            self.flush()
+
+    def _add_case(self, run_id, flow: Flow, serial, model, os_version, tving_version, clock: datetime,
+                  statuses: Dict[str, int]) -> datetime:
+        rng = self.rng
+        elapsed = flow.base_duration * rng.lognormvariate(0, 0.25)
+        roll = rng.random()
+        if roll < flow.flakiness:
+            status, error_msg = "실패", rng.choice(ERROR_MESSAGES)
+            elapsed *= rng.uniform(0.3, 1.0)
+        elif roll < flow.flakiness + 0.01:
+            status, error_msg = "차단", "사전 조건 미충족"
+            elapsed = rng.uniform(1, 5)
+        else:
+            status, error_msg = "성공", None
+        end = clock + timedelta(seconds=elapsed)
+        statuses[status] = statuses.get(status, 0) + 1
+        self.log_rows.append((flow.case_id, flow.title, _fmt(clock), _fmt(end), round(elapsed, 3), status, error_msg,
+                              serial, model, os_version, tving_version, run_id))
+        self.event_rows.append(make_run_event_record(run_id, CASE_STARTED, flow.case_id, serial,
+                                                     payload={"title": flow.title},
+                                                     created_at=_fmt(clock + self.utc_offset)))
+
+        calls = 0
+        maestro_start, maestro = 0.0, elapsed
+        if status != "차단":
+            calls = max(1, int(rng.gauss(self.calls_per_case, self.calls_per_case / 4)))
+            proxy, screenshot, capture = rng.uniform(2, 2.5), rng.uniform(1, 4), rng.uniform(3, 12)
+            maestro_start, maestro = proxy, max(1.0, elapsed - proxy - screenshot - capture)
+            for phase, offset, duration in ((PHASE_PROXY, 0.0, proxy), (PHASE_MAESTRO, proxy, maestro),
+                                            (PHASE_SCREENSHOT, proxy + maestro, screenshot),
+                                            (PHASE_API_CAPTURE, proxy + maestro + screenshot, capture)):
+                self._add_phase(run_id, flow.case_id, serial, phase, clock + timedelta(seconds=offset),
+                                min(duration, max(0.0, elapsed - offset)))
+        slow_path, slow_factor = SLOW_VERSIONS.get(tving_version, (None, 1.0))
+        failed = 0
+        elapsed_sum = 0.0
+        profiles = rng.choices(flow.endpoints, flow.endpoint_weights, k=calls)
+        offsets = sorted(rng.uniform(maestro_start, maestro_start + maestro) for _ in range(calls))
+        for profile, offset in zip(profiles, offsets):
+            url = f"https://{profile.host}{_fill_path(profile.path, rng)}"
+            response_time = profile.median * rng.lognormvariate(0, 0.5) * (slow_factor if profile.path == slow_path else 1.0)
+            if rng.random() < 0.01:
+                response_time *= rng.uniform(3, 8)                      # 느린 꼬리
+            status_code = 200
+            if rng.random() < profile.error_rate * (4 if status == "실패" else 1):
+                status_code = rng.choice((400, 401, 404, 500, 502, 503))
+                failed += 1
+            elapsed_sum += response_time
+            self.api_rows.append((flow.case_id, serial, model, os_version, tving_version,
+                                  clock.strftime('%Y%m%d_%H%M%S'), url, profile.method, status_code,
+                                  round(response_time, 4), run_id, self.endpoints.get_id(url, profile.method),
+                                  _fmt(clock + timedelta(seconds=offset) + self.utc_offset)))
+        if calls:
+            self.event_rows.append(make_run_event_record(
+                run_id, API_COUNTERS, flow.case_id, serial,
+                payload={"calls": calls, "failed": failed, "avg_response": round(elapsed_sum / calls, 4)},
+                created_at=_fmt(end + self.utc_offset)))
+        self.event_rows.append(make_run_event_record(run_id, CASE_FINISHED, flow.case_id, serial, status,
+                                                     payload={"elapsed": round(elapsed, 3)},
+                                                     created_at=_fmt(end + self.utc_offset)))
+        return end
+
+    def _add_phase(self, run_id, case_id, serial, phase: str, start: datetime, duration: float):
+        self.phase_rows.append((run_id, case_id, serial, phase, _fmt(start),
+                                _fmt(start + timedelta(seconds=duration)), round(duration, 3)))
+
+    def flush(self):
+        self.conn.executemany("""
+            INSERT INTO test_log (test_case_id, step_name, start_time, end_time, elapsed, status, error_msg,
+                                  serial, model, os_version, tving_version, run_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, self.log_rows)
+        self.conn.executemany("""
+            INSERT INTO test_api (test_case_id, serial, model, os_version, tving_version, timestamp, url, method,
+                                  status_code, elapsed, run_id, endpoint_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, self.api_rows)
+        self.conn.executemany(
+            f"INSERT INTO run_event ({', '.join(RUN_EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_EVENT_COLUMNS))})",
+            self.event_rows)
+        self.conn.executemany(
+            f"INSERT INTO {PHASE_TABLE} ({', '.join(PHASE_COLUMNS)}) VALUES ({', '.join('?' * len(PHASE_COLUMNS))})",
+            self.phase_rows)
+        self.conn.commit()
+        self.counts["test_log"] += len(self.log_rows)
+        self.counts["test_api"] += len(self.api_rows)
+        self.counts["run_event"] += len(self.event_rows)
+        self.counts["test_phase"] += len(self.phase_rows)
+        self.log_rows, self.api_rows, self.event_rows, self.phase_rows = [], [], [], []
+
+
+def generate_history(conn: sqlite3.Connection, days: int = 365, runs_per_day: int = 2, devices: int = 12,
+                     flows: int = DEFAULT_FLOWS, calls_per_case: int = 25, seed: int = 42,
+                     end: Optional[datetime] = None, derived: bool = True, progress: bool = False) -> Dict[str, int]:
+    """최근 days 일 동안의 합성 런 이력을 저장하고 저장한 행 수 반환 (migrate 된 연결)"""
+    rng = random.Random(seed)
+    flow_list = load_flows(flows, rng)
+    generator = HistoryGenerator(conn, flow_list, make_devices(devices, rng), calls_per_case, rng)
+    end = (end or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = end - timedelta(days=days)
+    run_id = (conn.execute("SELECT MAX(CAST(run_id AS INTEGER)) FROM run_summary").fetchone()[0] or FIRST_RUN_ID - 1) + 1
+    for day in range(days):
+        date = first_day + timedelta(days=day)
+        # 앱 버전은 기간 동안 순서대로 올라감
+        tving_version = TVING_VERSIONS[min(len(TVING_VERSIONS) - 1, day * len(TVING_VERSIONS) // max(days, 1))]
+        for slot in range(runs_per_day):
+            started = date + timedelta(hours=9 + slot * 14 / max(runs_per_day, 1), minutes=rng.randint(0, 40))
+            generator.add_run(str(run_id), started, tving_version)
+            run_id += 1
+        if progress and (day + 1) % 30 == 0:
+            print(f"  {day + 1}/{days}일 생성 (test_api {generator.counts['test_api'] + len(generator.api_rows):,}행)")
+    generator.flush()
+
+    rebuild_run_summary(conn)
+    conn.commit()
+    # 카탈로그를 막 동기화한 상태로 두어 대시보드가 TestRail 을 호출하지 않게 함
+    sync_cases(conn, [{"id": int(flow.case_id), "title": flow.title, "custom_automation_type": MAESTRO,
+                       "created_on": int(first_day.timestamp()), "updated_on": int(end.timestamp())}
+                      for flow in flow_list], "testrail")
+    if derived:
+        for name, refresh in (("API 롤업", refresh_rollups), ("API 이상 감지", refresh_anomalies),
+                              ("런별 API 집계", refresh_run_stats), ("API 시퀀스 인덱스", refresh_sequences)):
+            started = time.perf_counter()
+            refresh(conn)
+            if progress:
+                print(f"  {name} 갱신 {time.perf_counter() - started:.1f}초")
+    return generator.counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="합성 테스트 이력(test_log/test_api/run_event) 생성")
+    parser.add_argument("--db", default="artifacts/synthetic_test_log.db", help="생성할 DB 경로")
+    parser.add_argument("--days", type=int, default=365, help="이력 기간(일)")
+    parser.add_argument("--runs-per-day", type=int, default=2, help="하루 런 수")
+    parser.add_argument("--devices", type=int, default=12, help="단말 팜 크기")
+    parser.add_argument("--flows", type=int, default=DEFAULT_FLOWS, help="플로우(테스트케이스) 수")
+    parser.add_argument("--calls-per-case", type=int, default=25, help="케이스당 평균 API 호출 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-derived", action="store_true", help="롤업/이상 감지/회귀/시퀀스 갱신 생략")
+    parser.add_argument("--append", action="store_true", help="이미 데이터가 있는 DB 에 이어서 생성")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    conn = sqlite3.connect(args.db)
+    try:
+        migrate(conn)
+        if not args.append and conn.execute("SELECT 1 FROM test_log LIMIT 1").fetchone():
+            print(f"{args.db} 에 이미 test_log 데이터가 있습니다. (이어서 생성하려면 --append)")
+            return 1
+        conn.execute("PRAGMA journal_mode=WAL")
+        started = time.perf_counter()
+        print(f"합성 이력 생성: {args.days}일 x 하루 {args.runs_per_day}런, 단말 {args.devices}대, 플로우 {args.flows}개")
+        counts = generate_history(conn, args.days, args.runs_per_day, args.devices, args.flows, args.calls_per_case,
+                                  args.seed, derived=not args.skip_derived, progress=True)
+        print(f"완료: 런 {counts['runs']:,}개, test_log {counts['test_log']:,}행, test_api {counts['test_api']:,}행, "
+              f"run_event {counts['run_event']:,}행, test_phase {counts['test_phase']:,}행 "
+              f"({time.perf_counter() - started:.1f}초) -> {args.db}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+TestRail 테스트케이스 로컬 카탈로그
+TestRail 에서 받은 케이스 목록을 test_log.db 의 testrail_case 테이블에 보관하여
+대시보드가 매 요청마다 전체 케이스를 받아 파이썬에서 필터/정렬하지 않고
+인덱스(updated_on, automation_type) 위에서 키셋 페이지 조회를 하도록 합니다.
+
+- TestRail 동기화는 SYNC_TTL 초마다 한 번 (케이스 전체를 한 트랜잭션에서 교체)
+- TestRail 에 연결할 수 없으면 test_log 에 기록된 케이스로 카탈로그를 채움 (source='local')
+"""
+
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CASE_TABLE = "testrail_case"
+SYNC_TTL = 600                  # TestRail 재동기화 간격(초)
+
+# custom_automation_type 값
+MANUAL = 0
+AUTOMATED = 1
+MAESTRO = 2
+AUTOMATION_LABELS = {MANUAL: "수동", AUTOMATED: "자동화", MAESTRO: "Maestro"}
+# 목록 화면 필터 값 -> automation_type ('automated' 는 기존 화면과 같이 Maestro 로 취급)
+AUTOMATION_FILTERS = {"maestro": MAESTRO, "automated": MAESTRO, "manual": MANUAL}
+
+
+def _to_epoch(value) -> int:
+    """TestRail 의 epoch 정수 또는 test_log 의 시간 문자열을 epoch 초로 변환"""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value)).timestamp())
+    except ValueError:
+        return 0
+
+
+def _case_row(case: Dict, source: str, synced_at: float) -> tuple:
+    created_on = _to_epoch(case.get("created_on"))
+    return (
+        int(case["id"]),
+        case.get("title") or "",
+        case.get("custom_automation_type") or MANUAL,
+        case.get("priority_id"),
+        case.get("section_id"),
+        created_on,
+        _to_epoch(case.get("updated_on")) or created_on,
+        source,
+        synced_at,
+    )
+
+
+def replace_cases(conn: sqlite3.Connection, cases: Iterable[Dict], source: str = "testrail") -> int:
+    """카탈로그를 cases 로 교체 (트랜잭션은 호출자가 관리), 저장한 케이스 수 반환"""
+    synced_at = time.time()
+    # 같은 id 가 여러 번 오면 마지막 값 사용 (SQLite/PostgreSQL 공통 INSERT 로 저장)
+    rows = list({row[0]: row for row in (
+        _case_row(case, source, synced_at) for case in cases if case.get("id") is not None
+    )}.values())
+    conn.execute(f"DELETE FROM {CASE_TABLE}")
+    conn.executemany(f"""
+        INSERT INTO {CASE_TABLE}
+            (id, title, automation_type, priority_id, section_id, created_on, updated_on, source, synced_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    return len(rows)
+
+
+def sync_cases(conn: sqlite3.Connection, cases: Iterable[Dict], source: str = "testrail") -> int:
+    """replace_cases 를 자체 쓰기 트랜잭션에서 실행"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        count = replace_cases(conn, cases, source)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    logger.info(f"테스트케이스 카탈로그 동기화: {count}건 ({source})")
+    return count
+
+
+def local_cases(conn: sqlite3.Connection) -> List[Dict]:
+    """test_log 에 기록된 케이스를 TestRail 케이스 형식으로 (TestRail 연결 불가 시 대체)"""
+    rows = conn.execute("""
+        SELECT test_case_id, MAX(step_name), MAX(start_time)
+        FROM test_log
+        WHERE test_case_id IS NOT NULL
+        GROUP BY test_case_id
+    """).fetchall()
+    return [{
+        "id": test_case_id,
+        "title": f"TC{test_case_id} - {step_name}",
+        "custom_automation_type": MAESTRO,
+        "priority_id": 1,
+        "section_id": 1,
+        "created_on": start_time,
+        "updated_on": start_time,
+    } for test_case_id, step_name, start_time in rows if str(test_case_id).isdigit()]
+
+
+def catalog_state(conn: sqlite3.Connection) -> Optional[Dict]:
+    """마지막 동기화 시각과 출처 (카탈로그가 비어 있으면 None)"""
+    row = conn.execute(f"SELECT synced_at, source FROM {CASE_TABLE} ORDER BY synced_at DESC LIMIT 1").fetchone()
+    return {"synced_at": row[0], "source": row[1]} if row else None
+
+
+def is_stale(conn: sqlite3.Connection, ttl: float = SYNC_TTL) -> bool:
+    state = catalog_state(conn)
+    return state is None or time.time() - state["synced_at"] >= ttl
+
+
+def automation_counts(conn: sqlite3.Connection) -> Dict[int, int]:
+    """automation_type 별 케이스 수"""
+    return dict(conn.execute(f"""
+        SELECT automation_type, COUNT(*) FROM {CASE_TABLE} GROUP BY automation_type
+    """).fetchall())
+
+
+def format_epoch(value: Optional[int]) -> Optional[str]:
+    return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M") if value else None
@@ -1,35 +1,32 @@
-import sqlite3
+import os
+import sys
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
-DB_PATH = "artifacts/test_log.db"
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from scripts.utils.log_storage import DEFAULT_DB_PATH, resolve_storage
+from scripts.utils.run_events import RUN_EVENT_COLUMNS, RUN_EVENT_TABLE, make_run_event_record
+from scripts.utils.run_summary import update_run_summary
+from scripts.utils.run_timeline import PHASE_COLUMNS, PHASE_TABLE
+from scripts.utils.testlog_writer import get_batched_writer, flush_all_writers
 
-def get_db_connection(db_path: str = DB_PATH):
+# db_path 를 지정하지 않으면 config.ini [Storage] 에서 선택한 저장소 사용
+DB_PATH = DEFAULT_DB_PATH
+
+LOG_STEP_COLUMNS = (
+    "test_case_id", "step_name", "start_time", "end_time", "elapsed", "status", "error_msg",
+    "serial", "model", "os_version", "tving_version", "run_id",
+)
+# run_summary 갱신에 쓰는 (run_id, status, start_time, end_time, elapsed) 위치
+_SUMMARY_FIELDS = tuple(LOG_STEP_COLUMNS.index(column) for column in ("run_id", "status", "start_time", "end_time", "elapsed"))
+
+def get_db_connection(db_path: Optional[str] = None):
     """데이터베이스 연결을 반환합니다."""
-    return sqlite3.connect(db_path)
+    return resolve_storage(db_path).connect()
 
-def init_db(db_path: str = DB_PATH):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS test_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        test_case_id TEXT,
-        step_name TEXT,
-        start_time DATETIME,
-        end_time DATETIME,
-        elapsed REAL,
-        status TEXT,
-        error_msg TEXT,
-        serial TEXT,
-        model TEXT,
-        os_version TEXT,
-        tving_version TEXT,
-        run_id TEXT
-    )
-    """)
-    conn.commit()
+def init_db(db_path: Optional[str] = None):
+    conn = resolve_storage(db_path).connect_ready()
     conn.close()
 
 def log_step(
@@ -44,59 +41,95 @@ def log_step(
     os_version: Optional[str] = None,
     tving_version: Optional[str] = None,
     run_id: Optional[str] = None,
-    db_path: str = DB_PATH
+    db_path: Optional[str] = None
 ):
     if start_time is None:
         start_time = time.time()
     if end_time is None:
         end_time = time.time()
     elapsed = end_time - start_time
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute(
-        """
-        INSERT INTO test_log (test_case_id, step_name, start_time, end_time, elapsed, status, error_msg, serial, model, os_version, tving_version, run_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            test_case_id,
-            step_name,
-            datetime.fromtimestamp(start_time),
-            datetime.fromtimestamp(end_time),
-            elapsed,
-            status,
-            error_msg,
-            serial,
-            model,
-            os_version,
-            tving_version,
-            run_id
-        )
-    )
-    conn.commit()
-    conn.close()
+    # DB 저장은 백그라운드 Writer가 배치 트랜잭션으로 처리 (sqlite3 기본 datetime 어댑터와 동일한 문자열 형식)
+    _get_log_writer(db_path).submit("log_step", (
+        test_case_id,
+        step_name,
+        str(datetime.fromtimestamp(start_time)),
+        str(datetime.fromtimestamp(end_time)),
+        elapsed,
+        status,
+        error_msg,
+        serial,
+        model,
+        os_version,
+        tving_version,
+        run_id
+    ))
+
+def log_run_event(
+    run_id: Optional[str],
+    event_type: str,
+    test_case_id: Optional[str] = None,
+    serial: Optional[str] = None,
+    status: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    db_path: Optional[str] = None
+):
+    """대시보드 실시간 진행 표시용 런 이벤트 기록 (log_step 과 같은 배치 Writer 사용)"""
+    _get_log_writer(db_path).submit("run_event", make_run_event_record(
+        run_id, event_type, test_case_id, serial, status, payload, str(datetime.now())
+    ))
+
+def log_phase(
+    run_id: Optional[str],
+    phase: str,
+    start_time: float,
+    end_time: Optional[float] = None,
+    test_case_id: Optional[str] = None,
+    serial: Optional[str] = None,
+    db_path: Optional[str] = None
+):
+    """런 타임라인용 케이스 단계 구간 기록 (run_timeline.PHASES, log_step 과 같은 배치 Writer 사용)"""
+    if end_time is None:
+        end_time = time.time()
+    _get_log_writer(db_path).submit("phase", (
+        str(run_id) if run_id is not None else None,
+        str(test_case_id) if test_case_id is not None else None,
+        serial,
+        phase,
+        str(datetime.fromtimestamp(start_time)),
+        str(datetime.fromtimestamp(end_time)),
+        end_time - start_time
+    ))
+
+def _update_run_summary(conn, rows):
+    """배치 Writer 가 test_log 저장 직후 같은 트랜잭션에서 호출"""
+    update_run_summary(conn, (tuple(row[i] for i in _SUMMARY_FIELDS) for row in rows))
+
+def _get_log_writer(db_path: Optional[str] = None):
+    return get_batched_writer(resolve_storage(db_path), {
+        "log_step": ("test_log", LOG_STEP_COLUMNS, _update_run_summary),
+        "run_event": (RUN_EVENT_TABLE, RUN_EVENT_COLUMNS),
+        "phase": (PHASE_TABLE, PHASE_COLUMNS),
+    })
+
+def flush_log_steps(timeout: Optional[float] = None):
+    """큐에 쌓인 log_step 레코드를 모두 커밋할 때까지 대기"""
+    flush_all_writers(timeout)
 
-def get_step_stats(db_path: str = DB_PATH):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("SELECT step_name, COUNT(*), AVG(elapsed) FROM test_log GROUP BY step_name")
-    rows = c.fetchall()
+def get_step_stats(db_path: Optional[str] = None):
+    conn = get_db_connection(db_path)
+    rows = conn.execute("SELECT step_name, COUNT(*), AVG(elapsed) FROM test_log GROUP BY step_name").fetchall()
     conn.close()
     return rows
 
-def get_longest_steps(limit: int = 10, db_path: str = DB_PATH):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("SELECT * FROM test_log ORDER BY elapsed DESC LIMIT ?", (limit,))
-    rows = c.fetchall()
+def get_longest_steps(limit: int = 10, db_path: Optional[str] = None):
+    conn = get_db_connection(db_path)
+    rows = conn.execute("SELECT * FROM test_log ORDER BY elapsed DESC LIMIT ?", (limit,)).fetchall()
     conn.close()
     return rows
 
-def get_failures(db_path: str = DB_PATH):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("SELECT * FROM test_log WHERE status='fail'")
-    rows = c.fetchall()
+def get_failures(db_path: Optional[str] = None):
+    conn = get_db_connection(db_path)
+    rows = conn.execute("SELECT * FROM test_log WHERE status='fail'").fetchall()
     conn.close()
     return rows
 
@@ -105,6 +138,7 @@ if __name__ == "__main__":
     init_db()
     log_step("TC00001", "로그인", "success", serial="emulator-5554", model="Pixel 5", os_version="12", tving_version="7.0.0")
     log_step("TC00001", "프로필 전환", "fail", error_msg="Element not found", serial="emulator-5554", model="Pixel 5", os_version="12", tving_version="7.0.0")
+    flush_log_steps()
     print("단계별 통계:", get_step_stats())
     print("가장 오래 걸린 단계:", get_longest_steps())
     print("실패 단계:", get_failures()) 
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""
+테스트 로그 배치 Writer
+log_step 레코드를 메모리 큐에 모아 백그라운드 스레드에서 배치 트랜잭션으로 커밋합니다.
+
+- 배치 크기(batch_size), 주기(flush_interval), 종료(close/atexit) 시점에 플러시
+- 큐에 넣기 전에 스풀 파일(JSON Lines)에 먼저 기록하여 프로세스 크래시 시
+  다음 실행에서 재적용 (at-least-once: 커밋 직후 크래시하면 중복 가능)
+- 저장은 LogStorage.insert_rows (SQLite executemany / PostgreSQL COPY)
+- 잠금/연결 끊김 같은 일시 오류(LogStorage.is_transient)는 배치를 유지한 채 재시도하고, 그 외 오류는
+  레코드 단위로 다시 커밋해 계속 실패하는 레코드만 dead-letter 파일(<스풀 접두사>.deadletter.jsonl)로 옮김
+  (잘못된 레코드 하나가 이후 로그 저장을 모두 막지 않도록)
+- TableSpec 에 after_insert 훅을 주면 같은 트랜잭션 안에서 저장한 행으로 파생 테이블 갱신 (예: run_summary)
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from scripts.utils.log_storage import LogStorage
+
+logger = logging.getLogger(__name__)
+
+# (kind, record) - kind별 (테이블, 컬럼[, after_insert(conn, rows)])에 같은 트랜잭션 안에서 레코드를 저장
+AfterInsert = Callable[[object, List[tuple]], None]
+TableSpec = Union[Tuple[str, Sequence[str]], Tuple[str, Sequence[str], AfterInsert]]
+
+
+class BatchedLogWriter:
+    """스풀 파일 기반 at-least-once 배치 Writer"""
+
+    def __init__(
+        self,
+        storage: LogStorage,
+        tables: Dict[str, TableSpec],
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        spool_dir: Optional[str] = None,
+    ):
+        self.storage = storage
+        self.tables = dict(tables)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_prefix = storage.spool_prefix(spool_dir)
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, tuple]] = []
+        self._submitted = 0
+        self._committed = 0
+        self._closed = False
+        self._flush_requested = False
+        self._rotation = 0
+        self._last_commit = time.monotonic()
+
+        self._spool_path = f"{self.spool_prefix}.{os.getpid()}.spool"
+        self.dead_letter_path = f"{self.spool_prefix}.deadletter.jsonl"
+        self._inflight: List[str] = []
+        self._spool = None
+
+        # 이전 실행에서 남은 스풀 먼저 복구
+        self._recover_spools()
+        self._spool = open(self._spool_path, "a", encoding="utf-8")
+
+        self._thread = threading.Thread(target=self._run, name="BatchedLogWriter", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------ 생산자
+    def submit(self, kind: str, record: tuple) -> None:
+        """레코드를 큐에 추가 (핫 패스: 스풀 append + 리스트 append)"""
+        line = json.dumps([kind, record], ensure_ascii=False, default=str)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchedLogWriter가 이미 종료되었습니다.")
+            self._spool.write(line + "\n")
+            self._spool.flush()
+            self._pending.append((kind, record))
+            self._submitted += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 제출된 레코드가 모두 커밋될 때까지 대기"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._submitted
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._committed < target:
+                if not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.5)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """남은 레코드를 커밋하고 백그라운드 스레드 종료"""
+        with self._cond:
+            if self._closed:
+                return
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        with self._cond:
+            if self._spool and not self._pending and not self._inflight:
+                self._spool.close()
+                self._spool = None
+                self._remove_file(self._spool_path)
+
+    # ------------------------------------------------------------------ 소비자
+    def _run(self) -> None:
+        conn = None
+        batch: List[Tuple[str, tuple]] = []
+        batch_files: List[str] = []
+        taken = 0
+        while True:
+            with self._cond:
+                if not batch:
+                    self._wait_for_batch()
+                    if not self._pending:
+                        self._flush_requested = False
+                        if self._closed:
+                            break
+                        continue
+                    batch, self._pending = self._pending, []
+                    taken = len(batch)
+                    batch_files = self._rotate_spool()
+                    self._flush_requested = False
+            try:
+                if conn is None:
+                    conn = self._connect()
+                self._commit_batch(conn, batch)
+            except Exception as e:
+                # 일시 오류(또는 연결/dead-letter 기록 실패)는 스풀 파일을 유지한 채 재시도 (다시 연결)
+                logger.warning(f"로그 배치 커밋 실패 ({len(batch)}건), 재시도 예정: {e}")
+                if conn is not None:
+                    self._close_quietly(conn)
+                    conn = None
+                time.sleep(min(self.flush_interval, 1.0))
+                continue
+            for path in batch_files:
+                self._remove_file(path)
+            with self._cond:
+                self._inflight = [p for p in self._inflight if p not in batch_files]
+                self._committed += taken
+                self._last_commit = time.monotonic()
+                self._cond.notify_all()
+            batch, batch_files = [], []
+        if conn is not None:
+            conn.close()
+
+    def _wait_for_batch(self) -> None:
+        """배치 크기, 플러시 주기, 명시적 플러시/종료 중 하나가 충족될 때까지 대기 (락 보유 상태)"""
+        deadline = self._last_commit + self.flush_interval
+        while not self._closed and not self._flush_requested and len(self._pending) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if self._pending:
+                    return
+                remaining = self.flush_interval
+            self._cond.wait(remaining)
+
+    def _rotate_spool(self) -> List[str]:
+        """현재 스풀 파일을 inflight로 넘기고 새 스풀 파일을 연다 (락 보유 상태에서 호출)"""
+        self._spool.close()
+        self._rotation += 1
+        inflight_path = f"{self._spool_path}.{self._rotation}"
+        os.replace(self._spool_path, inflight_path)
+        self._spool = open(self._spool_path, "a", encoding="utf-8")
+        self._inflight.append(inflight_path)
+        return list(self._inflight)
+
+    def _connect(self):
+        return self.storage.connect_ready()
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _commit_batch(self, conn, batch: List[Tuple[str, tuple]]) -> None:
+        """배치 커밋, 영구 오류면 레코드 단위로 다시 커밋해 실패한 레코드를 dead-letter 로 격리
+
+        일시 오류는 호출자에게 다시 발생시키며, 그때까지 레코드 단위로 커밋한 레코드는 batch 에서 제거
+        """
+        try:
+            self._commit(conn, batch)
+            return
+        except Exception as e:
+            if self.storage.is_transient(e):
+                raise
+            logger.warning(f"로그 배치 커밋 실패 ({len(batch)}건), 레코드 단위로 다시 시도: {e}")
+        dead: List[Tuple[Tuple[str, tuple], Exception]] = []
+        for index, item in enumerate(batch):
+            try:
+                self._commit(conn, [item])
+            except Exception as e:
+                if self.storage.is_transient(e):
+                    self._dead_letter(dead)
+                    del batch[:index]
+                    raise
+                dead.append((item, e))
+        self._dead_letter(dead)
+
+    def _dead_letter(self, dead: List[Tuple[Tuple[str, tuple], Exception]]) -> None:
+        """커밋할 수 없는 레코드를 dead-letter 파일에 기록 (스풀 복구 대상이 아니므로 재적용되지 않음)"""
+        if not dead:
+            return
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for (kind, record), error in dead:
+                f.write(json.dumps({"kind": kind, "record": record, "error": f"{type(error).__name__}: {error}",
+                                    "failed_at": time.strftime('%Y-%m-%d %H:%M:%S')},
+                                   ensure_ascii=False, default=str) + "\n")
+        logger.error(f"커밋할 수 없는 로그 레코드 {len(dead)}건을 {self.dead_letter_path} 로 옮김: {dead[0][1]}")
+
+    def _commit(self, conn, batch: List[Tuple[str, tuple]]) -> None:
+        grouped: Dict[str, List[tuple]] = {}
+        for kind, record in batch:
+            grouped.setdefault(kind, []).append(tuple(record))
+        with conn:
+            for kind, rows in grouped.items():
+                spec = self.tables.get(kind)
+                if spec is None:
+                    logger.error(f"알 수 없는 로그 레코드 종류: {kind} ({len(rows)}건 무시)")
+                    continue
+                table, columns, *after_insert = spec
+                self.storage.insert_rows(conn, table, columns, rows)
+                for hook in after_insert:
+                    hook(conn, rows)
+
+    # ------------------------------------------------------------------ 복구
+    def _recover_spools(self) -> None:
+        """종료된 프로세스가 남긴 스풀 파일을 DB에 재적용"""
+        for path in sorted(glob.glob(f"{self.spool_prefix}.*.spool*")):
+            pid = self._spool_pid(path)
+            if pid is not None and pid != os.getpid() and self._pid_alive(pid):
+                continue
+            records = []
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    try:
+                        kind, record = json.loads(line)
+                        records.append((kind, tuple(record)))
+                    except ValueError:
+                        continue  # 크래시로 잘린 마지막 줄
+            if records:
+                try:
+                    conn = self._connect()
+                    try:
+                        self._commit_batch(conn, records)
+                    finally:
+                        conn.close()
+                except Exception as e:
+                    # 남은 레코드는 백그라운드 스레드가 재시도하고, 커밋되면 스풀 파일 삭제
+                    logger.warning(f"스풀 복구 실패, 백그라운드에서 재시도: {path} ({len(records)}건): {e}")
+                    self._pending.extend(records)
+                    self._submitted += len(records)
+                    self._inflight.append(path)
+                    continue
+                logger.info(f"스풀 복구 완료: {path} ({len(records)}건)")
+            self._remove_file(path)
+
+    @staticmethod
+    def _spool_pid(path: str) -> Optional[int]:
+        parts = os.path.basename(path).split(".")
+        try:
+            return int(parts[parts.index("spool") - 1])
+        except (ValueError, IndexError):
+            return None
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_writers: Dict[str, BatchedLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_batched_writer(storage: LogStorage, tables: Dict[str, TableSpec], **kwargs) -> BatchedLogWriter:
+    """저장소별 Writer 싱글톤 반환"""
+    key = storage.key
+    writer = _writers.get(key)
+    if writer is not None:
+        return writer
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = BatchedLogWriter(storage, tables, **kwargs)
+            _writers[key] = writer
+    return writer
+
+
+def flush_all_writers(timeout: Optional[float] = None) -> None:
+    """모든 Writer 플러시"""
+    for writer in list(_writers.values()):
+        writer.flush(timeout)
+
+
+def close_all_writers() -> None:
+    """모든 Writer 종료 (프로세스 종료 시 자동 호출)"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            logger.warning(f"로그 Writer 종료 중 오류: {e}")
+
+
+atexit.register(close_all_writers)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+API 패턴 인덱스 테스트
+APIPatternIndex.match 의 결과가 패턴별 re.search 결과와 같은지 확인합니다
+(캡처 그룹, 선택(|), 역참조, 서로 겹치는 패턴 포함).
+
+사용법:
+    python -m pytest test_api_pattern_index.py
+"""
+
+import re
+import sys
+import unittest
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from scripts.utils.maestro_api_validator import APIPatternIndex
+
+PATTERNS = (
+    r"https://api\.tving\.com/v2/media",
+    r"/api/content",
+    r"/api/content/list",
+    r"(a|b)c",
+    r"\.json$",
+    r"media/(\d+)/\1",
+    r"(?P<kind>vod|live)/(?P=kind)",
+    r"login|logout",
+)
+
+URLS = (
+    "https://api.tving.com/v2/media/123",
+    "https://example.com/api/content/list?page=1",
+    "https://example.com/api/content",
+    "bc",
+    "x.json",
+    "media/3/3",
+    "media/3/4",
+    "https://example.com/vod/vod.json",
+    "https://example.com/vod/live",
+    "https://example.com/user/LOGOUT",
+    "HTTPS://API.TVING.COM/V2/MEDIA/3/3",
+    "",
+    "line1\nmedia/7/7",
+)
+
+
+def search_each(patterns, url):
+    """기준 구현: 패턴마다 re.search"""
+    return tuple(i for i, pattern in enumerate(patterns) if re.search(pattern, url, re.IGNORECASE))
+
+
+class APIPatternIndexTest(unittest.TestCase):
+    def test_matches_per_pattern_search(self):
+        index = APIPatternIndex(PATTERNS)
+        for url in URLS:
+            with self.subTest(url=url):
+                self.assertEqual(index.match(url), search_each(PATTERNS, url))
+
+    def test_groups_do_not_shift_indices(self):
+        index = APIPatternIndex(PATTERNS)
+        self.assertEqual(index.match("bc"), (3,))
+        self.assertEqual(index.match("x.json"), (4,))
+        self.assertEqual(index.match("media/3/3"), (5,))
+        self.assertEqual(index.match("media/3/4"), ())
+
+    def test_cached_result_is_stable(self):
+        index = APIPatternIndex(PATTERNS)
+        first = index.match("https://example.com/api/content/list")
+        self.assertEqual(index.match("https://example.com/api/content/list"), first)
+        self.assertEqual(first, (1, 2))
+
+    def test_inline_flags_fall_back_to_search(self):
+        patterns = ("(?i)media", r"/api/content")
+        index = APIPatternIndex(patterns)
+        for url in URLS:
+            with self.subTest(url=url):
+                self.assertEqual(index.match(url), search_each(patterns, url))
+
+    def test_invalid_pattern_raises(self):
+        with self.assertRaises(re.error):
+            APIPatternIndex(("(unclosed",))
+
+    def test_empty_patterns(self):
+        self.assertEqual(APIPatternIndex(()).match("https://example.com"), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL 로그 저장소 테스트
+SQL 변환(_translate)과 COPY 이스케이프(_copy_value)는 항상 실행하고, 실제 PostgreSQL 이 필요한 테스트
+(쿼리 래퍼, COPY 대량 저장, 배치 Writer 저장)는 QA_TEST_POSTGRESQL_DSN 이 있을 때만 실행합니다.
+PostgreSQL 테스트는 임시 스키마에 러너 스키마를 만들고 끝나면 삭제합니다.
+
+사용법:
+    python -m pytest test_log_storage.py
+    QA_TEST_POSTGRESQL_DSN=postgresql://qa@localhost:5432/qa_log python test_log_storage.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from scripts.utils.log_storage import PostgresStorage, _copy_value, _translate, psycopg2
+
+TEST_DSN = os.environ.get("QA_TEST_POSTGRESQL_DSN")
+
+# COPY text 형식에서 이스케이프가 필요한 값들
+TRICKY_VALUES = [
+    "탭\t구분", "줄\n바꿈", "캐리지\r리턴", "역슬래시 \\ 경로", "\\N", "100%", "물음표?", "'따옴표'", "",
+]
+
+
+class TranslateTest(unittest.TestCase):
+    def test_parameters_outside_literals(self):
+        self.assertEqual(_translate("SELECT a FROM t WHERE b = ? AND c = ?"),
+                         "SELECT a FROM t WHERE b = %s AND c = %s")
+
+    def test_question_marks_in_literals_are_kept(self):
+        # api_columnar 의 URL 경로 추출 식
+        self.assertEqual(_translate("SELECT substr(t.url, 1, instr(t.url || '?', '?') - 1) FROM t WHERE id > ?"),
+                         "SELECT substr(t.url, 1, instr(t.url || '?', '?') - 1) FROM t WHERE id > %s")
+        self.assertEqual(_translate("SELECT 'it''s ?', \"col?\" FROM t WHERE a = ?"),
+                         "SELECT 'it''s ?', \"col?\" FROM t WHERE a = %s")
+
+    def test_question_marks_in_comments_are_kept(self):
+        self.assertEqual(_translate("SELECT ? -- 왜?\n, /* 이것도? */ ?"),
+                         "SELECT %s -- 왜?\n, /* 이것도? */ %s")
+
+    def test_percent_is_escaped_everywhere(self):
+        # psycopg2 는 파라미터가 있으면 문자열 상수까지 % 포맷하므로 상수 안의 % 도 이스케이프
+        self.assertEqual(_translate("SELECT a FROM t WHERE url LIKE '%tving%' AND b = ?"),
+                         "SELECT a FROM t WHERE url LIKE '%%tving%%' AND b = %s")
+
+    def test_insert_or_ignore(self):
+        self.assertEqual(_translate("INSERT OR IGNORE INTO t (a, b) VALUES (?, ?);"),
+                         "INSERT INTO t (a, b) VALUES (%s, %s) ON CONFLICT DO NOTHING")
+
+
+class CopyValueTest(unittest.TestCase):
+    def test_special_characters(self):
+        self.assertEqual(_copy_value(None), "\\N")
+        self.assertEqual(_copy_value("a\tb\nc\rd\\e"), "a\\tb\\nc\\rd\\\\e")
+        self.assertEqual(_copy_value("\\N"), "\\\\N")
+        self.assertEqual(_copy_value("평범한 값"), "평범한 값")
+
+    def test_scalar_types(self):
+        self.assertEqual(_copy_value(b"\x00\xff"), "\\\\x00ff")
+        self.assertEqual(_copy_value(True), "t")
+        self.assertEqual(_copy_value(1.5), "1.5")
+
+
+@unittest.skipUnless(TEST_DSN and psycopg2 is not None, "QA_TEST_POSTGRESQL_DSN 미설정 (또는 psycopg2 없음)")
+class PostgresStorageTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schema = f"qa_log_test_{os.getpid()}"
+        admin = psycopg2.connect(TEST_DSN)
+        admin.autocommit = True
+        with admin.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA {cls.schema}")
+        admin.close()
+        cls.storage = PostgresStorage(psycopg2.extensions.make_dsn(TEST_DSN, options=f"-c search_path={cls.schema}"))
+        cls.storage.connect_ready().close()
+
+    @classmethod
+    def tearDownClass(cls):
+        from scripts.utils.testlog_writer import close_all_writers
+
+        close_all_writers()
+        admin = psycopg2.connect(TEST_DSN)
+        admin.autocommit = True
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA {cls.schema} CASCADE")
+        admin.close()
+
+    def setUp(self):
+        self.conn = self.storage.connect()
+
+    def tearDown(self):
+        self.conn.rollback()
+        self.conn.close()
+
+    def test_literal_question_marks_and_percent(self):
+        row = self.conn.execute("SELECT '?' || ?, 'a%b' LIKE ?, strpos('x?y', '?')", ("값", "a%")).fetchone()
+        self.assertEqual(row, ("?값", True, 2))
+
+    def test_copy_rows_round_trip(self):
+        rows = [(f"run-copy-{index}", "copy", value, value) for index, value in enumerate(TRICKY_VALUES)]
+        rows.append(("run-copy-null", "copy", None, None))
+        with self.conn:
+            self.conn.copy_rows("run_event", ("run_id", "event_type", "status", "payload"), rows)
+        stored = self.conn.execute(
+            "SELECT run_id, event_type, status, payload FROM run_event WHERE run_id LIKE ? ORDER BY id",
+            ("run-copy-%",)).fetchall()
+        self.assertEqual(stored, rows)
+
+    def test_copy_rows_bytea(self):
+        payload = bytes(range(256))
+        with self.conn:
+            self.conn.copy_rows("api_body", ("hash", "codec", "size", "data"), [("copy-bytea", "raw", 256, payload)])
+        stored = self.conn.execute("SELECT data FROM api_body WHERE hash = ?", ("copy-bytea",)).fetchone()[0]
+        self.assertEqual(bytes(stored), payload)
+
+    def test_writer_ingest(self):
+        from scripts.utils.testlog_db import LOG_STEP_COLUMNS, _update_run_summary
+        from scripts.utils.testlog_writer import BatchedLogWriter
+
+        spool_dir = tempfile.mkdtemp()
+        try:
+            writer = BatchedLogWriter(self.storage, {"log_step": ("test_log", LOG_STEP_COLUMNS, _update_run_summary)},
+                                      flush_interval=0.1, spool_dir=spool_dir)
+            for index, value in enumerate(TRICKY_VALUES):
+                writer.submit("log_step", (
+                    f"TC{index}", value, "2026-01-01 00:00:00", "2026-01-01 00:00:01", 1.0,
+                    "pass" if index % 2 else "fail", value or None, "emulator-5554", "Pixel", "14", "7.0", "run-writer",
+                ))
+            self.assertTrue(writer.flush(30))
+            writer.close()
+            stored = self.conn.execute(
+                "SELECT step_name FROM test_log WHERE run_id = ? ORDER BY id", ("run-writer",)).fetchall()
+            self.assertEqual([row[0] for row in stored], TRICKY_VALUES)
+            total = self.conn.execute("SELECT total FROM run_summary WHERE run_id = ?", ("run-writer",)).fetchone()
+            self.assertEqual(total, (len(TRICKY_VALUES),))
+            self.assertFalse(os.path.exists(writer.dead_letter_path))
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()